@@ -9,6 +9,9 @@ from app.db.base import get_supabase
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+# users.role values with access to platform-wide operations
+PLATFORM_ADMIN_ROLES = {"owner", "admin"}
+
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme), 
@@ -33,4 +36,13 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
     
-    return user
\ No newline at end of file
+    return user
+
+
+async def get_platform_admin(current_user: dict = Depends(get_current_user)) -> dict:
+    """Current user, if they are a platform admin."""
+    if current_user.get("role") not in PLATFORM_ADMIN_ROLES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Platform admin access required"
+        )
+    return current_user
@@ -0,0 +1,87 @@
+from datetime import UTC, datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.api import deps
+from app.core.config import get_settings
+from app.core.profiling import ProfilerBusyError, profiler
+from app.core.response_cache import get_response_cache
+
+router = APIRouter(prefix="/v1.0/admin", tags=["admin"])
+
+FOLDED_CONTENT_TYPE = "text/plain; charset=utf-8"
+
+
+def _folded(body: str, name: str) -> PlainTextResponse:
+    stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%SZ")
+    return PlainTextResponse(
+        body,
+        media_type=FOLDED_CONTENT_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{name}-{stamp}.folded"'},
+    )
+
+
+@router.post("/profile", include_in_schema=False)
+async def capture_profile(
+    seconds: float | None = Query(None, gt=0, description="Profile every request for this long"),
+    requests: int | None = Query(
+        None, ge=1, description="Profile the next N requests (bounded by the capture limit)"
+    ),
+    _admin: dict = Depends(deps.get_platform_admin),
+) -> PlainTextResponse:
+    """Profile the next `seconds` or `requests` and return collapsed stacks.
+
+    The response is in the folded format read by flamegraph.pl and speedscope,
+    one `route;frame;...;frame count` line per distinct stack.
+    """
+    if seconds is None and requests is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass seconds or requests",
+        )
+    limit = get_settings().profiling_capture_max_seconds
+    if seconds is not None and seconds > limit:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must be at most {limit:g}",
+        )
+    try:
+        recorder = await profiler.capture(seconds=seconds, requests=requests, timeout=limit)
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    return _folded(recorder.render_collapsed(), "profile")
+
+
+@router.get("/profile/continuous", include_in_schema=False)
+async def continuous_profile(
+    reset: bool = Query(False, description="Clear the aggregate after reading it"),
+    _admin: dict = Depends(deps.get_platform_admin),
+) -> PlainTextResponse:
+    """Collapsed stacks aggregated from requests sampled by `profiling_sample_rate`."""
+    recorder = profiler.continuous
+    body = recorder.render_collapsed()
+    if reset:
+        recorder.reset()
+    return _folded(body, "profile-continuous")
+
+
+@router.post("/cache/invalidate", include_in_schema=False)
+async def invalidate_response_cache(
+    dataset: list[str] = Query(
+        ..., min_length=1, description="Datasets to drop, e.g. rankings after a new snapshot"
+    ),
+    _admin: dict = Depends(deps.get_platform_admin),
+) -> dict[str, list[str]]:
+    """Drop cached responses of `dataset` in every worker sharing the cache."""
+    cache = get_response_cache()
+    if cache is not None:
+        try:
+            for name in dataset:
+                await cache.invalidate(name)
+        except ConnectionError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Response cache backend is unavailable",
+            ) from exc
+    return {"invalidated": dataset}
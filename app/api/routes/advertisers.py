@@ -1,11 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from supabase import Client
 
 from app.api import deps
+from app.core.config import get_settings
+from app.core.http_cache import SNAPSHOT_CACHE_POLICY, http_cache
+from app.core.responses import ModelJSONResponse
+from app.core.streaming import StreamFormat, streaming_response
 from app.crud.advertiser import (
     get_advertiser_detail,
     get_advertisers_catalog,
     get_advertisers_summary,
+    iter_advertisers_catalog,
 )
 from app.db.base import get_supabase
 from app.schemas.advertiser import (
@@ -15,17 +21,19 @@ from app.schemas.advertiser import (
     AdvertiserDetailMeta,
     AdvertiserListEnvelope,
     AdvertiserListItem,
-    AdvertiserListMeta,
     AdvertiserSortBy,
     AdvertiserSummary,
     AdvertiserSummaryEnvelope,
     AdvertiserSummaryMeta,
     AdvertiserTimePeriodDays,
-    PageResponse,
     SortOrder,
 )
 
-router = APIRouter(prefix="/v1.0/advertisers", tags=["advertisers"])
+router = APIRouter(
+    prefix="/v1.0/advertisers",
+    tags=["advertisers"],
+    dependencies=[Depends(http_cache(SNAPSHOT_CACHE_POLICY))],
+)
 
 
 @router.get("", response_model=AdvertiserListEnvelope)
@@ -41,11 +49,37 @@ async def list_advertisers(
     sort_order: SortOrder = Query(SortOrder.DESC),
     limit: int = Query(20, ge=1, le=200),
     cursor: str | None = Query(None),
+    response_format: StreamFormat = Query(
+        StreamFormat.JSON,
+        alias="format",
+        description="ndjson or csv streams every matching row; limit and cursor apply to json only",
+    ),
     current_user: dict = Depends(deps.get_current_user),
     client: Client = Depends(get_supabase),
-) -> AdvertiserListEnvelope:
+) -> ModelJSONResponse | StreamingResponse:
     _ = current_user
 
+    if response_format != StreamFormat.JSON:
+        pages = iter_advertisers_catalog(
+            client,
+            q=q,
+            industry_slug=industry_slug,
+            time_period_days=int(time_period_days),
+            min_spend=min_spend,
+            min_channels=min_channels,
+            min_engagement=min_engagement,
+            activity_status=activity_status,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            page_size=get_settings().stream_page_size,
+        )
+        return streaming_response(
+            pages,
+            fmt=response_format,
+            fields=list(AdvertiserListItem.model_fields),
+            filename="advertisers",
+        )
+
     try:
         result = await get_advertisers_catalog(
             client,
@@ -67,19 +101,19 @@ async def list_advertisers(
             detail=str(exc),
         ) from exc
 
-    return AdvertiserListEnvelope(
-        data=[AdvertiserListItem(**row) for row in result["items"]],
-        page=PageResponse(
-            next_cursor=result["next_cursor"],
-            has_more=result["has_more"],
-        ),
-        meta=AdvertiserListMeta(
-            total_estimate=result["total_estimate"],
-            time_period_days=int(time_period_days),
-            snapshot_date=result["snapshot_date"],
-            baseline_date=result["baseline_date"],
-        ),
+    envelope = AdvertiserListEnvelope.model_validate(
+        {
+            "data": result["items"],
+            "page": {"next_cursor": result["next_cursor"], "has_more": result["has_more"]},
+            "meta": {
+                "total_estimate": result["total_estimate"],
+                "time_period_days": int(time_period_days),
+                "snapshot_date": result["snapshot_date"],
+                "baseline_date": result["baseline_date"],
+            },
+        }
     )
+    return ModelJSONResponse(envelope)
 
 
 @router.get("/summary", response_model=AdvertiserSummaryEnvelope)
@@ -1,22 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from supabase import Client
 
 from app.api import deps
-from app.crud.channel import get_catalog_channels, get_channel_overview
+from app.core.config import get_settings
+from app.core.http_cache import SNAPSHOT_CACHE_POLICY, http_cache
+from app.core.responses import ModelJSONResponse
+from app.core.streaming import StreamFormat, streaming_response
+from app.crud.channel import get_catalog_channels, get_channel_overview, iter_catalog_channels
 from app.db.base import get_supabase
 from app.schemas.channel import (
     ChannelListEnvelope,
     ChannelListItem,
-    ChannelListMeta,
     ChannelOverviewEnvelope,
     ChannelSizeBucket,
     ChannelSortBy,
     ChannelStatus,
-    PageResponse,
     SortOrder,
 )
 
-router = APIRouter(prefix="/v1.0/channels", tags=["channels"])
+router = APIRouter(
+    prefix="/v1.0/channels",
+    tags=["channels"],
+    dependencies=[Depends(http_cache(SNAPSHOT_CACHE_POLICY))],
+)
 
 
 @router.get("", response_model=ChannelListEnvelope)
@@ -39,9 +46,14 @@ async def list_channels(
     sort_order: SortOrder = Query(SortOrder.DESC),
     limit: int = Query(20, ge=1, le=200),
     cursor: str | None = Query(None),
+    response_format: StreamFormat = Query(
+        StreamFormat.JSON,
+        alias="format",
+        description="ndjson or csv streams every matching row; limit and cursor apply to json only",
+    ),
     current_user: dict = Depends(deps.get_current_user),
     client: Client = Depends(get_supabase),
-) -> ChannelListEnvelope:
+) -> ModelJSONResponse | StreamingResponse:
     """Search and filter channels catalog."""
     _ = current_user
 
@@ -51,6 +63,29 @@ async def list_channels(
             detail="er_min cannot be greater than er_max",
         )
 
+    if response_format != StreamFormat.JSON:
+        pages = iter_catalog_channels(
+            client,
+            q=q,
+            country_code=country_code,
+            category_slug=category_slug,
+            size_bucket=size_bucket,
+            er_min=er_min,
+            er_max=er_max,
+            status=status_filter,
+            verified=verified,
+            scam=scam,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            page_size=get_settings().stream_page_size,
+        )
+        return streaming_response(
+            pages,
+            fmt=response_format,
+            fields=list(ChannelListItem.model_fields),
+            filename="channels",
+        )
+
     try:
         result = await get_catalog_channels(
             client,
@@ -74,14 +109,14 @@ async def list_channels(
             detail=str(exc),
         ) from exc
 
-    return ChannelListEnvelope(
-        data=[ChannelListItem(**row) for row in result["items"]],
-        page=PageResponse(
-            next_cursor=result["next_cursor"],
-            has_more=result["has_more"],
-        ),
-        meta=ChannelListMeta(total_estimate=result["total_estimate"]),
+    envelope = ChannelListEnvelope.model_validate(
+        {
+            "data": result["items"],
+            "page": {"next_cursor": result["next_cursor"], "has_more": result["has_more"]},
+            "meta": {"total_estimate": result["total_estimate"]},
+        }
     )
+    return ModelJSONResponse(envelope)
 
 
 @router.get("/{channel_id}/overview", response_model=ChannelOverviewEnvelope)
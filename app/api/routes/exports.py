@@ -0,0 +1,143 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from supabase import Client
+
+from app.api import deps
+from app.crud.account_access import ensure_account_access
+from app.crud.export import create_export_job, get_export_job, list_export_jobs
+from app.db.base import get_supabase
+from app.schemas.export import (
+    ExportCreateRequest,
+    ExportFormat,
+    ExportJob,
+    ExportJobEnvelope,
+    ExportJobListEnvelope,
+    ExportStatus,
+    PageResponse,
+)
+from app.services.exports import (
+    EXPORT_FILE_EXTENSIONS,
+    EXPORT_MEDIA_TYPES,
+    export_file_path,
+    parquet_available,
+    run_export_job_in_background,
+)
+
+router = APIRouter(prefix="/v1.0/accounts/{account_id}", tags=["exports"])
+
+
+async def _ensure_member(client: Client, account_id: str, x_account_id: str, user_id: str) -> None:
+    try:
+        await ensure_account_access(
+            client,
+            account_id=account_id,
+            header_account_id=x_account_id,
+            user_id=user_id,
+            require_write=False,
+        )
+    except PermissionError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+
+
+@router.post("/exports", response_model=ExportJobEnvelope, status_code=status.HTTP_202_ACCEPTED)
+async def create_account_export(
+    account_id: str,
+    payload: ExportCreateRequest,
+    background_tasks: BackgroundTasks,
+    x_account_id: str = Header(..., alias="X-Account-Id"),
+    current_user: dict = Depends(deps.get_current_user),
+    client: Client = Depends(get_supabase),
+) -> ExportJobEnvelope:
+    """Queue an export; poll the job until `status` is `completed`, then download it."""
+    await _ensure_member(client, account_id, x_account_id, current_user["id"])
+
+    if payload.format == ExportFormat.PARQUET and not parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet exports are not available on this server.",
+        )
+
+    try:
+        job = await create_export_job(
+            client,
+            account_id=account_id,
+            user_id=current_user["id"],
+            export_type=payload.export_type,
+            export_format=payload.format,
+            filters=payload.filters,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    background_tasks.add_task(run_export_job_in_background, client, str(job["export_id"]))
+    return ExportJobEnvelope(data=ExportJob(**job), meta={})
+
+
+@router.get("/exports", response_model=ExportJobListEnvelope)
+async def list_account_exports(
+    account_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None),
+    x_account_id: str = Header(..., alias="X-Account-Id"),
+    current_user: dict = Depends(deps.get_current_user),
+    client: Client = Depends(get_supabase),
+) -> ExportJobListEnvelope:
+    await _ensure_member(client, account_id, x_account_id, current_user["id"])
+
+    try:
+        result = await list_export_jobs(client, account_id=account_id, limit=limit, cursor=cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    return ExportJobListEnvelope(
+        data=[ExportJob(**item) for item in result["items"]],
+        page=PageResponse(next_cursor=result["next_cursor"], has_more=result["has_more"]),
+        meta={},
+    )
+
+
+@router.get("/exports/{export_id}", response_model=ExportJobEnvelope)
+async def get_account_export(
+    account_id: str,
+    export_id: str,
+    x_account_id: str = Header(..., alias="X-Account-Id"),
+    current_user: dict = Depends(deps.get_current_user),
+    client: Client = Depends(get_supabase),
+) -> ExportJobEnvelope:
+    await _ensure_member(client, account_id, x_account_id, current_user["id"])
+
+    job = await get_export_job(client, account_id=account_id, export_id=export_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export not found.")
+    return ExportJobEnvelope(data=ExportJob(**job), meta={})
+
+
+@router.get("/exports/{export_id}/download")
+async def download_account_export(
+    account_id: str,
+    export_id: str,
+    x_account_id: str = Header(..., alias="X-Account-Id"),
+    current_user: dict = Depends(deps.get_current_user),
+    client: Client = Depends(get_supabase),
+) -> FileResponse:
+    await _ensure_member(client, account_id, x_account_id, current_user["id"])
+
+    job = await get_export_job(client, account_id=account_id, export_id=export_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export not found.")
+    if job["status"] != ExportStatus.COMPLETED.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export is {job['status']}.",
+        )
+
+    export_format = ExportFormat(job["format"])
+    path = export_file_path(account_id, export_id, export_format)
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export file not found.")
+
+    return FileResponse(
+        path,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        filename=f"{job['export_type']}-{export_id}.{EXPORT_FILE_EXTENSIONS[export_format]}",
+    )
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from supabase import Client
 
+from app.core.http_cache import SNAPSHOT_CACHE_POLICY, http_cache
 from app.crud.home import get_home_categories, get_home_countries
 from app.db.base import get_supabase
 from app.schemas.home import (
@@ -13,7 +14,11 @@ from app.schemas.home import (
     PageResponse,
 )
 
-router = APIRouter(prefix="/v1.0/home", tags=["home"])
+router = APIRouter(
+    prefix="/v1.0/home",
+    tags=["home"],
+    dependencies=[Depends(http_cache(SNAPSHOT_CACHE_POLICY))],
+)
 
 
 @router.get("/categories", response_model=HomeCategoriesEnvelope)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import get_settings
+from app.core.query_metrics import PROMETHEUS_CONTENT_TYPE, query_metrics
+
+router = APIRouter(tags=["monitoring"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """Database query metrics in the Prometheus text format."""
+    if not get_settings().metrics_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return PlainTextResponse(query_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,22 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from supabase import Client
 
 from app.api import deps
-from app.crud.mini_app import get_mini_apps_catalog, get_mini_apps_summary
+from app.core.config import get_settings
+from app.core.http_cache import SNAPSHOT_CACHE_POLICY, http_cache
+from app.core.responses import ModelJSONResponse
+from app.core.streaming import StreamFormat, streaming_response
+from app.crud.mini_app import get_mini_apps_catalog, get_mini_apps_summary, iter_mini_apps_catalog
 from app.db.base import get_supabase
 from app.schemas.mini_app import (
     MiniAppListEnvelope,
     MiniAppListItem,
-    MiniAppListMeta,
     MiniAppSortBy,
     MiniAppsPeriod,
     MiniAppsSummary,
     MiniAppsSummaryEnvelope,
-    PageResponse,
     SortOrder,
 )
 
-router = APIRouter(prefix="/v1.0/mini-apps", tags=["mini_apps"])
+router = APIRouter(
+    prefix="/v1.0/mini-apps",
+    tags=["mini_apps"],
+    dependencies=[Depends(http_cache(SNAPSHOT_CACHE_POLICY))],
+)
 
 
 @router.get("/summary", response_model=MiniAppsSummaryEnvelope)
@@ -42,11 +49,36 @@ async def list_mini_apps(
     sort_order: SortOrder = Query(SortOrder.DESC),
     limit: int = Query(20, ge=1, le=200),
     cursor: str | None = Query(None),
+    response_format: StreamFormat = Query(
+        StreamFormat.JSON,
+        alias="format",
+        description="ndjson or csv streams every matching row; limit and cursor apply to json only",
+    ),
     current_user: dict = Depends(deps.get_current_user),
     client: Client = Depends(get_supabase),
-) -> MiniAppListEnvelope:
+) -> ModelJSONResponse | StreamingResponse:
     _ = current_user
 
+    if response_format != StreamFormat.JSON:
+        pages = iter_mini_apps_catalog(
+            client,
+            q=q,
+            category_slug=category_slug,
+            min_daily_users=min_daily_users,
+            min_rating=min_rating,
+            launch_within_days=launch_within_days,
+            min_growth=min_growth,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            page_size=get_settings().stream_page_size,
+        )
+        return streaming_response(
+            pages,
+            fmt=response_format,
+            fields=list(MiniAppListItem.model_fields),
+            filename="mini_apps",
+        )
+
     try:
         result = await get_mini_apps_catalog(
             client,
@@ -67,11 +99,11 @@ async def list_mini_apps(
             detail=str(exc),
         ) from exc
 
-    return MiniAppListEnvelope(
-        data=[MiniAppListItem(**row) for row in result["items"]],
-        page=PageResponse(
-            next_cursor=result["next_cursor"],
-            has_more=result["has_more"],
-        ),
-        meta=MiniAppListMeta(total_estimate=result["total_estimate"]),
+    envelope = MiniAppListEnvelope.model_validate(
+        {
+            "data": result["items"],
+            "page": {"next_cursor": result["next_cursor"], "has_more": result["has_more"]},
+            "meta": {"total_estimate": result["total_estimate"]},
+        }
     )
+    return ModelJSONResponse(envelope)
@@ -1,20 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from supabase import Client
 
 from app.api import deps
+from app.core.config import get_settings
+from app.crud.account_access import ensure_account_access
 from app.crud.notification import (
+    create_notification_fanout_job,
+    get_notification_fanout_job,
     get_user_notification_by_id,
     get_user_notifications,
     get_user_notifications_count,
+    get_user_unread_count,
     mark_all_notifications_as_read,
     mark_notification_as_read,
 )
 from app.db.base import get_supabase
 from app.schemas.notification import (
     NotificationCountResponse,
+    NotificationFanoutJobResponse,
+    NotificationFanoutRequest,
     NotificationListResponse,
+    NotificationMarkAllReadResponse,
     NotificationResponse,
 )
+from app.services.notification_fanout import run_fanout_job, run_fanout_job_in_background
+from app.services.notification_stream import (
+    get_notification_broker,
+    iter_notification_events,
+    publish_unread_count,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1.0/notifications", tags=["notifications"])
 
@@ -25,6 +47,9 @@ async def list_notifications(
     limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
     cursor: str
     | None = Query(None, description="Pagination cursor for infinite scroll behavior"),
+    include_unread_count: bool = Query(
+        False, description="Also return the user's unread notification count"
+    ),
     current_user: dict = Depends(deps.get_current_user),
     client: Client = Depends(get_supabase),
 ) -> NotificationListResponse:
@@ -43,9 +68,14 @@ async def list_notifications(
             detail=str(exc),
         ) from exc
 
+    unread_count = None
+    if include_unread_count:
+        unread_count = await get_user_unread_count(client, user_id=current_user["id"])
+
     return NotificationListResponse(
         items=[NotificationResponse(**notification) for notification in result["items"]],
         next_cursor=result["next_cursor"],
+        unread_count=unread_count,
     )
 
 
@@ -62,6 +92,143 @@ async def get_notifications_count(
     return NotificationCountResponse(count=count)
 
 
+@router.get("/stream")
+async def stream_notifications(
+    current_user: dict = Depends(deps.get_current_user),
+    client: Client = Depends(get_supabase),
+) -> StreamingResponse:
+    """Server-Sent Events feed of new notifications and unread count changes.
+
+    `/notifications` and `/notifications/count` remain available for clients
+    that cannot keep a stream open.
+    """
+    settings = get_settings()
+    broker = get_notification_broker()
+    user_id = current_user["id"]
+
+    async def event_stream() -> AsyncIterator[str]:
+        subscription = broker.subscribe(user_id)
+        try:
+            yield f"retry: {int(settings.notification_stream_heartbeat_seconds * 1000)}\n\n"
+            async for item in iter_notification_events(
+                broker,
+                subscription,
+                get_unread_count=lambda: get_user_unread_count(client, user_id=user_id),
+                heartbeat_seconds=settings.notification_stream_heartbeat_seconds,
+                resync_seconds=settings.notification_stream_resync_seconds,
+                max_seconds=settings.notification_stream_max_seconds,
+            ):
+                if item is None:
+                    yield ": keepalive\n\n"
+                    continue
+                event, data = item
+                if event == "notification":
+                    payload = NotificationResponse(**data).model_dump_json()
+                else:
+                    payload = json.dumps(data)
+                yield f"event: {event}\ndata: {payload}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/fanouts",
+    response_model=NotificationFanoutJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_notification_fanout(
+    payload: NotificationFanoutRequest,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(deps.get_current_user),
+    client: Client = Depends(get_supabase),
+) -> NotificationFanoutJobResponse:
+    """Notify many users with set-based inserts instead of one request per user.
+
+    Account targets need an owner or admin of that account; explicit user
+    lists and `all` are limited to platform admins. Small user lists are
+    delivered before responding, everything else runs in the background and
+    can be followed with `GET /notifications/fanouts/{job_id}`.
+    """
+    target = payload.target
+    if target.type == "account":
+        try:
+            await ensure_account_access(
+                client,
+                account_id=target.account_id,
+                header_account_id=target.account_id,
+                user_id=current_user["id"],
+                require_write=True,
+            )
+            allowed = True
+        except PermissionError:
+            allowed = False
+    else:
+        allowed = current_user.get("role") in deps.PLATFORM_ADMIN_ROLES
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to notify this audience",
+        )
+
+    try:
+        job = await create_notification_fanout_job(
+            client,
+            created_by=current_user["id"],
+            target_type=target.type,
+            user_ids=target.user_ids,
+            account_id=target.account_id,
+            subject=payload.subject,
+            body=payload.body,
+            notification_type=payload.type,
+            details=payload.details,
+            cta=payload.cta,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+    job_id = str(job["id"])
+    inline_max = get_settings().notification_fanout_inline_max
+    if target.type == "users" and len(target.user_ids) <= inline_max:
+        try:
+            await asyncio.to_thread(run_fanout_job, client, job_id)
+        except Exception:
+            # Recorded on the job, which is returned with its failed status.
+            logger.exception("Inline notification fan-out %s failed", job_id)
+        job = await get_notification_fanout_job(client, job_id=job_id) or job
+    else:
+        background_tasks.add_task(run_fanout_job_in_background, client, job_id)
+
+    return NotificationFanoutJobResponse(**job)
+
+
+@router.get("/fanouts/{job_id}", response_model=NotificationFanoutJobResponse)
+async def get_notification_fanout(
+    job_id: str,
+    current_user: dict = Depends(deps.get_current_user),
+    client: Client = Depends(get_supabase),
+) -> NotificationFanoutJobResponse:
+    """Progress of a fan-out job, for its creator or a platform admin."""
+    job = await get_notification_fanout_job(client, job_id=job_id)
+    if not job or (
+        str(job.get("created_by")) != str(current_user["id"])
+        and current_user.get("role") not in deps.PLATFORM_ADMIN_ROLES
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Fan-out job not found",
+        )
+    return NotificationFanoutJobResponse(**job)
+
+
 @router.get("/{notification_id}", response_model=NotificationResponse)
 async def get_notification(
     notification_id: str,
@@ -80,14 +247,19 @@ async def get_notification(
     return NotificationResponse(**notification)
 
 
-@router.post("/read", response_model=list[NotificationResponse])
+@router.post("/read", response_model=NotificationMarkAllReadResponse)
 async def mark_all_notifications_read(
     current_user: dict = Depends(deps.get_current_user),
     client: Client = Depends(get_supabase),
-) -> list[NotificationResponse]:
-    """Mark all notifications for the current user as read."""
-    notifications = await mark_all_notifications_as_read(client, current_user["id"])
-    return [NotificationResponse(**notification) for notification in notifications]
+) -> NotificationMarkAllReadResponse:
+    """Mark all unread notifications for the current user as read."""
+    user_id = current_user["id"]
+    updated = await mark_all_notifications_as_read(client, user_id)
+    if updated:
+        await publish_unread_count(
+            user_id, get_unread_count=lambda: get_user_unread_count(client, user_id=user_id)
+        )
+    return NotificationMarkAllReadResponse(updated=updated)
 
 
 @router.post("/{notification_id}/read", response_model=NotificationResponse)
@@ -97,16 +269,17 @@ async def mark_single_notification_read(
     client: Client = Depends(get_supabase),
 ) -> NotificationResponse:
     """Mark a single notification as read for the current user."""
-    existing = await get_user_notification_by_id(
-        client, notification_id=notification_id, user_id=current_user["id"]
-    )
-    if not existing:
+    user_id = current_user["id"]
+    try:
+        updated = await mark_notification_as_read(
+            client, notification_id=notification_id, user_id=user_id
+        )
+    except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found",
-        )
-
-    updated = await mark_notification_as_read(
-        client, notification_id=notification_id, user_id=current_user["id"]
+        ) from exc
+    await publish_unread_count(
+        user_id, get_unread_count=lambda: get_user_unread_count(client, user_id=user_id)
     )
     return NotificationResponse(**updated)
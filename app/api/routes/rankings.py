@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, Query
 from supabase import Client
 
 from app.api import deps
+from app.core.http_cache import SNAPSHOT_CACHE_POLICY, http_cache
 from app.crud.ranking import (
     get_category_rankings,
     get_country_rankings,
@@ -17,7 +18,11 @@ from app.schemas.ranking import (
     RankingCollectionsEnvelope,
 )
 
-router = APIRouter(prefix="/v1.0/rankings", tags=["rankings"])
+router = APIRouter(
+    prefix="/v1.0/rankings",
+    tags=["rankings"],
+    dependencies=[Depends(http_cache(SNAPSHOT_CACHE_POLICY))],
+)
 
 
 @router.get("/countries", response_model=CountryRankingsEnvelope)
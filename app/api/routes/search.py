@@ -0,0 +1,122 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from supabase import Client
+
+from app.api import deps
+from app.core.config import get_settings
+from app.crud.search import normalize_search_term
+from app.db.base import get_supabase
+from app.schemas.search import (
+    SearchEnvelope,
+    SearchMeta,
+    SearchResults,
+    SearchSource,
+    SearchSourceMeta,
+    SearchSourceStatus,
+    SuggestEntityType,
+    SuggestEnvelope,
+    SuggestItem,
+    SuggestMeta,
+    SuggestResults,
+)
+from app.services.search import search_sources
+from app.services.suggest import (
+    MAX_SUGGEST_LIMIT,
+    PrefixIndex,
+    is_suggest_index_stale,
+    load_suggest_indexes,
+    refresh_suggest_indexes,
+)
+
+router = APIRouter(prefix="/v1.0/search", tags=["search"])
+
+
+def _suggest(index: PrefixIndex, q: str, limit: int) -> list[SuggestItem]:
+    return [
+        SuggestItem(
+            id=entry.entity_id,
+            name=entry.name,
+            handle=entry.handle,
+            popularity=entry.popularity,
+        )
+        for entry in index.search(q, limit=limit)
+    ]
+
+
+@router.get("/suggest", response_model=SuggestEnvelope)
+async def suggest(
+    background_tasks: BackgroundTasks,
+    q: str = Query(..., min_length=1, max_length=100, description="Typed prefix"),
+    types: list[SuggestEntityType] | None = Query(None, description="Entity types to suggest"),
+    limit: int = Query(5, ge=1, le=MAX_SUGGEST_LIMIT),
+    current_user: dict = Depends(deps.get_current_user),
+    client: Client = Depends(get_supabase),
+) -> SuggestEnvelope:
+    """Typeahead suggestions served from the in-process prefix index."""
+    _ = current_user
+
+    indexes = await load_suggest_indexes(client)
+    if is_suggest_index_stale(indexes):
+        # A sync task, so Starlette runs the rebuild in its threadpool.
+        background_tasks.add_task(refresh_suggest_indexes, client)
+
+    requested = set(types or SuggestEntityType)
+    results = SuggestResults()
+    if SuggestEntityType.CHANNELS in requested:
+        results.channels = _suggest(indexes.channels, q, limit)
+    if SuggestEntityType.ADVERTISERS in requested:
+        results.advertisers = _suggest(indexes.advertisers, q, limit)
+    if SuggestEntityType.MINI_APPS in requested:
+        results.mini_apps = _suggest(indexes.mini_apps, q, limit)
+
+    snapshot_dates = [value for value in indexes.snapshot_key if value]
+    return SuggestEnvelope(
+        data=results,
+        meta=SuggestMeta(snapshot_date=max(snapshot_dates) if snapshot_dates else None),
+    )
+
+
+@router.get("", response_model=SearchEnvelope)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search query"),
+    types: list[SearchSource] | None = Query(None, description="Sources to search"),
+    limit: int = Query(5, ge=1, le=20, description="Results per source"),
+    current_user: dict = Depends(deps.get_current_user),
+    client: Client = Depends(get_supabase),
+) -> SearchEnvelope:
+    """Search channels, advertisers, mini apps, ads and posts in one request.
+
+    Sources are queried concurrently; any source that misses its time budget is
+    reported in `meta.sources` and the remaining results are returned.
+    """
+    _ = current_user
+
+    term = normalize_search_term(q)
+    if term is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Search query is empty.")
+
+    settings = get_settings()
+    source_results = await search_sources(
+        client,
+        term,
+        sources=set(types or SearchSource),
+        limit=limit,
+        timeout_seconds=settings.search_source_timeout_seconds,
+    )
+
+    results = SearchResults.model_validate(
+        {source.value: result.items for source, result in source_results.items()}
+    )
+    return SearchEnvelope(
+        data=results,
+        meta=SearchMeta(
+            q=term,
+            partial=any(
+                result.status in (SearchSourceStatus.TIMEOUT, SearchSourceStatus.ERROR)
+                for result in source_results.values()
+            ),
+            sources={
+                source: SearchSourceMeta(status=result.status, took_ms=result.took_ms)
+                for source, result in source_results.items()
+            },
+        ),
+    )
@@ -14,6 +14,7 @@ from app.crud.notification import create_notification, get_user_notification_by_
 from app.crud.team_member import get_user_default_account_id
 from app.crud.user import get_user_by_email
 from app.db.base import get_supabase
+from app.services.notification_stream import publish_notification
 from app.services.resend import (
     ResendConfigurationError,
     ResendSendError,
@@ -445,7 +446,7 @@ async def confirm_magic_link(
                 "We're glad you're here."
             )
 
-            await create_notification(
+            notification = await create_notification(
                 client,
                 user_id=user["id"],
                 subject=subject,
@@ -454,6 +455,7 @@ async def confirm_magic_link(
                 details=body,
                 cta=None,
             )
+            publish_notification(user["id"], notification)
 
             try:
                 await send_welcome_email(
@@ -480,7 +482,7 @@ async def confirm_magic_link(
                     "We're glad you're here."
                 )
 
-                await create_notification(
+                notification = await create_notification(
                     client,
                     user_id=user["id"],
                     subject=welcome_subject,
@@ -489,6 +491,7 @@ async def confirm_magic_link(
                     details=body,
                     cta=None,
                 )
+                publish_notification(user["id"], notification)
 
                 try:
                     await send_welcome_email(
@@ -583,7 +586,7 @@ async def confirm_magic_link(
                         f"{account_display} on {settings.app_name}."
                     )
 
-                    await create_notification(
+                    notification = await create_notification(
                         client,
                         user_id=inviter_id,
                         subject=subject,
@@ -592,6 +595,7 @@ async def confirm_magic_link(
                         details=body,
                         cta=None,
                     )
+                    publish_notification(inviter_id, notification)
                     try:
                         await send_invite_accepted_email(
                             recipient=inviter["email"],
@@ -1,31 +1,47 @@
+from collections.abc import AsyncIterator
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from supabase import Client
 
 from app.api import deps
+from app.core.config import get_settings
+from app.core.responses import ModelJSONResponse
+from app.core.streaming import StreamFormat, streaming_response
 from app.crud.tracker import (
+    apply_tracker_batch,
     create_tracker,
     delete_tracker,
     ensure_account_access,
     get_tracker,
+    get_tracker_stats,
+    iter_tracker_mentions,
     list_tracker_mentions,
     list_trackers,
+    resolve_stats_window,
     update_tracker,
 )
 from app.db.base import get_supabase
 from app.schemas.tracker import (
-    PageResponse,
     Tracker,
+    TrackerBatchEnvelope,
+    TrackerBatchItemResult,
+    TrackerBatchRequest,
     TrackerCreateRequest,
     TrackerEnvelope,
     TrackerListEnvelope,
     TrackerMention,
     TrackerMentionListEnvelope,
+    TrackerStats,
+    TrackerStatsBucket,
+    TrackerStatsEnvelope,
     TrackerStatus,
     TrackerType,
     TrackerUpdateRequest,
 )
+from app.services.mention_matcher import apply_tracker_change, apply_tracker_removal
+from app.services.mention_stream import get_mention_stream_hub, iter_mentions
 
 router = APIRouter(prefix="/v1.0/accounts/{account_id}", tags=["trackers"])
 
@@ -38,7 +54,7 @@ async def get_trackers(
     tracker_type: TrackerType | None = Query(None, alias="type"),
     current_user: dict = Depends(deps.get_current_user),
     client: Client = Depends(get_supabase),
-) -> TrackerListEnvelope:
+) -> ModelJSONResponse:
     try:
         await ensure_account_access(
             client,
@@ -56,7 +72,7 @@ async def get_trackers(
         status=status_filter,
         tracker_type=tracker_type,
     )
-    return TrackerListEnvelope(data=[Tracker(**row) for row in items], meta={})
+    return ModelJSONResponse(TrackerListEnvelope.model_validate({"data": items, "meta": {}}))
 
 
 @router.get("/trackers/{tracker_id}", response_model=TrackerEnvelope)
@@ -85,6 +101,47 @@ async def get_tracker_by_id(
     return TrackerEnvelope(data=Tracker(**tracker), meta={})
 
 
+@router.get("/trackers/{tracker_id}/stats", response_model=TrackerStatsEnvelope)
+async def get_tracker_stats_by_id(
+    account_id: str,
+    tracker_id: str,
+    x_account_id: str = Header(..., alias="X-Account-Id"),
+    bucket: TrackerStatsBucket = Query(TrackerStatsBucket.DAY),
+    since: datetime | None = Query(None),
+    until: datetime | None = Query(None),
+    top_channels: int = Query(10, ge=0, le=50),
+    current_user: dict = Depends(deps.get_current_user),
+    client: Client = Depends(get_supabase),
+) -> TrackerStatsEnvelope:
+    try:
+        await ensure_account_access(
+            client,
+            account_id=account_id,
+            header_account_id=x_account_id,
+            user_id=current_user["id"],
+            require_write=False,
+        )
+        window_since, window_until = resolve_stats_window(bucket, since=since, until=until)
+    except PermissionError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    tracker = await get_tracker(client, account_id=account_id, tracker_id=tracker_id)
+    if tracker is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tracker not found.")
+
+    stats = await get_tracker_stats(
+        client,
+        tracker_id=tracker_id,
+        bucket=bucket,
+        since=window_since,
+        until=window_until,
+        top_channels_limit=top_channels,
+    )
+    return TrackerStatsEnvelope(data=TrackerStats(**stats), meta={})
+
+
 @router.post("/trackers", response_model=TrackerEnvelope, status_code=status.HTTP_201_CREATED)
 async def post_tracker(
     account_id: str,
@@ -116,9 +173,49 @@ async def post_tracker(
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
+    apply_tracker_change(created)
     return TrackerEnvelope(data=Tracker(**created), meta={})
 
 
+@router.post("/trackers:batch", response_model=TrackerBatchEnvelope)
+async def post_tracker_batch(
+    account_id: str,
+    payload: TrackerBatchRequest,
+    x_account_id: str = Header(..., alias="X-Account-Id"),
+    current_user: dict = Depends(deps.get_current_user),
+    client: Client = Depends(get_supabase),
+) -> TrackerBatchEnvelope:
+    """Create, update and delete trackers in one request with per-item results."""
+    try:
+        await ensure_account_access(
+            client,
+            account_id=account_id,
+            header_account_id=x_account_id,
+            user_id=current_user["id"],
+            require_write=True,
+        )
+    except PermissionError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+
+    results = await apply_tracker_batch(
+        client,
+        account_id=account_id,
+        user_id=current_user["id"],
+        operations=[operation.model_dump() for operation in payload.operations],
+    )
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        if result["status"] in ("created", "updated"):
+            apply_tracker_change(result["tracker"])
+        elif result["status"] == "deleted":
+            apply_tracker_removal(str(payload.operations[result["index"]].tracker_id))
+    return TrackerBatchEnvelope(
+        data=[TrackerBatchItemResult(**result) for result in results],
+        meta={"total": len(results), "counts": counts},
+    )
+
+
 @router.patch("/trackers/{tracker_id}", response_model=TrackerEnvelope)
 async def patch_tracker(
     account_id: str,
@@ -152,6 +249,7 @@ async def patch_tracker(
     if updated is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tracker not found.")
 
+    apply_tracker_change(updated)
     return TrackerEnvelope(data=Tracker(**updated), meta={})
 
 
@@ -183,6 +281,7 @@ async def remove_tracker(
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tracker not found.")
 
+    apply_tracker_removal(tracker_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -195,9 +294,14 @@ async def get_mentions(
     until: datetime | None = Query(None),
     limit: int = Query(20, ge=1, le=200),
     cursor: str | None = Query(None),
+    response_format: StreamFormat = Query(
+        StreamFormat.JSON,
+        alias="format",
+        description="ndjson or csv streams every matching row; limit and cursor apply to json only",
+    ),
     current_user: dict = Depends(deps.get_current_user),
     client: Client = Depends(get_supabase),
-) -> TrackerMentionListEnvelope:
+) -> ModelJSONResponse | StreamingResponse:
     if since is not None and until is not None and since > until:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -212,6 +316,21 @@ async def get_mentions(
             user_id=current_user["id"],
             require_write=False,
         )
+        if response_format != StreamFormat.JSON:
+            pages = iter_tracker_mentions(
+                client,
+                account_id=account_id,
+                tracker_id=tracker_id,
+                since=since,
+                until=until,
+                page_size=get_settings().stream_page_size,
+            )
+            return streaming_response(
+                pages,
+                fmt=response_format,
+                fields=list(TrackerMention.model_fields),
+                filename="tracker_mentions",
+            )
         result = await list_tracker_mentions(
             client,
             account_id=account_id,
@@ -226,8 +345,68 @@ async def get_mentions(
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
-    return TrackerMentionListEnvelope(
-        data=[TrackerMention(**row) for row in result["items"]],
-        page=PageResponse(next_cursor=result["next_cursor"], has_more=result["has_more"]),
-        meta={},
+    envelope = TrackerMentionListEnvelope.model_validate(
+        {
+            "data": result["items"],
+            "page": {"next_cursor": result["next_cursor"], "has_more": result["has_more"]},
+            "meta": {},
+        }
+    )
+    return ModelJSONResponse(envelope)
+
+
+@router.get("/tracker-mentions/stream")
+async def stream_mentions(
+    account_id: str,
+    x_account_id: str = Header(..., alias="X-Account-Id"),
+    last_event_id: int | None = Header(None, alias="Last-Event-ID", ge=0),
+    tracker_id: str | None = Query(None),
+    after_seq: int | None = Query(None, ge=0, description="Stream mentions after this mention_seq"),
+    current_user: dict = Depends(deps.get_current_user),
+    client: Client = Depends(get_supabase),
+) -> StreamingResponse:
+    """Server-Sent Events feed of new mentions, resumable via Last-Event-ID."""
+    try:
+        await ensure_account_access(
+            client,
+            account_id=account_id,
+            header_account_id=x_account_id,
+            user_id=current_user["id"],
+            require_write=False,
+        )
+    except PermissionError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+
+    settings = get_settings()
+    hub = get_mention_stream_hub()
+
+    async def event_stream() -> AsyncIterator[str]:
+        # Subscribing inside the generator ties the subscription to the stream's
+        # lifetime, including a client that disconnects before the first event.
+        subscription = await hub.subscribe(
+            client,
+            account_id=account_id,
+            tracker_id=tracker_id,
+            after_seq=last_event_id if last_event_id is not None else after_seq,
+        )
+        try:
+            yield f"retry: {int(settings.tracker_stream_poll_seconds * 1000)}\n\n"
+            async for item in iter_mentions(
+                hub,
+                subscription,
+                heartbeat_seconds=settings.tracker_stream_heartbeat_seconds,
+                max_seconds=settings.tracker_stream_max_seconds,
+            ):
+                if item is None:
+                    yield ": keepalive\n\n"
+                    continue
+                payload = TrackerMention(**item).model_dump_json()
+                yield f"id: {item['mention_seq']}\nevent: mention\ndata: {payload}\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
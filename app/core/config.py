@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import EmailStr, Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -29,6 +30,103 @@ class Settings(BaseSettings):
     google_client_id: str | None = Field(None, env="GOOGLE_CLIENT_ID")
     google_client_secret: str | None = Field(None, env="GOOGLE_CLIENT_SECRET")
 
+    # Search suggest (typeahead) index
+    search_suggest_refresh_seconds: int = 300
+    search_suggest_max_channels: int = 200_000
+
+    # Unified search: per-source time budget before partial results are returned
+    search_source_timeout_seconds: float = 0.8
+
+    # Response cache for snapshot-derived endpoints
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: int = 60
+    response_cache_stale_seconds: int = 300
+    response_cache_max_entries: int = 2048
+    # "memory" keeps entries per process; "redis" shares them between workers
+    # through the Redis server at response_cache_redis_url, under
+    # response_cache_key_prefix, with response_cache_max_entries kept locally
+    response_cache_backend: Literal["memory", "redis"] = "memory"
+    response_cache_redis_url: str = "redis://localhost:6379/0"
+    response_cache_key_prefix: str = "response-cache"
+
+    # Channel id -> name/username/avatar lookups shared by enrichment queries
+    channel_card_cache_ttl_seconds: int = 600
+    channel_card_cache_max_entries: int = 50_000
+
+    # Tracker mention matching pipeline
+    mention_pipeline_batch_size: int = 500
+    mention_pipeline_snippet_radius: int = 80
+
+    # Tracker mention stream (SSE)
+    tracker_stream_poll_seconds: float = 2.0
+    tracker_stream_batch_size: int = 500
+    tracker_stream_queue_size: int = 1000
+    tracker_stream_heartbeat_seconds: float = 15.0
+    tracker_stream_max_seconds: float = 300.0
+
+    # Notification stream (SSE)
+    notification_stream_queue_size: int = 100
+    notification_stream_heartbeat_seconds: float = 25.0
+    notification_stream_resync_seconds: float = 60.0
+    notification_stream_max_seconds: float = 900.0
+
+    # Notification fan-out: batch size per INSERT ... SELECT, and the largest
+    # explicit user list delivered before the request returns
+    notification_fanout_batch_size: int = 1000
+    notification_fanout_inline_max: int = 200
+
+    # Notification retention (app/services/notification_retention.py): rows
+    # older than retention_days, or soft-deleted longer than
+    # deleted_retention_days, are purged purge_batch_size at a time
+    notification_retention_days: int = 180
+    notification_deleted_retention_days: int = 30
+    notification_purge_batch_size: int = 5000
+    notification_purge_archive: bool = False
+
+    # Exports (app/services/exports.py): files live under export_storage_dir
+    # for export_ttl_hours; rows are read export_page_size at a time. A job
+    # whose heartbeat (refreshed per page) is older than
+    # export_stale_after_seconds is handed to another worker.
+    export_storage_dir: str = "var/exports"
+    export_page_size: int = 1000
+    export_ttl_hours: int = 72
+    export_workers: int = 2
+    export_poll_seconds: float = 5.0
+    export_stale_after_seconds: int = 3600
+    export_expire_interval_seconds: float = 600.0
+
+    # Listings requested with format=ndjson|csv (app/core/streaming.py) are
+    # read stream_page_size rows at a time
+    stream_page_size: int = 1000
+
+    # Query instrumentation (app/core/query_metrics.py): requests making more
+    # than query_budget_per_request PostgREST calls are logged (0 disables);
+    # result sizes are measured for query_response_bytes_sample_rate of the
+    # queries. /metrics is unauthenticated, so it is off unless enabled here
+    # for a deployment that keeps it off the public network.
+    query_instrumentation_enabled: bool = True
+    query_budget_per_request: int = 25
+    query_response_bytes_sample_rate: float = 0.05
+    metrics_enabled: bool = False
+
+    # Request profiling (app/core/profiling.py): profiling_sample_rate of
+    # requests feed the continuous profile (0 disables); stacks are sampled
+    # every profiling_interval_ms while a profiled request is in flight
+    profiling_sample_rate: float = 0.0
+    profiling_interval_ms: float = 5.0
+    profiling_max_stacks: int = 20_000
+    profiling_capture_max_seconds: float = 120.0
+
+    # Startup warmup (app/core/startup.py): /readyz reports ready once it is
+    # done; reference data covers the home lists, ranking collections and the
+    # rankings of the warmup_top_rankings largest countries and categories
+    warmup_reference_data: bool = True
+    warmup_top_rankings: int = 5
+    warmup_timeout_seconds: float = 30.0
+
+    # Monthly partition maintenance (app/services/partition_maintenance.py)
+    partition_premake_months: int = 3
+
     @model_validator(mode="after")
     def validate_supabase(self):
         if not self.supabase_url or not self.supabase_service_key:
@@ -0,0 +1,148 @@
+"""Conditional GET support for snapshot-derived endpoints.
+
+Routes opt in with the `http_cache` dependency, which records a `CachePolicy`
+on the request state. `HTTPCacheMiddleware` then buffers successful GET/HEAD
+responses of those routes (except streamed ones), tags them with a strong ETag and answers matching
+`If-None-Match` requests with 304 Not Modified.
+"""
+
+import hashlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_STATE_KEY = "http_cache_policy"
+_CACHEABLE_METHODS = frozenset({"GET", "HEAD"})
+# Headers a 304 must repeat from the full response (RFC 9110 section 15.4.5).
+_NOT_MODIFIED_HEADERS = ("cache-control", "etag", "vary", "expires", "content-location", "date")
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    max_age: int
+    stale_while_revalidate: int = 0
+
+    def header_value(self, *, public: bool) -> str:
+        directives = ["public" if public else "private", f"max-age={self.max_age}"]
+        if self.stale_while_revalidate:
+            directives.append(f"stale-while-revalidate={self.stale_while_revalidate}")
+        return ", ".join(directives)
+
+
+# Daily snapshot data: short freshness window, long revalidation window.
+SNAPSHOT_CACHE_POLICY = CachePolicy(max_age=300, stale_while_revalidate=3600)
+
+
+def http_cache(policy: CachePolicy) -> Callable[[Request], None]:
+    """Route dependency enabling ETag and Cache-Control handling with `policy`."""
+
+    def _set_policy(request: Request) -> None:
+        setattr(request.state, _STATE_KEY, policy)
+
+    return _set_policy
+
+
+def normalize_query_string(query_string: str) -> str:
+    """Sort query parameters and drop empty ones so equivalent URLs match."""
+    params = sorted((key, value) for key, value in parse_qsl(query_string) if value != "")
+    return urlencode(params)
+
+
+def compute_etag(path: str, query_string: str, body: bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(path.encode())
+    digest.update(b"?")
+    digest.update(normalize_query_string(query_string).encode())
+    digest.update(b"\n")
+    digest.update(body)
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {value.strip() for value in if_none_match.split(",")}
+    # Weak comparison, as If-None-Match requires.
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class HTTPCacheMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in _CACHEABLE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        request_headers = Headers(scope=scope)
+        start_message: Message | None = None
+        body_parts: list[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                policy = state.get(_STATE_KEY)
+                # Streamed bodies (no Content-Length) are neither buffered nor
+                # tagged: that would defeat streaming them in the first place.
+                streamed = "content-length" not in Headers(raw=message["headers"])
+                if policy is None or message["status"] != 200 or streamed:
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            await self._send_cached(
+                send,
+                start_message,
+                b"".join(body_parts),
+                scope=scope,
+                policy=state[_STATE_KEY],
+                request_headers=request_headers,
+            )
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_cached(
+        self,
+        send: Send,
+        start_message: Message,
+        body: bytes,
+        *,
+        scope: Scope,
+        policy: CachePolicy,
+        request_headers: Headers,
+    ) -> None:
+        etag = compute_etag(scope["path"], scope.get("query_string", b"").decode("latin-1"), body)
+        headers = MutableHeaders(raw=list(start_message["headers"]))
+        headers["ETag"] = etag
+        # Credentialed responses must not be stored by shared caches.
+        headers["Cache-Control"] = policy.header_value(public="authorization" not in request_headers)
+
+        if etag_matches(request_headers.get("if-none-match"), etag):
+            not_modified = MutableHeaders()
+            for name in _NOT_MODIFIED_HEADERS:
+                if name in headers:
+                    not_modified[name] = headers[name]
+            await send({"type": "http.response.start", "status": 304, "headers": not_modified.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send({**start_message, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
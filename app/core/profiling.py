@@ -0,0 +1,303 @@
+"""Opt-in stack-sampling profiler for HTTP requests.
+
+`ProfilingMiddleware` marks `profiling_sample_rate` of requests (and every
+request while an admin capture runs) as profiled. While any profiled request is
+in flight, a background thread takes `sys._current_frames()` every
+`profiling_interval_ms` and, for each thread currently running a profiled
+request, appends its folded stack to the request's scope. When the request
+finishes those stacks are counted under the route it matched. On the event loop
+thread the request is found by walking up to the middleware's own frame; in
+`asyncio.to_thread` and anyio worker threads through the context variable the
+worker copied. Time a request spends awaiting I/O is not sampled: the loop
+thread is then in the selector, outside any request.
+
+Results are collapsed stacks (`route;frame;frame count` lines), which
+flamegraph.pl, speedscope and inferno read directly. Sampled requests feed
+`profiler.continuous`; `profiler.capture()` records every request for a fixed
+time or request count. With sampling off and no capture running the
+middleware costs one settings read per request and the thread stays parked.
+"""
+
+import asyncio
+import concurrent.futures.thread
+import contextvars
+import functools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from types import CodeType, FrameType
+from typing import Any
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+UNMATCHED_ROUTE = "unmatched"
+# Scope key holding the stacks sampled so far for a profiled request.
+_STACKS_KEY = "app.profile_stacks"
+_MAX_STACK_DEPTH = 128
+
+_profiled_scope: ContextVar[Scope | None] = ContextVar("profiled_scope", default=None)
+
+
+class ProfilerBusyError(RuntimeError):
+    """Another capture is already running."""
+
+
+class ProfileRecorder:
+    """Folded stacks counted per route, bounded to `max_stacks` distinct stacks."""
+
+    def __init__(self, max_stacks: int) -> None:
+        self._max_stacks = max_stacks
+        self._lock = threading.Lock()
+        self._stacks: Counter[tuple[str, str]] = Counter()
+        self.samples = 0
+        self.dropped = 0
+
+    def add(self, route: str, stacks: list[str]) -> None:
+        with self._lock:
+            for stack in stacks:
+                key = (route, stack)
+                self.samples += 1
+                if key in self._stacks or len(self._stacks) < self._max_stacks:
+                    self._stacks[key] += 1
+                else:
+                    self.dropped += 1
+
+    def routes(self) -> Counter[str]:
+        with self._lock:
+            totals: Counter[str] = Counter()
+            for (route, _stack), count in self._stacks.items():
+                totals[route] += count
+            return totals
+
+    def render_collapsed(self) -> str:
+        with self._lock:
+            lines = [
+                f"{route};{stack} {count}" if stack else f"{route} {count}"
+                for (route, stack), count in sorted(self._stacks.items())
+            ]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+            self.dropped = 0
+
+
+class _Capture:
+    def __init__(self, recorder: ProfileRecorder, requests: int | None) -> None:
+        self.recorder = recorder
+        self.remaining = requests
+        self.done = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+
+    def request_finished(self) -> None:
+        if self.remaining is None:
+            return
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self.loop.call_soon_threadsafe(self.done.set)
+
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_labels: dict[CodeType, str] = {}
+
+
+def _frame_label(code: CodeType) -> str:
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        if filename.startswith(_APP_ROOT + os.sep):
+            filename = os.path.relpath(filename, _APP_ROOT)
+        else:
+            parent, name = os.path.split(filename)
+            filename = f"{os.path.basename(parent)}/{name}"
+        # `;` separates frames and a space the count in the collapsed format.
+        label = f"{filename}:{code.co_qualname}".replace(";", ",").replace(" ", "_")
+        _labels[code] = label
+    return label
+
+
+def _fold(frames: list[FrameType]) -> str:
+    """Outermost-first frame labels of `frames` (given innermost first)."""
+    return ";".join(_frame_label(frame.f_code) for frame in reversed(frames[:_MAX_STACK_DEPTH]))
+
+
+def _route(scope: Scope) -> str:
+    return getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+
+
+def _worker_context(frame: FrameType) -> contextvars.Context | None:
+    """The context a thread-pool frame runs its function in, if it is one we know."""
+    code = frame.f_code
+    if code is _WORK_ITEM_RUN:
+        # asyncio.to_thread submits functools.partial(context.run, func, ...).
+        work = frame.f_locals.get("self")
+        fn = getattr(work, "fn", None)
+        if isinstance(fn, functools.partial):
+            context = getattr(fn.func, "__self__", None)
+            return context if isinstance(context, contextvars.Context) else None
+    elif code is _ANYIO_WORKER_RUN:
+        context = frame.f_locals.get("context")
+        return context if isinstance(context, contextvars.Context) else None
+    return None
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._capture: _Capture | None = None
+        self._continuous: ProfileRecorder | None = None
+
+    @property
+    def continuous(self) -> ProfileRecorder:
+        if self._continuous is None:
+            self._continuous = ProfileRecorder(get_settings().profiling_max_stacks)
+        return self._continuous
+
+    @property
+    def capturing(self) -> bool:
+        return self._capture is not None
+
+    def recorders_for_request(self) -> tuple[ProfileRecorder, ...]:
+        """Where a new request's samples go; empty when it is not profiled."""
+        capture = self._capture
+        rate = get_settings().profiling_sample_rate
+        sampled = rate > 0 and (rate >= 1 or random.random() < rate)  # noqa: S311
+        if capture is None:
+            return (self.continuous,) if sampled else ()
+        return (self.continuous, capture.recorder) if sampled else (capture.recorder,)
+
+    def request_started(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="request-profiler", daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+
+    def request_finished(self, scope: Scope, recorders: tuple[ProfileRecorder, ...]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        stacks = scope.pop(_STACKS_KEY, None) or []
+        route = _route(scope)
+        for recorder in recorders:
+            recorder.add(route, stacks)
+        capture = self._capture
+        if capture is not None and capture.recorder in recorders:
+            capture.request_finished()
+
+    async def capture(
+        self, *, seconds: float | None, requests: int | None, timeout: float
+    ) -> ProfileRecorder:
+        """Profile every request for `seconds`, or until `requests` have finished.
+
+        A request-count capture still gives up after `timeout` seconds.
+        """
+        if self._capture is not None:
+            raise ProfilerBusyError("a profile capture is already running")
+        capture = _Capture(ProfileRecorder(get_settings().profiling_max_stacks), requests)
+        self._capture = capture
+        try:
+            wait = min(seconds, timeout) if seconds is not None else timeout
+            try:
+                await asyncio.wait_for(capture.done.wait(), timeout=wait)
+            except TimeoutError:
+                pass
+        finally:
+            self._capture = None
+        return capture.recorder
+
+    def reset(self) -> None:
+        self._capture = None
+        self._continuous = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while True:
+            if self._in_flight <= 0:
+                self._wake.clear()
+                if self._in_flight <= 0:
+                    self._wake.wait()
+                continue
+            interval = get_settings().profiling_interval_ms / 1000
+            started = time.perf_counter()
+            self._sample(own)
+            time.sleep(max(interval - (time.perf_counter() - started), interval / 10))
+
+    def _sample(self, own_thread: int) -> None:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            found = self._request_of(frame)
+            if found is None:
+                continue
+            stacks, frames = found
+            stacks.append(_fold(frames))
+
+    @staticmethod
+    def _request_of(frame: FrameType) -> tuple[list[str], list[FrameType]] | None:
+        """Stacks of the profiled request `frame`'s thread runs, and its frames below it."""
+        frames: list[FrameType] = []
+        current: FrameType | None = frame
+        while current is not None:
+            code = current.f_code
+            if code is _MIDDLEWARE_CALL:
+                scope = current.f_locals.get("scope")
+                stacks = scope.get(_STACKS_KEY) if isinstance(scope, dict) else None
+                return (stacks, frames) if stacks is not None else None
+            context = _worker_context(current)
+            if context is not None:
+                scope = context.get(_profiled_scope)
+                stacks = scope.get(_STACKS_KEY) if scope is not None else None
+                return (stacks, frames) if stacks is not None else None
+            frames.append(current)
+            current = current.f_back
+        return None
+
+
+profiler = Profiler()
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        recorders = profiler.recorders_for_request()
+        if not recorders:
+            await self.app(scope, receive, send)
+            return
+
+        scope[_STACKS_KEY] = []
+        token = _profiled_scope.set(scope)
+        profiler.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _profiled_scope.reset(token)
+            profiler.request_finished(scope, recorders)
+
+
+_MIDDLEWARE_CALL = ProfilingMiddleware.__call__.__code__
+_WORK_ITEM_RUN = concurrent.futures.thread._WorkItem.run.__code__
+try:
+    from anyio._backends._asyncio import WorkerThread as _AnyioWorkerThread
+except ImportError:  # pragma: no cover - anyio internals moved
+    _ANYIO_WORKER_RUN: Any = None
+else:
+    _ANYIO_WORKER_RUN = _AnyioWorkerThread.run.__code__
@@ -0,0 +1,272 @@
+"""Per-request database query accounting.
+
+`app.db.instrumentation.InstrumentedClient` reports every PostgREST round trip
+to `record_query`. `QueryMetricsMiddleware` opens a `RequestQueryStats` for
+each HTTP request (held in a context variable, which `asyncio.to_thread`
+carries into worker threads), adds a `Server-Timing` header with the queries
+made before the response started, and once the request is done feeds the
+per-route totals into `query_metrics` and warns when the request went over
+`query_budget_per_request`. `query_metrics.render()` is what `/metrics` serves.
+
+Tasks that outlive the request which starts them (pollers, listeners) must be
+created with a fresh `contextvars.Context()`; otherwise they inherit its stats
+and keep appending to them after the request has finished.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Queries made outside any HTTP request (workers, CLI services).
+NO_ROUTE = "none"
+# Requests that did not match a route.
+UNMATCHED_ROUTE = "unmatched"
+
+_QUERY_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+_REQUEST_QUERIES_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+_REQUEST_DB_SECONDS_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass(frozen=True)
+class QueryRecord:
+    table: str
+    operation: str
+    # Filter and modifier calls with their column, never their values.
+    filters: tuple[str, ...]
+    rows: int
+    response_bytes: int
+    seconds: float
+    error: bool = False
+
+
+@dataclass
+class RequestQueryStats:
+    scope: Scope
+    records: list[QueryRecord] = field(default_factory=list)
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+    @property
+    def count(self) -> int:
+        return len(self.records)
+
+    @property
+    def seconds(self) -> float:
+        return sum(record.seconds for record in self.records)
+
+    def summary(self, limit: int = 5) -> str:
+        calls = Counter(f"{record.operation} {record.table}" for record in self.records)
+        return ", ".join(f"{call} x{count}" for call, count in calls.most_common(limit))
+
+
+_current_stats: ContextVar[RequestQueryStats | None] = ContextVar(
+    "request_query_stats", default=None
+)
+
+
+def current_query_stats() -> RequestQueryStats | None:
+    return _current_stats.get()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], **extra: str) -> str:
+    pairs = [*zip(names, values, strict=True), *extra.items()]
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self._buckets = tuple(buckets)
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        # [bucket counts..., sum, count]
+        series = self._series.setdefault(labels, [0.0] * (len(self._buckets) + 2))
+        for index, bound in enumerate(self._buckets):
+            if value <= bound:
+                series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self, name: str, label_names: Sequence[str]) -> Iterable[str]:
+        for labels, series in sorted(self._series.items()):
+            for bound, count in zip(self._buckets, series, strict=False):
+                yield f"{name}_bucket{_labels(label_names, labels, le=f'{bound:g}')} {count:g}"
+            yield f"{name}_bucket{_labels(label_names, labels, le='+Inf')} {series[-1]:g}"
+            yield f"{name}_sum{_labels(label_names, labels)} {series[-2]:.6f}"
+            yield f"{name}_count{_labels(label_names, labels)} {series[-1]:g}"
+
+
+class QueryMetrics:
+    """Process-wide query counters in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self._queries: Counter[tuple[str, ...]] = Counter()
+        self._errors: Counter[tuple[str, ...]] = Counter()
+        self._rows: Counter[tuple[str, ...]] = Counter()
+        self._bytes: Counter[tuple[str, ...]] = Counter()
+        self._query_seconds = _Histogram(_QUERY_SECONDS_BUCKETS)
+        self._request_queries = _Histogram(_REQUEST_QUERIES_BUCKETS)
+        self._request_db_seconds = _Histogram(_REQUEST_DB_SECONDS_BUCKETS)
+        self._budget_exceeded: Counter[tuple[str, ...]] = Counter()
+
+    def observe_query(self, route: str, record: QueryRecord) -> None:
+        labels = (route, record.table, record.operation)
+        with self._lock:
+            self._queries[labels] += 1
+            if record.error:
+                self._errors[labels] += 1
+            self._rows[labels] += record.rows
+            self._bytes[labels] += record.response_bytes
+            self._query_seconds.observe((record.table, record.operation), record.seconds)
+
+    def observe_request(self, route: str, stats: RequestQueryStats, *, over_budget: bool) -> None:
+        with self._lock:
+            self._request_queries.observe((route,), stats.count)
+            self._request_db_seconds.observe((route,), stats.seconds)
+            if over_budget:
+                self._budget_exceeded[(route,)] += 1
+
+    def render(self) -> str:
+        query_labels = ("route", "table", "operation")
+        lines: list[str] = []
+
+        def counter(
+            name: str, help_text: str, values: Counter, label_names: Sequence[str]
+        ) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(
+                f"{name}{_labels(label_names, labels)} {value}"
+                for labels, value in sorted(values.items())
+            )
+
+        def histogram(
+            name: str, help_text: str, hist: _Histogram, label_names: Sequence[str]
+        ) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            lines.extend(hist.render(name, label_names))
+
+        with self._lock:
+            counter("db_queries_total", "PostgREST requests made.", self._queries, query_labels)
+            counter(
+                "db_query_errors_total",
+                "PostgREST requests that raised.",
+                self._errors,
+                query_labels,
+            )
+            counter("db_rows_total", "Rows returned by PostgREST.", self._rows, query_labels)
+            counter(
+                "db_response_bytes_total",
+                "Approximate JSON size of PostgREST results.",
+                self._bytes,
+                query_labels,
+            )
+            histogram(
+                "db_query_duration_seconds",
+                "PostgREST round-trip latency.",
+                self._query_seconds,
+                ("table", "operation"),
+            )
+            histogram(
+                "http_request_db_queries",
+                "PostgREST requests made per HTTP request.",
+                self._request_queries,
+                ("route",),
+            )
+            histogram(
+                "http_request_db_duration_seconds",
+                "Time per HTTP request spent waiting on PostgREST.",
+                self._request_db_seconds,
+                ("route",),
+            )
+            counter(
+                "http_request_query_budget_exceeded_total",
+                "HTTP requests that made more than query_budget_per_request queries.",
+                self._budget_exceeded,
+                ("route",),
+            )
+        return "\n".join(lines) + "\n"
+
+
+query_metrics = QueryMetrics()
+
+
+def record_query(record: QueryRecord) -> None:
+    stats = _current_stats.get()
+    query_metrics.observe_query(stats.route if stats else NO_ROUTE, record)
+    if stats is not None:
+        stats.records.append(record)
+
+
+def server_timing_value(stats: RequestQueryStats) -> str:
+    return f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
+
+
+class QueryMetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope)
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Streamed bodies keep querying after this point; the header
+                # only covers what ran before it, the metrics cover it all.
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing_value(stats))
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            self._finish(scope, stats, elapsed=time.perf_counter() - started)
+
+    @staticmethod
+    def _finish(scope: Scope, stats: RequestQueryStats, *, elapsed: float) -> None:
+        route = stats.route
+        budget = get_settings().query_budget_per_request
+        over_budget = bool(budget) and stats.count > budget
+        query_metrics.observe_request(route, stats, over_budget=over_budget)
+        if over_budget:
+            logger.warning(
+                "%s %s made %s database queries (budget %s, %.1f ms in db, %.1f ms total): %s",
+                scope["method"],
+                route,
+                stats.count,
+                budget,
+                stats.seconds * 1000,
+                elapsed * 1000,
+                stats.summary(),
+            )
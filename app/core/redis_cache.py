@@ -0,0 +1,324 @@
+"""Response cache backend shared by all workers through a Redis server.
+
+Talks RESP over asyncio streams, so no Redis client library is needed. Entries
+are `CacheEntry`s encoded as JSON, stored under
+`<prefix>:<epoch>:<dataset>:<generation>:<key>` and expiring at their stale
+deadline. Values come back as plain JSON types (dates as ISO strings), which
+the routes' response models parse like the original values.
+
+`invalidate(dataset)` increments the dataset's generation counter, so every
+worker's next lookup lands in a fresh key space while the old entries simply
+expire, and publishes the dataset on `<prefix>:invalidate`. Each worker keeps
+the generations it has read and up to `local_max_entries` recently used entries
+in process; an invalidation message drops both for its dataset, and `clear()`
+does the same for every dataset through the epoch counter. After a reconnect
+both are dropped too, since messages may have been missed.
+
+When Redis is unreachable lookups miss and writes are dropped, so requests
+fall back to computing their result; connecting is retried at most once per
+`retry_seconds`.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import deque
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+from pydantic_core import from_json, to_json
+
+from app.core.response_cache import CacheEntry, InMemoryLRUBackend, cache_dataset
+
+logger = logging.getLogger(__name__)
+
+ALL_DATASETS = "*"
+
+
+class RedisError(Exception):
+    """Error reply from the Redis server."""
+
+
+def encode_command(args: tuple[Any, ...]) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%b\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """Read one RESP2 reply; error replies are returned as `RedisError`, not raised."""
+    line = await reader.readuntil(b"\r\n")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        return RedisError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(rest)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise RedisError(f"Unexpected reply {line!r}")
+
+
+async def open_redis(
+    url: str, *, timeout: float
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Connect to `url` (redis://[user:password@]host[:port][/db]), authenticated."""
+    parsed = urlsplit(url)
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parsed.hostname or "localhost", parsed.port or 6379),
+        timeout=timeout,
+    )
+    setup: list[tuple[Any, ...]] = []
+    if parsed.password:
+        user = (unquote(parsed.username),) if parsed.username else ()
+        setup.append(("AUTH", *user, unquote(parsed.password)))
+    database = parsed.path.lstrip("/")
+    if database and database != "0":
+        setup.append(("SELECT", database))
+    try:
+        for command in setup:
+            writer.write(encode_command(command))
+            reply = await asyncio.wait_for(read_reply(reader), timeout=timeout)
+            if isinstance(reply, RedisError):
+                raise reply
+    except BaseException:
+        writer.close()
+        raise
+    return reader, writer
+
+
+class RedisConnection:
+    """One pipelined connection: commands are written as they come, replies matched in order."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._pending: deque[asyncio.Future] = deque()
+        self.closed = False
+        self._reading = asyncio.get_running_loop().create_task(
+            self._read_replies(), context=contextvars.Context()
+        )
+
+    @classmethod
+    async def open(cls, url: str, *, timeout: float) -> "RedisConnection":
+        return cls(*await open_redis(url, timeout=timeout))
+
+    async def execute(self, *args: Any) -> Any:
+        if self.closed:
+            raise ConnectionError("Redis connection is closed")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        self._writer.write(encode_command(args))
+        await self._writer.drain()
+        return await future
+
+    async def _read_replies(self) -> None:
+        try:
+            while True:
+                reply = await read_reply(self._reader)
+                future = self._pending.popleft()
+                if future.done():  # the caller timed out
+                    continue
+                if isinstance(reply, RedisError):
+                    future.set_exception(reply)
+                else:
+                    future.set_result(reply)
+        except (OSError, EOFError, IndexError, RedisError, ValueError) as exc:
+            self._close(ConnectionError(f"Redis connection lost: {exc!r}"))
+
+    def _close(self, exc: Exception) -> None:
+        self.closed = True
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(exc)
+        self._writer.close()
+
+    def close(self) -> None:
+        self._reading.cancel()
+        self._close(ConnectionError("Redis connection is closed"))
+
+
+class RedisCacheBackend:
+    def __init__(
+        self,
+        url: str,
+        *,
+        prefix: str,
+        local_max_entries: int,
+        timeout: float = 0.5,
+        retry_seconds: float = 1.0,
+    ) -> None:
+        self._url = url
+        self._prefix = prefix
+        self._timeout = timeout
+        self._retry_seconds = retry_seconds
+        self._local = InMemoryLRUBackend(local_max_entries) if local_max_entries > 0 else None
+        self._generations: dict[str, tuple[int, int]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._connection: RedisConnection | None = None
+        self._connecting: asyncio.Lock | None = None
+        self._listener: asyncio.Task | None = None
+        self._retry_at = 0.0
+
+    @property
+    def channel(self) -> str:
+        return f"{self._prefix}:invalidate"
+
+    async def get(self, key: str) -> CacheEntry | None:
+        local = await self._local.get(key) if self._local is not None else None
+        if local is not None and time.time() < local.fresh_until:
+            return local
+        try:
+            raw = await self._call("GET", await self._redis_key(key))
+        except (ConnectionError, RedisError):
+            return local
+        if raw is None:
+            return local
+        try:
+            entry = CacheEntry(**from_json(raw))
+        except (TypeError, ValueError):
+            logger.warning("Ignoring undecodable response cache entry %s", key)
+            return local
+        if self._local is not None:
+            await self._local.set(key, entry)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        if self._local is not None:
+            await self._local.set(key, entry)
+        ttl_ms = int((entry.stale_until - time.time()) * 1000)
+        if ttl_ms <= 0:
+            return
+        payload = to_json(entry)
+        try:
+            await self._call("SET", await self._redis_key(key), payload, "PX", ttl_ms)
+        except (ConnectionError, RedisError):
+            pass
+
+    async def invalidate(self, dataset: str) -> None:
+        """Drop `dataset` here and, through Redis, in every other worker."""
+        await self._forget(dataset)
+        counter = self._epoch_key() if dataset == ALL_DATASETS else self._generation_key(dataset)
+        await self._call("INCR", counter)
+        await self._call("PUBLISH", self.channel, dataset)
+
+    async def clear(self) -> None:
+        await self.invalidate(ALL_DATASETS)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _epoch_key(self) -> str:
+        return f"{self._prefix}:epoch"
+
+    def _generation_key(self, dataset: str) -> str:
+        return f"{self._prefix}:generation:{dataset}"
+
+    async def _redis_key(self, key: str) -> str:
+        dataset = cache_dataset(key)
+        generations = self._generations.get(dataset)
+        if generations is None:
+            epoch, generation = await self._call(
+                "MGET", self._epoch_key(), self._generation_key(dataset)
+            )
+            generations = (int(epoch or 0), int(generation or 0))
+            self._generations[dataset] = generations
+        epoch, generation = generations
+        return f"{self._prefix}:{epoch}:{dataset}:{generation}:{key}"
+
+    async def _forget(self, dataset: str) -> None:
+        if dataset == ALL_DATASETS:
+            self._generations.clear()
+            if self._local is not None:
+                await self._local.clear()
+            return
+        self._generations.pop(dataset, None)
+        if self._local is not None:
+            await self._local.invalidate(dataset)
+
+    async def _call(self, *args: Any) -> Any:
+        connection = await self._connect()
+        try:
+            return await asyncio.wait_for(connection.execute(*args), timeout=self._timeout)
+        except (OSError, TimeoutError) as exc:
+            connection.close()
+            self._unavailable(exc)
+            raise ConnectionError("Redis cache is unavailable") from exc
+
+    async def _connect(self) -> RedisConnection:
+        loop = asyncio.get_running_loop()
+        connecting = self._connecting
+        if self._loop is not loop or connecting is None:
+            # Connections and tasks belong to one event loop (one per test client).
+            await self.close()
+            self._loop = loop
+            connecting = self._connecting = asyncio.Lock()
+        if self._connection is not None and not self._connection.closed:
+            return self._connection
+        if time.monotonic() < self._retry_at:
+            raise ConnectionError("Redis cache is unavailable")
+        async with connecting:
+            if self._connection is None or self._connection.closed:
+                try:
+                    self._connection = await RedisConnection.open(
+                        self._url, timeout=self._timeout
+                    )
+                except (OSError, TimeoutError, RedisError) as exc:
+                    self._unavailable(exc)
+                    raise ConnectionError("Redis cache is unavailable") from exc
+                await self._forget(ALL_DATASETS)
+                if self._listener is None or self._listener.done():
+                    self._listener = loop.create_task(
+                        self._listen(), context=contextvars.Context()
+                    )
+        return self._connection
+
+    def _unavailable(self, exc: BaseException) -> None:
+        self._retry_at = time.monotonic() + self._retry_seconds
+        logger.warning("Redis cache at %s unavailable: %r", self._url, exc)
+
+    async def _listen(self) -> None:
+        delay = self._retry_seconds
+        while True:
+            try:
+                reader, writer = await open_redis(self._url, timeout=self._timeout)
+                try:
+                    writer.write(encode_command(("SUBSCRIBE", self.channel)))
+                    await writer.drain()
+                    while True:
+                        reply = await read_reply(reader)
+                        if not isinstance(reply, list) or len(reply) != 3:
+                            continue
+                        if reply[0] == b"subscribe":
+                            # Messages sent while unsubscribed are lost.
+                            await self._forget(ALL_DATASETS)
+                            delay = self._retry_seconds
+                        elif reply[0] == b"message":
+                            await self._forget(reply[2].decode())
+                finally:
+                    writer.close()
+            except (OSError, EOFError, TimeoutError, RedisError, ValueError) as exc:
+                logger.warning("Redis invalidation listener disconnected: %r", exc)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
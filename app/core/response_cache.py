@@ -0,0 +1,243 @@
+"""Response cache for snapshot-derived read endpoints.
+
+`cached_response` wraps a crud coroutine so that its result is cached under the
+function namespace plus its normalized keyword arguments. Concurrent misses
+for the same key are coalesced onto a single computation, and entries past
+their TTL but within the stale window are served while one background task
+refreshes them.
+
+Keys start with their namespace, `<dataset>.<endpoint>` (e.g.
+`rankings.countries`). `ResponseCache.invalidate(dataset)` drops every entry of
+one dataset, e.g. after a new snapshot of it lands. With
+`response_cache_backend = "redis"` entries are shared by all workers through
+`app.core.redis_cache.RedisCacheBackend`, which also tells the other workers
+about invalidations.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Protocol
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> CacheEntry | None: ...
+
+    async def set(self, key: str, entry: CacheEntry) -> None: ...
+
+    async def invalidate(self, dataset: str) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+def cache_dataset(key: str) -> str:
+    """The dataset `key` belongs to: the first dotted part of its namespace."""
+    return key.split(":", 1)[0].split(".", 1)[0]
+
+
+class InMemoryLRUBackend:
+    """Per-process LRU bounded by entry count."""
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.stale_until <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    async def invalidate(self, dataset: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if cache_dataset(key) == dataset]:
+                del self._entries[key]
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _key_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+def make_cache_key(namespace: str, params: dict[str, Any]) -> str:
+    """Build a stable key from `params`, ignoring order and unset (None) values."""
+    normalized = {key: value for key, value in params.items() if value is not None}
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=_key_default)
+    return f"{namespace}:{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, *, ttl_seconds: float, stale_seconds: float) -> None:
+        self.backend = backend
+        self._ttl_seconds = ttl_seconds
+        self._stale_seconds = stale_seconds
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._refresh_tasks: set[asyncio.Task] = set()
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        entry = await self.backend.get(key)
+        now = time.time()
+        if entry is not None and now < entry.fresh_until:
+            return entry.value
+        if entry is not None and now < entry.stale_until:
+            self._schedule_refresh(key, compute)
+            return entry.value
+        return await self._compute_once(key, compute)
+
+    async def _compute_once(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            # Run detached from the caller, so cancelling the request that
+            # started the computation does not fail the requests waiting on it.
+            task = asyncio.get_running_loop().create_task(self._compute(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._on_compute_done(key, done))
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = await compute()
+        now = time.time()
+        await self.backend.set(
+            key,
+            CacheEntry(
+                value=value,
+                fresh_until=now + self._ttl_seconds,
+                stale_until=now + self._ttl_seconds + self._stale_seconds,
+            ),
+        )
+        return value
+
+    def _on_compute_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark retrieved so an exception nobody waited on is not logged.
+            task.exception()
+
+    async def invalidate(self, dataset: str) -> None:
+        await self.backend.invalidate(dataset)
+
+    def _schedule_refresh(self, key: str, compute: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._inflight:
+            return
+        task = asyncio.get_running_loop().create_task(self._compute_once(key, compute))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._on_refresh_done)
+
+    def _on_refresh_done(self, task: asyncio.Task) -> None:
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background cache refresh failed", exc_info=task.exception())
+
+
+_response_cache: ResponseCache | None = None
+
+
+def _build_backend() -> CacheBackend:
+    settings = get_settings()
+    if settings.response_cache_backend == "redis":
+        from app.core.redis_cache import RedisCacheBackend
+
+        return RedisCacheBackend(
+            settings.response_cache_redis_url,
+            prefix=settings.response_cache_key_prefix,
+            local_max_entries=settings.response_cache_max_entries,
+        )
+    return InMemoryLRUBackend(settings.response_cache_max_entries)
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Return the process-wide cache, or None when caching is disabled."""
+    global _response_cache
+
+    settings = get_settings()
+    if not settings.response_cache_enabled:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            _build_backend(),
+            ttl_seconds=settings.response_cache_ttl_seconds,
+            stale_seconds=settings.response_cache_stale_seconds,
+        )
+    return _response_cache
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    """Install a cache built on another backend, or None to rebuild from settings."""
+    global _response_cache
+    _response_cache = cache
+
+
+def cached_response(namespace: str) -> Callable:
+    """Cache a crud coroutine taking the Supabase client plus keyword arguments.
+
+    `func.in_thread(client, ...)` fills the same entry but runs the coroutine on
+    its own event loop in a worker thread, for callers such as the startup
+    warmup that must not block the serving loop on the sync client.
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        async def cached(
+            compute: Callable[[], Awaitable[Any]], args: tuple[Any, ...], kwargs: dict[str, Any]
+        ) -> Any:
+            cache = get_response_cache()
+            if cache is None:
+                return await compute()
+
+            key = make_cache_key(namespace, {"args": list(args), **kwargs})
+            return await cache.get_or_compute(key, compute)
+
+        def run(client: Any, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+            return asyncio.run(func(client, *args, **kwargs))
+
+        @functools.wraps(func)
+        async def wrapper(client: Any, *args: Any, **kwargs: Any) -> Any:
+            return await cached(lambda: func(client, *args, **kwargs), args, kwargs)
+
+        async def in_thread(client: Any, *args: Any, **kwargs: Any) -> Any:
+            return await cached(lambda: asyncio.to_thread(run, client, args, kwargs), args, kwargs)
+
+        wrapper.in_thread = in_thread  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
@@ -0,0 +1,23 @@
+"""JSON responses serialized by pydantic-core.
+
+A route returning a model makes FastAPI dump it, validate the dump against
+`response_model` again, pass it through `jsonable_encoder` and finally
+`json.dumps`. Hot listing routes instead validate their envelope once (with
+`Model.model_validate` over the raw rows, not a model per row) and return
+`ModelJSONResponse(envelope)`: FastAPI leaves Response instances alone and the
+envelope is serialized in a single Rust pass. `response_model` stays on the
+route for the OpenAPI schema.
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+class ModelJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+        return to_json(content)
@@ -0,0 +1,167 @@
+"""Cold start and warmup: routers are imported after the app is serving.
+
+Importing the route modules pulls in every schema and CRUD module and the
+Supabase client stack, which is most of the process's import time. `app.main`
+therefore only names them; `RouterLoader` imports and mounts them in a worker
+thread, started by the lifespan handler as soon as the server is up.
+`LazyRouterMiddleware` holds back requests that arrive before the routers are
+mounted (instead of answering 404), except for `/ping` and the other paths the
+app itself serves. Without a lifespan (httpx.ASGITransport, scripts) the first
+request triggers the load.
+
+After the routers the lifespan handler builds the Supabase client off the event
+loop, primes the JWT settings and, with `warmup_reference_data`, loads the
+reference data first requests after a deploy ask for into the response cache
+(app/services/warmup.py). `/readyz` answers 200 only once that is done, so a
+load balancer routes traffic to warm workers only; `/livez` and `/ping` answer
+as soon as the process serves. A failed required step is retried with backoff;
+reference data is best effort and does not hold readiness back.
+"""
+
+import asyncio
+import importlib
+import inspect
+import logging
+import threading
+from collections.abc import AsyncIterator, Awaitable, Iterable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class RouterLoader:
+    """Imports the `router` of each module in `modules` and includes it in `app`, once."""
+
+    def __init__(self, app: FastAPI, modules: Iterable[str]) -> None:
+        self.app = app
+        self.modules = tuple(modules)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._task: asyncio.Future[None] | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            routers = [importlib.import_module(module).router for module in self.modules]
+            for router in routers:
+                self.app.include_router(router)
+            self._loaded = True
+
+    async def ensure_loaded(self) -> None:
+        """Load the routers in a worker thread; concurrent callers share one load."""
+        if self._loaded:
+            return
+        loop = asyncio.get_running_loop()
+        # A finished task that left nothing loaded failed; try again.
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = asyncio.ensure_future(asyncio.to_thread(self.load))
+        await asyncio.shield(self._task)
+
+
+class LazyRouterMiddleware:
+    def __init__(self, app: ASGIApp, loader: RouterLoader, ready_paths: Iterable[str]) -> None:
+        self.app = app
+        self.loader = loader
+        self.ready_paths = frozenset(ready_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            not self.loader.loaded
+            and scope["type"] in ("http", "websocket")
+            and scope["path"] not in self.ready_paths
+        ):
+            await self.loader.ensure_loaded()
+        await self.app(scope, receive, send)
+
+
+class Warmup:
+    """Progress of the startup warmup, as reported by /readyz."""
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.steps: dict[str, str] = {}
+
+    async def step(self, name: str, work: Awaitable[Any], *, required: bool = True) -> Any:
+        self.steps[name] = "running"
+        try:
+            result = await work
+        except Exception:
+            self.steps[name] = "failed"
+            if required:
+                raise
+            logger.warning("Warmup step %s failed", name, exc_info=True)
+            return None
+        self.steps[name] = "ok"
+        return result
+
+
+def _get_client(app: FastAPI) -> Any:
+    """The Supabase client requests get, honouring dependency overrides."""
+    from app.db.base import get_supabase
+
+    client = app.dependency_overrides.get(get_supabase, get_supabase)()
+    return next(client) if inspect.isgenerator(client) else client
+
+
+def _prime_security() -> None:
+    from app.core.security import create_access_token, decode_access_token
+
+    decode_access_token(create_access_token({"sub": "warmup"}))
+
+
+async def _create_clients(app: FastAPI) -> Any:
+    return await asyncio.to_thread(_get_client, app)
+
+
+async def _warm_once(app: FastAPI, warmup: Warmup) -> None:
+    from app.services.warmup import preload_reference_data
+
+    settings = get_settings()
+    await warmup.step("routers", app.state.router_loader.ensure_loaded())
+    client = await warmup.step("clients", _create_clients(app))
+    await warmup.step("security", asyncio.to_thread(_prime_security))
+    if settings.warmup_reference_data:
+        await warmup.step(
+            "reference_data",
+            asyncio.wait_for(
+                preload_reference_data(client, top_rankings=settings.warmup_top_rankings),
+                timeout=settings.warmup_timeout_seconds,
+            ),
+            required=False,
+        )
+    warmup.ready = True
+
+
+async def _warm(app: FastAPI, warmup: Warmup) -> None:
+    delay = 1.0
+    while True:
+        try:
+            await _warm_once(app, warmup)
+            return
+        except Exception:
+            logger.exception("Startup warmup failed, retrying in %.0fs", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Warm up in the background, tracked in `app.state.warmup`; stop on shutdown."""
+    app.state.warmup = Warmup()
+    warming = asyncio.create_task(_warm(app, app.state.warmup))
+    try:
+        yield
+    finally:
+        app.state.warmup.ready = False
+        warming.cancel()
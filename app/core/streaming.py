@@ -0,0 +1,98 @@
+"""NDJSON and CSV streaming for listing endpoints.
+
+Listings opt in through a `format` query parameter. Instead of materialising
+a JSON envelope, rows are pulled page by page from an async iterator and
+written out as they arrive, so memory stays bounded by the page size and the
+first bytes leave before the last page is fetched.
+"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+
+
+class StreamFormat(str, Enum):
+    JSON = "json"
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+STREAM_MEDIA_TYPES = {
+    StreamFormat.NDJSON: "application/x-ndjson",
+    StreamFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, date | datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, date | datetime):
+        return value.isoformat()
+    if isinstance(value, dict | list):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def ndjson_lines(rows: Sequence[dict[str, Any]], fields: Sequence[str]) -> str:
+    return "".join(
+        json.dumps(
+            {name: row.get(name) for name in fields}, ensure_ascii=False, default=_json_default
+        )
+        + "\n"
+        for row in rows
+    )
+
+
+def csv_lines(rows: Sequence[dict[str, Any]], fields: Sequence[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([csv_value(row.get(name)) for name in fields] for row in rows)
+    return buffer.getvalue()
+
+
+async def serialize_pages(
+    pages: AsyncIterator[list[dict[str, Any]]],
+    *,
+    fmt: StreamFormat,
+    fields: Sequence[str],
+) -> AsyncIterator[str]:
+    """One chunk per page (plus the CSV header), projected onto `fields`."""
+    if fmt == StreamFormat.CSV:
+        yield csv_lines([dict(zip(fields, fields, strict=True))], fields)
+        async for page in pages:
+            yield csv_lines(page, fields)
+        return
+    async for page in pages:
+        yield ndjson_lines(page, fields)
+
+
+def streaming_response(
+    pages: AsyncIterator[list[dict[str, Any]]],
+    *,
+    fmt: StreamFormat,
+    fields: Sequence[str],
+    filename: str,
+) -> StreamingResponse:
+    if fmt == StreamFormat.JSON:
+        raise ValueError("JSON listings are not streamed")
+    headers = {}
+    if fmt == StreamFormat.CSV:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return StreamingResponse(
+        serialize_pages(pages, fmt=fmt, fields=fields),
+        media_type=STREAM_MEDIA_TYPES[fmt],
+        headers=headers,
+    )
@@ -1,21 +1,24 @@
+import asyncio
 import json
-import re
 from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import AsyncIterator
 from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
 from supabase import Client
 
+from app.core.response_cache import cached_response
+from app.crud.channel_cache import get_channel_cards
+from app.crud.search import normalize_search_term
 from app.schemas.advertiser import AdvertiserActivityStatus, AdvertiserSortBy, SortOrder
 
-_SEARCH_TERM_SANITIZE_RE = re.compile(r"[(),]")
-
 _SORT_FIELD_MAP = {
     AdvertiserSortBy.ESTIMATED_SPEND: "estimated_spend",
     AdvertiserSortBy.TOTAL_ADS: "total_ads",
     AdvertiserSortBy.CHANNELS_USED: "channels_used",
     AdvertiserSortBy.AVG_ENGAGEMENT_RATE: "avg_engagement_rate",
     AdvertiserSortBy.TREND: "trend",
+    AdvertiserSortBy.RELEVANCE: "search_rank",
 }
 
 
@@ -178,6 +181,17 @@ def _get_latest_snapshot_date(client: Client) -> date | None:
     return _to_date(rows[0]["metric_date"]) if rows else None
 
 
+def _get_search_ranks(client: Client, search_term: str) -> dict[str, float]:
+    """Match advertisers through the `search_advertisers` index-backed function."""
+    response = client.rpc("search_advertisers", {"search_query": search_term}, get=True).execute()
+    rows = response.data or []
+    return {
+        str(row["advertiser_id"]): _to_float(row.get("search_rank")) or 0.0
+        for row in rows
+        if row.get("advertiser_id") is not None
+    }
+
+
 def _get_industries_map(client: Client) -> dict[str, dict[str, str]]:
     response = client.table("industries").select("id, slug, name").execute()
     rows = response.data or []
@@ -333,46 +347,38 @@ def _build_advertiser_records(
     return records, snapshot_date, baseline_date
 
 
-async def get_advertisers_catalog(
+def _list_advertiser_records(
     client: Client,
     *,
-    q: str | None = None,
-    industry_slug: str | None = None,
-    time_period_days: int = 30,
-    min_spend: float | None = None,
-    min_channels: int | None = None,
-    min_engagement: float | None = None,
-    activity_status: AdvertiserActivityStatus = AdvertiserActivityStatus.ALL,
-    sort_by: AdvertiserSortBy = AdvertiserSortBy.ESTIMATED_SPEND,
-    sort_order: SortOrder = SortOrder.DESC,
-    limit: int = 20,
-    cursor: str | None = None,
-) -> dict[str, Any]:
-    offset = 0
-    if cursor:
-        payload = _decode_cursor(cursor)
-        offset = payload["offset"]
-
+    q: str | None,
+    industry_slug: str | None,
+    time_period_days: int,
+    min_spend: float | None,
+    min_channels: int | None,
+    min_engagement: float | None,
+    activity_status: AdvertiserActivityStatus,
+    sort_by: AdvertiserSortBy,
+    sort_order: SortOrder,
+) -> tuple[list[dict[str, Any]], date | None, date | None]:
+    """Filtered and sorted advertiser records, plus the snapshot and baseline dates."""
     records, snapshot_date, baseline_date = _build_advertiser_records(
         client,
         time_period_days=time_period_days,
     )
 
-    normalized_q: str | None = None
-    if q:
-        normalized_q = _SEARCH_TERM_SANITIZE_RE.sub(" ", q).strip().lower()
+    search_term = normalize_search_term(q)
+    search_ranks = _get_search_ranks(client, search_term) if search_term else None
+    if sort_by == AdvertiserSortBy.RELEVANCE and search_ranks is None:
+        sort_by = AdvertiserSortBy.ESTIMATED_SPEND
 
     normalized_industry_slug = industry_slug.lower() if industry_slug else None
 
     filtered: list[dict[str, Any]] = []
     for record in records:
-        if normalized_q:
-            if (
-                normalized_q not in str(record.get("name", "")).lower()
-                and normalized_q not in str(record.get("slug", "")).lower()
-                and normalized_q not in str(record.get("description", "")).lower()
-            ):
+        if search_ranks is not None:
+            if record["advertiser_id"] not in search_ranks:
                 continue
+            record["search_rank"] = search_ranks[record["advertiser_id"]]
 
         if normalized_industry_slug and (record.get("industry_slug") or "").lower() != normalized_industry_slug:
             continue
@@ -400,13 +406,68 @@ async def get_advertisers_catalog(
 
         filtered.append(record)
 
-    total_estimate = len(filtered)
     sort_field = _SORT_FIELD_MAP[sort_by]
     sorted_records = _sort_records(
         filtered,
         sort_field=sort_field,
         sort_order=sort_order,
     )
+    return sorted_records, snapshot_date, baseline_date
+
+
+def _advertiser_list_item(row: dict[str, Any], *, rank: int) -> dict[str, Any]:
+    return {
+        "rank": rank,
+        "advertiser_id": row["advertiser_id"],
+        "name": row["name"],
+        "slug": row["slug"],
+        "logo_url": row.get("logo_url"),
+        "industry_slug": row.get("industry_slug"),
+        "industry_name": row.get("industry_name"),
+        "estimated_spend": row.get("estimated_spend"),
+        "total_ads": row.get("total_ads"),
+        "channels_used": row.get("channels_used"),
+        "avg_engagement_rate": row.get("avg_engagement_rate"),
+        "trend": row.get("trend"),
+        "active_creatives": row.get("active_creatives"),
+        "last_active_at": row.get("last_active_at"),
+    }
+
+
+@cached_response("advertisers.catalog")
+async def get_advertisers_catalog(
+    client: Client,
+    *,
+    q: str | None = None,
+    industry_slug: str | None = None,
+    time_period_days: int = 30,
+    min_spend: float | None = None,
+    min_channels: int | None = None,
+    min_engagement: float | None = None,
+    activity_status: AdvertiserActivityStatus = AdvertiserActivityStatus.ALL,
+    sort_by: AdvertiserSortBy = AdvertiserSortBy.ESTIMATED_SPEND,
+    sort_order: SortOrder = SortOrder.DESC,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> dict[str, Any]:
+    offset = 0
+    if cursor:
+        payload = _decode_cursor(cursor)
+        offset = payload["offset"]
+
+    sorted_records, snapshot_date, baseline_date = _list_advertiser_records(
+        client,
+        q=q,
+        industry_slug=industry_slug,
+        time_period_days=time_period_days,
+        min_spend=min_spend,
+        min_channels=min_channels,
+        min_engagement=min_engagement,
+        activity_status=activity_status,
+        sort_by=sort_by,
+        sort_order=sort_order,
+    )
+    total_estimate = len(sorted_records)
 
     page_rows = sorted_records[offset : offset + limit]
     has_more = (offset + limit) < len(sorted_records)
@@ -417,26 +478,9 @@ async def get_advertisers_catalog(
             offset=offset + limit,
         )
 
-    items: list[dict[str, Any]] = []
-    for index, row in enumerate(page_rows):
-        items.append(
-            {
-                "rank": offset + index + 1,
-                "advertiser_id": row["advertiser_id"],
-                "name": row["name"],
-                "slug": row["slug"],
-                "logo_url": row.get("logo_url"),
-                "industry_slug": row.get("industry_slug"),
-                "industry_name": row.get("industry_name"),
-                "estimated_spend": row.get("estimated_spend"),
-                "total_ads": row.get("total_ads"),
-                "channels_used": row.get("channels_used"),
-                "avg_engagement_rate": row.get("avg_engagement_rate"),
-                "trend": row.get("trend"),
-                "active_creatives": row.get("active_creatives"),
-                "last_active_at": row.get("last_active_at"),
-            }
-        )
+    items = [
+        _advertiser_list_item(row, rank=offset + index + 1) for index, row in enumerate(page_rows)
+    ]
 
     return {
         "items": items,
@@ -448,6 +492,47 @@ async def get_advertisers_catalog(
     }
 
 
+async def iter_advertisers_catalog(
+    client: Client,
+    *,
+    q: str | None = None,
+    industry_slug: str | None = None,
+    time_period_days: int = 30,
+    min_spend: float | None = None,
+    min_channels: int | None = None,
+    min_engagement: float | None = None,
+    activity_status: AdvertiserActivityStatus = AdvertiserActivityStatus.ALL,
+    sort_by: AdvertiserSortBy = AdvertiserSortBy.ESTIMATED_SPEND,
+    sort_order: SortOrder = SortOrder.DESC,
+    page_size: int,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Every advertiser `get_advertisers_catalog` would list, `page_size` at a time.
+
+    Ranking happens in Python over the whole catalog, so unlike the other
+    streamed listings the records are built up front; only serialization is
+    incremental.
+    """
+    sorted_records, _, _ = await asyncio.to_thread(
+        _list_advertiser_records,
+        client,
+        q=q,
+        industry_slug=industry_slug,
+        time_period_days=time_period_days,
+        min_spend=min_spend,
+        min_channels=min_channels,
+        min_engagement=min_engagement,
+        activity_status=activity_status,
+        sort_by=sort_by,
+        sort_order=sort_order,
+    )
+    for offset in range(0, len(sorted_records), page_size):
+        yield [
+            _advertiser_list_item(row, rank=offset + index + 1)
+            for index, row in enumerate(sorted_records[offset : offset + page_size])
+        ]
+
+
+@cached_response("advertisers.summary")
 async def get_advertisers_summary(
     client: Client,
     *,
@@ -568,18 +653,7 @@ def _get_top_channels(
     )
     top_channel_rows = top_channels_response.data or []
 
-    channel_ids = [str(row["channel_id"]) for row in top_channel_rows if row.get("channel_id")]
-    channel_map: dict[str, dict[str, Any]] = {}
-    if channel_ids:
-        channels_response = (
-            client.table("channels")
-            .select("id, name, username")
-            .in_("id", channel_ids)
-            .execute()
-        )
-        channel_map = {
-            str(row["id"]): row for row in (channels_response.data or []) if row.get("id") is not None
-        }
+    channel_map = get_channel_cards(client, [row.get("channel_id") for row in top_channel_rows])
 
     items: list[dict[str, Any]] = []
     for row in top_channel_rows:
@@ -599,6 +673,7 @@ def _get_top_channels(
     return items
 
 
+@cached_response("advertisers.detail")
 async def get_advertiser_detail(
     client: Client,
     *,
@@ -1,13 +1,17 @@
 import json
-import re
 from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import AsyncIterator
 from typing import Any
 
 from supabase import Client
 
+from app.core.response_cache import cached_response
+from app.crud.channel_cache import get_channel_cards
+from app.crud.keyset import iter_keyset_pages
+from app.crud.search import apply_search_filter, normalize_search_term
 from app.schemas.channel import ChannelSizeBucket, ChannelSortBy, ChannelStatus, SortOrder
 
-_SEARCH_TERM_SANITIZE_RE = re.compile(r"[(),]")
+_SEARCH_PREFIX_COLUMNS = ("search_name", "search_username")
 
 
 def _encode_cursor(*, last_id: str, offset: int) -> str:
@@ -57,13 +61,12 @@ def _apply_channel_filters(
     verified: bool | None = None,
     scam: bool | None = None,
 ) -> Any:
-    """Apply channel list filters to a Supabase query object."""
+    """Apply channel list filters to a Supabase query object.
+
+    `q` must already be normalized with `normalize_search_term`.
+    """
     if q:
-        normalized_query = _SEARCH_TERM_SANITIZE_RE.sub(" ", q).strip()
-        if normalized_query:
-            query = query.or_(
-                f"name.ilike.*{normalized_query}*,username.ilike.*{normalized_query}*"
-            )
+        query = apply_search_filter(query, q, prefix_columns=_SEARCH_PREFIX_COLUMNS)
 
     if country_code:
         query = query.eq("country_code", country_code.upper())
@@ -159,6 +162,7 @@ def _compute_kpi(value: int | float | None, baseline: int | float | None) -> dic
     }
 
 
+@cached_response("channels.catalog")
 async def get_catalog_channels(
     client: Client,
     *,
@@ -176,16 +180,37 @@ async def get_catalog_channels(
     limit: int = 20,
     cursor: str | None = None,
 ) -> dict[str, Any]:
-    """List channels from catalog view with filtering, sorting, and pagination."""
+    """List channels from catalog view with filtering, sorting, and pagination.
+
+    `sort_by=relevance` ranks matches with `ts_rank` through the
+    `search_catalog_channels` function and falls back to subscribers when no
+    search term is given.
+    """
     offset = 0
     if cursor:
         payload = _decode_cursor(cursor)
         offset = payload["offset"]
 
-    base_query = client.table("vw_catalog_channels").select("*")
+    search_term = normalize_search_term(q)
+    sort_by_relevance = sort_by == ChannelSortBy.RELEVANCE and search_term is not None
+    if sort_by == ChannelSortBy.RELEVANCE and not sort_by_relevance:
+        sort_by = ChannelSortBy.SUBSCRIBERS
+
+    if sort_by_relevance:
+        # The function already applies the search match, so `q` is not re-applied.
+        base_query = client.rpc(
+            "search_catalog_channels",
+            {"search_query": search_term},
+            get=True,
+        ).select("*")
+        sort_field = "search_rank"
+    else:
+        base_query = client.table("vw_catalog_channels").select("*")
+        sort_field = sort_by.value
+
     base_query = _apply_channel_filters(
         base_query,
-        q=q,
+        q=None if sort_by_relevance else search_term,
         country_code=country_code,
         category_slug=category_slug,
         size_bucket=size_bucket,
@@ -203,7 +228,7 @@ async def get_catalog_channels(
     )
     count_query = _apply_channel_filters(
         count_query,
-        q=q,
+        q=search_term,
         country_code=country_code,
         category_slug=category_slug,
         size_bucket=size_bucket,
@@ -218,7 +243,7 @@ async def get_catalog_channels(
 
     is_desc = sort_order == SortOrder.DESC
     paged_query = (
-        base_query.order(sort_by.value, desc=is_desc, nullsfirst=False)
+        base_query.order(sort_field, desc=is_desc, nullsfirst=False)
         .order("channel_id", desc=is_desc)
         .range(offset, offset + limit)
     )
@@ -244,6 +269,65 @@ async def get_catalog_channels(
     }
 
 
+async def iter_catalog_channels(
+    client: Client,
+    *,
+    q: str | None = None,
+    country_code: str | None = None,
+    category_slug: str | None = None,
+    size_bucket: ChannelSizeBucket | None = None,
+    er_min: float | None = None,
+    er_max: float | None = None,
+    status: ChannelStatus | None = None,
+    verified: bool | None = None,
+    scam: bool | None = None,
+    sort_by: ChannelSortBy = ChannelSortBy.SUBSCRIBERS,
+    sort_order: SortOrder = SortOrder.DESC,
+    page_size: int,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Every channel `get_catalog_channels` would list, in the same order.
+
+    Pages are fetched by keyset rather than offset, `page_size` rows at a
+    time, for streaming responses.
+    """
+    search_term = normalize_search_term(q)
+    sort_by_relevance = sort_by == ChannelSortBy.RELEVANCE and search_term is not None
+    if sort_by == ChannelSortBy.RELEVANCE and not sort_by_relevance:
+        sort_by = ChannelSortBy.SUBSCRIBERS
+
+    def build_query() -> Any:
+        if sort_by_relevance:
+            query = client.rpc(
+                "search_catalog_channels",
+                {"search_query": search_term},
+                get=True,
+            ).select("*")
+        else:
+            query = client.table("vw_catalog_channels").select("*")
+        return _apply_channel_filters(
+            query,
+            q=None if sort_by_relevance else search_term,
+            country_code=country_code,
+            category_slug=category_slug,
+            size_bucket=size_bucket,
+            er_min=er_min,
+            er_max=er_max,
+            status=status,
+            verified=verified,
+            scam=scam,
+        )
+
+    async for rows in iter_keyset_pages(
+        build_query,
+        sort_field="search_rank" if sort_by_relevance else sort_by.value,
+        key_field="channel_id",
+        desc=sort_order == SortOrder.DESC,
+        page_size=page_size,
+    ):
+        yield [_normalize_channel_row(row) for row in rows]
+
+
+@cached_response("channels.overview")
 async def get_channel_overview(client: Client, channel_id: str) -> dict[str, Any] | None:
     overview_response = (
         client.table("vw_channel_overview")
@@ -303,24 +387,21 @@ async def get_channel_overview(client: Client, channel_id: str) -> dict[str, Any
     )
     similarity_rows = similarities_response.data or []
 
+    similar_channel_cards = get_channel_cards(
+        client,
+        [row.get("similar_channel_id") for row in similarity_rows],
+    )
+
     similar_channels: list[dict[str, Any]] = []
     for similarity_row in similarity_rows:
         similar_channel_id = similarity_row.get("similar_channel_id")
         if similar_channel_id is None:
             continue
 
-        similar_channel_response = (
-            client.table("channels")
-            .select("id, name, username, subscribers_current")
-            .eq("id", similar_channel_id)
-            .limit(1)
-            .execute()
-        )
-        similar_channel_rows = similar_channel_response.data or []
-        if not similar_channel_rows:
+        similar_channel_row = similar_channel_cards.get(str(similar_channel_id))
+        if similar_channel_row is None:
             continue
 
-        similar_channel_row = similar_channel_rows[0]
         similar_channels.append(
             {
                 "channel_id": similar_channel_row["id"],
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from supabase import Client
+
+from app.core.config import get_settings
+
+CHANNEL_CARD_COLUMNS = "id, name, username, avatar_url, subscribers_current"
+
+
+class ChannelCardCache:
+    """Process-wide LRU of channel id -> display fields, each entry with a TTL.
+
+    Ids that do not exist are cached as None so repeated lookups of deleted
+    channels do not hit the database either.
+    """
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any] | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, channel_ids: list[str]) -> tuple[dict[str, dict[str, Any] | None], list[str]]:
+        """Split `channel_ids` into cached cards and ids that must be fetched."""
+        now = time.monotonic()
+        hits: dict[str, dict[str, Any] | None] = {}
+        misses: list[str] = []
+        with self._lock:
+            for channel_id in channel_ids:
+                entry = self._entries.get(channel_id)
+                if entry is None or entry[0] <= now:
+                    misses.append(channel_id)
+                    continue
+                self._entries.move_to_end(channel_id)
+                hits[channel_id] = entry[1]
+        return hits, misses
+
+    def put_many(self, cards: dict[str, dict[str, Any] | None]) -> None:
+        expires_at = time.monotonic() + self._ttl_seconds
+        with self._lock:
+            for channel_id, card in cards.items():
+                self._entries[channel_id] = (expires_at, card)
+                self._entries.move_to_end(channel_id)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, channel_ids: list[str] | None = None) -> None:
+        with self._lock:
+            if channel_ids is None:
+                self._entries.clear()
+                return
+            for channel_id in channel_ids:
+                self._entries.pop(channel_id, None)
+
+
+_channel_card_cache: ChannelCardCache | None = None
+
+
+def get_channel_card_cache() -> ChannelCardCache:
+    global _channel_card_cache
+
+    if _channel_card_cache is None:
+        settings = get_settings()
+        _channel_card_cache = ChannelCardCache(
+            max_entries=settings.channel_card_cache_max_entries,
+            ttl_seconds=settings.channel_card_cache_ttl_seconds,
+        )
+    return _channel_card_cache
+
+
+def reset_channel_card_cache() -> None:
+    global _channel_card_cache
+    _channel_card_cache = None
+
+
+def get_channel_cards(client: Client, channel_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """Return `{channel_id: row}` with CHANNEL_CARD_COLUMNS for the known ids.
+
+    Only ids missing from the cache are fetched, in a single query.
+    """
+    unique_ids = list(dict.fromkeys(str(channel_id) for channel_id in channel_ids if channel_id))
+    if not unique_ids:
+        return {}
+
+    cache = get_channel_card_cache()
+    cards, misses = cache.get_many(unique_ids)
+    if misses:
+        rows = (
+            client.table("channels")
+            .select(CHANNEL_CARD_COLUMNS)
+            .in_("id", misses)
+            .execute()
+            .data
+            or []
+        )
+        fetched: dict[str, dict[str, Any] | None] = dict.fromkeys(misses)
+        fetched.update({str(row["id"]): row for row in rows if row.get("id") is not None})
+        cache.put_many(fetched)
+        cards.update(fetched)
+
+    return {channel_id: card for channel_id, card in cards.items() if card is not None}
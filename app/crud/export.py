@@ -0,0 +1,447 @@
+from __future__ import annotations
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from supabase import Client
+
+from app.schemas.export import ExportFormat, ExportType
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    name: str
+    # One of str, int, float, bool, date, datetime; only Parquet uses it.
+    kind: str = "str"
+
+
+@dataclass(frozen=True)
+class ExportSource:
+    relation: str
+    # Unique, indexed column the rows are keyset-paginated on.
+    key: str
+    columns: tuple[ExportColumn, ...]
+    eq_filters: frozenset[str] = frozenset()
+    range_filters: frozenset[str] = frozenset()
+    fixed_filters: dict[str, Any] = field(default_factory=dict)
+    account_scoped: bool = False
+
+    @property
+    def select(self) -> str:
+        return ", ".join(column.name for column in self.columns)
+
+
+def _columns(*specs: str) -> tuple[ExportColumn, ...]:
+    columns = []
+    for spec in specs:
+        name, _, kind = spec.partition(":")
+        columns.append(ExportColumn(name, kind or "str"))
+    return tuple(columns)
+
+
+EXPORT_SOURCES: dict[ExportType, ExportSource] = {
+    ExportType.CHANNELS: ExportSource(
+        relation="vw_catalog_channels",
+        key="channel_id",
+        columns=_columns(
+            "channel_id",
+            "telegram_channel_id:int",
+            "name",
+            "username",
+            "country_code",
+            "country_name",
+            "status",
+            "verified:bool",
+            "category_slug",
+            "category_name",
+            "subscribers:int",
+            "avg_views:int",
+            "engagement_rate:float",
+            "growth_24h:float",
+            "growth_7d:float",
+            "growth_30d:float",
+            "posts_per_day:float",
+            "size_bucket",
+            "updated_at:datetime",
+        ),
+        eq_filters=frozenset(
+            {"country_code", "category_slug", "size_bucket", "status", "verified", "scam"}
+        ),
+        range_filters=frozenset({"subscribers", "engagement_rate"}),
+    ),
+    ExportType.ADS: ExportSource(
+        relation="vw_ads_listing",
+        key="ad_id",
+        columns=_columns(
+            "ad_id",
+            "campaign_id",
+            "advertiser_id",
+            "advertiser_name",
+            "channel_id",
+            "channel_name",
+            "channel_username",
+            "headline",
+            "preview_text",
+            "ad_type",
+            "media_type",
+            "category_slug",
+            "posted_at:datetime",
+            "last_seen_at:datetime",
+            "is_active:bool",
+            "impressions:int",
+            "clicks:int",
+            "ctr:float",
+            "engagement_rate:float",
+            "spend:float",
+        ),
+        eq_filters=frozenset(
+            {"advertiser_id", "channel_id", "category_slug", "ad_type", "media_type", "is_active"}
+        ),
+        range_filters=frozenset({"posted_at"}),
+    ),
+    ExportType.ADVERTISERS: ExportSource(
+        relation="advertisers",
+        key="id",
+        columns=_columns(
+            "id",
+            "name",
+            "slug",
+            "industry_id",
+            "website_url",
+            "active_creatives_count:int",
+            "estimated_spend_current:float",
+            "avg_engagement_rate_current:float",
+            "total_ads_current:int",
+            "channels_used_current:int",
+            "trend_30d:float",
+            "updated_at:datetime",
+        ),
+        eq_filters=frozenset({"industry_id"}),
+        range_filters=frozenset({"estimated_spend_current"}),
+    ),
+    ExportType.INVOICES: ExportSource(
+        relation="invoices",
+        key="id",
+        columns=_columns(
+            "id",
+            "invoice_number",
+            "status",
+            "currency",
+            "amount_subtotal:float",
+            "amount_tax:float",
+            "amount_total:float",
+            "period_start:date",
+            "period_end:date",
+            "issued_at:datetime",
+            "due_at:datetime",
+            "paid_at:datetime",
+        ),
+        eq_filters=frozenset({"status", "currency"}),
+        range_filters=frozenset({"issued_at"}),
+        account_scoped=True,
+    ),
+    ExportType.POSTS: ExportSource(
+        relation="posts",
+        key="id",
+        columns=_columns(
+            "id",
+            "channel_id",
+            "telegram_message_id:int",
+            "external_post_url",
+            "title",
+            "content_text",
+            "media_type",
+            "published_at:datetime",
+            "views_count:int",
+            "reactions_count:int",
+            "comments_count:int",
+            "forwards_count:int",
+        ),
+        eq_filters=frozenset({"channel_id", "media_type"}),
+        range_filters=frozenset({"published_at", "views_count"}),
+        fixed_filters={"is_deleted": False},
+    ),
+    ExportType.MINI_APPS: ExportSource(
+        relation="vw_mini_apps_latest",
+        key="mini_app_id",
+        columns=_columns(
+            "mini_app_id",
+            "telegram_app_id",
+            "name",
+            "slug",
+            "category_slug",
+            "category_name",
+            "rating:float",
+            "launched_at:date",
+            "daily_users:int",
+            "total_users:int",
+            "sessions:int",
+            "avg_session_seconds:int",
+            "growth_weekly:float",
+        ),
+        eq_filters=frozenset({"category_slug"}),
+        range_filters=frozenset({"daily_users", "total_users", "rating"}),
+    ),
+}
+
+
+def get_export_source(export_type: ExportType | str) -> ExportSource:
+    try:
+        return EXPORT_SOURCES[ExportType(export_type)]
+    except (KeyError, ValueError) as exc:
+        raise ValueError(f"Unsupported export type: {export_type}") from exc
+
+
+def validate_export_filters(source: ExportSource, filters: dict[str, Any]) -> dict[str, Any]:
+    """Check filter names against the source; returns the filters unchanged.
+
+    Raises:
+        ValueError: On an unknown filter name or a non-scalar value.
+    """
+    allowed = set(source.eq_filters)
+    for column in source.range_filters:
+        allowed.update({f"{column}_min", f"{column}_max"})
+
+    unknown = sorted(set(filters) - allowed)
+    if unknown:
+        raise ValueError(
+            f"Unsupported filters: {', '.join(unknown)}. Allowed: {', '.join(sorted(allowed))}"
+        )
+    for name, value in filters.items():
+        if value is not None and not isinstance(value, str | int | float | bool):
+            raise ValueError(f"Filter {name} must be a string, number or boolean")
+    return filters
+
+
+def _apply_export_filters(query: Any, source: ExportSource, filters: dict[str, Any]) -> Any:
+    for name, value in {**source.fixed_filters, **filters}.items():
+        if value is None:
+            continue
+        if name.endswith("_min") and name[:-4] in source.range_filters:
+            query = query.gte(name[:-4], value)
+        elif name.endswith("_max") and name[:-4] in source.range_filters:
+            query = query.lte(name[:-4], value)
+        else:
+            query = query.eq(name, value)
+    return query
+
+
+def iter_export_pages(
+    client: Client,
+    source: ExportSource,
+    *,
+    filters: dict[str, Any],
+    account_id: str | None,
+    page_size: int,
+) -> Iterator[list[dict[str, Any]]]:
+    """Yield rows page by page in key order, without OFFSET.
+
+    Each page continues after the last key of the previous one, so every
+    request is an index range scan and memory stays at one page.
+    """
+    last_key: str | None = None
+    while True:
+        query = client.table(source.relation).select(source.select)
+        if source.account_scoped:
+            query = query.eq("account_id", account_id)
+        query = _apply_export_filters(query, source, filters)
+        if last_key is not None:
+            query = query.gt(source.key, last_key)
+        rows = query.order(source.key).limit(page_size).execute().data or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        last_key = str(rows[-1][source.key])
+
+
+def _encode_cursor(created_at: str, export_id: str) -> str:
+    payload = json.dumps({"created_at": created_at, "id": export_id}).encode("utf-8")
+    return urlsafe_b64encode(payload).decode("utf-8")
+
+
+def _decode_cursor(cursor: str) -> dict[str, str]:
+    try:
+        payload = json.loads(urlsafe_b64decode(cursor).decode("utf-8"))
+        return {"created_at": str(payload["created_at"]), "id": str(payload["id"])}
+    except Exception as exc:  # noqa: BLE001
+        raise ValueError("Invalid pagination cursor") from exc
+
+
+def serialize_export_job(row: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "export_id": row["id"],
+        "account_id": row["account_id"],
+        "export_type": row["export_type"],
+        "format": row.get("format") or ExportFormat.CSV.value,
+        "status": row["status"],
+        "filters": row.get("filters") or {},
+        "rows_exported": int(row.get("rows_exported") or 0),
+        "file_url": row.get("file_url"),
+        "file_size_bytes": row.get("file_size_bytes"),
+        "error_message": row.get("error_message"),
+        "created_at": row["created_at"],
+        "started_at": row.get("started_at"),
+        "completed_at": row.get("completed_at"),
+        "expires_at": row.get("expires_at"),
+    }
+
+
+async def create_export_job(
+    client: Client,
+    *,
+    account_id: str,
+    user_id: str,
+    export_type: ExportType,
+    export_format: ExportFormat,
+    filters: dict[str, Any],
+) -> dict[str, Any]:
+    """Validate and queue an export, counting it against today's usage.
+
+    Raises:
+        ValueError: If the filters do not apply to the export type.
+    """
+    source = get_export_source(export_type)
+    validate_export_filters(source, filters)
+
+    response = (
+        client.table("export_jobs")
+        .insert(
+            {
+                "account_id": account_id,
+                "export_type": export_type.value,
+                "format": export_format.value,
+                "filters": filters,
+                "created_by": user_id,
+            }
+        )
+        .execute()
+    )
+    if not response.data:
+        raise ValueError("Failed to create export job")
+
+    client.rpc("increment_account_exports", {"p_account_id": account_id}).execute()
+    return serialize_export_job(response.data[0])
+
+
+async def list_export_jobs(
+    client: Client,
+    *,
+    account_id: str,
+    limit: int,
+    cursor: str | None,
+) -> dict[str, Any]:
+    query = client.table("export_jobs").select("*").eq("account_id", account_id)
+    if cursor:
+        payload = _decode_cursor(cursor)
+        created_at = payload["created_at"]
+        query = query.or_(
+            f'and(created_at.eq."{created_at}",id.lt.{payload["id"]}),'
+            f'created_at.lt."{created_at}"'
+        )
+
+    rows = (
+        query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1).execute().data
+        or []
+    )
+    has_more = len(rows) > limit
+    page_rows = rows[:limit]
+    next_cursor = (
+        _encode_cursor(str(page_rows[-1]["created_at"]), str(page_rows[-1]["id"]))
+        if has_more and page_rows
+        else None
+    )
+    return {
+        "items": [serialize_export_job(row) for row in page_rows],
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
+
+
+def get_export_job_row(client: Client, *, export_id: str) -> dict[str, Any] | None:
+    response = client.table("export_jobs").select("*").eq("id", export_id).limit(1).execute()
+    if response.data:
+        return response.data[0]
+    return None
+
+
+async def get_export_job(
+    client: Client, *, account_id: str, export_id: str
+) -> dict[str, Any] | None:
+    row = get_export_job_row(client, export_id=export_id)
+    if row is None or str(row["account_id"]) != account_id:
+        return None
+    return serialize_export_job(row)
+
+
+def claim_export_job(
+    client: Client, *, export_id: str | None = None, stale_after_seconds: int
+) -> dict[str, Any] | None:
+    """Move one queued job to processing for this worker, or return None."""
+    response = client.rpc(
+        "claim_export_job",
+        {"p_job_id": export_id, "p_stale_after": f"{stale_after_seconds} seconds"},
+    ).execute()
+    if response.data:
+        return response.data[0]
+    return None
+
+
+def update_export_progress(client: Client, *, export_id: str, rows_exported: int) -> None:
+    """Record progress and refresh the heartbeat that keeps the job claimed."""
+    client.table("export_jobs").update(
+        {"rows_exported": rows_exported, "heartbeat_at": datetime.now(UTC).isoformat()}
+    ).eq("id", export_id).execute()
+
+
+def complete_export_job(
+    client: Client,
+    *,
+    export_id: str,
+    rows_exported: int,
+    file_url: str,
+    file_size_bytes: int,
+    completed_at: datetime,
+    expires_at: datetime,
+) -> None:
+    client.table("export_jobs").update(
+        {
+            "status": "completed",
+            "rows_exported": rows_exported,
+            "file_url": file_url,
+            "file_size_bytes": file_size_bytes,
+            "completed_at": completed_at.isoformat(),
+            "expires_at": expires_at.isoformat(),
+        }
+    ).eq("id", export_id).execute()
+
+
+def fail_export_job(client: Client, *, export_id: str, error_message: str) -> None:
+    client.table("export_jobs").update(
+        {"status": "failed", "error_message": error_message}
+    ).eq("id", export_id).execute()
+
+
+def list_expired_export_jobs(client: Client, *, now: datetime, limit: int) -> list[dict[str, Any]]:
+    response = (
+        client.table("export_jobs")
+        .select("id, account_id, format")
+        .eq("status", "completed")
+        .lt("expires_at", now.isoformat())
+        .order("expires_at")
+        .limit(limit)
+        .execute()
+    )
+    return response.data or []
+
+
+def mark_export_jobs_expired(client: Client, export_ids: list[str]) -> None:
+    if not export_ids:
+        return
+    client.table("export_jobs").update({"status": "expired", "file_url": None}).in_(
+        "id", export_ids
+    ).execute()
@@ -4,6 +4,8 @@ from typing import Any
 
 from supabase import Client
 
+from app.core.response_cache import cached_response
+
 
 def _encode_cursor(*, offset: int) -> str:
     payload = {"offset": offset}
@@ -51,6 +53,7 @@ def _normalize_country_row(row: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+@cached_response("home.categories")
 async def get_home_categories(
     client: Client,
     *,
@@ -85,6 +88,7 @@ async def get_home_categories(
     }
 
 
+@cached_response("home.countries")
 async def get_home_countries(
     client: Client,
     *,
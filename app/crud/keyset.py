@@ -0,0 +1,65 @@
+"""Keyset (seek) pagination over PostgREST queries.
+
+OFFSET pagination re-reads every skipped row, so walking a large listing end
+to end is quadratic. Continuing after the last `(sort value, key)` pair
+instead keeps each page an index range scan, whatever its depth.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+
+def keyset_condition(
+    sort_field: str, key_field: str, last_row: dict[str, Any], *, desc: bool
+) -> str:
+    """PostgREST `or` filter selecting rows after `last_row`.
+
+    Matches `.order(sort_field, desc=desc, nullsfirst=False).order(key_field,
+    desc=desc)`: NULL sort values come last in either direction.
+    """
+    op = "lt" if desc else "gt"
+    key = last_row[key_field]
+    value = last_row.get(sort_field)
+    if value is None:
+        return f'and({sort_field}.is.null,{key_field}.{op}."{key}")'
+    return (
+        f'{sort_field}.{op}."{value}",'
+        f'and({sort_field}.eq."{value}",{key_field}.{op}."{key}"),'
+        f"{sort_field}.is.null"
+    )
+
+
+async def iter_keyset_pages(
+    build_query: Callable[[], Any],
+    *,
+    sort_field: str,
+    key_field: str,
+    desc: bool,
+    page_size: int,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield every row of `build_query()` in sort order, `page_size` at a time.
+
+    `build_query` returns a fresh filtered query per page. Requests run in a
+    worker thread so a long walk does not stall the event loop.
+    """
+    last_row: dict[str, Any] | None = None
+    while True:
+        query = build_query()
+        if last_row is not None:
+            if sort_field == key_field:
+                op = query.lt if desc else query.gt
+                query = op(key_field, last_row[key_field])
+            else:
+                query = query.or_(keyset_condition(sort_field, key_field, last_row, desc=desc))
+        if sort_field != key_field:
+            query = query.order(sort_field, desc=desc, nullsfirst=False)
+        query = query.order(key_field, desc=desc).limit(page_size)
+
+        response = await asyncio.to_thread(query.execute)
+        rows = response.data or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        last_row = rows[-1]
@@ -1,20 +1,24 @@
 import json
-import re
 from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import AsyncIterator
 from datetime import date, datetime, timedelta
 from typing import Any
 
 from supabase import Client
 
+from app.core.response_cache import cached_response
+from app.crud.keyset import iter_keyset_pages
+from app.crud.search import apply_search_filter, normalize_search_term
 from app.schemas.mini_app import MiniAppSortBy, MiniAppsPeriod, SortOrder
 
-_SEARCH_TERM_SANITIZE_RE = re.compile(r"[(),]")
+_SEARCH_PREFIX_COLUMNS = ("search_name",)
 
 _SORT_FIELD_MAP = {
     MiniAppSortBy.DAILY_USERS: "daily_users",
     MiniAppSortBy.GROWTH: "growth_weekly",
     MiniAppSortBy.RATING: "rating",
     MiniAppSortBy.LAUNCHED_AT: "launched_at",
+    MiniAppSortBy.RELEVANCE: "search_rank",
 }
 
 _PERIOD_DAYS_MAP = {
@@ -93,11 +97,7 @@ def _apply_mini_app_filters(
     min_growth: float | None = None,
 ) -> Any:
     if q:
-        normalized_query = _SEARCH_TERM_SANITIZE_RE.sub(" ", q).strip()
-        if normalized_query:
-            query = query.or_(
-                f"name.ilike.*{normalized_query}*,slug.ilike.*{normalized_query}*,description.ilike.*{normalized_query}*"
-            )
+        query = apply_search_filter(query, q, prefix_columns=_SEARCH_PREFIX_COLUMNS)
 
     if category_slug:
         query = query.eq("category_slug", category_slug)
@@ -165,6 +165,7 @@ def _delta_and_percent(
     return delta, (delta / baseline) * 100
 
 
+@cached_response("mini_apps.catalog")
 async def get_mini_apps_catalog(
     client: Client,
     *,
@@ -184,10 +185,24 @@ async def get_mini_apps_catalog(
         payload = _decode_cursor(cursor)
         offset = payload["offset"]
 
-    base_query = client.table("vw_mini_apps_latest").select("*")
+    search_term = normalize_search_term(q)
+    sort_by_relevance = sort_by == MiniAppSortBy.RELEVANCE and search_term is not None
+    if sort_by == MiniAppSortBy.RELEVANCE and not sort_by_relevance:
+        sort_by = MiniAppSortBy.DAILY_USERS
+
+    if sort_by_relevance:
+        # The function already applies the search match, so `q` is not re-applied.
+        base_query = client.rpc(
+            "search_mini_apps_latest",
+            {"search_query": search_term},
+            get=True,
+        ).select("*")
+    else:
+        base_query = client.table("vw_mini_apps_latest").select("*")
+
     base_query = _apply_mini_app_filters(
         base_query,
-        q=q,
+        q=None if sort_by_relevance else search_term,
         category_slug=category_slug,
         min_daily_users=min_daily_users,
         min_rating=min_rating,
@@ -202,7 +217,7 @@ async def get_mini_apps_catalog(
     )
     count_query = _apply_mini_app_filters(
         count_query,
-        q=q,
+        q=search_term,
         category_slug=category_slug,
         min_daily_users=min_daily_users,
         min_rating=min_rating,
@@ -241,6 +256,55 @@ async def get_mini_apps_catalog(
     }
 
 
+async def iter_mini_apps_catalog(
+    client: Client,
+    *,
+    q: str | None = None,
+    category_slug: str | None = None,
+    min_daily_users: int | None = None,
+    min_rating: float | None = None,
+    launch_within_days: int | None = None,
+    min_growth: float | None = None,
+    sort_by: MiniAppSortBy = MiniAppSortBy.DAILY_USERS,
+    sort_order: SortOrder = SortOrder.DESC,
+    page_size: int,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Every mini app `get_mini_apps_catalog` would list, keyset-paged for streaming."""
+    search_term = normalize_search_term(q)
+    sort_by_relevance = sort_by == MiniAppSortBy.RELEVANCE and search_term is not None
+    if sort_by == MiniAppSortBy.RELEVANCE and not sort_by_relevance:
+        sort_by = MiniAppSortBy.DAILY_USERS
+
+    def build_query() -> Any:
+        if sort_by_relevance:
+            query = client.rpc(
+                "search_mini_apps_latest",
+                {"search_query": search_term},
+                get=True,
+            ).select("*")
+        else:
+            query = client.table("vw_mini_apps_latest").select("*")
+        return _apply_mini_app_filters(
+            query,
+            q=None if sort_by_relevance else search_term,
+            category_slug=category_slug,
+            min_daily_users=min_daily_users,
+            min_rating=min_rating,
+            launch_within_days=launch_within_days,
+            min_growth=min_growth,
+        )
+
+    async for rows in iter_keyset_pages(
+        build_query,
+        sort_field=_SORT_FIELD_MAP[sort_by],
+        key_field="mini_app_id",
+        desc=sort_order == SortOrder.DESC,
+        page_size=page_size,
+    ):
+        yield [_normalize_mini_app_row(row) for row in rows]
+
+
+@cached_response("mini_apps.summary")
 async def get_mini_apps_summary(client: Client, *, period: MiniAppsPeriod) -> dict[str, Any]:
     period_days = _PERIOD_DAYS_MAP[period]
 
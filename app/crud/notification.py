@@ -3,6 +3,7 @@ from base64 import urlsafe_b64decode, urlsafe_b64encode
 from datetime import UTC, datetime
 from typing import Any
 
+from postgrest.types import CountMethod, ReturnMethod
 from supabase import Client
 
 from app.schemas.notification import NotificationType
@@ -133,10 +134,31 @@ async def get_user_notifications(
     return {"items": notifications[:limit], "next_cursor": next_cursor}
 
 
+async def get_user_unread_count(client: Client, *, user_id: str) -> int:
+    """Read the trigger-maintained unread counter for a user (primary-key lookup)."""
+    response = (
+        client.table("notification_counters")
+        .select("unread_count")
+        .eq("user_id", user_id)
+        .limit(1)
+        .execute()
+    )
+
+    if not response.data:
+        return 0
+    return max(int(response.data[0].get("unread_count") or 0), 0)
+
+
 async def get_user_notifications_count(
     client: Client, *, user_id: str, is_read: bool | None = None
 ) -> int:
-    """Get the total number of notifications for a user with optional read filtering."""
+    """Get the total number of notifications for a user with optional read filtering.
+
+    Unread counts come from `notification_counters`; other filters still count rows.
+    """
+    if is_read is False:
+        return await get_user_unread_count(client, user_id=user_id)
+
     query = (
         client.table("notifications")
         .select("id", count="exact")
@@ -170,33 +192,161 @@ async def get_user_notification_by_id(
     return None
 
 
-async def mark_all_notifications_as_read(client: Client, user_id: str) -> list[dict]:
-    """Mark all non-deleted notifications for a user as read."""
+async def mark_all_notifications_as_read(client: Client, user_id: str) -> int:
+    """Mark every unread notification for a user as read; returns how many changed.
+
+    Already-read rows are left alone and nothing is echoed back, so the cost
+    tracks the unread backlog rather than the user's whole history.
+    """
     read_at = datetime.now(UTC).isoformat()
     response = (
         client.table("notifications")
-        .update({"is_read": True, "read_at": read_at})
+        .update(
+            {"is_read": True, "read_at": read_at},
+            count=CountMethod.exact,
+            returning=ReturnMethod.minimal,
+        )
         .eq("user_id", user_id)
+        .eq("is_read", False)
         .is_("deleted_at", "null")
         .execute()
     )
 
-    return response.data or []
+    return response.count or 0
 
 
 async def mark_notification_as_read(client: Client, *, notification_id: str, user_id: str) -> dict:
-    """Mark a single notification as read for a user."""
+    """Mark a single notification as read for a user.
+
+    Unread rows are updated in one request; an already-read notification is
+    returned as is.
+
+    Raises:
+        ValueError: If the notification does not exist for the user.
+    """
     read_at = datetime.now(UTC).isoformat()
     response = (
         client.table("notifications")
         .update({"is_read": True, "read_at": read_at})
         .eq("id", notification_id)
         .eq("user_id", user_id)
+        .eq("is_read", False)
         .is_("deleted_at", "null")
         .execute()
     )
 
     if not response.data:
-        raise ValueError("Notification not found")
+        existing = await get_user_notification_by_id(
+            client, notification_id=notification_id, user_id=user_id
+        )
+        if not existing:
+            raise ValueError("Notification not found")
+        return existing
+
+    return response.data[0]
+
+
+def purge_notifications_batch(
+    client: Client,
+    *,
+    created_before: datetime,
+    deleted_before: datetime,
+    batch_size: int,
+    archive: bool = False,
+) -> int:
+    """Remove one bounded batch of expired notifications; returns the batch size removed."""
+    response = client.rpc(
+        "purge_notifications",
+        {
+            "p_created_before": created_before.isoformat(),
+            "p_deleted_before": deleted_before.isoformat(),
+            "p_batch_size": batch_size,
+            "p_archive": archive,
+        },
+    ).execute()
+    return int(response.data or 0)
+
+
+async def create_notification_fanout_job(
+    client: Client,
+    *,
+    created_by: str,
+    target_type: str,
+    user_ids: list[str] | None,
+    account_id: str | None,
+    subject: str,
+    body: str,
+    notification_type: NotificationType | str,
+    details: str | None = None,
+    cta: str | None = None,
+) -> dict:
+    """Queue a fan-out job; `run_notification_fanout_batch` delivers it."""
+    job_data = {
+        "target_type": target_type,
+        "target_user_ids": list(dict.fromkeys(user_ids)) if user_ids else None,
+        "target_account_id": account_id,
+        "subject": subject,
+        "body": body,
+        "type": (
+            notification_type.value
+            if isinstance(notification_type, NotificationType)
+            else notification_type
+        ),
+        "details": details,
+        "cta": cta,
+        "created_by": created_by,
+    }
+
+    response = client.table("notification_fanout_jobs").insert(job_data).execute()
+
+    if not response.data:
+        raise ValueError("Failed to create notification fan-out job")
+
+    return response.data[0]
+
+
+async def get_notification_fanout_job(client: Client, *, job_id: str) -> dict | None:
+    response = (
+        client.table("notification_fanout_jobs")
+        .select("*")
+        .eq("id", job_id)
+        .limit(1)
+        .execute()
+    )
+
+    if response.data:
+        return response.data[0]
+    return None
+
+
+def list_pending_notification_fanout_jobs(client: Client) -> list[dict]:
+    response = (
+        client.table("notification_fanout_jobs")
+        .select("id")
+        .in_("status", ["queued", "processing"])
+        .order("created_at")
+        .execute()
+    )
+    return response.data or []
+
+
+def run_notification_fanout_batch(client: Client, *, job_id: str, batch_size: int) -> dict:
+    """Insert the next `batch_size` notifications of a job in one statement.
+
+    Returns `{inserted, delivered_count, total_recipients, done}`.
+    """
+    response = client.rpc(
+        "run_notification_fanout_batch",
+        {"p_job_id": job_id, "p_batch_size": batch_size},
+    ).execute()
+
+    if not response.data:
+        raise ValueError("Notification fan-out batch returned no result")
 
     return response.data[0]
+
+
+def mark_notification_fanout_failed(client: Client, *, job_id: str, error_message: str) -> None:
+    client.table("notification_fanout_jobs").update(
+        {"status": "failed", "error_message": error_message}
+    ).eq("id", job_id).execute()
@@ -4,6 +4,9 @@ from typing import Any
 
 from supabase import Client
 
+from app.core.response_cache import cached_response
+from app.crud.channel_cache import get_channel_cards
+
 
 def _normalize_username(username: Any) -> str | None:
     if username is None:
@@ -33,17 +36,7 @@ def _to_float(value: Any) -> float | None:
 
 
 def _get_channels_map(client: Client, channel_ids: list[str]) -> dict[str, dict[str, Any]]:
-    if not channel_ids:
-        return {}
-
-    response = (
-        client.table("channels")
-        .select("id, name, username")
-        .in_("id", channel_ids)
-        .execute()
-    )
-    rows = response.data or []
-    return {str(row["id"]): row for row in rows if row.get("id") is not None}
+    return get_channel_cards(client, channel_ids)
 
 
 def _get_country_name(client: Client, country_code: str) -> str | None:
@@ -58,6 +51,7 @@ def _get_country_name(client: Client, country_code: str) -> str | None:
     return rows[0].get("name") if rows else None
 
 
+@cached_response("rankings.countries")
 async def get_country_rankings(
     client: Client,
     *,
@@ -150,6 +144,7 @@ async def get_country_rankings(
     }
 
 
+@cached_response("rankings.categories")
 async def get_category_rankings(
     client: Client,
     *,
@@ -263,6 +258,7 @@ async def get_category_rankings(
     }
 
 
+@cached_response("rankings.collections")
 async def get_ranking_collections(
     client: Client,
     *,
@@ -0,0 +1,313 @@
+import re
+import unicodedata
+from typing import Any
+
+from supabase import Client
+
+# Must match the length check in the search_* SQL functions in db/init_db.sql.
+FULL_TEXT_MIN_LENGTH = 3
+
+_SEARCH_TERM_SANITIZE_RE = re.compile(r"[(),*%]")
+_WHITESPACE_RE = re.compile(r"\s+")
+# Same word split as `[^[:alnum:]]+` in search_prefix_tsquery (db/init_db.sql).
+_TSQUERY_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_search_term(q: str | None) -> str | None:
+    """Sanitize a user supplied search query for PostgREST filters.
+
+    Returns None when nothing searchable is left after sanitizing.
+    """
+    if not q:
+        return None
+
+    normalized = _SEARCH_TERM_SANITIZE_RE.sub(" ", q)
+    normalized = _WHITESPACE_RE.sub(" ", normalized).strip().lstrip("@").strip()
+    return normalized or None
+
+
+def is_prefix_search(term: str) -> bool:
+    """Short terms (and terms without words) are matched as name prefixes via the trigram indexes."""
+    return len(term) < FULL_TEXT_MIN_LENGTH or prefix_tsquery(term) is None
+
+
+def _strip_accents(value: str) -> str:
+    """Mirror Postgres `unaccent` so queries match the indexed search_tsv."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def prefix_tsquery(term: str) -> str | None:
+    """Return a `to_tsquery` string matching every word of `term` as a lexeme prefix.
+
+    "cryp tele" becomes "cryp:* & tele:*", so partial words match the way the
+    old `ilike` filters did. Must match search_prefix_tsquery in db/init_db.sql.
+    """
+    words = _TSQUERY_WORD_RE.findall(_strip_accents(term).lower())
+    return " & ".join(f"{word}:*" for word in words) or None
+
+
+def apply_search_filter(
+    query: Any,
+    term: str,
+    *,
+    prefix_columns: tuple[str, ...],
+    tsv_column: str = "search_tsv",
+) -> Any:
+    """Apply an index-backed search filter to a Supabase query object.
+
+    Terms of FULL_TEXT_MIN_LENGTH characters or more are matched word by word as
+    lexeme prefixes against the GIN-indexed tsvector column. Shorter terms fall back to a
+    `lower(name) LIKE 'term%'` prefix match served by the trigram indexes, which
+    is why `prefix_columns` must name the lower-cased view columns.
+    """
+    if is_prefix_search(term):
+        prefix = term.lower()
+        return query.or_(",".join(f"{column}.like.{prefix}*" for column in prefix_columns))
+
+    return apply_full_text_filter(query, term, tsv_column=tsv_column)
+
+
+def apply_full_text_filter(query: Any, term: str, *, tsv_column: str = "search_tsv") -> Any:
+    """Match `term` with a prefix `to_tsquery` against a GIN-indexed tsvector column."""
+    return query.text_search(
+        tsv_column,
+        prefix_tsquery(term) or "",
+        options={"config": "simple"},
+    )
+
+
+_SUGGEST_FETCH_CHUNK_SIZE = 1000
+
+
+def _latest_date(client: Client, table: str, column: str) -> str | None:
+    response = client.table(table).select(column).order(column, desc=True).limit(1).execute()
+    rows = response.data or []
+    return str(rows[0][column]) if rows else None
+
+
+def get_suggest_snapshot_key(client: Client) -> tuple[str | None, ...]:
+    """Return the latest snapshot dates the suggest index is derived from."""
+    return (
+        _latest_date(client, "channel_rankings_daily", "snapshot_date"),
+        _latest_date(client, "advertiser_metrics_daily", "metric_date"),
+        _latest_date(client, "mini_app_metrics_daily", "metric_date"),
+    )
+
+
+def _fetch_ranked_rows(
+    client: Client,
+    *,
+    table: str,
+    columns: str,
+    score_column: str,
+    max_rows: int | None = None,
+) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    offset = 0
+    while max_rows is None or offset < max_rows:
+        end = offset + _SUGGEST_FETCH_CHUNK_SIZE - 1
+        if max_rows is not None:
+            end = min(end, max_rows - 1)
+
+        response = (
+            client.table(table)
+            .select(columns)
+            .order(score_column, desc=True, nullsfirst=False)
+            .order("id", desc=False)
+            .range(offset, end)
+            .execute()
+        )
+        chunk = response.data or []
+        rows.extend(chunk)
+        if len(chunk) < end - offset + 1:
+            break
+        offset = end + 1
+
+    return rows
+
+
+def load_suggest_sources(client: Client, *, max_channels: int) -> dict[str, list[dict[str, Any]]]:
+    """Load the name/handle/popularity rows the suggest index is built from.
+
+    Channels are capped to the `max_channels` most subscribed ones so the index
+    stays bounded in memory.
+    """
+    return {
+        "channels": _fetch_ranked_rows(
+            client,
+            table="channels",
+            columns="id, name, username, subscribers_current",
+            score_column="subscribers_current",
+            max_rows=max_channels,
+        ),
+        "advertisers": _fetch_ranked_rows(
+            client,
+            table="advertisers",
+            columns="id, name, slug, estimated_spend_current",
+            score_column="estimated_spend_current",
+        ),
+        "mini_apps": _fetch_ranked_rows(
+            client,
+            table="mini_apps",
+            columns="id, name, slug, daily_users_current",
+            score_column="daily_users_current",
+        ),
+    }
+
+
+def _to_float(value: Any) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value: Any) -> int | None:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _normalize_username(username: Any) -> str | None:
+    if username is None:
+        return None
+    username_str = str(username)
+    if username_str.startswith("@"):
+        return username_str
+    return f"@{username_str}"
+
+
+def _snippet(value: Any, *, max_length: int = 200) -> str | None:
+    if not value:
+        return None
+    text = _WHITESPACE_RE.sub(" ", str(value)).strip()
+    if len(text) <= max_length:
+        return text
+    return text[: max_length - 1].rstrip() + "…"
+
+
+def search_channels(client: Client, term: str, *, limit: int) -> list[dict[str, Any]]:
+    response = (
+        client.rpc("search_catalog_channels", {"search_query": term}, get=True)
+        .select("channel_id, name, username, subscribers, search_rank")
+        .order("search_rank", desc=True)
+        .order("subscribers", desc=True, nullsfirst=False)
+        .limit(limit)
+        .execute()
+    )
+    return [
+        {
+            "channel_id": row["channel_id"],
+            "name": row["name"],
+            "username": _normalize_username(row.get("username")),
+            "subscribers": _to_int(row.get("subscribers")),
+            "search_rank": _to_float(row.get("search_rank")) or 0.0,
+        }
+        for row in (response.data or [])
+    ]
+
+
+def search_advertisers(client: Client, term: str, *, limit: int) -> list[dict[str, Any]]:
+    rank_response = (
+        client.rpc("search_advertisers", {"search_query": term}, get=True)
+        .select("advertiser_id, search_rank")
+        .order("search_rank", desc=True)
+        .limit(limit)
+        .execute()
+    )
+    rank_rows = rank_response.data or []
+    if not rank_rows:
+        return []
+
+    ranks = {str(row["advertiser_id"]): _to_float(row.get("search_rank")) or 0.0 for row in rank_rows}
+    advertisers_response = (
+        client.table("advertisers")
+        .select("id, name, slug, logo_url")
+        .in_("id", list(ranks))
+        .execute()
+    )
+    advertisers_map = {str(row["id"]): row for row in (advertisers_response.data or [])}
+
+    items: list[dict[str, Any]] = []
+    for advertiser_id, search_rank in ranks.items():
+        advertiser = advertisers_map.get(advertiser_id)
+        if advertiser is None:
+            continue
+        items.append(
+            {
+                "advertiser_id": advertiser_id,
+                "name": advertiser["name"],
+                "slug": advertiser["slug"],
+                "logo_url": advertiser.get("logo_url"),
+                "search_rank": search_rank,
+            }
+        )
+    return items
+
+
+def search_mini_apps(client: Client, term: str, *, limit: int) -> list[dict[str, Any]]:
+    response = (
+        client.rpc("search_mini_apps_latest", {"search_query": term}, get=True)
+        .select("mini_app_id, name, slug, daily_users, search_rank")
+        .order("search_rank", desc=True)
+        .order("daily_users", desc=True, nullsfirst=False)
+        .limit(limit)
+        .execute()
+    )
+    return [
+        {
+            "mini_app_id": row["mini_app_id"],
+            "name": row["name"],
+            "slug": row["slug"],
+            "daily_users": _to_int(row.get("daily_users")),
+            "search_rank": _to_float(row.get("search_rank")) or 0.0,
+        }
+        for row in (response.data or [])
+    ]
+
+
+def search_ads(client: Client, term: str, *, limit: int) -> list[dict[str, Any]]:
+    """Most recent ad creatives matching `term` (full-text terms only)."""
+    query = client.table("vw_ads_listing").select(
+        "ad_id, advertiser_id, advertiser_name, channel_id, channel_name, preview_text, posted_at"
+    )
+    query = apply_full_text_filter(query, term)
+    response = query.order("posted_at", desc=True, nullsfirst=False).limit(limit).execute()
+    return [
+        {
+            "ad_id": row["ad_id"],
+            "advertiser_id": row["advertiser_id"],
+            "advertiser_name": row.get("advertiser_name"),
+            "channel_id": row.get("channel_id"),
+            "channel_name": row.get("channel_name"),
+            "preview_text": _snippet(row.get("preview_text")),
+            "posted_at": str(row["posted_at"]) if row.get("posted_at") else None,
+        }
+        for row in (response.data or [])
+    ]
+
+
+def search_posts(client: Client, term: str, *, limit: int) -> list[dict[str, Any]]:
+    """Most recent posts matching `term` via posts_search_tsv_gin_idx (full-text terms only)."""
+    query = client.table("posts").select(
+        "id, channel_id, title, content_text, published_at, external_post_url"
+    )
+    query = apply_full_text_filter(query.eq("is_deleted", False), term)
+    response = query.order("published_at", desc=True).limit(limit).execute()
+    return [
+        {
+            "post_id": row["id"],
+            "channel_id": row["channel_id"],
+            "title": row.get("title"),
+            "content_snippet": _snippet(row.get("content_text")),
+            "published_at": str(row["published_at"]),
+            "external_post_url": row.get("external_post_url"),
+        }
+        for row in (response.data or [])
+    ]
@@ -1,15 +1,32 @@
+import asyncio
 import json
 from base64 import urlsafe_b64decode, urlsafe_b64encode
-from datetime import UTC, datetime
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from postgrest.exceptions import APIError
 from supabase import Client
 
-from app.schemas.tracker import TrackerStatus, TrackerType
+from app.core.response_cache import cached_response
+from app.crud.channel_cache import get_channel_cards
+from app.crud.keyset import iter_keyset_pages
+from app.schemas.tracker import TrackerStatsBucket, TrackerStatus, TrackerType
 
 _WRITE_ROLES = {"owner", "admin", "editor"}
 
+_STATS_BUCKET_SIZES = {
+    TrackerStatsBucket.HOUR: timedelta(hours=1),
+    TrackerStatsBucket.DAY: timedelta(days=1),
+    TrackerStatsBucket.WEEK: timedelta(weeks=1),
+}
+_STATS_DEFAULT_BUCKETS = {
+    TrackerStatsBucket.HOUR: 48,
+    TrackerStatsBucket.DAY: 30,
+    TrackerStatsBucket.WEEK: 26,
+}
+MAX_STATS_BUCKETS = 1000
+
 
 def _encode_mentions_cursor(mention_seq: int) -> str:
     payload = {"mention_seq": mention_seq}
@@ -255,6 +272,173 @@ async def delete_tracker(
     return bool(response.data)
 
 
+def _batch_update_payload(operation: dict[str, Any], user_id: str, now: str) -> dict[str, Any]:
+    payload: dict[str, Any] = {"updated_by": user_id}
+    status = operation.get("status")
+    if status is not None:
+        payload["status"] = status.value
+        # Set paused_at outright rather than reading each row's previous status.
+        payload["paused_at"] = now if status == TrackerStatus.PAUSED else None
+    for field in ("notify_push", "notify_telegram", "notify_email"):
+        if operation.get(field) is not None:
+            payload[field] = operation[field]
+    return payload
+
+
+async def apply_tracker_batch(
+    client: Client,
+    *,
+    account_id: str,
+    user_id: str,
+    operations: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """Run create/update/delete operations with one write per kind of change.
+
+    Creates go out as a single multi-row upsert that skips rows colliding with
+    `UNIQUE (account_id, tracker_type, normalized_value)`, updates sharing the
+    same payload become one `id IN (...)` update, and deletes one soft-delete.
+    Returns one `{index, op, status, tracker, error}` result per operation.
+    """
+    results: list[dict[str, Any] | None] = [None] * len(operations)
+    now = datetime.now(UTC).isoformat()
+
+    def _result(
+        index: int,
+        status: str,
+        tracker: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        results[index] = {
+            "index": index,
+            "op": operations[index]["op"],
+            "status": status,
+            "tracker": _normalize_tracker_row(tracker) if tracker is not None else None,
+            "error": error,
+        }
+
+    targeted: dict[str, list[int]] = {}
+    for index, operation in enumerate(operations):
+        if operation["op"] != "create":
+            targeted.setdefault(str(operation["tracker_id"]), []).append(index)
+    conflicting = {index for indexes in targeted.values() if len(indexes) > 1 for index in indexes}
+    for index in conflicting:
+        _result(index, "conflict", error="tracker_id appears in more than one operation")
+
+    creates: dict[tuple[str, str], list[int]] = {}
+    updates: dict[str, tuple[dict[str, Any], list[str]]] = {}
+    deletes: list[str] = []
+    for index, operation in enumerate(operations):
+        if index in conflicting:
+            continue
+        if operation["op"] == "create":
+            key = (operation["tracker_type"].value, operation["tracker_value"].strip().lower())
+            creates.setdefault(key, []).append(index)
+        elif operation["op"] == "update":
+            payload = _batch_update_payload(operation, user_id, now)
+            group_key = json.dumps(payload, sort_keys=True)
+            updates.setdefault(group_key, (payload, []))[1].append(str(operation["tracker_id"]))
+        else:
+            deletes.append(str(operation["tracker_id"]))
+
+    if creates:
+        rows = []
+        for (tracker_type, normalized_value), indexes in creates.items():
+            operation = operations[indexes[0]]
+            rows.append(
+                {
+                    "account_id": account_id,
+                    "tracker_type": tracker_type,
+                    "tracker_value": operation["tracker_value"].strip(),
+                    "normalized_value": normalized_value,
+                    "notify_push": operation["notify_push"],
+                    "notify_telegram": operation["notify_telegram"],
+                    "notify_email": operation["notify_email"],
+                    "created_by": user_id,
+                    "updated_by": user_id,
+                }
+            )
+        response = (
+            client.table("trackers")
+            .upsert(
+                rows,
+                on_conflict="account_id,tracker_type,normalized_value",
+                ignore_duplicates=True,
+            )
+            .execute()
+        )
+        created = {
+            (str(row["tracker_type"]), str(row["normalized_value"]).lower()): row
+            for row in response.data or []
+        }
+        for key, indexes in creates.items():
+            row = created.get(key)
+            for position, index in enumerate(indexes):
+                if row is not None and position == 0:
+                    _result(index, "created", row)
+                else:
+                    _result(index, "duplicate", error="Tracker already exists for this account.")
+
+    by_id: dict[str, dict[str, Any]] = {}
+    for payload, tracker_ids in updates.values():
+        response = (
+            client.table("trackers")
+            .update(payload)
+            .in_("id", tracker_ids)
+            .eq("account_id", account_id)
+            .is_("deleted_at", "null")
+            .execute()
+        )
+        by_id.update({str(row["id"]): row for row in response.data or []})
+
+    if deletes:
+        response = (
+            client.table("trackers")
+            .update({"deleted_at": now, "deleted_by": user_id, "updated_by": user_id})
+            .in_("id", deletes)
+            .eq("account_id", account_id)
+            .is_("deleted_at", "null")
+            .execute()
+        )
+        by_id.update({str(row["id"]): row for row in response.data or []})
+
+    for index, operation in enumerate(operations):
+        if results[index] is not None:
+            continue
+        row = by_id.get(str(operation["tracker_id"]))
+        if row is None:
+            _result(index, "not_found", error="Tracker not found.")
+            continue
+        if operation["op"] == "delete":
+            _result(index, "deleted")
+        else:
+            _result(index, "updated", row)
+
+    return [result for result in results if result is not None]
+
+
+def _build_mention_items(client: Client, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    channel_cards = get_channel_cards(client, [row.get("channel_id") for row in rows])
+    channel_name_map = {channel_id: str(card.get("name")) for channel_id, card in channel_cards.items()}
+
+    items: list[dict[str, Any]] = []
+    for row in rows:
+        channel_id = row.get("channel_id")
+        items.append(
+            {
+                "mention_id": row["id"],
+                "tracker_id": row["tracker_id"],
+                "mention_seq": int(row["mention_seq"]),
+                "channel_id": channel_id,
+                "channel_name": channel_name_map.get(str(channel_id)) if channel_id else None,
+                "post_id": row.get("post_id"),
+                "mention_text": row["mention_text"],
+                "context_snippet": row.get("context_snippet"),
+                "mentioned_at": row["mentioned_at"],
+            }
+        )
+    return items
+
+
 async def list_tracker_mentions(
     client: Client,
     *,
@@ -285,46 +469,304 @@ async def list_tracker_mentions(
     has_more = len(rows) > limit
     page_rows = rows[:limit]
 
-    channel_ids = list({row.get("channel_id") for row in page_rows if row.get("channel_id")})
-    channel_name_map: dict[str, str] = {}
-    if channel_ids:
-        channel_rows = (
-            client.table("channels")
-            .select("id,name")
-            .in_("id", channel_ids)
+    items = _build_mention_items(client, page_rows)
+
+    next_cursor = None
+    if has_more and page_rows:
+        next_cursor = _encode_mentions_cursor(int(page_rows[-1]["mention_seq"]))
+
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
+
+
+async def iter_tracker_mentions(
+    client: Client,
+    *,
+    account_id: str,
+    tracker_id: str | None,
+    since: datetime | None,
+    until: datetime | None,
+    page_size: int,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Mentions in `list_tracker_mentions` order, `page_size` at a time, for streaming."""
+
+    def build_query() -> Any:
+        query = client.table("tracker_mentions").select("*").eq("account_id", account_id)
+        if tracker_id is not None:
+            query = query.eq("tracker_id", tracker_id)
+        if since is not None:
+            query = query.gte("mentioned_at", since.isoformat())
+        if until is not None:
+            query = query.lte("mentioned_at", until.isoformat())
+        return query
+
+    async for rows in iter_keyset_pages(
+        build_query,
+        sort_field="mention_seq",
+        key_field="mention_seq",
+        desc=True,
+        page_size=page_size,
+    ):
+        yield await asyncio.to_thread(_build_mention_items, client, rows)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """`value` in UTC; naive values are taken to be UTC already."""
+    return value.astimezone(UTC) if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def truncate_to_bucket(value: datetime, bucket: TrackerStatsBucket) -> datetime:
+    """Python twin of `date_trunc(bucket, value, 'UTC')`; weeks start on Monday."""
+    value = _as_utc(value)
+    truncated = value.replace(minute=0, second=0, microsecond=0)
+    if bucket == TrackerStatsBucket.HOUR:
+        return truncated
+    truncated = truncated.replace(hour=0)
+    if bucket == TrackerStatsBucket.WEEK:
+        truncated -= timedelta(days=truncated.weekday())
+    return truncated
+
+
+def resolve_stats_window(
+    bucket: TrackerStatsBucket,
+    *,
+    since: datetime | None,
+    until: datetime | None,
+    now: datetime | None = None,
+) -> tuple[datetime, datetime]:
+    """Align `[since, until)` to bucket boundaries, filling in defaults.
+
+    A missing `until` becomes the end of the current bucket, so repeated
+    requests within one bucket share a cache key.
+    """
+    step = _STATS_BUCKET_SIZES[bucket]
+    if until is None:
+        until = truncate_to_bucket(now or datetime.now(UTC), bucket) + step
+    else:
+        aligned = truncate_to_bucket(until, bucket)
+        until = aligned if aligned == _as_utc(until) else aligned + step
+    if since is None:
+        since = until - step * _STATS_DEFAULT_BUCKETS[bucket]
+    else:
+        since = truncate_to_bucket(since, bucket)
+
+    if since >= until:
+        raise ValueError("since must be less than until")
+    if (until - since) / step > MAX_STATS_BUCKETS:
+        raise ValueError(f"Window exceeds {MAX_STATS_BUCKETS} {bucket.value} buckets")
+    return since, until
+
+
+@cached_response("tracker_stats")
+async def get_tracker_stats(
+    client: Client,
+    *,
+    tracker_id: str,
+    bucket: TrackerStatsBucket,
+    since: datetime,
+    until: datetime,
+    top_channels_limit: int,
+) -> dict[str, Any]:
+    """Mention histogram and top channels for one tracker over `[since, until)`.
+
+    Both aggregates are grouped server-side over `tracker_mentions_tracker_time_idx`,
+    so the response size depends on the window, not on the number of mentions.
+    Callers must check the tracker belongs to the account first; the window
+    should come from `resolve_stats_window`.
+    """
+    params = {"p_tracker_id": tracker_id, "p_since": since.isoformat(), "p_until": until.isoformat()}
+    histogram = (
+        client.rpc("tracker_mention_histogram", {**params, "p_bucket": bucket.value}).execute().data
+        or []
+    )
+    top_rows: list[dict[str, Any]] = []
+    if top_channels_limit > 0:
+        top_rows = (
+            client.rpc("tracker_mention_top_channels", {**params, "p_limit": top_channels_limit})
             .execute()
             .data
             or []
         )
-        channel_name_map = {
-            str(channel["id"]): str(channel.get("name"))
-            for channel in channel_rows
-            if channel.get("id") is not None
-        }
 
-    items: list[dict[str, Any]] = []
-    for row in page_rows:
-        channel_id = row.get("channel_id")
-        items.append(
+    counts = {
+        truncate_to_bucket(datetime.fromisoformat(str(row["bucket_start"])), bucket): int(row["mentions"])
+        for row in histogram
+    }
+    step = _STATS_BUCKET_SIZES[bucket]
+    series: list[dict[str, Any]] = []
+    bucket_start = since
+    while bucket_start < until:
+        series.append({"bucket_start": bucket_start, "mentions": counts.get(bucket_start, 0)})
+        bucket_start += step
+
+    channel_cards = get_channel_cards(client, [row["channel_id"] for row in top_rows])
+    top_channels = []
+    for row in top_rows:
+        card = channel_cards.get(str(row["channel_id"]), {})
+        top_channels.append(
             {
-                "mention_id": row["id"],
-                "tracker_id": row["tracker_id"],
-                "mention_seq": int(row["mention_seq"]),
-                "channel_id": channel_id,
-                "channel_name": channel_name_map.get(str(channel_id)) if channel_id else None,
-                "post_id": row.get("post_id"),
-                "mention_text": row["mention_text"],
-                "context_snippet": row.get("context_snippet"),
-                "mentioned_at": row["mentioned_at"],
+                "channel_id": str(row["channel_id"]),
+                "channel_name": card.get("name"),
+                "username": card.get("username"),
+                "avatar_url": card.get("avatar_url"),
+                "mentions": int(row["mentions"]),
             }
         )
 
-    next_cursor = None
-    if has_more and page_rows:
-        next_cursor = _encode_mentions_cursor(int(page_rows[-1]["mention_seq"]))
-
     return {
-        "items": items,
-        "next_cursor": next_cursor,
-        "has_more": has_more,
+        "tracker_id": tracker_id,
+        "bucket": bucket.value,
+        "since": since,
+        "until": until,
+        "total_mentions": sum(counts.values()),
+        "series": series,
+        "top_channels": top_channels,
     }
+
+
+def get_latest_mention_seq(client: Client) -> int:
+    rows = (
+        client.table("tracker_mentions")
+        .select("mention_seq")
+        .order("mention_seq", desc=True)
+        .limit(1)
+        .execute()
+        .data
+        or []
+    )
+    return int(rows[0]["mention_seq"]) if rows else 0
+
+
+def list_mentions_after(
+    client: Client,
+    *,
+    account_ids: list[str],
+    after_seq: int,
+    limit: int,
+) -> list[tuple[str, dict[str, Any]]]:
+    """Mentions with mention_seq > `after_seq` for `account_ids`, oldest first.
+
+    Returns `(account_id, item)` pairs so one query can serve many accounts.
+    """
+    rows = (
+        client.table("tracker_mentions")
+        .select("*")
+        .in_("account_id", account_ids)
+        .gt("mention_seq", after_seq)
+        .order("mention_seq", desc=False)
+        .limit(limit)
+        .execute()
+        .data
+        or []
+    )
+    items = _build_mention_items(client, rows)
+    return [(str(row["account_id"]), item) for row, item in zip(rows, items, strict=True)]
+
+
+_MATCHING_TRACKER_COLUMNS = (
+    "id, account_id, tracker_type, tracker_value, normalized_value, status, deleted_at, updated_at"
+)
+_MATCHING_FETCH_CHUNK_SIZE = 1000
+
+
+def list_trackers_for_matching(client: Client, *, updated_since: str | None) -> list[dict[str, Any]]:
+    """Trackers to (re)load into the mention matcher, oldest change first.
+
+    The first load only needs live trackers; later loads also return paused and
+    deleted ones changed since `updated_since` so they can be dropped.
+    """
+    rows: list[dict[str, Any]] = []
+    offset = 0
+    while True:
+        query = client.table("trackers").select(_MATCHING_TRACKER_COLUMNS)
+        if updated_since is None:
+            query = query.eq("status", TrackerStatus.ACTIVE.value).is_("deleted_at", "null")
+        else:
+            query = query.gte("updated_at", updated_since)
+
+        chunk = (
+            query.order("updated_at", desc=False)
+            .order("id", desc=False)
+            .range(offset, offset + _MATCHING_FETCH_CHUNK_SIZE - 1)
+            .execute()
+            .data
+            or []
+        )
+        rows.extend(chunk)
+        if len(chunk) < _MATCHING_FETCH_CHUNK_SIZE:
+            return rows
+        offset += _MATCHING_FETCH_CHUNK_SIZE
+
+
+def get_match_cursor(client: Client, name: str) -> dict[str, Any] | None:
+    rows = (
+        client.table("tracker_match_cursors")
+        .select("last_created_at, last_post_id")
+        .eq("name", name)
+        .limit(1)
+        .execute()
+        .data
+        or []
+    )
+    return rows[0] if rows else None
+
+
+def save_match_cursor(client: Client, name: str, *, last_created_at: str, last_post_id: str) -> None:
+    client.table("tracker_match_cursors").upsert(
+        {"name": name, "last_created_at": last_created_at, "last_post_id": last_post_id},
+        on_conflict="name",
+    ).execute()
+
+
+def list_posts_for_matching(
+    client: Client,
+    *,
+    after_created_at: str | None,
+    after_post_id: str | None,
+    limit: int,
+) -> list[dict[str, Any]]:
+    """Posts in (created_at, id) order after the given keyset position."""
+    query = client.table("posts").select("id, channel_id, title, content_text, published_at, created_at")
+    if after_created_at is not None and after_post_id is not None:
+        query = query.or_(
+            f'created_at.gt."{after_created_at}",'
+            f'and(created_at.eq."{after_created_at}",id.gt.{after_post_id})'
+        )
+    return (
+        query.eq("is_deleted", False)
+        .order("created_at", desc=False)
+        .order("id", desc=False)
+        .limit(limit)
+        .execute()
+        .data
+        or []
+    )
+
+
+def insert_tracker_mentions(client: Client, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Bulk insert mentions, skipping (tracker_id, post_id) pairs already stored.
+
+    The conflict target carries `mentioned_at` because the unique index of the
+    partitioned table must include the partition key. Returns only the rows
+    that were actually inserted.
+    """
+    if not rows:
+        return []
+
+    response = (
+        client.table("tracker_mentions")
+        .upsert(rows, on_conflict="tracker_id,post_id,mentioned_at", ignore_duplicates=True)
+        .execute()
+    )
+    return response.data or []
+
+
+def apply_tracker_mention_counts(client: Client, counts: list[dict[str, Any]]) -> None:
+    """Increment mentions_count and advance last_activity_at for many trackers at once."""
+    if not counts:
+        return
+
+    client.rpc("apply_tracker_mention_counts", {"counts": counts}).execute()
@@ -1,9 +1,10 @@
 from functools import lru_cache
-from typing import Generator
+from typing import Generator, cast
 
 from supabase import Client, create_client
 
 from app.core.config import get_settings
+from app.db.instrumentation import InstrumentedClient
 
 _supabase_client: Client | None = None
 
@@ -19,6 +20,8 @@ def get_supabase_client() -> Client:
             settings.supabase_url,
             settings.supabase_service_key
         )
+        if settings.query_instrumentation_enabled:
+            _supabase_client = cast(Client, InstrumentedClient(_supabase_client))
     
     return _supabase_client
 
@@ -0,0 +1,148 @@
+"""Supabase client wrapper that reports every PostgREST round trip.
+
+`InstrumentedClient` hands out proxies around the postgrest request builders.
+The proxies note the table, the operation and the filter columns as the query
+is built, and on `execute()` time it and pass a `QueryRecord` to
+`app.core.query_metrics.record_query`. Everything else is delegated untouched.
+"""
+
+import random
+import time
+from typing import Any
+
+from pydantic_core import to_json
+
+from app.core.config import get_settings
+from app.core.query_metrics import QueryRecord, record_query
+
+_OPERATIONS = frozenset({"select", "insert", "update", "upsert", "delete"})
+# Builder methods whose first argument is a column name worth recording.
+_COLUMN_METHODS = frozenset(
+    {
+        "eq",
+        "neq",
+        "gt",
+        "gte",
+        "lt",
+        "lte",
+        "like",
+        "ilike",
+        "is_",
+        "in_",
+        "contains",
+        "contained_by",
+        "filter",
+        "order",
+        "text_search",
+    }
+)
+
+
+def _describe_call(name: str, args: tuple[Any, ...]) -> str:
+    if name in _COLUMN_METHODS and args and isinstance(args[0], str):
+        return f"{name}:{args[0]}"
+    return name
+
+
+def _row_count(data: Any) -> int:
+    if isinstance(data, list):
+        return len(data)
+    return 0 if data is None else 1
+
+
+def _response_bytes(data: Any) -> int:
+    """Estimated JSON size of a result, measured for a sample of the queries.
+
+    postgrest does not keep the raw body, so measuring means re-encoding the
+    decoded payload. Sampled sizes are scaled by the sample rate, which keeps
+    `db_response_bytes_total` an unbiased estimate of the total.
+    """
+    rate = get_settings().query_response_bytes_sample_rate
+    if rate <= 0 or (rate < 1 and random.random() >= rate):  # noqa: S311
+        return 0
+    try:
+        return round(len(to_json(data)) / min(rate, 1.0))
+    except Exception:  # noqa: BLE001 - metrics must never break a query
+        return 0
+
+
+class InstrumentedQuery:
+    __slots__ = ("_builder", "_table", "_operation", "_filters")
+
+    def __init__(self, builder: Any, table: str, operation: str, filters: tuple[str, ...]) -> None:
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+        self._filters = filters
+
+    def _wrap(self, name: str, args: tuple[Any, ...], result: Any) -> Any:
+        if not hasattr(result, "execute"):
+            return result
+        if name in _OPERATIONS:
+            return InstrumentedQuery(result, self._table, name, self._filters)
+        filters = (*self._filters, _describe_call(name, args))
+        return InstrumentedQuery(result, self._table, self._operation, filters)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            # Builder properties such as `not_` return the builder itself.
+            return self._wrap(name, (), attr)
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            return self._wrap(name, args, attr(*args, **kwargs))
+
+        return call
+
+    def execute(self) -> Any:
+        started = time.perf_counter()
+        try:
+            response = self._builder.execute()
+        except Exception:
+            self._record(time.perf_counter() - started, rows=0, response_bytes=0, error=True)
+            raise
+        data = getattr(response, "data", None)
+        self._record(
+            time.perf_counter() - started,
+            rows=_row_count(data),
+            response_bytes=_response_bytes(data),
+        )
+        return response
+
+    def _record(
+        self, seconds: float, *, rows: int, response_bytes: int, error: bool = False
+    ) -> None:
+        record_query(
+            QueryRecord(
+                table=self._table,
+                operation=self._operation,
+                filters=self._filters,
+                rows=rows,
+                response_bytes=response_bytes,
+                seconds=seconds,
+                error=error,
+            )
+        )
+
+
+class InstrumentedClient:
+    """Drop-in for `supabase.Client` whose table and rpc queries are recorded."""
+
+    def __init__(self, client: Any) -> None:
+        self._client = client
+
+    @property
+    def wrapped(self) -> Any:
+        return self._client
+
+    def table(self, table_name: str) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.table(table_name), table_name, "select", ())
+
+    def from_(self, table_name: str) -> InstrumentedQuery:
+        return self.table(table_name)
+
+    def rpc(self, fn: str, *args: Any, **kwargs: Any) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.rpc(fn, *args, **kwargs), fn, "rpc", ())
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
@@ -1,29 +1,52 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api.routes import (
-    account_channels,
-    advertisers,
-    api_keys,
-    auth,
-    billing,
-    channels,
-    home,
-    mini_apps,
-    notifications,
-    protected,
-    public,
-    rankings,
-    signin,
-    team_members,
-    trackers,
-    users,
-)
 from app.core.config import get_settings
+from app.core.http_cache import HTTPCacheMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.query_metrics import QueryMetricsMiddleware
+from app.core.startup import LazyRouterMiddleware, RouterLoader, Warmup, lifespan
 
 settings = get_settings()
 
-app = FastAPI(title=settings.app_name)
+# Imported and included once the app is serving, see app/core/startup.py
+ROUTER_MODULES = tuple(
+    f"app.api.routes.{name}"
+    for name in (
+        "public",
+        "auth",
+        "protected",
+        "signin",
+        "users",
+        "team_members",
+        "notifications",
+        "channels",
+        "home",
+        "advertisers",
+        "mini_apps",
+        "rankings",
+        "trackers",
+        "account_channels",
+        "api_keys",
+        "billing",
+        "exports",
+        "search",
+        "metrics",
+        "admin",
+    )
+)
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+app.state.router_loader = RouterLoader(app, ROUTER_MODULES)
+# Replaced by the lifespan handler, which runs the warmup
+app.state.warmup = Warmup()
+
+# Innermost, so sampled stacks start at routing
+app.add_middleware(ProfilingMiddleware)
+
+# Registered before CORS so 304 responses still pass through CORSMiddleware
+app.add_middleware(HTTPCacheMiddleware)
 
 # Add CORS middleware
 app.add_middleware(
@@ -34,29 +57,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Requests other than the probes wait here until the routers are mounted
+app.add_middleware(
+    LazyRouterMiddleware,
+    loader=app.state.router_loader,
+    ready_paths={"/ping", "/livez", "/readyz"},
+)
+
+# Outermost, so Server-Timing is also set on 304s and CORS preflights
+app.add_middleware(QueryMetricsMiddleware)
+
 
 @app.api_route("/ping", methods=["GET", "HEAD", "OPTIONS"], tags=["public"])
 async def ping() -> dict[str, str]:
     return {"status": "ok"}
 
 
-# Include routers
-app.include_router(public.router)
-app.include_router(auth.router)
-app.include_router(protected.router)
-app.include_router(signin.router)
-app.include_router(users.router)
-app.include_router(team_members.router)
-app.include_router(notifications.router)
-app.include_router(channels.router)
-app.include_router(home.router)
-app.include_router(advertisers.router)
-app.include_router(mini_apps.router)
-app.include_router(rankings.router)
-app.include_router(trackers.router)
-app.include_router(account_channels.router)
-app.include_router(api_keys.router)
-app.include_router(billing.router)
+@app.get("/livez", tags=["public"])
+async def livez() -> dict[str, str]:
+    """Liveness: the process is serving requests."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz", tags=["public"])
+async def readyz() -> JSONResponse:
+    """Readiness: 200 once the startup warmup has finished, 503 until then."""
+    warmup: Warmup = app.state.warmup
+    return JSONResponse(
+        {"status": "ready" if warmup.ready else "warming", "steps": warmup.steps},
+        status_code=status.HTTP_200_OK if warmup.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
 
 
 @app.get("/", tags=["public"])
@@ -9,6 +9,7 @@ class AdvertiserSortBy(str, Enum):
     CHANNELS_USED = "channels_used"
     AVG_ENGAGEMENT_RATE = "avg_engagement_rate"
     TREND = "trend"
+    RELEVANCE = "relevance"
 
 
 class SortOrder(str, Enum):
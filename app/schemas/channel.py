@@ -25,6 +25,7 @@ class ChannelSortBy(str, Enum):
     GROWTH_30D = "growth_30d"
     ENGAGEMENT_RATE = "engagement_rate"
     UPDATED_AT = "updated_at"
+    RELEVANCE = "relevance"
 
 
 class SortOrder(str, Enum):
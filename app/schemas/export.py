@@ -0,0 +1,70 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class ExportType(str, Enum):
+    CHANNELS = "channels_csv"
+    ADS = "ads_csv"
+    ADVERTISERS = "advertisers_csv"
+    INVOICES = "invoices_csv"
+    POSTS = "posts_csv"
+    MINI_APPS = "mini_apps_csv"
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+
+class ExportStatus(str, Enum):
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    EXPIRED = "expired"
+    CANCELLED = "cancelled"
+
+
+class PageResponse(BaseModel):
+    next_cursor: str | None
+    has_more: bool
+
+
+class ExportCreateRequest(BaseModel):
+    export_type: ExportType
+    format: ExportFormat = ExportFormat.CSV
+    # Equality filters by column name, plus `<column>_min` / `<column>_max`
+    # for range columns; the accepted names depend on `export_type`.
+    filters: dict[str, Any] = Field(default_factory=dict)
+
+
+class ExportJob(BaseModel):
+    export_id: str
+    account_id: str
+    export_type: ExportType
+    format: ExportFormat
+    status: ExportStatus
+    filters: dict[str, Any]
+    rows_exported: int
+    file_url: str | None = None
+    file_size_bytes: int | None = None
+    error_message: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
+    expires_at: datetime | None = None
+
+
+class ExportJobEnvelope(BaseModel):
+    data: ExportJob
+    meta: dict[str, object] = Field(default_factory=dict)
+
+
+class ExportJobListEnvelope(BaseModel):
+    data: list[ExportJob]
+    page: PageResponse
+    meta: dict[str, object] = Field(default_factory=dict)
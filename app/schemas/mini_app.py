@@ -13,6 +13,7 @@ class MiniAppSortBy(str, Enum):
     GROWTH = "growth"
     RATING = "rating"
     LAUNCHED_AT = "launched_at"
+    RELEVANCE = "relevance"
 
 
 class SortOrder(str, Enum):
@@ -1,7 +1,8 @@
 from datetime import datetime
 from enum import Enum
+from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
 
 class NotificationType(str, Enum):
@@ -33,9 +34,56 @@ class NotificationListResponse(BaseModel):
 
     items: list[NotificationResponse]
     next_cursor: str | None
+    unread_count: int | None = None
 
 
 class NotificationCountResponse(BaseModel):
     """Response schema for notification count results."""
 
     count: int
+
+
+class NotificationMarkAllReadResponse(BaseModel):
+    """Response schema for marking every notification as read."""
+
+    updated: int
+
+
+class NotificationFanoutTarget(BaseModel):
+    """Audience of a fan-out: explicit users, an account's members, or everyone."""
+
+    type: Literal["users", "account", "all"]
+    user_ids: list[str] | None = Field(None, min_length=1, max_length=10_000)
+    account_id: str | None = None
+
+    @model_validator(mode="after")
+    def validate_target(self) -> "NotificationFanoutTarget":
+        if self.type == "users" and not self.user_ids:
+            raise ValueError("user_ids is required for a users target")
+        if self.type == "account" and not self.account_id:
+            raise ValueError("account_id is required for an account target")
+        return self
+
+
+class NotificationFanoutRequest(BaseModel):
+    """Request schema for notifying many users at once."""
+
+    target: NotificationFanoutTarget
+    subject: str = Field(..., min_length=1)
+    body: str = Field(..., min_length=1)
+    type: NotificationType = NotificationType.UPDATES
+    details: str | None = None
+    cta: str | None = None
+
+
+class NotificationFanoutJobResponse(BaseModel):
+    """Progress of a notification fan-out job."""
+
+    id: str
+    target_type: str
+    status: str
+    total_recipients: int | None = None
+    delivered_count: int
+    error_message: str | None = None
+    created_at: datetime
+    completed_at: datetime | None = None
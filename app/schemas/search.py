@@ -0,0 +1,113 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class SuggestEntityType(str, Enum):
+    CHANNELS = "channels"
+    ADVERTISERS = "advertisers"
+    MINI_APPS = "mini_apps"
+
+
+class SuggestItem(BaseModel):
+    id: str
+    name: str
+    handle: str | None = None
+    popularity: float
+
+
+class SuggestResults(BaseModel):
+    channels: list[SuggestItem] = []
+    advertisers: list[SuggestItem] = []
+    mini_apps: list[SuggestItem] = []
+
+
+class SuggestMeta(BaseModel):
+    snapshot_date: str | None = None
+
+
+class SuggestEnvelope(BaseModel):
+    data: SuggestResults
+    meta: SuggestMeta
+
+
+class SearchSource(str, Enum):
+    CHANNELS = "channels"
+    ADVERTISERS = "advertisers"
+    MINI_APPS = "mini_apps"
+    ADS = "ads"
+    POSTS = "posts"
+
+
+class SearchSourceStatus(str, Enum):
+    OK = "ok"
+    TIMEOUT = "timeout"
+    ERROR = "error"
+    SKIPPED = "skipped"
+
+
+class SearchChannelHit(BaseModel):
+    channel_id: str
+    name: str
+    username: str | None = None
+    subscribers: int | None = None
+    search_rank: float
+
+
+class SearchAdvertiserHit(BaseModel):
+    advertiser_id: str
+    name: str
+    slug: str
+    logo_url: str | None = None
+    search_rank: float
+
+
+class SearchMiniAppHit(BaseModel):
+    mini_app_id: str
+    name: str
+    slug: str
+    daily_users: int | None = None
+    search_rank: float
+
+
+class SearchAdHit(BaseModel):
+    ad_id: str
+    advertiser_id: str
+    advertiser_name: str | None = None
+    channel_id: str | None = None
+    channel_name: str | None = None
+    preview_text: str | None = None
+    posted_at: str | None = None
+
+
+class SearchPostHit(BaseModel):
+    post_id: str
+    channel_id: str
+    title: str | None = None
+    content_snippet: str | None = None
+    published_at: str
+    external_post_url: str | None = None
+
+
+class SearchResults(BaseModel):
+    channels: list[SearchChannelHit] = []
+    advertisers: list[SearchAdvertiserHit] = []
+    mini_apps: list[SearchMiniAppHit] = []
+    ads: list[SearchAdHit] = []
+    posts: list[SearchPostHit] = []
+
+
+class SearchSourceMeta(BaseModel):
+    status: SearchSourceStatus
+    took_ms: int
+
+
+class SearchMeta(BaseModel):
+    q: str
+    partial: bool
+    sources: dict[SearchSource, SearchSourceMeta]
+
+
+class SearchEnvelope(BaseModel):
+    data: SearchResults
+    meta: SearchMeta
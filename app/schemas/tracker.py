@@ -1,8 +1,11 @@
 from datetime import datetime
 from enum import Enum
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
+MAX_TRACKER_BATCH_OPERATIONS = 500
+
 
 class TrackerType(str, Enum):
     KEYWORD = "keyword"
@@ -79,6 +82,35 @@ class TrackerMention(BaseModel):
     mentioned_at: datetime
 
 
+class TrackerStatsBucket(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+
+
+class TrackerStatsPoint(BaseModel):
+    bucket_start: datetime
+    mentions: int
+
+
+class TrackerStatsChannel(BaseModel):
+    channel_id: str
+    channel_name: str | None = None
+    username: str | None = None
+    avatar_url: str | None = None
+    mentions: int
+
+
+class TrackerStats(BaseModel):
+    tracker_id: str
+    bucket: TrackerStatsBucket
+    since: datetime
+    until: datetime
+    total_mentions: int
+    series: list[TrackerStatsPoint]
+    top_channels: list[TrackerStatsChannel]
+
+
 class TrackerEnvelope(BaseModel):
     data: Tracker
     meta: dict[str, object] = Field(default_factory=dict)
@@ -89,7 +121,62 @@ class TrackerListEnvelope(BaseModel):
     meta: dict[str, object] = Field(default_factory=dict)
 
 
+class TrackerStatsEnvelope(BaseModel):
+    data: TrackerStats
+    meta: dict[str, object] = Field(default_factory=dict)
+
+
 class TrackerMentionListEnvelope(BaseModel):
     data: list[TrackerMention]
     page: PageResponse
     meta: dict[str, object] = Field(default_factory=dict)
+
+
+class TrackerBatchCreateOperation(TrackerCreateRequest):
+    op: Literal["create"]
+
+
+class TrackerBatchUpdateOperation(TrackerUpdateRequest):
+    op: Literal["update"]
+    tracker_id: str
+
+
+class TrackerBatchDeleteOperation(BaseModel):
+    op: Literal["delete"]
+    tracker_id: str
+
+
+TrackerBatchOperation = Annotated[
+    TrackerBatchCreateOperation | TrackerBatchUpdateOperation | TrackerBatchDeleteOperation,
+    Field(discriminator="op"),
+]
+
+
+class TrackerBatchRequest(BaseModel):
+    operations: list[TrackerBatchOperation] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_TRACKER_BATCH_OPERATIONS,
+    )
+
+
+class TrackerBatchItemStatus(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    DUPLICATE = "duplicate"
+    NOT_FOUND = "not_found"
+    CONFLICT = "conflict"
+
+
+class TrackerBatchItemResult(BaseModel):
+    index: int
+    op: Literal["create", "update", "delete"]
+    status: TrackerBatchItemStatus
+    tracker: Tracker | None = None
+    error: str | None = None
+
+
+class TrackerBatchEnvelope(BaseModel):
+    data: list[TrackerBatchItemResult]
+    meta: dict[str, object] = Field(default_factory=dict)
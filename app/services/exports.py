@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import gzip
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from supabase import Client
+
+from app.core.config import get_settings
+from app.core.streaming import csv_value
+from app.crud.export import (
+    ExportColumn,
+    claim_export_job,
+    complete_export_job,
+    fail_export_job,
+    get_export_source,
+    iter_export_pages,
+    list_expired_export_jobs,
+    mark_export_jobs_expired,
+    update_export_progress,
+)
+from app.schemas.export import ExportFormat
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FILE_EXTENSIONS = {
+    ExportFormat.CSV: "csv.gz",
+    ExportFormat.NDJSON: "ndjson.gz",
+    ExportFormat.PARQUET: "parquet",
+}
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "application/gzip",
+    ExportFormat.NDJSON: "application/gzip",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def export_file_path(account_id: str, export_id: str, export_format: ExportFormat | str) -> Path:
+    extension = EXPORT_FILE_EXTENSIONS[ExportFormat(export_format)]
+    return Path(get_settings().export_storage_dir) / str(account_id) / f"{export_id}.{extension}"
+
+
+def export_download_url(account_id: str, export_id: str) -> str:
+    return f"/v1.0/accounts/{account_id}/exports/{export_id}/download"
+
+
+class CsvExportWriter:
+    def __init__(self, path: Path, columns: tuple[ExportColumn, ...]) -> None:
+        self._names = [column.name for column in columns]
+        self._file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self._names)
+
+    def write_rows(self, rows: Iterable[dict[str, Any]]) -> None:
+        self._writer.writerows([csv_value(row.get(name)) for name in self._names] for row in rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class NdjsonExportWriter:
+    def __init__(self, path: Path, columns: tuple[ExportColumn, ...]) -> None:
+        self._names = [column.name for column in columns]
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+
+    def write_rows(self, rows: Iterable[dict[str, Any]]) -> None:
+        self._file.writelines(
+            json.dumps({name: row.get(name) for name in self._names}, ensure_ascii=False, default=str)
+            + "\n"
+            for row in rows
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetExportWriter:
+    """One row group per page against a schema fixed up front from the column kinds."""
+
+    def __init__(self, path: Path, columns: tuple[ExportColumn, ...]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {
+            "str": pa.string(),
+            "int": pa.int64(),
+            "float": pa.float64(),
+            "bool": pa.bool_(),
+            "date": pa.date32(),
+            "datetime": pa.timestamp("us", tz="UTC"),
+        }
+        self._pa = pa
+        self._columns = columns
+        self._schema = pa.schema([(column.name, types[column.kind]) for column in columns])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="gzip")
+
+    @staticmethod
+    def _convert(kind: str, value: Any) -> Any:
+        if value is None:
+            return None
+        if kind == "datetime":
+            return datetime.fromisoformat(str(value))
+        if kind == "date":
+            return date.fromisoformat(str(value))
+        if kind == "str" and not isinstance(value, str):
+            return json.dumps(value, ensure_ascii=False) if isinstance(value, dict | list) else str(value)
+        return value
+
+    def write_rows(self, rows: Iterable[dict[str, Any]]) -> None:
+        rows = list(rows)
+        arrays = {
+            column.name: [self._convert(column.kind, row.get(column.name)) for row in rows]
+            for column in self._columns
+        }
+        self._writer.write_table(self._pa.Table.from_pydict(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+EXPORT_WRITERS = {
+    ExportFormat.CSV: CsvExportWriter,
+    ExportFormat.NDJSON: NdjsonExportWriter,
+    ExportFormat.PARQUET: ParquetExportWriter,
+}
+
+
+def run_export_job(client: Client, job: dict[str, Any]) -> dict[str, Any]:
+    """Stream a claimed job's rows into its file; returns the completion fields.
+
+    Rows move from PostgREST to the compressed file one page at a time, so
+    memory is bounded by `export_page_size` whatever the export size. The file
+    is written under a `.part` name and renamed once complete.
+    """
+    settings = get_settings()
+    export_id = str(job["id"])
+    account_id = str(job["account_id"])
+    export_format = ExportFormat(job.get("format") or ExportFormat.CSV)
+    source = get_export_source(job["export_type"])
+
+    path = export_file_path(account_id, export_id, export_format)
+    partial_path = path.with_name(f"{path.name}.part")
+    rows_exported = 0
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        writer = EXPORT_WRITERS[export_format](partial_path, source.columns)
+        try:
+            for page in iter_export_pages(
+                client,
+                source,
+                filters=job.get("filters") or {},
+                account_id=account_id,
+                page_size=settings.export_page_size,
+            ):
+                writer.write_rows(page)
+                rows_exported += len(page)
+                update_export_progress(client, export_id=export_id, rows_exported=rows_exported)
+        finally:
+            writer.close()
+        os.replace(partial_path, path)
+    except Exception as exc:
+        partial_path.unlink(missing_ok=True)
+        logger.warning("Export %s failed after %s rows", export_id, rows_exported)
+        fail_export_job(client, export_id=export_id, error_message=str(exc))
+        raise
+
+    completed_at = datetime.now(UTC)
+    result = {
+        "rows_exported": rows_exported,
+        "file_url": export_download_url(account_id, export_id),
+        "file_size_bytes": path.stat().st_size,
+        "completed_at": completed_at,
+        "expires_at": completed_at + timedelta(hours=settings.export_ttl_hours),
+    }
+    complete_export_job(client, export_id=export_id, **result)
+    return result
+
+
+def process_export_job(client: Client, *, export_id: str | None = None) -> dict[str, Any] | None:
+    """Claim and run one job (a specific one, or the oldest queued)."""
+    job = claim_export_job(
+        client,
+        export_id=export_id,
+        stale_after_seconds=get_settings().export_stale_after_seconds,
+    )
+    if job is None:
+        return None
+    run_export_job(client, job)
+    return job
+
+
+async def run_export_job_in_background(client: Client, export_id: str) -> None:
+    """BackgroundTasks entry point; a no-op when a worker already claimed the job."""
+    try:
+        await asyncio.to_thread(process_export_job, client, export_id=export_id)
+    except Exception:
+        logger.exception("Background export %s failed", export_id)
+
+
+def expire_exports(client: Client, *, now: datetime | None = None, batch_size: int = 500) -> int:
+    """Delete files of exports past `expires_at` and mark them expired."""
+    now = now or datetime.now(UTC)
+    expired = 0
+    while True:
+        jobs = list_expired_export_jobs(client, now=now, limit=batch_size)
+        for job in jobs:
+            export_file_path(str(job["account_id"]), str(job["id"]), job.get("format") or "csv").unlink(
+                missing_ok=True
+            )
+        mark_export_jobs_expired(client, [str(job["id"]) for job in jobs])
+        expired += len(jobs)
+        if len(jobs) < batch_size:
+            return expired
+
+
+class ExportWorkerPool:
+    """Threads that each claim and run queued export jobs until stopped."""
+
+    def __init__(
+        self,
+        client: Client,
+        *,
+        workers: int,
+        poll_seconds: float,
+        max_backoff_seconds: float = 60.0,
+    ) -> None:
+        self._client = client
+        self._workers = workers
+        self._poll_seconds = poll_seconds
+        self._max_backoff_seconds = max_backoff_seconds
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        for index in range(self._workers):
+            thread = threading.Thread(target=self._run, name=f"export-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self) -> None:
+        backoff = self._poll_seconds
+        while not self._stop.is_set():
+            try:
+                job = process_export_job(self._client)
+            except Exception:
+                # Failures are recorded on the job; keep serving the queue, but
+                # back off in case the database itself is unreachable.
+                logger.exception("Export worker %s failed a job", threading.current_thread().name)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self._max_backoff_seconds)
+                continue
+            backoff = self._poll_seconds
+            if job is None:
+                self._stop.wait(self._poll_seconds)
+
+
+def main(argv: list[str] | None = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run export workers.")
+    parser.add_argument("--workers", type=int, default=settings.export_workers)
+    parser.add_argument(
+        "--expire-only", action="store_true", help="Clean up expired exports and exit"
+    )
+    args = parser.parse_args(argv)
+
+    from app.db.base import get_supabase_client
+
+    client = get_supabase_client()
+    if args.expire_only:
+        logger.info("Expired %s exports", expire_exports(client))
+        return
+
+    pool = ExportWorkerPool(client, workers=args.workers, poll_seconds=settings.export_poll_seconds)
+    pool.start()
+    stop = threading.Event()
+    try:
+        while not stop.wait(settings.export_expire_interval_seconds):
+            expired = expire_exports(client)
+            if expired:
+                logger.info("Expired %s exports", expired)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(value: str) -> str:
+    """Collapse whitespace and lower-case, matching `trackers.normalized_value`."""
+    return _WHITESPACE_RE.sub(" ", value).strip().lower()
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class AhoCorasick:
+    """Multi-pattern automaton finding every pattern occurrence in one pass."""
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: list[str] = list(dict.fromkeys(pattern for pattern in patterns if pattern))
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[int, ...]] = [()]
+
+        outputs: list[list[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append([])
+                node = next_node
+            outputs[node].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                outputs[child].extend(outputs[self._fail[child]])
+
+        self._output = [tuple(output) for output in outputs]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def iter_matches(self, text: str) -> Iterable[tuple[int, int]]:
+        """Yield `(pattern_index, end_offset)` for every occurrence in `text`."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in output[node]:
+                yield index, position + 1
+
+
+@dataclass(frozen=True)
+class TrackerTarget:
+    tracker_id: str
+    account_id: str
+    tracker_value: str
+
+
+@dataclass(frozen=True)
+class TrackerMatch:
+    tracker: TrackerTarget
+    start: int
+    end: int
+
+
+def tracker_patterns(tracker_type: str, normalized_value: str) -> list[str]:
+    """Text patterns a tracker matches; channel trackers also match t.me links."""
+    value = normalize_text(normalized_value)
+    if tracker_type != "channel":
+        return [value]
+
+    handle = value.lstrip("@")
+    if not handle:
+        return []
+    return [f"@{handle}", f"t.me/{handle}"]
+
+
+class TrackerMatcher:
+    """Active trackers compiled into a single automaton.
+
+    Tracker changes only touch the pattern registry. The automaton is rebuilt
+    lazily on the next match, and only when the set of patterns changed, so
+    pausing one of many trackers sharing a keyword costs nothing.
+    """
+
+    def __init__(self) -> None:
+        self._targets_by_pattern: dict[str, dict[str, TrackerTarget]] = {}
+        self._patterns_by_tracker: dict[str, list[str]] = {}
+        self._automaton: AhoCorasick | None = None
+        self._lock = threading.Lock()
+        self.synced_until: str | None = None
+
+    def __len__(self) -> int:
+        return len(self._patterns_by_tracker)
+
+    def apply_tracker(self, row: dict[str, Any]) -> None:
+        """Add, update or remove a tracker from a `trackers` table row.
+
+        Re-applying an unchanged tracker is a no-op, so the automaton survives
+        syncs that return trackers whose patterns did not change.
+        """
+        tracker_id = str(row["id"])
+        is_active = row.get("status") == "active" and row.get("deleted_at") is None
+        if not is_active:
+            self.remove_tracker(tracker_id)
+            return
+
+        target = TrackerTarget(
+            tracker_id=tracker_id,
+            account_id=str(row["account_id"]),
+            tracker_value=str(row.get("tracker_value") or row["normalized_value"]),
+        )
+        patterns = tracker_patterns(str(row["tracker_type"]), str(row["normalized_value"]))
+        with self._lock:
+            previous = self._patterns_by_tracker.get(tracker_id, [])
+            if previous == patterns and all(
+                self._targets_by_pattern[pattern].get(tracker_id) == target for pattern in patterns
+            ):
+                return
+
+            self._remove(tracker_id, keep=patterns)
+            for pattern in patterns:
+                targets = self._targets_by_pattern.setdefault(pattern, {})
+                if not targets:
+                    self._automaton = None
+                targets[tracker_id] = target
+            self._patterns_by_tracker[tracker_id] = patterns
+
+    def remove_tracker(self, tracker_id: str) -> None:
+        with self._lock:
+            self._remove(tracker_id)
+
+    def _remove(self, tracker_id: str, keep: Iterable[str] = ()) -> None:
+        kept = set(keep)
+        for pattern in self._patterns_by_tracker.pop(tracker_id, []):
+            targets = self._targets_by_pattern.get(pattern)
+            if targets is None or pattern in kept:
+                continue
+            targets.pop(tracker_id, None)
+            if not targets:
+                del self._targets_by_pattern[pattern]
+                self._automaton = None
+
+    def _get_automaton(self) -> AhoCorasick:
+        with self._lock:
+            if self._automaton is None:
+                self._automaton = AhoCorasick(self._targets_by_pattern)
+            return self._automaton
+
+    def match(self, text: str) -> list[TrackerMatch]:
+        """Return the first whole-word match per tracker in normalized `text`."""
+        automaton = self._get_automaton()
+        if not len(automaton):
+            return []
+
+        matches: dict[str, TrackerMatch] = {}
+        for index, end in automaton.iter_matches(text):
+            pattern = automaton.patterns[index]
+            start = end - len(pattern)
+            if _is_word_char(pattern[0]) and start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if _is_word_char(pattern[-1]) and end < len(text) and _is_word_char(text[end]):
+                continue
+            for target in self._targets_by_pattern.get(pattern, {}).values():
+                if target.tracker_id not in matches:
+                    matches[target.tracker_id] = TrackerMatch(tracker=target, start=start, end=end)
+        return list(matches.values())
+
+
+_tracker_matcher: TrackerMatcher | None = None
+
+
+def get_tracker_matcher() -> TrackerMatcher:
+    global _tracker_matcher
+
+    if _tracker_matcher is None:
+        _tracker_matcher = TrackerMatcher()
+    return _tracker_matcher
+
+
+def apply_tracker_change(tracker: dict[str, Any]) -> None:
+    """Keep this process's matcher current after a tracker write; no-op if unused.
+
+    `tracker` is a tracker as returned by `app.crud.tracker`.
+    """
+    if _tracker_matcher is not None:
+        _tracker_matcher.apply_tracker(
+            {
+                "id": tracker["tracker_id"],
+                "account_id": tracker["account_id"],
+                "tracker_type": tracker["tracker_type"],
+                "tracker_value": tracker["tracker_value"],
+                "normalized_value": tracker["tracker_value"],
+                "status": tracker["status"],
+            }
+        )
+
+
+def apply_tracker_removal(tracker_id: str) -> None:
+    """Drop a deleted tracker from this process's matcher; no-op if unused."""
+    if _tracker_matcher is not None:
+        _tracker_matcher.remove_tracker(tracker_id)
+
+
+def reset_tracker_matcher() -> None:
+    global _tracker_matcher
+    _tracker_matcher = None
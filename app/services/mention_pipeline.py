@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from supabase import Client
+
+from app.core.config import get_settings
+from app.crud.tracker import (
+    apply_tracker_mention_counts,
+    get_match_cursor,
+    insert_tracker_mentions,
+    list_posts_for_matching,
+    list_trackers_for_matching,
+    save_match_cursor,
+)
+from app.services.mention_matcher import (
+    TrackerMatch,
+    TrackerMatcher,
+    get_tracker_matcher,
+    normalize_text,
+)
+
+logger = logging.getLogger(__name__)
+
+MATCH_CURSOR_NAME = "posts"
+
+
+@dataclass
+class MentionBatchResult:
+    posts_scanned: int = 0
+    mentions_inserted: int = 0
+    trackers_updated: int = 0
+
+
+def sync_tracker_matcher(client: Client, matcher: TrackerMatcher) -> int:
+    """Apply tracker rows changed since the matcher's last sync; returns the count."""
+    rows = list_trackers_for_matching(client, updated_since=matcher.synced_until)
+    for row in rows:
+        matcher.apply_tracker(row)
+    if rows:
+        matcher.synced_until = str(rows[-1]["updated_at"])
+    return len(rows)
+
+
+def _snippet(text: str, match: TrackerMatch, *, radius: int) -> str:
+    start = max(0, match.start - radius)
+    end = min(len(text), match.end + radius)
+    snippet = text[start:end].strip()
+    if start > 0:
+        snippet = "…" + snippet
+    if end < len(text):
+        snippet += "…"
+    return snippet
+
+
+def build_mention_rows(
+    matcher: TrackerMatcher,
+    posts: list[dict[str, Any]],
+    *,
+    snippet_radius: int,
+) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    for post in posts:
+        display_text = " ".join(
+            part for part in (post.get("title"), post.get("content_text")) if part
+        )
+        display_text = " ".join(display_text.split())
+        search_text = normalize_text(display_text)
+        if not search_text:
+            continue
+        # lower() can change the length of a few characters; fall back to the
+        # normalized text so match offsets stay valid for the snippet.
+        snippet_source = display_text if len(display_text) == len(search_text) else search_text
+
+        for match in matcher.match(search_text):
+            rows.append(
+                {
+                    "account_id": match.tracker.account_id,
+                    "tracker_id": match.tracker.tracker_id,
+                    "channel_id": post.get("channel_id"),
+                    "post_id": post["id"],
+                    "mention_text": match.tracker.tracker_value,
+                    "context_snippet": _snippet(snippet_source, match, radius=snippet_radius),
+                    "mentioned_at": post["published_at"],
+                }
+            )
+    return rows
+
+
+def _mention_counts(inserted: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    counts: dict[str, dict[str, Any]] = {}
+    for row in inserted:
+        tracker_id = str(row["tracker_id"])
+        entry = counts.setdefault(
+            tracker_id,
+            {"tracker_id": tracker_id, "mentions": 0, "last_activity_at": row["mentioned_at"]},
+        )
+        entry["mentions"] += 1
+        entry["last_activity_at"] = max(str(entry["last_activity_at"]), str(row["mentioned_at"]))
+    return list(counts.values())
+
+
+def process_next_batch(
+    client: Client,
+    *,
+    matcher: TrackerMatcher | None = None,
+    batch_size: int | None = None,
+) -> MentionBatchResult:
+    """Match the next batch of posts against every active tracker.
+
+    Mentions are bulk inserted in one request and tracker counters updated in
+    one RPC, then the cursor advances. Re-running a batch after a failure is
+    safe because (tracker_id, post_id) duplicates are skipped and only newly
+    inserted rows are counted.
+    """
+    settings = get_settings()
+    matcher = matcher or get_tracker_matcher()
+    batch_size = batch_size or settings.mention_pipeline_batch_size
+
+    sync_tracker_matcher(client, matcher)
+
+    cursor = get_match_cursor(client, MATCH_CURSOR_NAME) or {}
+    posts = list_posts_for_matching(
+        client,
+        after_created_at=cursor.get("last_created_at"),
+        after_post_id=cursor.get("last_post_id"),
+        limit=batch_size,
+    )
+    if not posts:
+        return MentionBatchResult()
+
+    mention_rows = build_mention_rows(
+        matcher,
+        posts,
+        snippet_radius=settings.mention_pipeline_snippet_radius,
+    )
+    inserted = insert_tracker_mentions(client, mention_rows)
+    counts = _mention_counts(inserted)
+    apply_tracker_mention_counts(client, counts)
+
+    last_post = posts[-1]
+    save_match_cursor(
+        client,
+        MATCH_CURSOR_NAME,
+        last_created_at=str(last_post["created_at"]),
+        last_post_id=str(last_post["id"]),
+    )
+    return MentionBatchResult(
+        posts_scanned=len(posts),
+        mentions_inserted=len(inserted),
+        trackers_updated=len(counts),
+    )
+
+
+def run_mention_pipeline(
+    client: Client, *, idle_seconds: float = 5.0, max_backoff_seconds: float = 60.0
+) -> None:
+    """Process batches forever, sleeping whenever the posts backlog is drained.
+
+    A failed batch is retried after `idle_seconds`, doubling up to
+    `max_backoff_seconds` while failures continue. Batches are safe to replay.
+    """
+    batch_size = get_settings().mention_pipeline_batch_size
+    backoff = idle_seconds
+    while True:
+        try:
+            result = process_next_batch(client, batch_size=batch_size)
+        except Exception:
+            logger.exception("Mention pipeline batch failed; retrying in %.0f s", backoff)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, max_backoff_seconds)
+            continue
+        backoff = idle_seconds
+        if result.posts_scanned:
+            logger.info(
+                "Matched %s posts: %s mentions for %s trackers",
+                result.posts_scanned,
+                result.mentions_inserted,
+                result.trackers_updated,
+            )
+        if result.posts_scanned < batch_size:
+            time.sleep(idle_seconds)
+
+
+if __name__ == "__main__":
+    from app.db.base import get_supabase_client
+
+    logging.basicConfig(level=logging.INFO)
+    run_mention_pipeline(get_supabase_client())
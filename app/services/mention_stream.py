@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from supabase import Client
+
+from app.core.config import get_settings
+from app.crud.tracker import get_latest_mention_seq, list_mentions_after
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class MentionSubscription:
+    account_id: str
+    tracker_id: str | None
+    after_seq: int
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    overflowed: bool = False
+
+    def offer(self, item: dict[str, Any]) -> None:
+        if self.overflowed:
+            return
+        if self.tracker_id is not None and str(item["tracker_id"]) != self.tracker_id:
+            return
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # A stalled client; end its stream so it reconnects with Last-Event-ID.
+            self.overflowed = True
+
+
+class MentionStreamHub:
+    """One poller per process fanning new tracker mentions out to subscribers.
+
+    Every poll is a single `mention_seq > cursor` query covering all subscribed
+    accounts, however many connections are open.
+    """
+
+    def __init__(self, *, poll_seconds: float, batch_size: int, queue_size: int) -> None:
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self._subscriptions: dict[str, set[MentionSubscription]] = {}
+        self._cursor: int | None = None
+        self._client: Client | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    async def subscribe(
+        self,
+        client: Client,
+        *,
+        account_id: str,
+        tracker_id: str | None,
+        after_seq: int | None,
+    ) -> MentionSubscription:
+        self._client = client
+        if self._cursor is None:
+            self._cursor = await asyncio.to_thread(get_latest_mention_seq, client)
+
+        subscription = MentionSubscription(
+            account_id=account_id,
+            tracker_id=tracker_id,
+            after_seq=self._cursor if after_seq is None else after_seq,
+            queue=asyncio.Queue(maxsize=self.queue_size),
+        )
+        self._subscriptions.setdefault(account_id, set()).add(subscription)
+        self._ensure_poller()
+        return subscription
+
+    def unsubscribe(self, subscription: MentionSubscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.account_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.account_id]
+        if not self._subscriptions:
+            # Nothing is polled while idle, so the next subscriber starts from "now".
+            self._cursor = None
+
+    async def backfill(self, subscription: MentionSubscription) -> list[dict[str, Any]]:
+        """Mentions the subscriber missed before it registered, oldest first."""
+        items: list[dict[str, Any]] = []
+        after_seq = subscription.after_seq
+        while after_seq < (self._cursor or 0):
+            rows = await asyncio.to_thread(
+                list_mentions_after,
+                self._client,
+                account_ids=[subscription.account_id],
+                after_seq=after_seq,
+                limit=self.batch_size,
+            )
+            if not rows:
+                break
+            items.extend(
+                item
+                for _, item in rows
+                if subscription.tracker_id is None
+                or str(item["tracker_id"]) == subscription.tracker_id
+            )
+            after_seq = rows[-1][1]["mention_seq"]
+            if len(rows) < self.batch_size:
+                break
+        return items
+
+    async def poll_once(self) -> int:
+        """Fetch mentions newer than the cursor and fan them out; returns the count."""
+        if not self._subscriptions or self._client is None:
+            return 0
+
+        rows = await asyncio.to_thread(
+            list_mentions_after,
+            self._client,
+            account_ids=list(self._subscriptions),
+            after_seq=self._cursor or 0,
+            limit=self.batch_size,
+        )
+        for account_id, item in rows:
+            for subscription in tuple(self._subscriptions.get(account_id, ())):
+                subscription.offer(item)
+            self._cursor = max(self._cursor or 0, item["mention_seq"])
+        return len(rows)
+
+    def _ensure_poller(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        # A fresh context, so the poller does not keep recording its queries
+        # into the request that happened to start it.
+        self._task = loop.create_task(self._run(), context=contextvars.Context())
+
+    async def _run(self) -> None:
+        fetched = 0
+        while self._subscriptions:
+            # A full batch means there is more to read; poll again right away.
+            if fetched < self.batch_size:
+                await asyncio.sleep(self.poll_seconds)
+            try:
+                fetched = await self.poll_once()
+            except Exception:
+                logger.exception("Tracker mention poll failed")
+                fetched = 0
+
+
+async def iter_mentions(
+    hub: MentionStreamHub,
+    subscription: MentionSubscription,
+    *,
+    heartbeat_seconds: float,
+    max_seconds: float,
+) -> AsyncIterator[dict[str, Any] | None]:
+    """Yield mentions in mention_seq order, or None when a heartbeat is due.
+
+    Ends after `max_seconds` or when the subscriber falls too far behind.
+    """
+    deadline = time.monotonic() + max_seconds
+    last_seq = subscription.after_seq
+    try:
+        for item in await hub.backfill(subscription):
+            if item["mention_seq"] > last_seq:
+                last_seq = item["mention_seq"]
+                yield item
+
+        while not subscription.overflowed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                item = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=min(heartbeat_seconds, remaining),
+                )
+            except TimeoutError:
+                yield None
+                continue
+            if item["mention_seq"] > last_seq:
+                last_seq = item["mention_seq"]
+                yield item
+    finally:
+        hub.unsubscribe(subscription)
+
+
+_hub: MentionStreamHub | None = None
+
+
+def get_mention_stream_hub() -> MentionStreamHub:
+    global _hub
+
+    if _hub is None:
+        settings = get_settings()
+        _hub = MentionStreamHub(
+            poll_seconds=settings.tracker_stream_poll_seconds,
+            batch_size=settings.tracker_stream_batch_size,
+            queue_size=settings.tracker_stream_queue_size,
+        )
+    return _hub
+
+
+def reset_mention_stream_hub() -> None:
+    global _hub
+    _hub = None
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from supabase import Client
+
+from app.core.config import get_settings
+from app.crud.notification import (
+    list_pending_notification_fanout_jobs,
+    mark_notification_fanout_failed,
+    run_notification_fanout_batch,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def run_fanout_job(client: Client, job_id: str, *, batch_size: int | None = None) -> int:
+    """Deliver a fan-out job batch by batch; returns the notifications inserted.
+
+    Progress is committed with every batch, so a job interrupted here is
+    picked up where it stopped by `resume_fanout_jobs`.
+    """
+    batch_size = batch_size or get_settings().notification_fanout_batch_size
+    inserted = 0
+    try:
+        while True:
+            result = run_notification_fanout_batch(client, job_id=job_id, batch_size=batch_size)
+            inserted += int(result.get("inserted") or 0)
+            logger.info(
+                "Fan-out %s: %s/%s delivered",
+                job_id,
+                result.get("delivered_count"),
+                result.get("total_recipients"),
+            )
+            if result.get("done"):
+                return inserted
+    except Exception as exc:
+        logger.warning("Notification fan-out %s failed after %s inserts", job_id, inserted)
+        mark_notification_fanout_failed(client, job_id=job_id, error_message=str(exc))
+        raise
+
+
+async def run_fanout_job_in_background(client: Client, job_id: str) -> None:
+    """BackgroundTasks entry point; keeps the batches off the event loop."""
+    try:
+        await asyncio.to_thread(run_fanout_job, client, job_id)
+    except Exception:
+        logger.exception("Background notification fan-out %s failed", job_id)
+
+
+def resume_fanout_jobs(client: Client) -> int:
+    """Finish every queued or interrupted job; returns how many were run."""
+    jobs = list_pending_notification_fanout_jobs(client)
+    for job in jobs:
+        try:
+            run_fanout_job(client, str(job["id"]))
+        except Exception:
+            # Recorded on the job; keep draining the remaining ones.
+            logger.exception("Resumed notification fan-out %s failed", job["id"])
+    return len(jobs)
+
+
+if __name__ == "__main__":
+    from app.db.base import get_supabase_client
+
+    logging.basicConfig(level=logging.INFO)
+    resume_fanout_jobs(get_supabase_client())
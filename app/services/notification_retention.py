@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from supabase import Client
+
+from app.core.config import get_settings
+from app.crud.notification import purge_notifications_batch
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NotificationPurgeResult:
+    created_before: datetime
+    deleted_before: datetime
+    purged: int = 0
+    batches: int = 0
+    # False when max_batches stopped the run with expired rows left over.
+    drained: bool = True
+
+
+def purge_expired_notifications(
+    client: Client,
+    *,
+    now: datetime | None = None,
+    retention_days: int | None = None,
+    deleted_retention_days: int | None = None,
+    batch_size: int | None = None,
+    archive: bool | None = None,
+    max_batches: int | None = None,
+) -> NotificationPurgeResult:
+    """Delete (or archive) expired notifications in bounded batches.
+
+    Each batch is its own short transaction, so a large backlog never holds
+    long locks on `notifications`; a short batch means nothing is left.
+    """
+    settings = get_settings()
+    now = now or datetime.now(UTC)
+    if retention_days is None:
+        retention_days = settings.notification_retention_days
+    if deleted_retention_days is None:
+        deleted_retention_days = settings.notification_deleted_retention_days
+    batch_size = batch_size or settings.notification_purge_batch_size
+    if archive is None:
+        archive = settings.notification_purge_archive
+
+    result = NotificationPurgeResult(
+        created_before=now - timedelta(days=retention_days),
+        deleted_before=now - timedelta(days=deleted_retention_days),
+    )
+    while max_batches is None or result.batches < max_batches:
+        purged = purge_notifications_batch(
+            client,
+            created_before=result.created_before,
+            deleted_before=result.deleted_before,
+            batch_size=batch_size,
+            archive=archive,
+        )
+        result.batches += 1
+        result.purged += purged
+        if purged < batch_size:
+            return result
+
+    result.drained = False
+    return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Purge expired notifications.")
+    parser.add_argument("--retention-days", type=int, default=None)
+    parser.add_argument("--deleted-retention-days", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument(
+        "--archive",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Move purged rows to notifications_archive instead of deleting them",
+    )
+    args = parser.parse_args(argv)
+
+    from app.db.base import get_supabase_client
+
+    result = purge_expired_notifications(
+        get_supabase_client(),
+        retention_days=args.retention_days,
+        deleted_retention_days=args.deleted_retention_days,
+        batch_size=args.batch_size,
+        archive=args.archive,
+        max_batches=args.max_batches,
+    )
+    logger.info(
+        "Purged %s notifications in %s batches%s",
+        result.purged,
+        result.batches,
+        "" if result.drained else " (stopped at --max-batches)",
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.config import get_settings
+
+NotificationEvent = tuple[str, dict[str, Any]]
+
+
+@dataclass(eq=False)
+class NotificationSubscription:
+    user_id: str
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    loop: asyncio.AbstractEventLoop | None = None
+    overflowed: bool = False
+
+    def offer(self, event: NotificationEvent) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A stalled client; end its stream so it reconnects and resyncs.
+            self.overflowed = True
+
+
+class NotificationBroker:
+    """In-process pub/sub of notification events keyed by user id.
+
+    Events only reach subscribers connected to this worker. Streams resync the
+    unread counter periodically, so changes published by other workers still
+    show up, only later.
+    """
+
+    def __init__(self, *, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._subscriptions: dict[str, set[NotificationSubscription]] = {}
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def has_subscribers(self, user_id: str) -> bool:
+        return bool(self._subscriptions.get(user_id))
+
+    def subscribe(self, user_id: str) -> NotificationSubscription:
+        subscription = NotificationSubscription(
+            user_id=user_id,
+            queue=asyncio.Queue(maxsize=self.queue_size),
+            loop=asyncio.get_running_loop(),
+        )
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: NotificationSubscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_id: str, event: str, data: dict[str, Any]) -> int:
+        """Queue `event` for every stream of `user_id`; returns how many were reached."""
+        subscriptions = tuple(self._subscriptions.get(user_id, ()))
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+
+        for subscription in subscriptions:
+            if subscription.loop is None or subscription.loop is current_loop:
+                subscription.offer((event, data))
+            else:
+                subscription.loop.call_soon_threadsafe(subscription.offer, (event, data))
+        return len(subscriptions)
+
+
+async def iter_notification_events(
+    broker: NotificationBroker,
+    subscription: NotificationSubscription,
+    *,
+    get_unread_count: Callable[[], Awaitable[int]],
+    heartbeat_seconds: float,
+    resync_seconds: float,
+    max_seconds: float,
+) -> AsyncIterator[NotificationEvent | None]:
+    """Yield notification events, or None when a heartbeat is due.
+
+    Starts with the current unread count and re-reads it every
+    `resync_seconds`, emitting it again only when it changed.
+    """
+    deadline = time.monotonic() + max_seconds
+    try:
+        unread_count = await get_unread_count()
+        yield "unread_count", {"unread_count": unread_count}
+        next_resync = time.monotonic() + resync_seconds
+
+        while not subscription.overflowed:
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            if now >= next_resync:
+                next_resync = now + resync_seconds
+                latest = await get_unread_count()
+                if latest != unread_count:
+                    unread_count = latest
+                    yield "unread_count", {"unread_count": unread_count}
+                    continue
+
+            timeout = min(heartbeat_seconds, deadline - now, max(next_resync - now, 0))
+            try:
+                event, data = await asyncio.wait_for(subscription.queue.get(), timeout=timeout)
+            except TimeoutError:
+                yield None
+                continue
+            if event == "unread_count":
+                unread_count = data["unread_count"]
+            elif event == "notification" and not data.get("is_read"):
+                unread_count += 1
+            yield event, data
+    finally:
+        broker.unsubscribe(subscription)
+
+
+_broker: NotificationBroker | None = None
+
+
+def get_notification_broker() -> NotificationBroker:
+    global _broker
+
+    if _broker is None:
+        _broker = NotificationBroker(queue_size=get_settings().notification_stream_queue_size)
+    return _broker
+
+
+def publish_notification(user_id: str, notification: dict[str, Any]) -> None:
+    """Push a newly created notification to the user's open streams."""
+    get_notification_broker().publish(user_id, "notification", notification)
+
+
+async def publish_unread_count(
+    user_id: str, *, get_unread_count: Callable[[], Awaitable[int]]
+) -> None:
+    """Push the user's unread count to their open streams, if they have any."""
+    broker = get_notification_broker()
+    if not broker.has_subscribers(user_id):
+        return
+    broker.publish(user_id, "unread_count", {"unread_count": await get_unread_count()})
+
+
+def reset_notification_broker() -> None:
+    global _broker
+    _broker = None
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+
+from supabase import Client
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    name: str
+    # Months kept attached, counting the current one; None keeps everything.
+    retention_months: int | None
+
+
+PARTITIONED_TABLES: tuple[PartitionedTable, ...] = (
+    PartitionedTable("tracker_mentions", retention_months=24),
+    PartitionedTable("channel_metrics_daily", retention_months=36),
+    PartitionedTable("post_metrics_daily", retention_months=12),
+    PartitionedTable("advertiser_metrics_daily", retention_months=36),
+    PartitionedTable("api_key_usage_daily", retention_months=13),
+)
+
+
+@dataclass
+class PartitionPlan:
+    table: str
+    create: list[date] = field(default_factory=list)
+    detach: list[date] = field(default_factory=list)
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def plan_partitions(
+    table: PartitionedTable,
+    existing_months: list[date],
+    *,
+    today: date,
+    premake_months: int,
+) -> PartitionPlan:
+    """Months to create so `premake_months` future partitions exist, and months to detach."""
+    current = month_start(today)
+    existing = {month_start(month) for month in existing_months}
+    plan = PartitionPlan(table=table.name)
+
+    for offset in range(premake_months + 1):
+        month = add_months(current, offset)
+        if month not in existing:
+            plan.create.append(month)
+
+    if table.retention_months is not None:
+        oldest_kept = add_months(current, -(table.retention_months - 1))
+        plan.detach = sorted(month for month in existing if month < oldest_kept)
+    return plan
+
+
+def run_partition_maintenance(
+    client: Client,
+    *,
+    today: date | None = None,
+    premake_months: int | None = None,
+    drop: bool = False,
+    dry_run: bool = False,
+    tables: tuple[PartitionedTable, ...] = PARTITIONED_TABLES,
+) -> list[PartitionPlan]:
+    """Pre-create future monthly partitions and detach (or drop) expired ones.
+
+    Creating ahead of time keeps new rows out of the `<table>_default`
+    partition; a populated default partition blocks creating the matching
+    month later. Detached partitions are left as plain tables to archive.
+    """
+    today = today or datetime.now(UTC).date()
+    if premake_months is None:
+        premake_months = get_settings().partition_premake_months
+
+    plans: list[PartitionPlan] = []
+    for table in tables:
+        rows = client.rpc("list_monthly_partitions", {"p_table": table.name}).execute().data or []
+        existing = [date.fromisoformat(str(row["month_start"])) for row in rows]
+        plan = plan_partitions(table, existing, today=today, premake_months=premake_months)
+        plans.append(plan)
+        if dry_run:
+            continue
+
+        for month in plan.create:
+            client.rpc(
+                "create_monthly_partition",
+                {"p_table": table.name, "p_month": month.isoformat()},
+            ).execute()
+        for month in plan.detach:
+            client.rpc(
+                "detach_monthly_partition",
+                {"p_table": table.name, "p_month": month.isoformat(), "p_drop": drop},
+            ).execute()
+    return plans
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain monthly table partitions.")
+    parser.add_argument("--premake-months", type=int, default=None)
+    parser.add_argument("--drop", action="store_true", help="Drop expired partitions instead of detaching")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the plan")
+    args = parser.parse_args(argv)
+
+    from app.db.base import get_supabase_client
+
+    plans = run_partition_maintenance(
+        get_supabase_client(),
+        premake_months=args.premake_months,
+        drop=args.drop,
+        dry_run=args.dry_run,
+    )
+    for plan in plans:
+        logger.info(
+            "%s: create %s, %s %s",
+            plan.table,
+            [month.isoformat() for month in plan.create],
+            "drop" if args.drop else "detach",
+            [month.isoformat() for month in plan.detach],
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
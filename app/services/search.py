@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from supabase import Client
+
+from app.crud import search as search_crud
+from app.schemas.search import SearchSource, SearchSourceStatus
+
+logger = logging.getLogger(__name__)
+
+SearchFn = Callable[..., list[dict[str, Any]]]
+
+_SOURCE_SEARCHES: dict[SearchSource, SearchFn] = {
+    SearchSource.CHANNELS: search_crud.search_channels,
+    SearchSource.ADVERTISERS: search_crud.search_advertisers,
+    SearchSource.MINI_APPS: search_crud.search_mini_apps,
+    SearchSource.ADS: search_crud.search_ads,
+    SearchSource.POSTS: search_crud.search_posts,
+}
+
+# Ad and post texts have no name to prefix-match, so short terms skip them.
+_FULL_TEXT_ONLY_SOURCES = frozenset({SearchSource.ADS, SearchSource.POSTS})
+
+
+@dataclass
+class SourceResult:
+    status: SearchSourceStatus
+    took_ms: int
+    items: list[dict[str, Any]] = field(default_factory=list)
+
+
+async def _run_source(
+    source: SearchSource,
+    client: Client,
+    term: str,
+    *,
+    limit: int,
+    timeout_seconds: float,
+) -> SourceResult:
+    started = time.perf_counter()
+
+    def _elapsed_ms() -> int:
+        return int((time.perf_counter() - started) * 1000)
+
+    try:
+        items = await asyncio.wait_for(
+            asyncio.to_thread(_SOURCE_SEARCHES[source], client, term, limit=limit),
+            timeout=timeout_seconds,
+        )
+    except TimeoutError:
+        logger.warning("Search source %s exceeded %.2fs budget", source.value, timeout_seconds)
+        return SourceResult(status=SearchSourceStatus.TIMEOUT, took_ms=_elapsed_ms())
+    except Exception:
+        logger.exception("Search source %s failed", source.value)
+        return SourceResult(status=SearchSourceStatus.ERROR, took_ms=_elapsed_ms())
+
+    return SourceResult(status=SearchSourceStatus.OK, took_ms=_elapsed_ms(), items=items)
+
+
+async def search_sources(
+    client: Client,
+    term: str,
+    *,
+    sources: set[SearchSource],
+    limit: int,
+    timeout_seconds: float,
+) -> dict[SearchSource, SourceResult]:
+    """Query every requested source concurrently, each within its own time budget.
+
+    A source that times out or fails is reported with that status and no items
+    instead of failing the whole search. Its worker thread is left to finish in
+    the background since the sync client cannot be cancelled mid-request.
+    """
+    results: dict[SearchSource, SourceResult] = {}
+    pending: dict[SearchSource, Any] = {}
+
+    for source in SearchSource:
+        if source not in sources:
+            continue
+        if source in _FULL_TEXT_ONLY_SOURCES and search_crud.is_prefix_search(term):
+            results[source] = SourceResult(status=SearchSourceStatus.SKIPPED, took_ms=0)
+            continue
+        pending[source] = _run_source(
+            source,
+            client,
+            term,
+            limit=limit,
+            timeout_seconds=timeout_seconds,
+        )
+
+    gathered = await asyncio.gather(*pending.values())
+    results.update(zip(pending, gathered, strict=True))
+    return {source: results[source] for source in SearchSource if source in results}
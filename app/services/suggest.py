@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from supabase import Client
+
+from app.core.config import get_settings
+from app.crud.search import get_suggest_snapshot_key, load_suggest_sources
+
+logger = logging.getLogger(__name__)
+
+# Prefixes up to this length match large slices of the index, so their top
+# results are memoized per index build, keeping the most recently used ones.
+_MEMOIZED_PREFIX_LENGTH = 2
+_MEMO_MAX_ENTRIES = 2048
+MAX_SUGGEST_LIMIT = 20
+
+_WORD_START_RE = re.compile(r"(?:^|[\s\-_.])(\w)")
+
+
+@dataclass(frozen=True)
+class SuggestEntry:
+    entity_id: str
+    name: str
+    handle: str | None
+    popularity: float
+
+
+def _fold(value: str) -> str:
+    """Case- and accent-fold text so lookups ignore both."""
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _index_keys(entry: SuggestEntry) -> set[str]:
+    """Keys for the full name, every word suffix of the name and the handle."""
+    name = _fold(entry.name).strip()
+    keys = {name[match.start(1) :] for match in _WORD_START_RE.finditer(name)}
+    keys.add(name)
+    if entry.handle:
+        keys.add(_fold(entry.handle).lstrip("@"))
+    keys.discard("")
+    return keys
+
+
+class PrefixIndex:
+    """Sorted key array searched with bisect, returning the most popular matches."""
+
+    def __init__(self, entries: list[SuggestEntry]) -> None:
+        self._entries = entries
+        pairs = sorted(
+            (key, position)
+            for position, entry in enumerate(entries)
+            for key in _index_keys(entry)
+        )
+        self._keys = [key for key, _ in pairs]
+        self._positions = [position for _, position in pairs]
+        self._memo: OrderedDict[str, list[int]] = OrderedDict()
+        # Single characters are the widest slices; memoize them while building.
+        for first_char in {key[0] for key in self._keys}:
+            self._remember(first_char, self._top_positions(first_char, MAX_SUGGEST_LIMIT))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _top_positions(self, prefix: str, limit: int) -> list[int]:
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + "\U0010ffff", lo=start)
+        candidates = set(self._positions[start:end])
+        return heapq.nlargest(
+            limit,
+            candidates,
+            key=lambda position: (self._entries[position].popularity, -position),
+        )
+
+    def _remember(self, prefix: str, positions: list[int]) -> None:
+        self._memo[prefix] = positions
+        if len(self._memo) > _MEMO_MAX_ENTRIES:
+            self._memo.popitem(last=False)
+
+    def search(self, prefix: str, *, limit: int) -> list[SuggestEntry]:
+        folded = _fold(prefix).strip().lstrip("@")
+        if not folded:
+            return []
+
+        if len(folded) <= _MEMOIZED_PREFIX_LENGTH:
+            positions = self._memo.get(folded)
+            if positions is None:
+                positions = self._top_positions(folded, MAX_SUGGEST_LIMIT)
+                self._remember(folded, positions)
+            else:
+                self._memo.move_to_end(folded)
+        else:
+            positions = self._top_positions(folded, limit)
+
+        return [self._entries[position] for position in positions[:limit]]
+
+
+@dataclass
+class SuggestIndexes:
+    snapshot_key: tuple[str | None, ...]
+    channels: PrefixIndex
+    advertisers: PrefixIndex
+    mini_apps: PrefixIndex
+    checked_at: float = field(default_factory=time.monotonic)
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _build_index(
+    rows: list[dict[str, Any]],
+    *,
+    handle_field: str,
+    popularity_field: str,
+) -> PrefixIndex:
+    entries = [
+        SuggestEntry(
+            entity_id=str(row["id"]),
+            name=str(row["name"]),
+            handle=str(row[handle_field]) if row.get(handle_field) else None,
+            popularity=_to_float(row.get(popularity_field)),
+        )
+        for row in rows
+        if row.get("id") is not None and row.get("name")
+    ]
+    return PrefixIndex(entries)
+
+
+def build_suggest_indexes(
+    client: Client,
+    *,
+    snapshot_key: tuple[str | None, ...] | None = None,
+) -> SuggestIndexes:
+    settings = get_settings()
+    if snapshot_key is None:
+        snapshot_key = get_suggest_snapshot_key(client)
+    sources = load_suggest_sources(client, max_channels=settings.search_suggest_max_channels)
+    return SuggestIndexes(
+        snapshot_key=snapshot_key,
+        channels=_build_index(
+            sources["channels"],
+            handle_field="username",
+            popularity_field="subscribers_current",
+        ),
+        advertisers=_build_index(
+            sources["advertisers"],
+            handle_field="slug",
+            popularity_field="estimated_spend_current",
+        ),
+        mini_apps=_build_index(
+            sources["mini_apps"],
+            handle_field="slug",
+            popularity_field="daily_users_current",
+        ),
+    )
+
+
+_suggest_indexes: SuggestIndexes | None = None
+_build_lock = threading.Lock()
+
+
+def get_suggest_indexes(client: Client) -> SuggestIndexes:
+    """Return the current indexes, building them on first use."""
+    global _suggest_indexes
+
+    if _suggest_indexes is None:
+        with _build_lock:
+            if _suggest_indexes is None:
+                _suggest_indexes = build_suggest_indexes(client)
+
+    return _suggest_indexes
+
+
+async def load_suggest_indexes(client: Client) -> SuggestIndexes:
+    """Like `get_suggest_indexes`, but a first build runs off the event loop."""
+    indexes = _suggest_indexes
+    if indexes is None:
+        indexes = await asyncio.to_thread(get_suggest_indexes, client)
+    return indexes
+
+
+def is_suggest_index_stale(indexes: SuggestIndexes) -> bool:
+    settings = get_settings()
+    return time.monotonic() - indexes.checked_at >= settings.search_suggest_refresh_seconds
+
+
+def refresh_suggest_indexes(client: Client) -> None:
+    """Rebuild the indexes if a new snapshot landed since the last build.
+
+    Meant to run in a worker thread (a sync background task); requests keep
+    reading the previous indexes until the new ones are swapped in, and
+    concurrent refreshes are skipped.
+    """
+    global _suggest_indexes
+
+    if not _build_lock.acquire(blocking=False):
+        return
+
+    try:
+        current = _suggest_indexes
+        if current is not None and not is_suggest_index_stale(current):
+            return
+
+        try:
+            snapshot_key = get_suggest_snapshot_key(client)
+            if current is None or snapshot_key != current.snapshot_key:
+                _suggest_indexes = build_suggest_indexes(client, snapshot_key=snapshot_key)
+        except Exception:
+            # Keep serving the previous indexes; checking them below means the
+            # refresh is retried once per refresh interval, not on every request.
+            logger.exception("Refreshing the suggest indexes failed")
+        if current is not None:
+            current.checked_at = time.monotonic()
+    finally:
+        _build_lock.release()
+
+
+def reset_suggest_indexes() -> None:
+    global _suggest_indexes
+    _suggest_indexes = None
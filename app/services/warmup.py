@@ -0,0 +1,71 @@
+"""Reference data loaded into the response cache before a worker reports ready.
+
+Each call uses the arguments the matching route passes for its default query,
+so the cache keys are the ones the first requests after a deploy look up. The
+queries run in worker threads, so /livez and /ping keep answering and the
+warmup timeout can fire while they are in flight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from supabase import Client
+
+from app.crud.home import get_home_categories, get_home_countries
+from app.crud.ranking import (
+    get_category_rankings,
+    get_country_rankings,
+    get_ranking_collections,
+)
+
+logger = logging.getLogger(__name__)
+
+# Page size and ranking defaults of the /v1.0/home and /v1.0/rankings routes
+DEFAULT_LIMIT = 20
+DEFAULT_COUNTRY_CODE = "US"
+DEFAULT_CATEGORY_SLUG = "technology"
+
+
+def _largest(client: Client, table: str, column: str, count: int) -> list[str]:
+    response = (
+        client.table(table)
+        .select(column)
+        .order("channels_count", desc=True, nullsfirst=False)
+        .limit(count)
+        .execute()
+    )
+    return [str(row[column]) for row in response.data or [] if row.get(column)]
+
+
+def _with_default(default: str, values: list[str], count: int) -> list[str]:
+    return list(dict.fromkeys([default, *values]))[: max(count, 1)]
+
+
+async def preload_reference_data(client: Client, *, top_rankings: int) -> None:
+    await get_home_categories.in_thread(client, limit=DEFAULT_LIMIT, cursor=None)
+    await get_home_countries.in_thread(client, limit=DEFAULT_LIMIT, cursor=None)
+    await get_ranking_collections.in_thread(client, limit=DEFAULT_LIMIT)
+
+    largest_countries = await asyncio.to_thread(_largest, client, "countries", "code", top_rankings)
+    country_codes = _with_default(DEFAULT_COUNTRY_CODE, largest_countries, top_rankings)
+    for country_code in country_codes:
+        await get_country_rankings.in_thread(
+            client, country_code=country_code, limit=DEFAULT_LIMIT
+        )
+
+    largest_categories = await asyncio.to_thread(
+        _largest, client, "categories", "slug", top_rankings
+    )
+    category_slugs = _with_default(DEFAULT_CATEGORY_SLUG, largest_categories, top_rankings)
+    for category_slug in category_slugs:
+        await get_category_rankings.in_thread(
+            client, category_slug=category_slug, limit=DEFAULT_LIMIT
+        )
+
+    logger.info(
+        "Preloaded reference data: %d country and %d category rankings",
+        len(country_codes),
+        len(category_slugs),
+    )
@@ -0,0 +1,185 @@
+"""Local Redis stand-in for tests and benchmarks of the shared response cache.
+
+`FakeRedisServer` listens on 127.0.0.1 in its own thread and event loop, so any
+number of clients (event loops, test clients, worker processes) can talk to it
+the way they would to a real server. It speaks the RESP subset
+`app.core.redis_cache` uses: PING, AUTH, SELECT, GET, SET (PX/EX/NX), MGET,
+INCR, DEL, FLUSHALL, PUBLISH and SUBSCRIBE.
+
+    with FakeRedisServer() as server:
+        backend = RedisCacheBackend(server.url, prefix="test", local_max_entries=0)
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from typing import Any
+
+from app.core.redis_cache import RedisError, read_reply
+
+
+def _encode_reply(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, Exception):
+        return b"-%b\r\n" % str(value).encode()
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+%b\r\n" % value.encode()
+    if isinstance(value, bytes):
+        return b"$%d\r\n%b\r\n" % (len(value), value)
+    return b"*%d\r\n" % len(value) + b"".join(_encode_reply(item) for item in value)
+
+
+class FakeRedisServer:
+    def __init__(self, *, password: str | None = None) -> None:
+        self.password = password
+        self.commands: Counter[str] = Counter()
+        self.port = 0
+        self._data: dict[bytes, tuple[bytes, float | None]] = {}
+        self._subscribers: dict[bytes, set[asyncio.StreamWriter]] = {}
+        self._connections: set[asyncio.Task] = set()
+        self._loop = asyncio.new_event_loop()
+        self._thread: threading.Thread | None = None
+        self._server: asyncio.Server | None = None
+
+    @property
+    def url(self) -> str:
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{self.port}/0"
+
+    def start(self) -> "FakeRedisServer":
+        started = threading.Event()
+
+        def run() -> None:
+            asyncio.set_event_loop(self._loop)
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._serve, "127.0.0.1", self.port)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-redis", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self) -> None:
+        """Close the listener and every client connection; `start()` reopens on the same port."""
+
+        server = self._server
+
+        async def shutdown() -> None:
+            server.close()
+            for connection in self._connections:
+                connection.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await server.wait_closed()
+            self._loop.stop()
+
+        if self._thread is None or server is None:
+            return
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop)
+        self._thread.join()
+        self._thread = None
+        self._loop.close()
+        self._loop = asyncio.new_event_loop()
+
+    def __enter__(self) -> "FakeRedisServer":
+        return self.start()
+
+    def __exit__(self, *_exc: object) -> None:
+        self.stop()
+
+    def keys(self) -> list[str]:
+        return sorted(key.decode() for key in list(self._data) if self._get(key) is not None)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(asyncio.current_task())
+        authenticated = self.password is None
+        try:
+            while True:
+                command = await read_reply(reader)
+                if not isinstance(command, list) or not command:
+                    writer.write(_encode_reply(RedisError("ERR protocol error")))
+                    continue
+                name, *args = command
+                name = name.decode().upper()
+                self.commands[name] += 1
+                if name == "AUTH":
+                    authenticated = args[-1].decode() == self.password
+                    reply: Any = "OK" if authenticated else RedisError("WRONGPASS invalid password")
+                elif not authenticated:
+                    reply = RedisError("NOAUTH Authentication required.")
+                elif name == "SUBSCRIBE":
+                    for channel in args:
+                        self._subscribers.setdefault(channel, set()).add(writer)
+                        writer.write(_encode_reply([b"subscribe", channel, 1]))
+                    continue
+                else:
+                    reply = self._execute(name, args)
+                writer.write(_encode_reply(reply))
+                await writer.drain()
+        except (ConnectionError, EOFError):
+            pass
+        finally:
+            self._connections.discard(asyncio.current_task())
+            for subscribers in self._subscribers.values():
+                subscribers.discard(writer)
+            writer.close()
+
+    def _get(self, key: bytes) -> bytes | None:
+        stored = self._data.get(key)
+        if stored is None:
+            return None
+        value, expires_at = stored
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def _execute(self, name: str, args: list[bytes]) -> Any:
+        if name == "PING":
+            return "PONG"
+        if name == "SELECT":
+            return "OK"
+        if name == "GET":
+            return self._get(args[0])
+        if name == "MGET":
+            return [self._get(key) for key in args]
+        if name == "SET":
+            return self._set(args)
+        if name == "INCR":
+            value = int(self._get(args[0]) or 0) + 1
+            self._data[args[0]] = (str(value).encode(), self._data.get(args[0], (b"", None))[1])
+            return value
+        if name == "DEL":
+            return sum(self._data.pop(key, None) is not None for key in args)
+        if name == "FLUSHALL":
+            self._data.clear()
+            return "OK"
+        if name == "PUBLISH":
+            channel, message = args
+            subscribers = self._subscribers.get(channel, set())
+            for subscriber in subscribers:
+                subscriber.write(_encode_reply([b"message", channel, message]))
+            return len(subscribers)
+        return RedisError(f"ERR unknown command '{name}'")
+
+    def _set(self, args: list[bytes]) -> Any:
+        key, value, *options = args
+        expires_at = None
+        flags = [option.decode().upper() for option in options]
+        for index, flag in enumerate(flags):
+            if flag in ("PX", "EX"):
+                amount = int(options[index + 1])
+                seconds = amount / 1000 if flag == "PX" else amount
+                expires_at = time.monotonic() + seconds
+        if "NX" in flags and self._get(key) is not None:
+            return None
+        self._data[key] = (value, expires_at)
+        return "OK"
+
@@ -0,0 +1,680 @@
+"""Synthetic catalog data for `InMemorySupabase`.
+
+`build_dataset(DatasetSize.for_channels(n))` produces every table and view the
+read paths touch (catalog and overview views, daily metrics, rankings and
+collections, advertisers with creatives, mini apps, users with accounts,
+trackers, mentions and notifications) with deterministic ids and
+pseudo-random values, so two runs with the same size and seed see the same
+rows. `seeded_client` wraps it in a client with the search functions
+registered.
+
+Catalog views, `channels` and rankings cover every channel. Per-channel
+history (the overview view, metrics, similar channels, tags and posts) is only
+generated for the first `detailed_channels` channels, which keeps a million
+channel dataset within a few GB; benchmarks should request overviews of
+those (`Dataset.detailed_channel_ids`).
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Any
+
+from app.crud.search import prefix_tsquery
+from app.testing.supabase import InMemorySupabase, Row, fold_text, text_matches
+
+COUNTRIES = (
+    ("US", "United States"),
+    ("GB", "United Kingdom"),
+    ("DE", "Germany"),
+    ("FR", "France"),
+    ("ES", "Spain"),
+    ("IT", "Italy"),
+    ("BR", "Brazil"),
+    ("IN", "India"),
+    ("RU", "Russia"),
+    ("UA", "Ukraine"),
+    ("TR", "Turkey"),
+    ("ID", "Indonesia"),
+)
+CATEGORIES = (
+    ("tech", "Technology"),
+    ("news", "News"),
+    ("crypto", "Crypto"),
+    ("finance", "Finance"),
+    ("games", "Games"),
+    ("music", "Music"),
+    ("education", "Education"),
+    ("sports", "Sports"),
+    ("travel", "Travel"),
+    ("food", "Food"),
+    ("fashion", "Fashion"),
+    ("health", "Health"),
+)
+INDUSTRIES = (
+    ("fintech", "Fintech"),
+    ("gaming", "Gaming"),
+    ("ecommerce", "E-commerce"),
+    ("education", "Education"),
+    ("crypto", "Crypto"),
+    ("travel", "Travel"),
+    ("health", "Health"),
+    ("media", "Media"),
+)
+_ADJECTIVES = (
+    "daily", "global", "smart", "crypto", "urban", "digital", "open", "rapid",
+    "golden", "quiet", "bright", "wild", "modern", "classic", "cosmic", "happy",
+)
+_NOUNS = (
+    "news", "signals", "insider", "digest", "hub", "journal", "lab", "market",
+    "club", "radar", "pulse", "review", "stories", "feed", "wire", "talks",
+)
+# Snapshot tables are read at the latest date and at fixed lookbacks.
+_SNAPSHOT_OFFSETS = (0, 1, 7, 14, 30, 90)
+_RANKING_DEPTH = 100
+_COLLECTION_SIZE = 50
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+# Column defaults of the tables the write paths insert into.
+COLUMN_DEFAULTS = {
+    "users": {"created_at": _now},
+    "accounts": {"created_at": _now},
+    "team_members": {"deleted_at": None, "created_at": _now},
+    "magic_tokens": {"used_at": None, "created_at": _now},
+    "notifications": {"is_read": False, "read_at": None, "deleted_at": None, "created_at": _now},
+    "trackers": {
+        "status": "active",
+        "mentions_count": 0,
+        "last_activity_at": None,
+        "deleted_at": None,
+        "created_at": _now,
+        "updated_at": _now,
+    },
+}
+
+# Namespaces for deterministic ids: f"{namespace:08x}-0000-4000-8000-{index:012x}".
+_CHANNEL, _ADVERTISER, _MINI_APP, _USER, _ACCOUNT, _TRACKER = range(1, 7)
+_MENTION, _NOTIFICATION, _POST, _CREATIVE, _COLLECTION, _TAG, _MISC = range(7, 14)
+
+
+def make_id(namespace: int, index: int) -> str:
+    return f"{namespace:08x}-0000-4000-8000-{index:012x}"
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    channels: int = 10_000
+    detailed_channels: int = 2_000
+    metric_days: int = 30
+    posts_per_channel: int = 10
+    advertisers: int = 500
+    creatives_per_advertiser: int = 10
+    mini_apps: int = 1_000
+    users: int = 10
+    trackers_per_account: int = 10
+    mentions: int = 50_000
+    notifications_per_user: int = 50
+
+    @classmethod
+    def for_channels(cls, channels: int) -> "DatasetSize":
+        """Scale everything else off the channel count (10k channels is the baseline)."""
+        scale = channels / 10_000
+        return cls(
+            channels=channels,
+            detailed_channels=min(channels, 2_000),
+            advertisers=max(20, int(500 * scale)),
+            mini_apps=max(20, int(1_000 * scale)),
+            mentions=max(100, int(50_000 * scale)),
+        )
+
+
+@dataclass
+class Dataset:
+    tables: dict[str, list[Row]]
+    detailed_channel_ids: list[str]
+    advertiser_ids: list[str]
+    # (user row, default account id) pairs; every user owns one account.
+    users: list[tuple[Row, str]]
+    snapshot_date: date
+
+
+def _timestamp(value: datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def _size_bucket(subscribers: int) -> str:
+    if subscribers < 10_000:
+        return "small"
+    if subscribers < 100_000:
+        return "medium"
+    if subscribers < 1_000_000:
+        return "large"
+    return "huge"
+
+
+def _channel_rows(
+    size: DatasetSize, rng: random.Random, today: date
+) -> tuple[list[Row], list[Row], list[Row]]:
+    catalog: list[Row] = []
+    overview: list[Row] = []
+    channels: list[Row] = []
+    updated_at = _timestamp(datetime.combine(today, time(6), tzinfo=UTC))
+    for index in range(size.channels):
+        channel_id = make_id(_CHANNEL, index)
+        adjective = _ADJECTIVES[index % len(_ADJECTIVES)]
+        noun = _NOUNS[(index // len(_ADJECTIVES)) % len(_NOUNS)]
+        name = f"{adjective.title()} {noun.title()} {index}"
+        username = f"{adjective}_{noun}_{index}"
+        country_code, _ = COUNTRIES[rng.randrange(len(COUNTRIES))]
+        category_slug, category_name = CATEGORIES[rng.randrange(len(CATEGORIES))]
+        subscribers = int(10 ** rng.uniform(2, 6.7))
+        engagement_rate = round(rng.uniform(0.2, 12.0), 2)
+        scam = rng.random() < 0.01
+        verified = not scam and rng.random() < 0.1
+        status = "scam" if scam else ("verified" if verified else "normal")
+        catalog.append(
+            {
+                "channel_id": channel_id,
+                "name": name,
+                "username": username,
+                "subscribers": subscribers,
+                "growth_24h": round(rng.uniform(-1.0, 3.0), 2),
+                "growth_7d": round(rng.uniform(-3.0, 12.0), 2),
+                "growth_30d": round(rng.uniform(-8.0, 40.0), 2) if rng.random() > 0.05 else None,
+                "engagement_rate": engagement_rate,
+                "category_slug": category_slug,
+                "category_name": category_name,
+                "country_code": country_code,
+                "status": status,
+                "verified": verified,
+                "scam": scam,
+                "size_bucket": _size_bucket(subscribers),
+                "updated_at": updated_at,
+                "search_name": name.lower(),
+                "search_username": username,
+                "search_tsv": fold_text(f"{name} {username} {category_name}"),
+            }
+        )
+        channels.append(
+            {
+                "id": channel_id,
+                "name": name,
+                "username": username,
+                "subscribers_current": subscribers,
+                "country_code": country_code,
+                "category_slug": category_slug,
+            }
+        )
+        if index < size.detailed_channels:
+            overview.append(
+                {
+                    "channel_id": channel_id,
+                    "telegram_channel_id": 1_000_000_000 + index,
+                    "name": name,
+                    "username": username,
+                    "avatar_url": f"https://cdn.example.com/avatars/{index}.jpg",
+                    "description": f"{name} covers {category_name.lower()} every day.",
+                    "status": status,
+                    "country_code": country_code,
+                    "category_slug": category_slug,
+                    "category_name": category_name,
+                    "about_text": f"About {name}.",
+                    "website_url": f"https://{username.replace('_', '-')}.example.com",
+                    "subscribers": subscribers,
+                    "avg_views": int(subscribers * rng.uniform(0.05, 0.6)),
+                    "engagement_rate": engagement_rate,
+                    "posts_per_day": round(rng.uniform(0.5, 12.0), 1),
+                    "incoming_30d": rng.randrange(0, 200),
+                    "outgoing_30d": rng.randrange(0, 200),
+                }
+            )
+    return catalog, overview, channels
+
+
+def _channel_detail_rows(
+    size: DatasetSize, rng: random.Random, today: date, catalog: list[Row]
+) -> dict[str, list[Row]]:
+    metrics: list[Row] = []
+    similarities: list[Row] = []
+    channel_tags: list[Row] = []
+    posts: list[Row] = []
+    tags = [
+        {"id": make_id(_TAG, index), "slug": f"tag-{index}", "name": f"Tag {index}"}
+        for index in range(50)
+    ]
+    now = datetime.combine(today, time(12), tzinfo=UTC)
+    detailed = min(size.detailed_channels, len(catalog))
+    for index in range(detailed):
+        row = catalog[index]
+        channel_id = row["channel_id"]
+        subscribers = row["subscribers"]
+        for day in range(size.metric_days):
+            metrics.append(
+                {
+                    "channel_id": channel_id,
+                    "metric_date": (today - timedelta(days=day)).isoformat(),
+                    "subscribers": max(0, subscribers - day * rng.randrange(0, 50)),
+                    "avg_views": int(subscribers * rng.uniform(0.05, 0.6)),
+                    "engagement_rate": round(rng.uniform(0.2, 12.0), 2),
+                    "posts_per_day": round(rng.uniform(0.5, 12.0), 1),
+                }
+            )
+        for similar in rng.sample(range(detailed), min(5, detailed - 1)):
+            if similar != index:
+                similarities.append(
+                    {
+                        "channel_id": channel_id,
+                        "similar_channel_id": catalog[similar]["channel_id"],
+                        "similarity_score": round(rng.random(), 3),
+                    }
+                )
+        for tag in rng.sample(tags, 3):
+            tag["usage_count"] = tag.get("usage_count", 0) + 1
+            channel_tags.append(
+                {
+                    "channel_id": channel_id,
+                    "tag_id": tag["id"],
+                    "relevance_score": round(rng.random(), 3),
+                }
+            )
+        for post in range(size.posts_per_channel):
+            post_index = index * size.posts_per_channel + post
+            published_at = now - timedelta(hours=post * 6 + rng.randrange(6))
+            posts.append(
+                {
+                    "id": make_id(_POST, post_index),
+                    "channel_id": channel_id,
+                    "telegram_message_id": post_index + 1,
+                    "published_at": _timestamp(published_at),
+                    "created_at": _timestamp(published_at),
+                    "title": f"Post {post} of {row['name']}",
+                    "content_text": f"Update {post} from {row['name']} on {row['category_name']}",
+                    "views_count": rng.randrange(100, 100_000),
+                    "reactions_count": rng.randrange(0, 2_000),
+                    "comments_count": rng.randrange(0, 500),
+                    "forwards_count": rng.randrange(0, 1_000),
+                    "external_post_url": f"https://t.me/{row['username']}/{post_index + 1}",
+                    "is_deleted": False,
+                }
+            )
+    return {
+        "channel_metrics_daily": metrics,
+        "channel_similarities": similarities,
+        "channel_tags": channel_tags,
+        "tags": tags,
+        "posts": posts,
+    }
+
+
+def _ranking_rows(rng: random.Random, today: date, catalog: list[Row]) -> dict[str, list[Row]]:
+    categories = [
+        {"id": make_id(_MISC, index), "slug": slug, "name": name}
+        for index, (slug, name) in enumerate(CATEGORIES)
+    ]
+    category_ids = {row["slug"]: row["id"] for row in categories}
+    by_subscribers = sorted(catalog, key=lambda row: row["subscribers"], reverse=True)
+    rankings: list[Row] = []
+    ranks: dict[tuple[str, str], int] = {}
+    for row in by_subscribers:
+        for scope, key in (("country", row["country_code"]), ("category", row["category_slug"])):
+            rank = ranks.get((scope, key), 0) + 1
+            if rank > _RANKING_DEPTH:
+                continue
+            ranks[(scope, key)] = rank
+            rankings.append(
+                {
+                    "id": make_id(_MISC, 1_000 + len(rankings)),
+                    "snapshot_date": today.isoformat(),
+                    "ranking_scope": scope,
+                    "country_code": key if scope == "country" else None,
+                    "category_id": category_ids[key] if scope == "category" else None,
+                    "channel_id": row["channel_id"],
+                    "rank": rank,
+                    "subscribers": row["subscribers"],
+                    "engagement_rate": row["engagement_rate"],
+                    "growth_7d": row["growth_7d"],
+                }
+            )
+    collections = [
+        {
+            "id": make_id(_COLLECTION, index),
+            "slug": f"collection-{index}",
+            "name": f"Collection {index}",
+            "description": f"Hand-picked channels #{index}",
+            "icon": "star",
+            "is_active": index < 5,
+        }
+        for index in range(6)
+    ]
+    collection_channels = [
+        {"collection_id": collection["id"], "channel_id": channel["channel_id"]}
+        for collection in collections
+        for channel in rng.sample(catalog, min(_COLLECTION_SIZE, len(catalog)))
+    ]
+    return {
+        "countries": [{"code": code, "name": name} for code, name in COUNTRIES],
+        "categories": categories,
+        "channel_rankings_daily": rankings,
+        "ranking_collections": collections,
+        "ranking_collection_channels": collection_channels,
+    }
+
+
+def _advertiser_rows(
+    size: DatasetSize, rng: random.Random, today: date, catalog: list[Row]
+) -> dict[str, list[Row]]:
+    industries = [
+        {"id": make_id(_MISC, 100 + index), "slug": slug, "name": name}
+        for index, (slug, name) in enumerate(INDUSTRIES)
+    ]
+    advertisers: list[Row] = []
+    metrics: list[Row] = []
+    creatives: list[Row] = []
+    top_channels: list[Row] = []
+    now = datetime.combine(today, time(12), tzinfo=UTC)
+    for index in range(size.advertisers):
+        advertiser_id = make_id(_ADVERTISER, index)
+        industry = industries[index % len(industries)]
+        name = f"{_ADJECTIVES[index % len(_ADJECTIVES)].title()} {industry['name']} {index}"
+        spend = round(rng.uniform(500, 250_000), 2)
+        advertisers.append(
+            {
+                "id": advertiser_id,
+                "name": name,
+                "slug": f"advertiser-{index}",
+                "industry_id": industry["id"],
+                "logo_url": f"https://cdn.example.com/logos/{index}.png",
+                "website_url": f"https://advertiser-{index}.example.com",
+                "description": f"{name} advertises {industry['name'].lower()} products.",
+                "active_creatives_count": size.creatives_per_advertiser,
+                "estimated_spend_current": spend,
+                "avg_engagement_rate_current": round(rng.uniform(0.5, 8.0), 2),
+                "total_ads_current": rng.randrange(1, 400),
+                "channels_used_current": rng.randrange(1, 80),
+                "trend_30d": round(rng.uniform(-30, 60), 2),
+            }
+        )
+        for offset in _SNAPSHOT_OFFSETS:
+            metrics.append(
+                {
+                    "advertiser_id": advertiser_id,
+                    "metric_date": (today - timedelta(days=offset)).isoformat(),
+                    "estimated_spend": round(spend * rng.uniform(0.6, 1.1), 2),
+                    "total_ads": rng.randrange(1, 400),
+                    "active_creatives": rng.randrange(1, size.creatives_per_advertiser + 1),
+                    "channels_used": rng.randrange(1, 80),
+                    "avg_engagement_rate": round(rng.uniform(0.5, 8.0), 2),
+                    "trend_percent": round(rng.uniform(-30, 60), 2),
+                }
+            )
+        for creative in range(size.creatives_per_advertiser):
+            posted_at = now - timedelta(hours=rng.randrange(24 * 90))
+            creatives.append(
+                {
+                    "id": make_id(_CREATIVE, index * size.creatives_per_advertiser + creative),
+                    "advertiser_id": advertiser_id,
+                    "posted_at": _timestamp(posted_at),
+                    "last_seen_at": _timestamp(posted_at + timedelta(hours=rng.randrange(72))),
+                }
+            )
+        for rank, channel in enumerate(rng.sample(catalog, min(10, len(catalog))), start=1):
+            top_channels.append(
+                {
+                    "advertiser_id": advertiser_id,
+                    "snapshot_date": today.isoformat(),
+                    "channel_id": channel["channel_id"],
+                    "rank": rank,
+                    "impressions": rng.randrange(1_000, 1_000_000),
+                    "estimated_spend": round(spend / (rank + 1), 2),
+                    "engagement_rate": channel["engagement_rate"],
+                }
+            )
+    return {
+        "industries": industries,
+        "advertisers": advertisers,
+        "advertiser_metrics_daily": metrics,
+        "ad_creatives": creatives,
+        "advertiser_top_channels_daily": top_channels,
+    }
+
+
+def _mini_app_rows(size: DatasetSize, rng: random.Random, today: date) -> dict[str, list[Row]]:
+    mini_apps: list[Row] = []
+    metrics: list[Row] = []
+    latest: list[Row] = []
+    for index in range(size.mini_apps):
+        mini_app_id = make_id(_MINI_APP, index)
+        category_slug, category_name = CATEGORIES[index % len(CATEGORIES)]
+        name = f"{_NOUNS[index % len(_NOUNS)].title()} {category_name} App {index}"
+        launched_at = (today - timedelta(days=rng.randrange(1, 720))).isoformat()
+        daily_users = int(10 ** rng.uniform(2, 6))
+        sessions = int(daily_users * rng.uniform(1.0, 4.0))
+        mini_apps.append({"id": mini_app_id, "name": name, "launched_at": launched_at})
+        for offset in _SNAPSHOT_OFFSETS:
+            metrics.append(
+                {
+                    "mini_app_id": mini_app_id,
+                    "metric_date": (today - timedelta(days=offset)).isoformat(),
+                    "daily_users": int(daily_users * rng.uniform(0.7, 1.1)),
+                    "sessions": int(sessions * rng.uniform(0.7, 1.1)),
+                    "avg_session_seconds": rng.randrange(30, 900),
+                }
+            )
+        latest.append(
+            {
+                "mini_app_id": mini_app_id,
+                "name": name,
+                "slug": f"mini-app-{index}",
+                "description": f"{name} for {category_name.lower()} fans.",
+                "category_slug": category_slug,
+                "daily_users": daily_users,
+                "total_users": daily_users * rng.randrange(5, 50),
+                "sessions": sessions,
+                "avg_session_seconds": rng.randrange(30, 900),
+                "rating": round(rng.uniform(2.5, 5.0), 1),
+                "growth_weekly": round(rng.uniform(-10, 40), 2),
+                "launched_at": launched_at,
+                "search_name": name.lower(),
+                "search_tsv": fold_text(f"{name} {category_name}"),
+            }
+        )
+    return {
+        "mini_apps": mini_apps,
+        "mini_app_metrics_daily": metrics,
+        "vw_mini_apps_latest": latest,
+    }
+
+
+def _account_rows(
+    size: DatasetSize, rng: random.Random, today: date, detailed: list[Row]
+) -> dict[str, list[Row]]:
+    users: list[Row] = []
+    accounts: list[Row] = []
+    team_members: list[Row] = []
+    trackers: list[Row] = []
+    notifications: list[Row] = []
+    counters: list[Row] = []
+    now = datetime.combine(today, time(12), tzinfo=UTC)
+    for index in range(size.users):
+        user_id = make_id(_USER, index)
+        account_id = make_id(_ACCOUNT, index)
+        users.append(
+            {
+                "id": user_id,
+                "email": f"user{index}@bench.example.com",
+                "first_name": "Bench",
+                "last_name": f"User {index}",
+                "created_at": _timestamp(now - timedelta(days=365)),
+            }
+        )
+        accounts.append(
+            {
+                "id": account_id,
+                "name": f"Account {index}",
+                "created_by": user_id,
+                "is_default": True,
+            }
+        )
+        team_members.append(
+            {
+                "id": make_id(_MISC, 10_000 + index),
+                "account_id": account_id,
+                "user_id": user_id,
+                "role": "owner",
+                "status": "accepted",
+                "deleted_at": None,
+            }
+        )
+        for tracker in range(size.trackers_per_account):
+            keyword = f"{_NOUNS[tracker % len(_NOUNS)]} {tracker}"
+            trackers.append(
+                {
+                    "id": make_id(_TRACKER, index * size.trackers_per_account + tracker),
+                    "account_id": account_id,
+                    "tracker_type": "keyword",
+                    "tracker_value": keyword,
+                    "normalized_value": keyword,
+                    "status": "active",
+                    "mentions_count": 0,
+                    "last_activity_at": None,
+                    "notify_push": True,
+                    "notify_telegram": False,
+                    "notify_email": False,
+                    "created_by": user_id,
+                    "updated_by": user_id,
+                    "updated_at": _timestamp(now - timedelta(days=30)),
+                    "deleted_at": None,
+                    "deleted_by": None,
+                }
+            )
+        unread = 0
+        for number in range(size.notifications_per_user):
+            is_read = number >= 5
+            unread += not is_read
+            created_at = now - timedelta(hours=number * 3)
+            notifications.append(
+                {
+                    "id": make_id(_NOTIFICATION, index * size.notifications_per_user + number),
+                    "user_id": user_id,
+                    "subject": f"Update {number}",
+                    "body": f"Something happened ({number}).",
+                    "type": "updates",
+                    "details": None,
+                    "cta": None,
+                    "is_read": is_read,
+                    "read_at": _timestamp(created_at + timedelta(hours=1)) if is_read else None,
+                    "created_at": _timestamp(created_at),
+                    "deleted_at": None,
+                }
+            )
+        counters.append({"user_id": user_id, "unread_count": unread})
+
+    mentions: list[Row] = []
+    if trackers and detailed:
+        span_seconds = 30 * 24 * 3600
+        for seq in range(1, size.mentions + 1):
+            tracker = trackers[rng.randrange(len(trackers))]
+            channel = detailed[rng.randrange(len(detailed))]
+            age = span_seconds * (size.mentions - seq) // size.mentions
+            mentioned_at = now - timedelta(seconds=age)
+            tracker["mentions_count"] += 1
+            tracker["last_activity_at"] = _timestamp(mentioned_at)
+            mentions.append(
+                {
+                    "id": make_id(_MENTION, seq),
+                    "account_id": tracker["account_id"],
+                    "tracker_id": tracker["id"],
+                    "mention_seq": seq,
+                    "channel_id": channel["channel_id"],
+                    "post_id": None,
+                    "mention_text": tracker["tracker_value"],
+                    "context_snippet": f"... {tracker['tracker_value']} in {channel['name']} ...",
+                    "mentioned_at": _timestamp(mentioned_at),
+                }
+            )
+    return {
+        "users": users,
+        "accounts": accounts,
+        "team_members": team_members,
+        "trackers": trackers,
+        "tracker_mentions": mentions,
+        "notifications": notifications,
+        "notification_counters": counters,
+    }
+
+
+def build_dataset(
+    size: DatasetSize | None = None, *, seed: int = 0, today: date | None = None
+) -> Dataset:
+    size = size or DatasetSize()
+    today = today or datetime.now(UTC).date()
+    rng = random.Random(seed)  # noqa: S311 - reproducible fixture data
+    catalog, overview, channels = _channel_rows(size, rng, today)
+    tables: dict[str, list[Row]] = {
+        "vw_catalog_channels": catalog,
+        "vw_channel_overview": overview,
+        "channels": channels,
+        **_channel_detail_rows(size, rng, today, catalog),
+        **_ranking_rows(rng, today, catalog),
+        **_advertiser_rows(size, rng, today, catalog),
+        **_mini_app_rows(size, rng, today),
+        **_account_rows(size, rng, today, catalog[: size.detailed_channels]),
+    }
+    return Dataset(
+        tables=tables,
+        detailed_channel_ids=[row["channel_id"] for row in overview],
+        advertiser_ids=[row["id"] for row in tables["advertisers"]],
+        users=[(user, account["id"]) for user, account in zip(tables["users"], tables["accounts"], strict=True)],
+        snapshot_date=today,
+    )
+
+
+def _search_rows(table: str, id_column: str | None = None):
+    """A `search_*` function: rows of `table` matching `search_query`, with `search_rank`."""
+
+    def search(client: InMemorySupabase, params: dict[str, Any]) -> list[Row]:
+        query = prefix_tsquery(str(params.get("search_query") or "")) or ""
+        rows = []
+        for row in client.rows(table):
+            document = row.get("search_tsv") or " ".join(
+                str(row.get(column) or "") for column in ("name", "description")
+            )
+            if text_matches(document, query):
+                rank = round(1.0 / (1 + len(document)), 6)
+                if id_column is None:
+                    rows.append({**row, "search_rank": rank})
+                else:
+                    rows.append({id_column: row["id"], "search_rank": rank})
+        return rows
+
+    return search
+
+
+def register_search_functions(client: InMemorySupabase) -> None:
+    client.register_rpc("search_catalog_channels", _search_rows("vw_catalog_channels"))
+    client.register_rpc("search_mini_apps_latest", _search_rows("vw_mini_apps_latest"))
+    client.register_rpc("search_advertisers", _search_rows("advertisers", "advertiser_id"))
+
+
+def seeded_client(
+    dataset: Dataset, *, latency: float = 0.0, latency_per_row: float = 0.0
+) -> InMemorySupabase:
+    client = InMemorySupabase(
+        dataset.tables,
+        latency=latency,
+        latency_per_row=latency_per_row,
+        max_rows=None,
+        primary_keys={
+            "notification_counters": ("user_id",),
+            "vw_catalog_channels": ("channel_id",),
+            "vw_channel_overview": ("channel_id",),
+            "vw_mini_apps_latest": ("mini_app_id",),
+        },
+        column_defaults=COLUMN_DEFAULTS,
+    )
+    register_search_functions(client)
+    return client
@@ -0,0 +1,765 @@
+"""In-memory stand-in for the supabase-py client.
+
+`InMemorySupabase` implements the part of the PostgREST builder API the crud
+layer uses: `select` (column lists, `count="exact"`, `head`), the comparison
+filters, `in_`, `is_`, `like`/`ilike`, `or_` with nested `and()`/`or()`,
+`text_search` over a plain-text `search_tsv`, `order` (with Postgres null
+ordering), `limit`/`range`, `single`/`maybe_single`, writes, and `rpc` for
+functions registered with `register_rpc`. Filter values are coerced to the
+type of the stored value the way Postgres casts PostgREST's text parameters,
+and ISO timestamps compare as instants.
+
+It is meant for tests and for `bench/`, so it also models the costs that
+matter there: every `execute()` can sleep for `latency` seconds (plus
+`latency_per_row` per returned row) to stand in for the network round trip,
+and responses are capped at `max_rows` like PostgREST's `db-max-rows`.
+Equality filters are answered from per-column hash indexes built on first use
+and dropped on writes, so seeding a million rows stays usable.
+"""
+
+import copy
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from collections.abc import Callable, Iterable, Mapping
+from datetime import UTC, date, datetime
+from functools import lru_cache
+from typing import Any
+
+from postgrest.exceptions import APIError
+
+Row = dict[str, Any]
+RpcFunction = Callable[["InMemorySupabase", dict[str, Any]], Any]
+_Predicate = Callable[[Row], bool]
+
+_TIMESTAMP_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_WORD_RE = re.compile(r"\w+")
+_COUNT_MODES = frozenset({"exact", "planned", "estimated"})
+
+
+class FakeResponse:
+    def __init__(self, data: Any, count: int | None = None) -> None:
+        self.data = data
+        self.count = count
+
+
+@lru_cache(maxsize=65536)
+def _parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+def _is_temporal(value: Any) -> bool:
+    return isinstance(value, str) and bool(_TIMESTAMP_RE.match(value) or _DATE_RE.match(value))
+
+
+def _to_instant(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=UTC)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=UTC)
+    if isinstance(value, str):
+        try:
+            return _parse_timestamp(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _coerce(value: Any, like: Any) -> Any:
+    """Cast a filter value to the type of the stored value it is compared with."""
+    if value is None or like is None:
+        return value
+    if isinstance(like, bool):
+        if isinstance(value, str):
+            return value.strip().lower() in {"true", "t", "1", "yes"}
+        return bool(value)
+    if isinstance(like, int | float):
+        if isinstance(value, str):
+            try:
+                return float(value) if isinstance(like, float) or "." in value else int(value)
+            except ValueError:
+                return value
+        return value
+    if isinstance(like, str) and not isinstance(value, str):
+        if isinstance(value, date | datetime):
+            return value.isoformat()
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return str(value)
+    return value
+
+
+def _comparable(stored: Any, value: Any) -> tuple[Any, Any]:
+    value = _coerce(value, stored)
+    temporal = (date, datetime)
+    if isinstance(stored, temporal) or isinstance(value, temporal):
+        return _to_instant(stored), _to_instant(value)
+    if isinstance(stored, str) and isinstance(value, str) and stored != value:
+        # A date-only bound against a timestamp column, or two offsets.
+        if (_TIMESTAMP_RE.match(stored) and _is_temporal(value)) or (
+            _TIMESTAMP_RE.match(value) and _is_temporal(stored)
+        ):
+            return _to_instant(stored), _to_instant(value)
+    return stored, value
+
+
+def _compare(stored: Any, operator: str, value: Any) -> bool:
+    if stored is None or value is None:
+        return False
+    left, right = _comparable(stored, value)
+    try:
+        if operator == "eq":
+            return left == right
+        if operator == "neq":
+            return left != right
+        if operator == "gt":
+            return left > right
+        if operator == "gte":
+            return left >= right
+        if operator == "lt":
+            return left < right
+        if operator == "lte":
+            return left <= right
+    except TypeError:
+        return False
+    raise ValueError(f"unsupported operator {operator!r}")
+
+
+@lru_cache(maxsize=4096)
+def _like_regex(pattern: str, case_insensitive: bool) -> re.Pattern[str]:
+    parts = []
+    for char in pattern:
+        if char in "*%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("^" + "".join(parts) + "$", re.IGNORECASE if case_insensitive else 0)
+
+
+def _like(stored: Any, pattern: str, *, case_insensitive: bool) -> bool:
+    if stored is None:
+        return False
+    return _like_regex(pattern, case_insensitive).match(str(stored)) is not None
+
+
+def _is(stored: Any, value: Any) -> bool:
+    if value is None or (isinstance(value, str) and value.lower() == "null"):
+        return stored is None
+    return stored is _coerce(value, True)
+
+
+def _in(stored: Any, values: Iterable[Any]) -> bool:
+    return stored is not None and any(_compare(stored, "eq", value) for value in values)
+
+
+def _contains(stored: Any, value: Any) -> bool:
+    if isinstance(stored, dict) and isinstance(value, Mapping):
+        return all(stored.get(key) == item for key, item in value.items())
+    if isinstance(stored, list | tuple):
+        return all(item in stored for item in value)
+    return False
+
+
+def fold_text(value: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+@lru_cache(maxsize=262144)
+def _tokens(document: str) -> frozenset[str]:
+    return frozenset(_WORD_RE.findall(fold_text(document)))
+
+
+def _has_token(tokens: frozenset[str], token: str, prefix: bool) -> bool:
+    return any(t.startswith(token) for t in tokens) if prefix else token in tokens
+
+
+def text_matches(document: str, query: str) -> bool:
+    """`websearch_to_tsquery` semantics: words are ANDed, `or` splits, `-` negates.
+
+    Words of a `to_tsquery` prefix query (`cryp:* & tele:*`) match lexeme prefixes.
+    """
+    tokens = _tokens(document)
+    for group in re.split(r"\s+or\s+", query.strip(), flags=re.IGNORECASE):
+        required: list[tuple[str, bool]] = []
+        excluded: list[tuple[str, bool]] = []
+        for word in group.split():
+            target = excluded if word.startswith("-") else required
+            prefix = word.endswith(":*")
+            target.extend((token, prefix) for token in _WORD_RE.findall(fold_text(word)))
+        if required and all(_has_token(tokens, *t) for t in required) and not any(
+            _has_token(tokens, *t) for t in excluded
+        ):
+            return True
+    return False
+
+
+def _text_document(row: Row, column: str) -> str:
+    value = row.get(column)
+    if isinstance(value, str):
+        return value
+    return " ".join(str(item) for item in row.values() if isinstance(item, str))
+
+
+def _split_top_level(expression: str) -> list[str]:
+    parts: list[str] = []
+    depth = 0
+    quoted = False
+    current: list[str] = []
+    for char in expression:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"')
+    return value
+
+
+def _condition(column: str, operator: str, value: Any) -> _Predicate:
+    if operator in {"eq", "neq", "gt", "gte", "lt", "lte"}:
+        return lambda row: _compare(row.get(column), operator, value)
+    if operator in {"like", "ilike"}:
+        case_insensitive = operator == "ilike"
+        return lambda row: _like(row.get(column), value, case_insensitive=case_insensitive)
+    if operator == "is":
+        return lambda row: _is(row.get(column), value)
+    if operator == "in":
+        values = list(value)
+        return lambda row: _in(row.get(column), values)
+    if operator == "cs":
+        return lambda row: _contains(row.get(column), value)
+    if operator in {"fts", "plfts", "phfts", "wfts"}:
+        return lambda row: text_matches(_text_document(row, column), value)
+    raise ValueError(f"unsupported operator {operator!r}")
+
+
+def _parse_logic_tree(expression: str) -> _Predicate:
+    """Compile a PostgREST `or=(...)` / `and=(...)` filter body into a predicate."""
+    match = re.match(r"^(not\.)?(and|or)\((.*)\)$", expression, re.DOTALL)
+    if match:
+        negate, combinator, body = match.groups()
+        children = [_parse_logic_tree(part) for part in _split_top_level(body)]
+        combine = all if combinator == "and" else any
+        predicate: _Predicate = lambda row: combine(child(row) for child in children)  # noqa: E731
+        return (lambda row: not predicate(row)) if negate else predicate
+
+    column, _, rest = expression.partition(".")
+    operator, _, raw_value = rest.partition(".")
+    negate = operator == "not"
+    if negate:
+        operator, _, raw_value = raw_value.partition(".")
+    value: Any
+    if operator == "in":
+        value = [_unquote(item) for item in _split_top_level(raw_value.strip("()"))]
+    elif operator == "cs":
+        value = [_unquote(item) for item in _split_top_level(raw_value.strip("{}"))]
+    else:
+        value = _unquote(raw_value)
+    condition = _condition(column, operator, value)
+    return (lambda row: not condition(row)) if negate else condition
+
+
+def _index_key(value: Any) -> Any:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int | float):
+        return int(value) if float(value).is_integer() else float(value)
+    if isinstance(value, date | datetime):
+        return value.isoformat()
+    return value if isinstance(value, str) else str(value)
+
+
+def _project(row: Row, columns: list[str] | None) -> Row:
+    if columns is None:
+        return dict(row)
+    return {column: row.get(column) for column in columns}
+
+
+def _parse_columns(columns: tuple[str, ...]) -> list[str] | None:
+    joined = ",".join(columns)
+    names: list[str] = []
+    for part in _split_top_level(joined):
+        if part == "*":
+            return None
+        if "(" in part:
+            # Embedded resources are not modeled.
+            continue
+        alias, _, source = part.partition(":")
+        names.append((source or alias).split("::")[0].strip())
+    return names or None
+
+
+class FakeTable:
+    def __init__(self, name: str, rows: Iterable[Row] = (), primary_key: tuple[str, ...] = ("id",)):
+        self.name = name
+        self.rows: list[Row] = list(rows)
+        self.primary_key = primary_key
+        # column -> (a stored value to coerce lookups to, value -> rows)
+        self._indexes: dict[str, tuple[Any, dict[Any, list[Row]]]] = {}
+
+        self._positions: dict[int, int] | None = None
+
+    def invalidate(self) -> None:
+        self._indexes.clear()
+        self._positions = None
+
+    def positions(self) -> dict[int, int]:
+        if self._positions is None:
+            self._positions = {id(row): index for index, row in enumerate(self.rows)}
+        return self._positions
+
+    def lookup(self, column: str, value: Any) -> list[Row]:
+        if column not in self._indexes:
+            sample = None
+            index: dict[Any, list[Row]] = {}
+            for row in self.rows:
+                stored = row.get(column)
+                if stored is not None:
+                    sample = stored if sample is None else sample
+                    index.setdefault(_index_key(stored), []).append(row)
+            self._indexes[column] = (sample, index)
+        sample, index = self._indexes[column]
+        return index.get(_index_key(_coerce(value, sample)), [])
+
+
+class FakeQuery:
+    """One PostgREST request; builder methods mutate and return the query."""
+
+    def __init__(
+        self,
+        client: "InMemorySupabase",
+        table: str,
+        *,
+        rpc: tuple[str, dict[str, Any]] | None = None,
+        count: str | None = None,
+        head: bool = False,
+    ) -> None:
+        self._client = client
+        self._table = table
+        self._rpc = rpc
+        self._action = "select"
+        self._payload: Any = None
+        self._columns: list[str] | None = None
+        self._count = count
+        self._head = head
+        self._returning = True
+        self._on_conflict: tuple[str, ...] | None = None
+        self._ignore_duplicates = False
+        self._filters: list[_Predicate] = []
+        # Positive eq / in_ filters, which can be answered from an index.
+        self._lookups: list[tuple[str, list[Any]]] = []
+        self._orders: list[tuple[str, bool, bool | None]] = []
+        self._limit: int | None = None
+        self._offset = 0
+        self._single: str | None = None
+        self._negate_next = False
+
+    # -- actions ---------------------------------------------------------
+
+    def select(self, *columns: str, count: str | None = None, head: bool | None = None):
+        self._columns = _parse_columns(columns) if columns else None
+        if count is not None:
+            self._count = count
+        if head is not None:
+            self._head = head
+        return self
+
+    def _write(
+        self, action: str, payload: Any, *, count: str | None, returning: Any
+    ) -> "FakeQuery":
+        self._action = action
+        self._payload = payload
+        self._count = count
+        self._returning = str(getattr(returning, "value", returning) or "representation") != (
+            "minimal"
+        )
+        return self
+
+    def insert(self, json: Any, *, count: str | None = None, returning: Any = None, **_kwargs):
+        return self._write("insert", json, count=count, returning=returning)
+
+    def upsert(
+        self,
+        json: Any,
+        *,
+        on_conflict: str = "",
+        ignore_duplicates: bool = False,
+        count: str | None = None,
+        returning: Any = None,
+        **_kwargs,
+    ):
+        if on_conflict:
+            self._on_conflict = tuple(part.strip() for part in on_conflict.split(","))
+        self._ignore_duplicates = ignore_duplicates
+        return self._write("upsert", json, count=count, returning=returning)
+
+    def update(self, json: Any, *, count: str | None = None, returning: Any = None, **_kwargs):
+        return self._write("update", json, count=count, returning=returning)
+
+    def delete(self, *, count: str | None = None, returning: Any = None, **_kwargs):
+        return self._write("delete", None, count=count, returning=returning)
+
+    # -- filters ---------------------------------------------------------
+
+    def _note_lookup(self, column: str, values: list[Any]) -> None:
+        # Timestamps can match in another format, so they are left to the scan.
+        if not self._negate_next and not any(_TIMESTAMP_RE.match(str(v)) for v in values):
+            self._lookups.append((column, values))
+
+    def _add(self, predicate: _Predicate) -> "FakeQuery":
+        if self._negate_next:
+            self._negate_next = False
+            self._filters.append(lambda row: not predicate(row))
+        else:
+            self._filters.append(predicate)
+        return self
+
+    @property
+    def not_(self) -> "FakeQuery":
+        self._negate_next = True
+        return self
+
+    def eq(self, column: str, value: Any):
+        self._note_lookup(column, [value])
+        return self._add(_condition(column, "eq", value))
+
+    def neq(self, column: str, value: Any):
+        return self._add(_condition(column, "neq", value))
+
+    def gt(self, column: str, value: Any):
+        return self._add(_condition(column, "gt", value))
+
+    def gte(self, column: str, value: Any):
+        return self._add(_condition(column, "gte", value))
+
+    def lt(self, column: str, value: Any):
+        return self._add(_condition(column, "lt", value))
+
+    def lte(self, column: str, value: Any):
+        return self._add(_condition(column, "lte", value))
+
+    def like(self, column: str, pattern: str):
+        return self._add(_condition(column, "like", pattern))
+
+    def ilike(self, column: str, pattern: str):
+        return self._add(_condition(column, "ilike", pattern))
+
+    def is_(self, column: str, value: Any):
+        return self._add(_condition(column, "is", value))
+
+    def in_(self, column: str, values: Iterable[Any]):
+        values = list(values)
+        self._note_lookup(column, values)
+        return self._add(_condition(column, "in", values))
+
+    def contains(self, column: str, value: Any):
+        return self._add(_condition(column, "cs", value))
+
+    def match(self, query: Mapping[str, Any]):
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def filter(self, column: str, operator: str, criteria: Any):
+        return self._add(_parse_logic_tree(f"{column}.{operator}.{criteria}"))
+
+    def or_(self, filters: str, reference_table: str | None = None):
+        return self._add(_parse_logic_tree(f"or({filters})"))
+
+    def text_search(self, column: str, query: str, options: Mapping[str, Any] | None = None):
+        return self._add(_condition(column, "fts", query))
+
+    # -- modifiers -------------------------------------------------------
+
+    def order(
+        self,
+        column: str,
+        *,
+        desc: bool = False,
+        nullsfirst: bool | None = None,
+        foreign_table: str | None = None,
+    ):
+        self._orders.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int, *, foreign_table: str | None = None):
+        self._limit = size
+        return self
+
+    def offset(self, size: int):
+        self._offset = size
+        return self
+
+    def range(self, start: int, end: int, foreign_table: str | None = None):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def single(self):
+        self._single = "single"
+        return self
+
+    def maybe_single(self):
+        self._single = "maybe_single"
+        return self
+
+    # -- execution -------------------------------------------------------
+
+    def _candidates(self, source: list[Row] | FakeTable) -> list[Row]:
+        if isinstance(source, FakeTable):
+            if self._lookups:
+                # The most selective indexed filter picks the rows to scan.
+                matches = [
+                    [source.lookup(column, value) for value in values]
+                    for column, values in self._lookups
+                ]
+                buckets = min(matches, key=lambda found: sum(map(len, found)))
+                if len(buckets) == 1:
+                    rows = buckets[0]
+                else:
+                    unique = {id(row): row for bucket in buckets for row in bucket}
+                    # Keep table order, as a scan would.
+                    position = source.positions()
+                    rows = sorted(unique.values(), key=lambda row: position[id(row)])
+            else:
+                rows = source.rows
+        else:
+            rows = source
+        if not self._filters:
+            return list(rows)
+        return [row for row in rows if all(predicate(row) for predicate in self._filters)]
+
+    def _sorted(self, rows: list[Row]) -> list[Row]:
+        # Stable sorts applied from the last key to the first.
+        for column, desc, nullsfirst in reversed(self._orders):
+            nulls_first = desc if nullsfirst is None else nullsfirst
+            present = [row for row in rows if row.get(column) is not None]
+            missing = [row for row in rows if row.get(column) is None]
+            present.sort(key=lambda row, c=column: _sort_key(row[c]), reverse=desc)
+            rows = missing + present if nulls_first else present + missing
+        return rows
+
+    def _window(self, rows: list[Row]) -> list[Row]:
+        end = None if self._limit is None else self._offset + self._limit
+        rows = rows[self._offset : end]
+        max_rows = self._client.max_rows
+        return rows[:max_rows] if max_rows is not None else rows
+
+    def _select(self) -> FakeResponse:
+        if self._rpc is not None:
+            source: list[Row] | FakeTable | Any = self._client._call_rpc(*self._rpc)
+            if not isinstance(source, list):
+                return FakeResponse(source)
+        else:
+            source = self._client._table(self._table)
+        rows = self._sorted(self._candidates(source))
+        total = len(rows) if self._count in _COUNT_MODES else None
+        data = [] if self._head else [_project(row, self._columns) for row in self._window(rows)]
+        return FakeResponse(data, total)
+
+    def _mutate(self) -> FakeResponse:
+        table = self._client._table(self._table)
+        if self._action in {"insert", "upsert"}:
+            changed = self._client._insert(
+                table,
+                self._payload,
+                upsert=self._action == "upsert",
+                on_conflict=self._on_conflict,
+                ignore_duplicates=self._ignore_duplicates,
+            )
+        elif self._action == "update":
+            changed = self._candidates(table)
+            for row in changed:
+                row.update(copy.deepcopy(self._payload))
+        else:
+            changed = self._candidates(table)
+            removed = {id(row) for row in changed}
+            table.rows = [row for row in table.rows if id(row) not in removed]
+        table.invalidate()
+        data = [_project(row, self._columns) for row in changed] if self._returning else []
+        return FakeResponse(data, len(changed) if self._count in _COUNT_MODES else None)
+
+    def execute(self) -> FakeResponse:
+        with self._client._lock:
+            self._client.executed += 1
+            response = self._select() if self._action == "select" else self._mutate()
+        self._client._sleep(response.data)
+        if self._single is not None and isinstance(response.data, list):
+            if len(response.data) > 1 or (self._single == "single" and not response.data):
+                raise APIError(
+                    {
+                        "code": "PGRST116",
+                        "message": "JSON object requested, multiple (or no) rows returned",
+                    }
+                )
+            response.data = response.data[0] if response.data else None
+            if response.data is None:
+                return None  # postgrest-py returns None for an empty maybe_single
+        return response
+
+
+def _sort_key(value: Any) -> Any:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, date | datetime) or _is_temporal(value):
+        return _to_instant(value)
+    return value
+
+
+class InMemorySupabase:
+    """Drop-in for `supabase.Client` backed by Python lists.
+
+    `tables` maps table and view names to rows. Views are just tables here:
+    seed them with the rows the real view would produce (see
+    `app.testing.seed`).
+    """
+
+    def __init__(
+        self,
+        tables: Mapping[str, Iterable[Row]] | None = None,
+        *,
+        latency: float = 0.0,
+        latency_per_row: float = 0.0,
+        max_rows: int | None = None,
+        primary_keys: Mapping[str, tuple[str, ...]] | None = None,
+        column_defaults: Mapping[str, Mapping[str, Any]] | None = None,
+    ) -> None:
+        self.latency = latency
+        self.latency_per_row = latency_per_row
+        self.max_rows = max_rows
+        self._primary_keys = dict(primary_keys or {})
+        # table -> column -> value, or a callable producing one, for inserted rows
+        self._column_defaults = {
+            name: dict(columns) for name, columns in (column_defaults or {}).items()
+        }
+        self._tables: dict[str, FakeTable] = {}
+        self._rpcs: dict[str, RpcFunction] = {}
+        self._lock = threading.RLock()
+        self.executed = 0
+        for name, rows in (tables or {}).items():
+            self.seed(name, rows)
+
+    # -- setup -----------------------------------------------------------
+
+    def seed(self, table: str, rows: Iterable[Row]) -> None:
+        with self._lock:
+            target = self._table(table)
+            target.rows.extend(rows)
+            target.invalidate()
+
+    def rows(self, table: str) -> list[Row]:
+        """The live row list of `table`, for assertions."""
+        return self._table(table).rows
+
+    def register_rpc(self, name: str, function: RpcFunction) -> None:
+        """Serve `client.rpc(name, params)` with `function(client, params)`.
+
+        A list of dicts can be filtered, ordered and paged like a table;
+        anything else is returned as `data` unchanged.
+        """
+        self._rpcs[name] = function
+
+    # -- supabase.Client surface -----------------------------------------
+
+    def table(self, table_name: str) -> FakeQuery:
+        return FakeQuery(self, table_name)
+
+    def from_(self, table_name: str) -> FakeQuery:
+        return self.table(table_name)
+
+    def rpc(
+        self,
+        fn: str,
+        params: dict[str, Any] | None = None,
+        count: str | None = None,
+        head: bool = False,
+        get: bool = False,
+    ) -> FakeQuery:
+        return FakeQuery(self, fn, rpc=(fn, dict(params or {})), count=count, head=head)
+
+    # -- internals -------------------------------------------------------
+
+    def _table(self, name: str) -> FakeTable:
+        table = self._tables.get(name)
+        if table is None:
+            table = FakeTable(name, primary_key=self._primary_keys.get(name, ("id",)))
+            self._tables[name] = table
+        return table
+
+    def _call_rpc(self, name: str, params: dict[str, Any]) -> Any:
+        function = self._rpcs.get(name)
+        if function is None:
+            raise APIError(
+                {"code": "PGRST202", "message": f"Could not find the function public.{name}"}
+            )
+        return function(self, params)
+
+    def _insert(
+        self,
+        table: FakeTable,
+        payload: Any,
+        *,
+        upsert: bool,
+        on_conflict: tuple[str, ...] | None,
+        ignore_duplicates: bool,
+    ) -> list[Row]:
+        records = payload if isinstance(payload, list) else [payload]
+        keys = on_conflict or table.primary_key
+        existing = {
+            tuple(_index_key(row.get(key)) for key in keys): row
+            for row in table.rows
+            if all(row.get(key) is not None for key in keys)
+        }
+        changed: list[Row] = []
+        for record in records:
+            row = copy.deepcopy(dict(record))
+            if table.primary_key == ("id",) and row.get("id") is None:
+                row["id"] = str(uuid.uuid4())
+            identity = tuple(_index_key(row.get(key)) for key in keys)
+            current = existing.get(identity) if None not in identity else None
+            if current is not None:
+                if not upsert:
+                    raise APIError(
+                        {
+                            "code": "23505",
+                            "message": f'duplicate key value violates unique constraint '
+                            f'"{table.name}_pkey"',
+                        }
+                    )
+                if not ignore_duplicates:
+                    current.update(row)
+                    changed.append(current)
+                continue
+            for column, default in self._column_defaults.get(table.name, {}).items():
+                if column not in row:
+                    row[column] = default() if callable(default) else default
+            table.rows.append(row)
+            existing[identity] = row
+            changed.append(row)
+        return changed
+
+    def _sleep(self, data: Any) -> None:
+        rows = len(data) if isinstance(data, list) else 0
+        delay = self.latency + self.latency_per_row * rows
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,24 @@
+import pytest
+
+from app.core.config import get_settings
+from app.core.query_metrics import query_metrics
+from app.core.response_cache import set_response_cache
+from app.crud.channel_cache import reset_channel_card_cache
+
+
+@pytest.fixture(autouse=True)
+def _reset_process_caches():
+    """Give every test fresh process-wide caches so cached rows never leak."""
+    set_response_cache(None)
+    reset_channel_card_cache()
+    query_metrics.reset()
+    yield
+    set_response_cache(None)
+    reset_channel_card_cache()
+    query_metrics.reset()
+
+
+@pytest.fixture(autouse=True)
+def _no_reference_data_warmup(monkeypatch):
+    """Keep app lifespans from querying Supabase for reference data unless a test asks to."""
+    monkeypatch.setattr(get_settings(), "warmup_reference_data", False)
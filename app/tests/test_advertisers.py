@@ -1,3 +1,4 @@
+import re
 from datetime import date, timedelta
 from typing import Any
 
@@ -79,6 +80,16 @@ class FakeSupabaseClient:
     def table(self, table_name: str):
         return FakeTableQuery(table_name, self.storage)
 
+    def rpc(self, fn: str, params: dict[str, Any], **_kwargs):
+        assert fn == "search_advertisers"
+        terms = set(re.findall(r"\w+", params["search_query"].lower()))
+        rows = []
+        for row in self.storage.get("advertisers", []):
+            tokens = re.findall(r"\w+", f"{row['name']} {row.get('description') or ''}".lower())
+            if terms <= set(tokens):
+                rows.append({"advertiser_id": row["id"], "search_rank": len(terms) / len(tokens)})
+        return FakeTableQuery(fn, {fn: rows})
+
 
 def _override_current_user():
     return {"id": "user-1", "email": "user@example.com"}
@@ -349,6 +360,23 @@ def test_list_advertisers_search_filters_and_activity_status():
         app.dependency_overrides = {}
 
 
+def test_list_advertisers_relevance_sort():
+    supabase_client = _get_fake_supabase()
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    try:
+        with TestClient(app) as client:
+            response = client.get("/v1.0/advertisers?q=crypto&sort_by=relevance")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [row["slug"] for row in body["data"]] == ["bybit", "binance"]
+        assert body["meta"]["total_estimate"] == 2
+    finally:
+        app.dependency_overrides = {}
+
+
 def test_list_advertisers_cursor_pagination_and_rank_continuation():
     supabase_client = _get_fake_supabase()
     app.dependency_overrides[get_supabase] = lambda: supabase_client
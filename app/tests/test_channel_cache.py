@@ -0,0 +1,70 @@
+import time
+
+from app.crud.channel_cache import ChannelCardCache, get_channel_cards
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeTableQuery:
+    def __init__(self, client, table_name: str):
+        self.client = client
+        self.table_name = table_name
+        self.ids: list[str] = []
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def in_(self, _field: str, values):
+        self.ids = list(values)
+        return self
+
+    def execute(self):
+        self.client.requested.append(self.ids)
+        rows = self.client.storage.get(self.table_name, [])
+        return FakeResponse([row.copy() for row in rows if row["id"] in self.ids])
+
+
+class FakeSupabaseClient:
+    def __init__(self, storage):
+        self.storage = storage
+        self.requested: list[list[str]] = []
+
+    def table(self, table_name: str):
+        return FakeTableQuery(self, table_name)
+
+
+def _storage():
+    return {
+        "channels": [
+            {"id": "ch-1", "name": "Tech News Daily", "username": "technewsdaily", "avatar_url": None},
+            {"id": "ch-2", "name": "Crypto Radar", "username": "cryptoradar", "avatar_url": None},
+        ]
+    }
+
+
+def test_get_channel_cards_only_fetches_misses_and_caches_unknown_ids():
+    supabase_client = FakeSupabaseClient(_storage())
+
+    first = get_channel_cards(supabase_client, ["ch-1", "ch-missing", "ch-1"])
+    second = get_channel_cards(supabase_client, ["ch-1", "ch-2", "ch-missing"])
+
+    assert set(first) == {"ch-1"}
+    assert set(second) == {"ch-1", "ch-2"}
+    assert supabase_client.requested == [["ch-1", "ch-missing"], ["ch-2"]]
+
+
+def test_channel_card_cache_expires_and_evicts():
+    cache = ChannelCardCache(max_entries=2, ttl_seconds=0.01)
+    cache.put_many({"ch-1": {"id": "ch-1"}, "ch-2": {"id": "ch-2"}, "ch-3": {"id": "ch-3"}})
+
+    hits, misses = cache.get_many(["ch-1", "ch-2", "ch-3"])
+    assert set(hits) == {"ch-2", "ch-3"}
+    assert misses == ["ch-1"]
+
+    time.sleep(0.02)
+    hits, misses = cache.get_many(["ch-2", "ch-3"])
+    assert hits == {}
+    assert misses == ["ch-2", "ch-3"]
@@ -1,8 +1,10 @@
+import json
 import re
 
 from fastapi.testclient import TestClient
 
 from app.api import deps
+from app.core.config import get_settings
 from app.db.base import get_supabase
 from app.main import app
 
@@ -13,6 +15,50 @@ class FakeResponse:
         self.count = count
 
 
+def _tokenize(value: str) -> list[str]:
+    return re.findall(r"\w+", value.lower())
+
+
+def _search_text(row: dict) -> str:
+    return f"{row.get('name', '')} {row.get('username') or ''}"
+
+
+_KEYSET_PATTERN = re.compile(
+    r'(\w+)\.(lt|gt)\."([^"]*)",and\(\1\.eq\."[^"]*",(\w+)\.(?:lt|gt)\."([^"]*)"\),\1\.is\.null'
+)
+_KEYSET_NULL_PATTERN = re.compile(r'and\((\w+)\.is\.null,(\w+)\.(lt|gt)\."([^"]*)"\)')
+
+
+def _typed(reference, text: str):
+    return type(reference)(text) if isinstance(reference, int | float) else text
+
+
+def _keyset_filter(condition: str):
+    """Row filter for the seek conditions built by `app.crud.keyset`, else None."""
+    match = _KEYSET_PATTERN.fullmatch(condition)
+    if match:
+        sort_field, op, value, key_field, key = match.groups()
+
+        def after(row):
+            row_value = row.get(sort_field)
+            if row_value is None:
+                return True
+            last = _typed(row_value, value)
+            if row_value == last:
+                return row[key_field] < key if op == "lt" else row[key_field] > key
+            return row_value < last if op == "lt" else row_value > last
+
+        return after
+
+    match = _KEYSET_NULL_PATTERN.fullmatch(condition)
+    if match:
+        sort_field, key_field, op, key = match.groups()
+        return lambda row: row.get(sort_field) is None and (
+            row[key_field] < key if op == "lt" else row[key_field] > key
+        )
+    return None
+
+
 class FakeTableQuery:
     def __init__(self, table_name: str, storage: dict[str, list[dict]]):
         self.table_name = table_name
@@ -35,6 +81,11 @@ class FakeTableQuery:
         self.filters.append(lambda row: row.get(field) == value)
         return self
 
+    def in_(self, field, values):
+        allowed = set(values)
+        self.filters.append(lambda row: row.get(field) in allowed)
+        return self
+
     def gte(self, field, value):
         self.filters.append(
             lambda row: row.get(field) is not None and row.get(field) >= value
@@ -48,6 +99,20 @@ class FakeTableQuery:
         return self
 
     def or_(self, condition: str):
+        keyset_filter = _keyset_filter(condition)
+        if keyset_filter is not None:
+            self.filters.append(keyset_filter)
+            return self
+
+        prefix_match = re.search(r"\.like\.([^*,]+)\*", condition)
+        if prefix_match:
+            prefix = prefix_match.group(1)
+            self.or_filters.append(
+                lambda row: str(row.get("name", "")).lower().startswith(prefix)
+                or str(row.get("username") or "").lower().startswith(prefix)
+            )
+            return self
+
         match = re.search(r"\*([^*]+)\*", condition)
         if not match:
             return self
@@ -59,6 +124,16 @@ class FakeTableQuery:
         )
         return self
 
+    def text_search(self, _column: str, query: str, options=None):
+        prefixes = _tokenize(query)
+        self.filters.append(
+            lambda row: all(
+                any(word.startswith(prefix) for word in _tokenize(_search_text(row)))
+                for prefix in prefixes
+            )
+        )
+        return self
+
     def order(self, field: str, desc: bool = False, **_kwargs):
         self.orders.append((field, desc))
         return self
@@ -108,6 +183,16 @@ class FakeSupabaseClient:
     def table(self, table_name: str):
         return FakeTableQuery(table_name, self.storage)
 
+    def rpc(self, fn: str, params: dict, **_kwargs):
+        assert fn == "search_catalog_channels"
+        terms = _tokenize(params["search_query"])
+        rows = []
+        for row in self.storage.get("vw_catalog_channels", []):
+            tokens = _tokenize(_search_text(row))
+            if set(terms) <= set(tokens):
+                rows.append({**row, "search_rank": len(terms) / len(tokens)})
+        return FakeTableQuery(fn, {fn: rows})
+
 
 def _override_current_user():
     return {"id": "user-1", "email": "user@example.com"}
@@ -381,6 +466,71 @@ def test_list_channels_search_and_filters():
         app.dependency_overrides = {}
 
 
+def test_list_channels_relevance_sort():
+    supabase_client = _get_fake_supabase()
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    try:
+        with TestClient(app) as client:
+            response = client.get("/v1.0/channels?q=crypto&sort_by=relevance&verified=true")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [row["name"] for row in body["data"]] == ["Crypto Alpha", "Crypto Growth Radar"]
+        assert body["meta"]["total_estimate"] == 2
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_list_channels_relevance_sort_without_query_falls_back_to_subscribers():
+    supabase_client = _get_fake_supabase()
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    try:
+        with TestClient(app) as client:
+            response = client.get("/v1.0/channels?sort_by=relevance&limit=2")
+
+        assert response.status_code == 200
+        names = [row["name"] for row in response.json()["data"]]
+        assert names == ["Tech News Daily", "Crypto Growth Radar"]
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_list_channels_short_query_uses_prefix_match():
+    supabase_client = _get_fake_supabase()
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    try:
+        with TestClient(app) as client:
+            response = client.get("/v1.0/channels?q=@te")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [row["name"] for row in body["data"]] == ["Tech News Daily"]
+        assert body["meta"]["total_estimate"] == 1
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_list_channels_partial_words_match_as_prefixes():
+    supabase_client = _get_fake_supabase()
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    try:
+        with TestClient(app) as client:
+            response = client.get("/v1.0/channels?q=cryp alph")
+
+        assert response.status_code == 200
+        assert [row["name"] for row in response.json()["data"]] == ["Crypto Alpha"]
+    finally:
+        app.dependency_overrides = {}
+
+
 def test_list_channels_cursor_pagination():
     supabase_client = _get_fake_supabase()
     app.dependency_overrides[get_supabase] = lambda: supabase_client
@@ -409,6 +559,51 @@ def test_list_channels_cursor_pagination():
         app.dependency_overrides = {}
 
 
+def test_list_channels_streams_ndjson_across_keyset_pages(monkeypatch):
+    monkeypatch.setattr(get_settings(), "stream_page_size", 2)
+    supabase_client = _get_fake_supabase()
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    try:
+        with TestClient(app) as client:
+            listing = client.get("/v1.0/channels?limit=200&sort_by=subscribers&sort_order=desc")
+            streamed = client.get(
+                "/v1.0/channels?format=ndjson&limit=1&sort_by=subscribers&sort_order=desc"
+            )
+
+        assert streamed.status_code == 200
+        assert streamed.headers["content-type"] == "application/x-ndjson"
+        assert "etag" not in streamed.headers
+        rows = [json.loads(line) for line in streamed.text.splitlines()]
+        expected = listing.json()["data"]
+        assert len(rows) == len(expected) > 2
+        assert [row["channel_id"] for row in rows] == [row["channel_id"] for row in expected]
+        assert set(rows[0]) == set(expected[0])
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_list_channels_streams_csv_with_header():
+    supabase_client = _get_fake_supabase()
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    try:
+        with TestClient(app) as client:
+            response = client.get("/v1.0/channels?format=csv&q=tech")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/csv; charset=utf-8"
+        assert response.headers["content-disposition"] == 'attachment; filename="channels.csv"'
+        header, *lines = response.text.splitlines()
+        assert header.split(",")[:2] == ["channel_id", "name"]
+        assert len(lines) == 1
+        assert "Tech News Daily" in lines[0]
+    finally:
+        app.dependency_overrides = {}
+
+
 def test_list_channels_requires_auth():
     supabase_client = _get_fake_supabase()
     app.dependency_overrides[get_supabase] = lambda: supabase_client
@@ -422,6 +617,27 @@ def test_list_channels_requires_auth():
         app.dependency_overrides = {}
 
 
+def test_list_channels_authenticated_response_is_privately_cacheable():
+    supabase_client = _get_fake_supabase()
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+    auth_headers = {"Authorization": "Bearer test-token"}
+
+    try:
+        with TestClient(app) as client:
+            response = client.get("/v1.0/channels?limit=2", headers=auth_headers)
+            not_modified = client.get(
+                "/v1.0/channels?limit=2",
+                headers={**auth_headers, "If-None-Match": response.headers["etag"]},
+            )
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "private, max-age=300, stale-while-revalidate=3600"
+        assert not_modified.status_code == 304
+    finally:
+        app.dependency_overrides = {}
+
+
 def test_list_channels_invalid_cursor():
     supabase_client = _get_fake_supabase()
     app.dependency_overrides[get_supabase] = lambda: supabase_client
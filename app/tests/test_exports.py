@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.core.config import get_settings
+from app.db.base import get_supabase
+from app.main import app
+from app.services import exports
+from app.services.exports import expire_exports, export_file_path, process_export_job
+
+ACCOUNT_ID = "acct-1"
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeTableQuery:
+    def __init__(self, client: FakeSupabaseClient, table_name: str):
+        self.client = client
+        self.table_name = table_name
+        self.filters: list = []
+        self.action = "select"
+        self.payload: dict[str, Any] | None = None
+        self.orders: list[tuple[str, bool]] = []
+        self.limit_value: int | None = None
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def eq(self, field, value):
+        self.filters.append(lambda row: row.get(field) == value)
+        return self
+
+    def is_(self, field, _value):
+        self.filters.append(lambda row: row.get(field) is None)
+        return self
+
+    def in_(self, field, values):
+        self.filters.append(lambda row: row.get(field) in values)
+        return self
+
+    def gt(self, field, value):
+        self.filters.append(lambda row: str(row.get(field)) > str(value))
+        return self
+
+    def gte(self, field, value):
+        self.filters.append(lambda row: row.get(field) >= value)
+        return self
+
+    def lt(self, field, value):
+        self.filters.append(lambda row: row.get(field) is not None and str(row.get(field)) < str(value))
+        return self
+
+    def lte(self, field, value):
+        self.filters.append(lambda row: row.get(field) <= value)
+        return self
+
+    def order(self, field: str, desc: bool = False, **_kwargs):
+        self.orders.append((field, desc))
+        return self
+
+    def limit(self, value: int):
+        self.limit_value = value
+        return self
+
+    def insert(self, payload: dict):
+        self.action = "insert"
+        self.payload = payload
+        return self
+
+    def update(self, payload: dict):
+        self.action = "update"
+        self.payload = payload
+        return self
+
+    def execute(self):
+        self.client.calls.append((self.action, self.table_name))
+        table = self.client.storage.setdefault(self.table_name, [])
+        if self.action == "insert":
+            row = {
+                "id": f"exp-{len(table) + 1}",
+                "status": "queued",
+                "rows_exported": 0,
+                "created_at": f"2026-02-14T12:00:0{len(table)}+00:00",
+                **self.payload,
+            }
+            table.append(row)
+            return FakeResponse([row.copy()])
+
+        rows = [row for row in table if all(check(row) for check in self.filters)]
+        if self.action == "update":
+            for row in rows:
+                row.update(self.payload)
+            return FakeResponse([row.copy() for row in rows])
+
+        rows = [row.copy() for row in rows]
+        for field, desc in reversed(self.orders):
+            rows.sort(key=lambda row: row.get(field), reverse=desc)
+        if self.limit_value is not None:
+            rows = rows[: self.limit_value]
+        return FakeResponse(rows)
+
+
+class FakeRpc:
+    def __init__(self, client: FakeSupabaseClient, fn_name: str, params: dict[str, Any]):
+        self.client = client
+        self.fn_name = fn_name
+        self.params = params
+
+    def execute(self):
+        self.client.calls.append(("rpc", self.fn_name))
+        if self.fn_name == "increment_account_exports":
+            self.client.usage[self.params["p_account_id"]] = (
+                self.client.usage.get(self.params["p_account_id"], 0) + 1
+            )
+            return FakeResponse(None)
+
+        assert self.fn_name == "claim_export_job"
+        for job in self.client.storage["export_jobs"]:
+            if job["status"] == "queued" and self.params["p_job_id"] in (None, job["id"]):
+                job.update({"status": "processing", "started_at": "2026-02-14T12:00:10+00:00"})
+                return FakeResponse([job.copy()])
+        return FakeResponse([])
+
+
+class FakeSupabaseClient:
+    def __init__(self, storage: dict[str, list[dict[str, Any]]]):
+        self.storage = storage
+        self.calls: list[tuple[str, str]] = []
+        self.usage: dict[str, int] = {}
+
+    def table(self, table_name: str):
+        return FakeTableQuery(self, table_name)
+
+    def rpc(self, fn_name: str, params: dict[str, Any], **_kwargs):
+        return FakeRpc(self, fn_name, params)
+
+
+def _channel(index: int, country_code: str) -> dict[str, Any]:
+    return {
+        "channel_id": f"ch-{index:02d}",
+        "telegram_channel_id": 1000 + index,
+        "name": f"Channel, {index}",
+        "username": None,
+        "country_code": country_code,
+        "status": "verified" if index % 2 else "normal",
+        "verified": bool(index % 2),
+        "subscribers": 100 * index,
+        "engagement_rate": 1.5,
+        "updated_at": "2026-02-14T00:00:00+00:00",
+    }
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "export_storage_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "export_page_size", 2)
+    return {
+        "team_members": [
+            {"account_id": ACCOUNT_ID, "user_id": "member", "role": "viewer", "status": "accepted", "deleted_at": None}
+        ],
+        "vw_catalog_channels": [_channel(index, "US" if index != 3 else "DE") for index in range(1, 7)],
+        "export_jobs": [],
+    }
+
+
+def _client_for(storage: dict[str, list[dict[str, Any]]], user_id: str) -> FakeSupabaseClient:
+    supabase_client = FakeSupabaseClient(storage)
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = lambda: {"id": user_id}
+    return supabase_client
+
+
+def test_channels_export_streams_pages_into_gzipped_csv(storage):
+    supabase_client = _client_for(storage, "member")
+    headers = {"X-Account-Id": ACCOUNT_ID}
+    try:
+        with TestClient(app) as client:
+            created = client.post(
+                f"/v1.0/accounts/{ACCOUNT_ID}/exports",
+                headers=headers,
+                json={"export_type": "channels_csv", "filters": {"country_code": "US", "subscribers_min": 200}},
+            )
+            export_id = created.json()["data"]["export_id"]
+            job = client.get(f"/v1.0/accounts/{ACCOUNT_ID}/exports/{export_id}", headers=headers)
+            listing = client.get(f"/v1.0/accounts/{ACCOUNT_ID}/exports", headers=headers)
+            download = client.get(f"/v1.0/accounts/{ACCOUNT_ID}/exports/{export_id}/download", headers=headers)
+
+        assert created.status_code == 202
+        assert created.json()["data"]["status"] == "queued"
+        data = job.json()["data"]
+        assert (data["status"], data["rows_exported"]) == ("completed", 4)
+        assert data["file_url"] == f"/v1.0/accounts/{ACCOUNT_ID}/exports/{export_id}/download"
+        assert data["file_size_bytes"] > 0
+        assert [item["export_id"] for item in listing.json()["data"]] == [export_id]
+
+        assert download.status_code == 200
+        rows = list(csv.reader(io.StringIO(gzip.decompress(download.content).decode("utf-8"))))
+        assert rows[0][:3] == ["channel_id", "telegram_channel_id", "name"]
+        assert [row[0] for row in rows[1:]] == ["ch-02", "ch-04", "ch-05", "ch-06"]
+        assert rows[1][2] == "Channel, 2"
+        assert rows[1][7] == "false"
+
+        # 4 rows at 2 per page: two full pages and the empty page that ends the scan.
+        assert supabase_client.calls.count(("select", "vw_catalog_channels")) == 3
+        assert supabase_client.usage == {ACCOUNT_ID: 1}
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_export_rejects_unknown_filters_and_non_members(storage):
+    try:
+        with TestClient(app) as client:
+            _client_for(storage, "member")
+            invalid = client.post(
+                f"/v1.0/accounts/{ACCOUNT_ID}/exports",
+                headers={"X-Account-Id": ACCOUNT_ID},
+                json={"export_type": "channels_csv", "filters": {"search_tsv": "x"}},
+            )
+            _client_for(storage, "stranger")
+            forbidden = client.post(
+                f"/v1.0/accounts/{ACCOUNT_ID}/exports",
+                headers={"X-Account-Id": ACCOUNT_ID},
+                json={"export_type": "channels_csv"},
+            )
+
+        assert invalid.status_code == 400
+        assert "search_tsv" in invalid.json()["detail"]
+        assert forbidden.status_code == 403
+        assert storage["export_jobs"] == []
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_ndjson_export_and_expiry_cleanup(storage):
+    storage["export_jobs"].append(
+        {
+            "id": "exp-1",
+            "account_id": ACCOUNT_ID,
+            "export_type": "channels_csv",
+            "format": "ndjson",
+            "filters": {"verified": True},
+            "status": "queued",
+            "rows_exported": 0,
+            "created_at": "2026-02-14T12:00:00+00:00",
+        }
+    )
+    supabase_client = FakeSupabaseClient(storage)
+
+    assert process_export_job(supabase_client)["id"] == "exp-1"
+    assert process_export_job(supabase_client) is None
+    assert storage["export_jobs"][0]["heartbeat_at"] > storage["export_jobs"][0]["started_at"]
+
+    path = export_file_path(ACCOUNT_ID, "exp-1", "ndjson")
+    lines = [json.loads(line) for line in gzip.decompress(path.read_bytes()).splitlines()]
+    assert [line["channel_id"] for line in lines] == ["ch-01", "ch-03", "ch-05"]
+    assert lines[0]["username"] is None
+
+    job = storage["export_jobs"][0]
+    expires_at = datetime.fromisoformat(job["expires_at"])
+    assert expire_exports(supabase_client, now=expires_at - timedelta(minutes=1)) == 0
+    assert expire_exports(supabase_client, now=expires_at + timedelta(minutes=1)) == 1
+    assert not path.exists()
+    assert (job["status"], job["file_url"]) == ("expired", None)
+    assert expires_at > datetime.now(UTC)
+
+
+def test_export_worker_backs_off_while_jobs_keep_failing(monkeypatch):
+    outcomes = [RuntimeError("database unreachable")] * 3 + [{"id": "exp-1"}, None]
+    waits = []
+
+    def process(_client):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    class Stop:
+        def is_set(self) -> bool:
+            return not outcomes
+
+        def wait(self, seconds: float) -> None:
+            waits.append(seconds)
+
+    monkeypatch.setattr(exports, "process_export_job", process)
+    pool = exports.ExportWorkerPool(object(), workers=1, poll_seconds=1, max_backoff_seconds=3)
+    pool._stop = Stop()
+    pool._run()
+
+    assert waits == [1, 2, 3, 1]
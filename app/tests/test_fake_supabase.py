@@ -0,0 +1,166 @@
+import pytest
+from postgrest.exceptions import APIError
+
+from app.crud.keyset import keyset_condition
+from app.testing import supabase as fake_module
+from app.testing.seed import DatasetSize, build_dataset, seeded_client
+from app.testing.supabase import InMemorySupabase
+from bench import endpoints
+
+
+def _client() -> InMemorySupabase:
+    return InMemorySupabase(
+        {
+            "channels": [
+                {
+                    "id": "a",
+                    "subscribers": 300,
+                    "score": 1.5,
+                    "verified": True,
+                    "deleted_at": None,
+                    "created_at": "2026-01-02T10:00:00+00:00",
+                },
+                {
+                    "id": "b",
+                    "subscribers": 100,
+                    "score": None,
+                    "verified": False,
+                    "deleted_at": None,
+                    "created_at": "2026-01-01T23:30:00Z",
+                },
+                {
+                    "id": "c",
+                    "subscribers": 200,
+                    "score": 0.5,
+                    "verified": True,
+                    "deleted_at": "2026-01-03T00:00:00Z",
+                    "created_at": "2026-01-03T08:00:00Z",
+                },
+            ]
+        }
+    )
+
+
+def _ids(response) -> list[str]:
+    return [row["id"] for row in response.data]
+
+
+def test_filters_coerce_values_like_postgrest():
+    client = _client()
+
+    assert _ids(client.table("channels").select("id").gte("subscribers", "200").execute()) == [
+        "a",
+        "c",
+    ]
+    assert _ids(client.table("channels").select("id").eq("verified", "true").execute()) == [
+        "a",
+        "c",
+    ]
+    assert _ids(client.table("channels").select("id").in_("id", ["c", "b"]).execute()) == [
+        "b",
+        "c",
+    ]
+    assert _ids(client.table("channels").select("id").is_("deleted_at", "null").execute()) == [
+        "a",
+        "b",
+    ]
+    # A date-only bound against timestamps, and timestamps in different offsets.
+    assert _ids(
+        client.table("channels").select("id").gte("created_at", "2026-01-02").execute()
+    ) == ["a", "c"]
+    before = client.table("channels").select("id").lt("created_at", "2026-01-02T01:00:00+01:00")
+    assert _ids(before.execute()) == ["b"]
+    assert _ids(client.table("channels").select("id").not_.eq("id", "a").execute()) == ["b", "c"]
+
+
+def test_order_range_count_and_keyset_or():
+    client = _client()
+
+    response = (
+        client.table("channels")
+        .select("id", count="exact")
+        .order("score", desc=True, nullsfirst=False)
+        .range(0, 1)
+        .execute()
+    )
+    assert _ids(response) == ["a", "c"]
+    assert response.count == 3
+    # Postgres puts nulls first in descending order unless told otherwise.
+    assert _ids(client.table("channels").select("id").order("score", desc=True).execute())[0] == "b"
+
+    head = client.table("channels").select("id", count="exact", head=True).execute()
+    assert (head.data, head.count) == ([], 3)
+
+    condition = keyset_condition(
+        "subscribers", "id", {"subscribers": 300, "id": "a"}, desc=True
+    )
+    after = client.table("channels").select("id").or_(condition).execute()
+    assert _ids(after) == ["b", "c"]
+
+    nested = client.table("channels").select("id").or_(
+        'and(verified.eq.true,subscribers.lt.250),id.eq."b"'
+    )
+    assert _ids(nested.execute()) == ["b", "c"]
+
+
+def test_writes_keep_indexes_current():
+    client = _client()
+    assert _ids(client.table("channels").select("id").eq("subscribers", 100).execute()) == ["b"]
+
+    inserted = client.table("channels").insert({"subscribers": 100}).execute().data[0]
+    assert inserted["id"]
+    with pytest.raises(APIError):
+        client.table("channels").insert({"id": "a"}).execute()
+
+    client.table("channels").upsert({"id": "a", "subscribers": 100}).execute()
+    updated = client.table("channels").update({"subscribers": 5}, count="exact").eq("id", "b")
+    assert updated.execute().count == 1
+    client.table("channels").delete().eq("id", "c").execute()
+
+    assert _ids(client.table("channels").select("id").eq("subscribers", 100).execute()) == [
+        "a",
+        inserted["id"],
+    ]
+    assert len(client.rows("channels")) == 3
+
+
+def test_text_search_rpc_and_simulated_latency(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(fake_module.time, "sleep", sleeps.append)
+    dataset = build_dataset(DatasetSize.for_channels(200), seed=1)
+    client = seeded_client(dataset, latency=0.002, latency_per_row=0.0001)
+
+    matched = (
+        client.table("vw_catalog_channels")
+        .select("channel_id, name")
+        .text_search("search_tsv", "daily -news", options={"type": "web_search"})
+        .limit(5)
+        .execute()
+        .data
+    )
+    assert matched
+    assert all("Daily" in row["name"] and "News" not in row["name"] for row in matched)
+    assert set(matched[0]) == {"channel_id", "name"}
+
+    ranked = (
+        client.rpc("search_catalog_channels", {"search_query": "daily"}, get=True)
+        .select("*")
+        .order("search_rank", desc=True)
+        .limit(3)
+        .execute()
+        .data
+    )
+    assert len(ranked) == 3 and "search_rank" in ranked[0]
+    assert sleeps == [pytest.approx(0.0025), pytest.approx(0.0023)]
+
+
+def test_bench_scenarios_run_cleanly_on_seeded_data():
+    report = endpoints.run(
+        channels=200, requests=3, warmup=0, seed=0, latency_ms=0, response_cache=False
+    )
+
+    results = {result["scenario"]: result for result in report["results"]}
+    assert set(results) == {scenario.name for scenario in endpoints.SCENARIOS}
+    for result in results.values():
+        assert result["errors"] == 0, result
+        assert result["queries_per_request"] >= 1
@@ -203,6 +203,48 @@ def test_get_home_categories_is_public_without_auth():
         app.dependency_overrides = {}
 
 
+def test_get_home_categories_sets_cache_headers_and_honors_if_none_match():
+    supabase_client = _get_fake_supabase()
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+
+    try:
+        with TestClient(app) as client:
+            response = client.get("/v1.0/home/categories?limit=2")
+            etag = response.headers["etag"]
+            not_modified = client.get(
+                "/v1.0/home/categories?limit=2",
+                headers={"If-None-Match": etag},
+            )
+            reordered = client.get("/v1.0/home/categories?cursor=&limit=2")
+            other_page = client.get("/v1.0/home/categories?limit=3")
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "public, max-age=300, stale-while-revalidate=3600"
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["etag"] == etag
+        assert not_modified.headers["cache-control"] == response.headers["cache-control"]
+        assert reordered.headers["etag"] == etag
+        assert other_page.headers["etag"] != etag
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_get_home_categories_error_response_is_not_cached():
+    supabase_client = _get_fake_supabase()
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+
+    try:
+        with TestClient(app) as client:
+            response = client.get("/v1.0/home/categories?cursor=not-a-valid-cursor")
+
+        assert response.status_code == 400
+        assert "etag" not in response.headers
+        assert "cache-control" not in response.headers
+    finally:
+        app.dependency_overrides = {}
+
+
 def test_get_home_countries_base_response_shape():
     supabase_client = _get_fake_supabase()
     app.dependency_overrides[get_supabase] = lambda: supabase_client
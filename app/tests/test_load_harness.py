@@ -0,0 +1,57 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from bench import load
+
+
+def test_load_mix_runs_in_process_against_the_fake_without_errors():
+    async def scenario():
+        with load.fake_backend(
+            channels=200, users=3, seed=0, latency_ms=0, response_cache=False
+        ) as (emails, channel_ids):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await load.run_load(
+                    client=client,
+                    emails=emails,
+                    channel_ids=channel_ids,
+                    mix={name: 1 for name in load.OPERATIONS},
+                    concurrency=3,
+                    duration=None,
+                    requests=60,
+                )
+
+    report = asyncio.run(scenario())
+
+    assert report["overall"]["requests"] == 60
+    assert report["overall"]["errors"] == 0, report["operations"]
+    assert set(report["operations"]) == set(load.OPERATIONS)
+    assert report["overall"]["p50_ms"] <= report["overall"]["p99_ms"]
+
+
+def test_compare_flags_slower_p95_lower_throughput_and_new_errors():
+    def stats(p95_ms, throughput_rps, error_rate=0.0):
+        return {"p95_ms": p95_ms, "throughput_rps": throughput_rps, "error_rate": error_rate}
+
+    baseline = {
+        "overall": stats(50, 100),
+        "operations": {"catalog": stats(40, 60), "overview": stats(10, 40)},
+    }
+    report = {
+        "overall": stats(55, 95),
+        "operations": {
+            "catalog": stats(70, 60),
+            "overview": stats(10.5, 25, error_rate=0.05),
+            "signin": stats(500, 1),
+        },
+    }
+
+    regressions = load.compare(report, baseline, tolerance=0.2)
+
+    assert regressions == [
+        "catalog: p95 70 ms > 40 ms baseline",
+        "overview: throughput 25/s < 40/s baseline",
+        "overview: error rate 0.05 > 0.0 baseline",
+    ]
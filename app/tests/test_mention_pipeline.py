@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+
+import pytest
+
+from app.services import mention_matcher, mention_pipeline
+from app.services.mention_matcher import AhoCorasick, TrackerMatcher
+from app.services.mention_pipeline import process_next_batch
+
+ACCOUNT_A = "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
+ACCOUNT_B = "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb"
+
+
+class FakeResponse:
+    def __init__(self, data: list[dict[str, Any]]):
+        self.data = data
+
+
+class FakeTableQuery:
+    def __init__(self, client: FakeSupabaseClient, table_name: str):
+        self.client = client
+        self.table_name = table_name
+        self.filters: list = []
+        self.orders: list[tuple[str, bool]] = []
+        self.limit_value: int | None = None
+        self.range_bounds: tuple[int, int] | None = None
+        self.upsert_rows: list[dict[str, Any]] | None = None
+        self.upsert_kwargs: dict[str, Any] = {}
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def eq(self, field: str, value: Any):
+        self.filters.append(lambda row: row.get(field) == value)
+        return self
+
+    def is_(self, field: str, _value: str):
+        self.filters.append(lambda row: row.get(field) is None)
+        return self
+
+    def gte(self, field: str, value: Any):
+        self.filters.append(lambda row: row.get(field) >= value)
+        return self
+
+    def or_(self, condition: str):
+        created_at, post_id = re.match(
+            r'created_at\.gt\."([^"]+)",and\(created_at\.eq\."[^"]+",id\.gt\.([^)]+)\)',
+            condition,
+        ).groups()
+        self.filters.append(lambda row: (row["created_at"], row["id"]) > (created_at, post_id))
+        return self
+
+    def order(self, field: str, desc: bool = False, **_kwargs):
+        self.orders.append((field, desc))
+        return self
+
+    def limit(self, count: int):
+        self.limit_value = count
+        return self
+
+    def range(self, start: int, end: int):
+        self.range_bounds = (start, end)
+        return self
+
+    def upsert(self, rows, **kwargs):
+        self.upsert_rows = rows if isinstance(rows, list) else [rows]
+        self.upsert_kwargs = kwargs
+        return self
+
+    def execute(self) -> FakeResponse:
+        self.client.calls.append(self.table_name)
+        table = self.client.storage.setdefault(self.table_name, [])
+        if self.upsert_rows is not None:
+            return FakeResponse(self._execute_upsert(table))
+
+        rows = [row.copy() for row in table if all(check(row) for check in self.filters)]
+        for field, desc in reversed(self.orders):
+            rows.sort(key=lambda row: row.get(field), reverse=desc)
+        if self.range_bounds is not None:
+            rows = rows[self.range_bounds[0] : self.range_bounds[1] + 1]
+        elif self.limit_value is not None:
+            rows = rows[: self.limit_value]
+        return FakeResponse(rows)
+
+    def _execute_upsert(self, table: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        conflict_fields = self.upsert_kwargs["on_conflict"].split(",")
+        written: list[dict[str, Any]] = []
+        for new_row in self.upsert_rows:
+            key = tuple(new_row.get(field) for field in conflict_fields)
+            existing = next(
+                (row for row in table if tuple(row.get(field) for field in conflict_fields) == key),
+                None,
+            )
+            if existing is not None:
+                if not self.upsert_kwargs.get("ignore_duplicates"):
+                    existing.update(new_row)
+                    written.append(existing.copy())
+                continue
+            table.append(new_row.copy())
+            written.append(new_row.copy())
+        return written
+
+
+class FakeRpc:
+    def __init__(self, client: FakeSupabaseClient, fn_name: str, params: dict[str, Any]):
+        self.client = client
+        self.fn_name = fn_name
+        self.params = params
+
+    def execute(self) -> FakeResponse:
+        self.client.calls.append(f"rpc:{self.fn_name}")
+        for count in self.params["counts"]:
+            for tracker in self.client.storage["trackers"]:
+                if tracker["id"] == count["tracker_id"]:
+                    tracker["mentions_count"] += count["mentions"]
+                    tracker["last_activity_at"] = max(
+                        tracker["last_activity_at"] or "",
+                        count["last_activity_at"],
+                    )
+        return FakeResponse([])
+
+
+class FakeSupabaseClient:
+    def __init__(self, storage: dict[str, list[dict[str, Any]]]):
+        self.storage = storage
+        self.calls: list[str] = []
+
+    def table(self, table_name: str):
+        return FakeTableQuery(self, table_name)
+
+    def rpc(self, fn_name: str, params: dict[str, Any], **_kwargs):
+        return FakeRpc(self, fn_name, params)
+
+
+def _tracker(tracker_id: str, account_id: str, tracker_type: str, value: str, **overrides) -> dict:
+    row = {
+        "id": tracker_id,
+        "account_id": account_id,
+        "tracker_type": tracker_type,
+        "tracker_value": value,
+        "normalized_value": value.lower(),
+        "status": "active",
+        "deleted_at": None,
+        "mentions_count": 0,
+        "last_activity_at": None,
+        "updated_at": "2026-02-14T00:00:00+00:00",
+    }
+    row.update(overrides)
+    return row
+
+
+def _post(post_id: str, created_at: str, content_text: str, title: str | None = None) -> dict:
+    return {
+        "id": post_id,
+        "channel_id": "ch-1",
+        "title": title,
+        "content_text": content_text,
+        "published_at": created_at,
+        "created_at": created_at,
+        "is_deleted": False,
+    }
+
+
+def test_aho_corasick_reports_overlapping_matches():
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+
+    matches = sorted((automaton.patterns[index], end) for index, end in automaton.iter_matches("ushers"))
+
+    assert matches == [("he", 4), ("hers", 6), ("she", 4)]
+
+
+def test_tracker_matcher_respects_word_boundaries_and_channel_handles():
+    matcher = TrackerMatcher()
+    matcher.apply_tracker(_tracker("t-1", ACCOUNT_A, "keyword", "Bitcoin Price"))
+    matcher.apply_tracker(_tracker("t-2", ACCOUNT_B, "keyword", "bitcoin price"))
+    matcher.apply_tracker(_tracker("t-3", ACCOUNT_A, "keyword", "eth"))
+    matcher.apply_tracker(_tracker("t-4", ACCOUNT_A, "channel", "@technewsdaily"))
+
+    matched = matcher.match("the bitcoin price method via t.me/technewsdaily")
+    assert sorted(match.tracker.tracker_id for match in matched) == ["t-1", "t-2", "t-4"]
+
+    assert [match.tracker.tracker_id for match in matcher.match("eth, then @technewsdailyx")] == ["t-3"]
+
+
+def test_tracker_matcher_applies_pause_and_delete_incrementally():
+    matcher = TrackerMatcher()
+    matcher.apply_tracker(_tracker("t-1", ACCOUNT_A, "keyword", "ton"))
+    matcher.apply_tracker(_tracker("t-2", ACCOUNT_B, "keyword", "ton"))
+    assert len(matcher.match("ton rally")) == 2
+
+    matcher.apply_tracker(_tracker("t-1", ACCOUNT_A, "keyword", "ton", status="paused"))
+    assert [match.tracker.tracker_id for match in matcher.match("ton rally")] == ["t-2"]
+
+    matcher.apply_tracker(_tracker("t-2", ACCOUNT_B, "keyword", "ton", deleted_at="2026-02-15T00:00:00Z"))
+    assert matcher.match("ton rally") == []
+    assert len(matcher) == 0
+
+
+def test_reapplying_an_unchanged_tracker_keeps_the_automaton():
+    matcher = TrackerMatcher()
+    matcher.apply_tracker(_tracker("t-1", ACCOUNT_A, "keyword", "ton"))
+    matcher.apply_tracker(_tracker("t-2", ACCOUNT_B, "keyword", "ton"))
+    automaton = matcher._get_automaton()
+
+    matcher.apply_tracker(_tracker("t-1", ACCOUNT_A, "keyword", "ton", mentions_count=5))
+    matcher.apply_tracker(_tracker("t-2", ACCOUNT_B, "keyword", "TON"))
+    assert matcher._get_automaton() is automaton
+
+    matcher.apply_tracker(_tracker("t-2", ACCOUNT_B, "keyword", "ethereum"))
+    assert matcher._get_automaton() is not automaton
+    assert [match.tracker.tracker_id for match in matcher.match("ton")] == ["t-1"]
+
+
+def test_apply_tracker_change_updates_process_matcher_only_once_created():
+    tracker = {
+        "tracker_id": "t-1",
+        "account_id": ACCOUNT_A,
+        "tracker_type": "keyword",
+        "tracker_value": "TON",
+        "status": "active",
+    }
+    mention_matcher.reset_tracker_matcher()
+    try:
+        mention_matcher.apply_tracker_change(tracker)
+        matcher = mention_matcher.get_tracker_matcher()
+        assert len(matcher) == 0
+
+        mention_matcher.apply_tracker_change(tracker)
+        assert [match.tracker.tracker_id for match in matcher.match("ton")] == ["t-1"]
+
+        mention_matcher.apply_tracker_removal("t-1")
+        assert matcher.match("ton") == []
+    finally:
+        mention_matcher.reset_tracker_matcher()
+
+
+def test_process_next_batch_inserts_mentions_and_updates_counters():
+    storage = {
+        "trackers": [
+            _tracker("t-1", ACCOUNT_A, "keyword", "bitcoin price"),
+            _tracker("t-2", ACCOUNT_B, "keyword", "ethereum"),
+            _tracker("t-3", ACCOUNT_A, "keyword", "solana", status="paused"),
+        ],
+        "posts": [
+            _post("p-1", "2026-02-14T10:00:00+00:00", "Bitcoin   price hits a new high"),
+            _post("p-2", "2026-02-14T11:00:00+00:00", "Ethereum and bitcoin price update", title="Daily"),
+            _post("p-3", "2026-02-14T12:00:00+00:00", "Solana outage"),
+        ],
+        "tracker_mentions": [],
+        "tracker_match_cursors": [],
+    }
+    supabase_client = FakeSupabaseClient(storage)
+    matcher = TrackerMatcher()
+
+    first = process_next_batch(supabase_client, matcher=matcher, batch_size=2)
+
+    assert (first.posts_scanned, first.mentions_inserted, first.trackers_updated) == (2, 3, 2)
+    mentions = sorted((row["tracker_id"], row["post_id"]) for row in storage["tracker_mentions"])
+    assert mentions == [("t-1", "p-1"), ("t-1", "p-2"), ("t-2", "p-2")]
+    assert storage["tracker_mentions"][0]["context_snippet"] == "Bitcoin price hits a new high"
+    assert storage["trackers"][0]["mentions_count"] == 2
+    assert storage["trackers"][0]["last_activity_at"] == "2026-02-14T11:00:00+00:00"
+    assert storage["tracker_match_cursors"][0]["last_post_id"] == "p-2"
+    assert supabase_client.calls.count("tracker_mentions") == 1
+    assert supabase_client.calls.count("rpc:apply_tracker_mention_counts") == 1
+
+    second = process_next_batch(supabase_client, matcher=matcher, batch_size=2)
+    assert (second.posts_scanned, second.mentions_inserted) == (1, 0)
+
+    third = process_next_batch(supabase_client, matcher=matcher, batch_size=2)
+    assert third.posts_scanned == 0
+
+
+def test_process_next_batch_skips_already_stored_mentions_when_replayed():
+    storage = {
+        "trackers": [_tracker("t-1", ACCOUNT_A, "keyword", "ton")],
+        "posts": [_post("p-1", "2026-02-14T10:00:00+00:00", "TON is up")],
+        "tracker_mentions": [
+            {"tracker_id": "t-1", "post_id": "p-1", "mentioned_at": "2026-02-14T10:00:00+00:00"}
+        ],
+        "tracker_match_cursors": [],
+    }
+    supabase_client = FakeSupabaseClient(storage)
+
+    result = process_next_batch(supabase_client, matcher=TrackerMatcher(), batch_size=10)
+
+    assert result.mentions_inserted == 0
+    assert storage["trackers"][0]["mentions_count"] == 0
+    assert len(storage["tracker_mentions"]) == 1
+
+
+class _StopPipeline(BaseException):
+    pass
+
+
+def test_run_mention_pipeline_backs_off_and_keeps_going_after_errors(monkeypatch):
+    outcomes = [
+        RuntimeError("PostgREST unavailable"),
+        RuntimeError("PostgREST unavailable"),
+        mention_pipeline.MentionBatchResult(posts_scanned=0),
+    ]
+    sleeps = []
+
+    def next_batch(_client, *, batch_size):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if not outcomes:
+            raise _StopPipeline
+
+    monkeypatch.setattr(mention_pipeline, "process_next_batch", next_batch)
+    monkeypatch.setattr(mention_pipeline.time, "sleep", sleep)
+
+    with pytest.raises(_StopPipeline):
+        mention_pipeline.run_mention_pipeline(object(), idle_seconds=1, max_backoff_seconds=1.5)
+
+    assert sleeps == [1, 1.5, 1]
@@ -28,6 +28,14 @@ def _coerce_value(value: Any) -> Any:
     return value
 
 
+def _tokenize(value: str) -> list[str]:
+    return re.findall(r"\w+", value.lower())
+
+
+def _search_text(row: dict[str, Any]) -> str:
+    return f"{row.get('name', '')} {row.get('slug', '')} {row.get('description') or ''}"
+
+
 class FakeTableQuery:
     def __init__(self, table_name: str, storage: dict[str, list[dict]]):
         self.table_name = table_name
@@ -81,6 +89,12 @@ class FakeTableQuery:
         return self
 
     def or_(self, condition: str):
+        prefix_match = re.search(r"\.like\.([^*,]+)\*", condition)
+        if prefix_match:
+            prefix = prefix_match.group(1)
+            self.or_filters.append(lambda row: str(row.get("name", "")).lower().startswith(prefix))
+            return self
+
         match = re.search(r"\*([^*]+)\*", condition)
         if not match:
             return self
@@ -93,6 +107,16 @@ class FakeTableQuery:
         )
         return self
 
+    def text_search(self, _column: str, query: str, options=None):
+        prefixes = _tokenize(query)
+        self.filters.append(
+            lambda row: all(
+                any(word.startswith(prefix) for word in _tokenize(_search_text(row)))
+                for prefix in prefixes
+            )
+        )
+        return self
+
     def order(self, field: str, desc: bool = False, **_kwargs):
         self.orders.append((field, desc))
         return self
@@ -142,6 +166,16 @@ class FakeSupabaseClient:
     def table(self, table_name: str):
         return FakeTableQuery(table_name, self.storage)
 
+    def rpc(self, fn: str, params: dict[str, Any], **_kwargs):
+        assert fn == "search_mini_apps_latest"
+        terms = _tokenize(params["search_query"])
+        rows = []
+        for row in self.storage.get("vw_mini_apps_latest", []):
+            tokens = _tokenize(_search_text(row))
+            if set(terms) <= set(tokens):
+                rows.append({**row, "search_rank": len(terms) / len(tokens)})
+        return FakeTableQuery(fn, {fn: rows})
+
 
 def _override_current_user():
     return {"id": "user-1", "email": "user@example.com"}
@@ -372,6 +406,23 @@ def test_list_mini_apps_search_and_filters():
         app.dependency_overrides = {}
 
 
+def test_list_mini_apps_relevance_sort():
+    supabase_client = _get_fake_supabase()
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    try:
+        with TestClient(app) as client:
+            response = client.get("/v1.0/mini-apps?q=crypto&sort_by=relevance")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [row["name"] for row in body["data"]] == ["Wallet", "Hamster Kombat"]
+        assert body["meta"]["total_estimate"] == 2
+    finally:
+        app.dependency_overrides = {}
+
+
 def test_list_mini_apps_sort_by_growth_desc():
     supabase_client = _get_fake_supabase()
     app.dependency_overrides[get_supabase] = lambda: supabase_client
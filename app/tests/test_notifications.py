@@ -0,0 +1,507 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.api.routes.notifications import mark_all_notifications_read, stream_notifications
+from app.core.config import get_settings
+from app.crud.notification import create_notification
+from app.db.base import get_supabase
+from app.main import app
+from app.services import notification_stream
+from app.services.notification_retention import purge_expired_notifications
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+ACCOUNT_ID = "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
+
+INSERT_DEFAULTS = {
+    "notifications": {"is_read": False, "read_at": None},
+    "notification_fanout_jobs": {
+        "status": "queued",
+        "total_recipients": None,
+        "delivered_count": 0,
+        "last_user_id": None,
+        "error_message": None,
+        "completed_at": None,
+    },
+}
+
+
+class FakeResponse:
+    def __init__(self, data: list[dict[str, Any]], count: int | None = None):
+        self.data = data
+        self.count = count
+
+
+class FakeTableQuery:
+    def __init__(self, table_name: str, storage: dict[str, list[dict[str, Any]]]):
+        self.table_name = table_name
+        self.storage = storage
+        self.filters: list = []
+        self.orders: list[tuple[str, bool]] = []
+        self.limit_value: int | None = None
+        self.count_mode: str | None = None
+        self.insert_data: dict[str, Any] | None = None
+        self.update_data: dict[str, Any] | None = None
+        self.update_kwargs: dict[str, Any] = {}
+
+    def insert(self, data: dict[str, Any]):
+        self.insert_data = data
+        return self
+
+    def update(self, data: dict[str, Any], **kwargs):
+        self.update_data = data
+        self.update_kwargs = kwargs
+        return self
+
+    def select(self, *_args, count: str | None = None, **_kwargs):
+        self.count_mode = count
+        return self
+
+    def eq(self, field: str, value: Any):
+        self.filters.append(lambda row: row.get(field) == value)
+        return self
+
+    def is_(self, field: str, _value: str):
+        self.filters.append(lambda row: row.get(field) is None)
+        return self
+
+    def in_(self, field: str, values: list[Any]):
+        self.filters.append(lambda row: row.get(field) in values)
+        return self
+
+    def order(self, field: str, desc: bool = False, **_kwargs):
+        self.orders.append((field, desc))
+        return self
+
+    def limit(self, count: int):
+        self.limit_value = count
+        return self
+
+    def execute(self) -> FakeResponse:
+        table = self.storage.setdefault(self.table_name, [])
+        if self.insert_data is not None:
+            row = {
+                "id": f"n-{len(table) + 1}",
+                **INSERT_DEFAULTS.get(self.table_name, {}),
+                **self.insert_data,
+            }
+            row.setdefault("created_at", "2026-02-14T12:00:00+00:00")
+            table.append(row)
+            return FakeResponse([row.copy()])
+        if self.update_data is not None:
+            updated = []
+            for row in table:
+                if all(check(row) for check in self.filters):
+                    row.update(self.update_data)
+                    updated.append(row.copy())
+            count = len(updated) if self.update_kwargs.get("count") else None
+            if self.update_kwargs.get("returning") == "minimal":
+                return FakeResponse([], count=count)
+            return FakeResponse(updated, count=count)
+
+        rows = [
+            row.copy()
+            for row in self.storage.get(self.table_name, [])
+            if all(check(row) for check in self.filters)
+        ]
+        for field, desc in reversed(self.orders):
+            rows.sort(key=lambda row: row[field], reverse=desc)
+        count = len(rows) if self.count_mode == "exact" else None
+        if self.limit_value is not None:
+            rows = rows[: self.limit_value]
+        return FakeResponse(rows, count=count)
+
+
+class FakeFanoutBatch:
+    """Emulates `run_notification_fanout_batch` for explicit user lists and accounts."""
+
+    def __init__(self, storage: dict[str, list[dict[str, Any]]], params: dict[str, Any]):
+        self.storage = storage
+        self.params = params
+
+    def _recipients(self, job: dict[str, Any]) -> list[str]:
+        if job["target_type"] == "account":
+            candidates = {
+                member["user_id"]
+                for member in self.storage.get("team_members", [])
+                if member["account_id"] == job["target_account_id"]
+                and member["status"] == "accepted"
+            }
+        else:
+            candidates = set(job["target_user_ids"])
+        return sorted(
+            user["id"]
+            for user in self.storage.get("users", [])
+            if user["id"] in candidates and user.get("deleted_at") is None
+        )
+
+    def execute(self) -> FakeResponse:
+        job = next(
+            row for row in self.storage["notification_fanout_jobs"] if row["id"] == self.params["p_job_id"]
+        )
+        recipients = self._recipients(job)
+        if job["total_recipients"] is None:
+            job["total_recipients"] = len(recipients)
+        pending = [user_id for user_id in recipients if user_id > (job["last_user_id"] or "")]
+        batch = pending[: self.params["p_batch_size"]]
+        notifications = self.storage.setdefault("notifications", [])
+        for user_id in batch:
+            notifications.append(
+                {
+                    "id": f"f-{len(notifications) + 1}",
+                    "user_id": user_id,
+                    "subject": job["subject"],
+                    "body": job["body"],
+                    "is_read": False,
+                }
+            )
+        done = len(batch) < self.params["p_batch_size"]
+        job["delivered_count"] += len(batch)
+        job["last_user_id"] = batch[-1] if batch else job["last_user_id"]
+        job["status"] = "completed" if done else "processing"
+        return FakeResponse(
+            [
+                {
+                    "inserted": len(batch),
+                    "delivered_count": job["delivered_count"],
+                    "total_recipients": job["total_recipients"],
+                    "done": done,
+                }
+            ]
+        )
+
+
+class FakePurge:
+    """Emulates `purge_notifications` with ISO timestamp comparisons."""
+
+    def __init__(self, storage: dict[str, list[dict[str, Any]]], params: dict[str, Any]):
+        self.storage = storage
+        self.params = params
+
+    def execute(self) -> FakeResponse:
+        notifications = self.storage["notifications"]
+        doomed = [
+            row
+            for row in notifications
+            if row["created_at"] < self.params["p_created_before"]
+            or (row["deleted_at"] or "9999") < self.params["p_deleted_before"]
+        ][: self.params["p_batch_size"]]
+        for row in doomed:
+            notifications.remove(row)
+            if self.params["p_archive"]:
+                self.storage.setdefault("notifications_archive", []).append(row)
+        return FakeResponse(len(doomed))
+
+
+class FakeSupabaseClient:
+    def __init__(self, storage: dict[str, list[dict[str, Any]]]):
+        self.storage = storage
+        self.table_calls: list[str] = []
+        self.rpc_calls: list[str] = []
+
+    def table(self, table_name: str):
+        self.table_calls.append(table_name)
+        return FakeTableQuery(table_name, self.storage)
+
+    def rpc(self, fn_name: str, params: dict[str, Any], **_kwargs):
+        self.rpc_calls.append(fn_name)
+        if fn_name == "purge_notifications":
+            return FakePurge(self.storage, params)
+        assert fn_name == "run_notification_fanout_batch"
+        return FakeFanoutBatch(self.storage, params)
+
+
+@pytest.fixture(autouse=True)
+def _reset_notification_broker():
+    notification_stream.reset_notification_broker()
+    yield
+    notification_stream.reset_notification_broker()
+
+
+def _notification(notification_id: str, created_at: str, *, is_read: bool) -> dict[str, Any]:
+    return {
+        "id": notification_id,
+        "user_id": USER_ID,
+        "subject": f"Subject {notification_id}",
+        "body": "Body",
+        "type": "welcome",
+        "details": None,
+        "cta": None,
+        "is_read": is_read,
+        "read_at": None,
+        "created_at": created_at,
+        "deleted_at": None,
+    }
+
+
+def _setup(counters: list[dict[str, Any]]) -> FakeSupabaseClient:
+    client = FakeSupabaseClient(
+        {
+            "notifications": [
+                _notification("n-1", "2026-02-14T10:00:00+00:00", is_read=False),
+                _notification("n-2", "2026-02-14T11:00:00+00:00", is_read=True),
+            ],
+            "notification_counters": counters,
+        }
+    )
+    app.dependency_overrides[get_supabase] = lambda: client
+    app.dependency_overrides[deps.get_current_user] = lambda: {"id": USER_ID}
+    return client
+
+
+def test_unread_count_reads_counter_row_instead_of_counting():
+    supabase_client = _setup([{"user_id": USER_ID, "unread_count": 7}])
+    try:
+        with TestClient(app) as client:
+            unread = client.get("/v1.0/notifications/count?is_read=false")
+            total = client.get("/v1.0/notifications/count")
+
+        assert unread.json() == {"count": 7}
+        assert total.json() == {"count": 2}
+        assert supabase_client.table_calls == ["notification_counters", "notifications"]
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_list_notifications_includes_unread_count_on_request():
+    _setup([])
+    try:
+        with TestClient(app) as client:
+            plain = client.get("/v1.0/notifications")
+            combined = client.get("/v1.0/notifications?include_unread_count=true&limit=1")
+
+        assert plain.json()["unread_count"] is None
+        body = combined.json()
+        assert [item["id"] for item in body["items"]] == ["n-2"]
+        assert body["unread_count"] == 0
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_mark_read_only_touches_unread_rows_and_returns_count():
+    supabase_client = _setup([])
+    supabase_client.storage["notifications"].append(
+        _notification("n-3", "2026-02-14T12:00:00+00:00", is_read=False)
+    )
+    supabase_client.storage["notifications"][1]["read_at"] = "2026-02-14T11:30:00+00:00"
+    try:
+        with TestClient(app) as client:
+            single = client.post("/v1.0/notifications/n-2/read")
+            missing = client.post("/v1.0/notifications/n-404/read")
+            first = client.post("/v1.0/notifications/read")
+            second = client.post("/v1.0/notifications/read")
+
+        assert single.status_code == 200
+        assert single.json()["read_at"].startswith("2026-02-14T11:30:00")
+        assert missing.status_code == 404
+        assert first.json() == {"updated": 2}
+        assert second.json() == {"updated": 0}
+        assert all(row["is_read"] for row in supabase_client.storage["notifications"])
+        assert supabase_client.storage["notifications"][1]["read_at"] == "2026-02-14T11:30:00+00:00"
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_purge_expired_notifications_runs_in_bounded_batches():
+    notifications = [
+        _notification("old-1", "2025-06-01T00:00:00+00:00", is_read=True),
+        _notification("old-2", "2025-07-01T00:00:00+00:00", is_read=False),
+        _notification("old-3", "2025-08-01T00:00:00+00:00", is_read=True),
+        _notification("deleted", "2026-02-01T00:00:00+00:00", is_read=True),
+        _notification("recent-deleted", "2026-02-10T00:00:00+00:00", is_read=True),
+        _notification("fresh", "2026-02-14T00:00:00+00:00", is_read=False),
+    ]
+    notifications[3]["deleted_at"] = "2026-01-01T00:00:00+00:00"
+    notifications[4]["deleted_at"] = "2026-02-12T00:00:00+00:00"
+    supabase_client = FakeSupabaseClient({"notifications": list(notifications)})
+
+    result = purge_expired_notifications(
+        supabase_client,
+        now=datetime(2026, 2, 15, tzinfo=UTC),
+        retention_days=180,
+        deleted_retention_days=30,
+        batch_size=2,
+        archive=True,
+    )
+
+    assert (result.purged, result.batches, result.drained) == (4, 3, True)
+    assert [row["id"] for row in supabase_client.storage["notifications"]] == ["recent-deleted", "fresh"]
+    assert len(supabase_client.storage["notifications_archive"]) == 4
+
+    capped = purge_expired_notifications(
+        FakeSupabaseClient({"notifications": [dict(row) for row in notifications[:3]]}),
+        now=datetime(2026, 2, 15, tzinfo=UTC),
+        batch_size=1,
+        max_batches=2,
+    )
+    assert (capped.purged, capped.drained) == (2, False)
+
+
+def test_notification_stream_sends_unread_count_and_closes_cleanly(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "notification_stream_heartbeat_seconds", 0.05)
+    monkeypatch.setattr(settings, "notification_stream_max_seconds", 0.12)
+    _setup([{"user_id": USER_ID, "unread_count": 3}])
+    try:
+        with TestClient(app) as client:
+            response = client.get("/v1.0/notifications/stream")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "event: unread_count\ndata: {\"unread_count\": 3}" in response.text
+        assert ": keepalive" in response.text
+        assert notification_stream.get_notification_broker().subscriber_count == 0
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_notification_stream_unsubscribes_when_closed_before_the_first_event():
+    client = _setup([])
+    broker = notification_stream.get_notification_broker()
+
+    async def run() -> int:
+        response = await stream_notifications(current_user={"id": USER_ID}, client=client)
+        stream = response.body_iterator
+        assert (await anext(stream)).startswith("retry:")
+        subscribers = broker.subscriber_count
+        await stream.aclose()
+        return subscribers
+
+    try:
+        assert asyncio.run(run()) == 1
+        assert broker.subscriber_count == 0
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_published_notifications_and_mark_read_reach_open_streams():
+    supabase_client = FakeSupabaseClient({"notifications": [], "notification_counters": []})
+    broker = notification_stream.get_notification_broker()
+    counter = {"unread_count": 0}
+
+    async def unread_count() -> int:
+        return counter["unread_count"]
+
+    async def run() -> list:
+        subscription = broker.subscribe(USER_ID)
+        events = notification_stream.iter_notification_events(
+            broker,
+            subscription,
+            get_unread_count=unread_count,
+            heartbeat_seconds=5,
+            resync_seconds=5,
+            max_seconds=5,
+        )
+        received = [await anext(events)]
+
+        created = await create_notification(
+            supabase_client, user_id=USER_ID, subject="Hi", body="Welcome"
+        )
+        notification_stream.publish_notification(USER_ID, created)
+        received.append(await anext(events))
+
+        supabase_client.storage["notification_counters"].append(
+            {"user_id": USER_ID, "unread_count": 0}
+        )
+        await mark_all_notifications_read(current_user={"id": USER_ID}, client=supabase_client)
+        received.append(await anext(events))
+        await events.aclose()
+        return received
+
+    received = asyncio.run(run())
+
+    assert received[0] == ("unread_count", {"unread_count": 0})
+    assert received[1][0] == "notification"
+    assert received[1][1]["subject"] == "Hi"
+    assert received[2] == ("unread_count", {"unread_count": 0})
+    assert broker.subscriber_count == 0
+
+
+def _fanout_storage() -> dict[str, list[dict[str, Any]]]:
+    return {
+        "users": [
+            {"id": "u-1", "deleted_at": None},
+            {"id": "u-2", "deleted_at": None},
+            {"id": "u-3", "deleted_at": "2026-02-01T00:00:00+00:00"},
+            {"id": "u-4", "deleted_at": None},
+        ],
+        "team_members": [
+            {"account_id": ACCOUNT_ID, "user_id": USER_ID, "role": "admin", "status": "accepted", "deleted_at": None},
+            {"account_id": ACCOUNT_ID, "user_id": "u-2", "role": "viewer", "status": "accepted", "deleted_at": None},
+            {"account_id": ACCOUNT_ID, "user_id": "u-4", "role": "viewer", "status": "accepted", "deleted_at": None},
+            {"account_id": ACCOUNT_ID, "user_id": "u-1", "role": "viewer", "status": "invited", "deleted_at": None},
+        ],
+        "notifications": [],
+        "notification_fanout_jobs": [],
+    }
+
+
+def test_fanout_to_user_list_is_delivered_inline_in_batches(monkeypatch):
+    monkeypatch.setattr(get_settings(), "notification_fanout_batch_size", 2)
+    supabase_client = FakeSupabaseClient(_fanout_storage())
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = lambda: {"id": USER_ID, "role": "admin"}
+    payload = {
+        "target": {"type": "users", "user_ids": ["u-1", "u-2", "u-3", "u-4", "u-1"]},
+        "subject": "Maintenance",
+        "body": "Scheduled downtime tonight",
+    }
+    try:
+        with TestClient(app) as client:
+            response = client.post("/v1.0/notifications/fanouts", json=payload)
+
+        assert response.status_code == 202
+        body = response.json()
+        assert (body["status"], body["total_recipients"], body["delivered_count"]) == ("completed", 3, 3)
+        assert sorted(row["user_id"] for row in supabase_client.storage["notifications"]) == ["u-1", "u-2", "u-4"]
+        assert supabase_client.rpc_calls == ["run_notification_fanout_batch"] * 2
+        assert supabase_client.storage["notification_fanout_jobs"][0]["target_user_ids"] == [
+            "u-1",
+            "u-2",
+            "u-3",
+            "u-4",
+        ]
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_fanout_to_account_requires_account_admin_and_reports_progress():
+    supabase_client = FakeSupabaseClient(_fanout_storage())
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    payload = {
+        "target": {"type": "account", "account_id": ACCOUNT_ID},
+        "subject": "New dashboard",
+        "body": "Take a look",
+    }
+    try:
+        with TestClient(app) as client:
+            app.dependency_overrides[deps.get_current_user] = lambda: {"id": "u-2", "role": "user"}
+            forbidden = client.post("/v1.0/notifications/fanouts", json=payload)
+            everyone = client.post(
+                "/v1.0/notifications/fanouts",
+                json={**payload, "target": {"type": "all"}},
+            )
+
+            app.dependency_overrides[deps.get_current_user] = lambda: {"id": USER_ID, "role": "user"}
+            accepted = client.post("/v1.0/notifications/fanouts", json=payload)
+            progress = client.get(f"/v1.0/notifications/fanouts/{accepted.json()['id']}")
+
+            app.dependency_overrides[deps.get_current_user] = lambda: {"id": "u-4", "role": "user"}
+            hidden = client.get(f"/v1.0/notifications/fanouts/{accepted.json()['id']}")
+
+        assert forbidden.status_code == 403
+        assert everyone.status_code == 403
+        assert accepted.status_code == 202
+        assert accepted.json()["status"] == "queued"
+        assert progress.json()["status"] == "completed"
+        assert progress.json()["delivered_count"] == 2
+        assert sorted(row["user_id"] for row in supabase_client.storage["notifications"]) == ["u-2", "u-4"]
+        assert hidden.status_code == 404
+    finally:
+        app.dependency_overrides = {}
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import UTC, date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app.crud.advertiser import _get_metrics_map
+from app.crud.api_keys import get_api_usage
+from app.crud.tracker import get_tracker_stats, list_tracker_mentions
+from app.schemas.tracker import TrackerStatsBucket
+from app.services.partition_maintenance import (
+    PartitionedTable,
+    add_months,
+    plan_partitions,
+    run_partition_maintenance,
+)
+
+INIT_DB_SQL = Path(__file__).resolve().parents[2] / "db" / "init_db.sql"
+
+
+class FakeResponse:
+    def __init__(self, data: list[dict[str, Any]]):
+        self.data = data
+
+
+class FakeRpc:
+    def __init__(self, client: FakePartitionClient, fn_name: str, params: dict[str, Any]):
+        self.client = client
+        self.fn_name = fn_name
+        self.params = params
+
+    def execute(self) -> FakeResponse:
+        self.client.calls.append((self.fn_name, self.params))
+        months = self.client.partitions.setdefault(self.params["p_table"], set())
+        if self.fn_name == "list_monthly_partitions":
+            return FakeResponse([{"month_start": month} for month in sorted(months)])
+        if self.fn_name == "create_monthly_partition":
+            months.add(self.params["p_month"])
+        elif self.fn_name == "detach_monthly_partition":
+            months.discard(self.params["p_month"])
+        return FakeResponse([])
+
+
+class FakePartitionClient:
+    def __init__(self, partitions: dict[str, set[str]]):
+        self.partitions = partitions
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    def rpc(self, fn_name: str, params: dict[str, Any], **_kwargs):
+        return FakeRpc(self, fn_name, params)
+
+
+def test_add_months_crosses_year_boundaries():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -13) == date(2024, 12, 1)
+
+
+def test_plan_partitions_premakes_future_months_and_detaches_expired():
+    table = PartitionedTable("tracker_mentions", retention_months=3)
+    existing = [date(2026, month, 1) for month in range(5, 11)]
+
+    plan = plan_partitions(table, existing, today=date(2026, 10, 19), premake_months=2)
+
+    assert plan.create == [date(2026, 11, 1), date(2026, 12, 1)]
+    assert plan.detach == [date(2026, 5, 1), date(2026, 6, 1), date(2026, 7, 1)]
+
+
+def test_run_partition_maintenance_is_idempotent():
+    client = FakePartitionClient({"post_metrics_daily": {"2025-09-01", "2026-10-01"}})
+    tables = (
+        PartitionedTable("post_metrics_daily", retention_months=12),
+        PartitionedTable("api_key_usage_daily", retention_months=None),
+    )
+
+    run_partition_maintenance(
+        client, today=date(2026, 10, 19), premake_months=1, drop=True, tables=tables
+    )
+
+    assert client.partitions == {
+        "post_metrics_daily": {"2026-10-01", "2026-11-01"},
+        "api_key_usage_daily": {"2026-10-01", "2026-11-01"},
+    }
+    detach_params = {"p_table": "post_metrics_daily", "p_month": "2025-09-01", "p_drop": True}
+    assert ("detach_monthly_partition", detach_params) in client.calls
+
+    client.calls.clear()
+    plans = run_partition_maintenance(client, today=date(2026, 10, 19), premake_months=1, tables=tables)
+
+    assert all(not plan.create and not plan.detach for plan in plans)
+    assert [name for name, _ in client.calls] == ["list_monthly_partitions"] * 2
+
+
+# Plan checks against a real Postgres. PARTITION_TEST_DATABASE_URL must point
+# at a disposable database: init_db.sql is applied to its public schema.
+ACCOUNT_ID = "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
+API_KEY_ID = "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb"
+TRACKER_ID = "cccccccc-cccc-cccc-cccc-cccccccccccc"
+
+
+class RecordingQuery:
+    """Collects the builder calls a CRUD function makes on one table."""
+
+    def __init__(self, client: RecordingClient, table: str):
+        self.client = client
+        self.source = table
+        self.columns = "*"
+        self.filters: list[tuple[str, str, Any]] = []
+        self.orders: list[tuple[str, bool]] = []
+        self.limit_value: int | None = None
+
+    def select(self, *columns: str, **_kwargs):
+        self.columns = ", ".join(columns) or "*"
+        return self
+
+    def eq(self, column: str, value: Any):
+        self.filters.append((column, "=", value))
+        return self
+
+    def gte(self, column: str, value: Any):
+        self.filters.append((column, ">=", value))
+        return self
+
+    def lte(self, column: str, value: Any):
+        self.filters.append((column, "<=", value))
+        return self
+
+    def lt(self, column: str, value: Any):
+        self.filters.append((column, "<", value))
+        return self
+
+    def in_(self, column: str, values: list[Any]):
+        self.filters.append((column, "IN", list(values)))
+        return self
+
+    def is_(self, column: str, _value: str):
+        self.filters.append((column, "IS", None))
+        return self
+
+    def order(self, column: str, desc: bool = False, **_kwargs):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count: int, **_kwargs):
+        self.limit_value = count
+        return self
+
+    def execute(self) -> FakeResponse:
+        self.client.calls.append(self)
+        return FakeResponse(self.client.rows.get(self.source, []))
+
+
+class RecordingRpc:
+    def __init__(self, client: RecordingClient, fn_name: str, params: dict[str, Any]):
+        self.client = client
+        self.source = fn_name
+        self.params = params
+
+    def execute(self) -> FakeResponse:
+        self.client.calls.append(self)
+        return FakeResponse([])
+
+
+class RecordingClient:
+    def __init__(self, rows: dict[str, list[dict[str, Any]]]):
+        self.rows = rows
+        self.calls: list[RecordingQuery | RecordingRpc] = []
+
+    def table(self, name: str) -> RecordingQuery:
+        return RecordingQuery(self, name)
+
+    def rpc(self, fn_name: str, params: dict[str, Any], **_kwargs) -> RecordingRpc:
+        return RecordingRpc(self, fn_name, params)
+
+
+def _render(sql: Any, call: RecordingQuery | RecordingRpc) -> Any:
+    """The SQL PostgREST runs for a recorded call, with the values inlined.
+
+    The stats functions are plain `LANGUAGE sql STABLE` functions, which the
+    planner inlines, so their plans show the scanned partitions too.
+    """
+    if isinstance(call, RecordingRpc):
+        arguments = sql.SQL(", ").join(
+            sql.SQL("{} => {}").format(sql.Identifier(name), sql.Literal(value))
+            for name, value in call.params.items()
+        )
+        return sql.SQL("SELECT * FROM {}({})").format(sql.Identifier(call.source), arguments)
+
+    if call.columns.strip() == "*":
+        columns = sql.SQL("*")
+    else:
+        columns = sql.SQL(", ").join(
+            sql.Identifier(column.strip()) for column in call.columns.split(",")
+        )
+    query = sql.SQL("SELECT {} FROM {}").format(columns, sql.Identifier(call.source))
+
+    conditions = []
+    for column, operator, value in call.filters:
+        if operator == "IN":
+            operand = sql.SQL("({})").format(sql.SQL(", ").join(map(sql.Literal, value)))
+        elif operator == "IS":
+            operand = sql.SQL("NULL")
+        else:
+            operand = sql.Literal(value)
+        conditions.append(sql.SQL("{} {} {}").format(sql.Identifier(column), sql.SQL(operator), operand))
+    if conditions:
+        query += sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions)
+    if call.orders:
+        query += sql.SQL(" ORDER BY ") + sql.SQL(", ").join(
+            sql.SQL("{} DESC" if desc else "{}").format(sql.Identifier(column))
+            for column, desc in call.orders
+        )
+    if call.limit_value is not None:
+        query += sql.SQL(" LIMIT {}").format(sql.Literal(call.limit_value))
+    return query
+
+
+def _month_bounds(month: date) -> tuple[datetime, datetime]:
+    since = datetime(month.year, month.month, 1, tzinfo=UTC)
+    return since, datetime.combine(add_months(month, 1), time(), tzinfo=UTC)
+
+
+def _api_usage(client: RecordingClient, month: date) -> None:
+    asyncio.run(
+        get_api_usage(
+            client,
+            account_id=ACCOUNT_ID,
+            from_date=month,
+            to_date=add_months(month, 1) - timedelta(days=1),
+        )
+    )
+
+
+def _advertiser_metrics(client: RecordingClient, month: date) -> None:
+    _get_metrics_map(client, month)
+
+
+def _tracker_stats(client: RecordingClient, month: date) -> None:
+    since, until = _month_bounds(month)
+    asyncio.run(
+        get_tracker_stats(
+            client,
+            tracker_id=TRACKER_ID,
+            bucket=TrackerStatsBucket.DAY,
+            since=since,
+            until=until,
+            top_channels_limit=5,
+        )
+    )
+
+
+def _tracker_mentions(client: RecordingClient, month: date) -> None:
+    since, until = _month_bounds(month)
+    asyncio.run(
+        list_tracker_mentions(
+            client,
+            account_id=ACCOUNT_ID,
+            tracker_id=TRACKER_ID,
+            since=since,
+            until=until - timedelta(microseconds=1),
+            limit=20,
+            cursor=None,
+        )
+    )
+
+
+PRUNING_CASES = [
+    (_api_usage, {"api_key_usage_daily"}, "api_key_usage_daily", 0),
+    (_advertiser_metrics, {"advertiser_metrics_daily"}, "advertiser_metrics_daily", 0),
+    (
+        _tracker_stats,
+        {"tracker_mention_histogram", "tracker_mention_top_channels"},
+        "tracker_mentions",
+        -1,
+    ),
+    (_tracker_mentions, {"tracker_mentions"}, "tracker_mentions", -1),
+]
+
+
+def _scanned_relations(plan: dict[str, Any]) -> set[str]:
+    relations = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    for child in plan.get("Plans", []):
+        relations |= _scanned_relations(child)
+    return relations
+
+
+@pytest.fixture(scope="module")
+def partitioned_db():
+    database_url = os.environ.get("PARTITION_TEST_DATABASE_URL")
+    if not database_url:
+        pytest.skip("PARTITION_TEST_DATABASE_URL is not set")
+    psycopg = pytest.importorskip("psycopg")
+
+    with psycopg.connect(database_url, autocommit=True) as connection:
+        connection.execute(INIT_DB_SQL.read_text())
+        yield connection
+
+
+@pytest.mark.parametrize(("issue", "sources", "table", "month_offset"), PRUNING_CASES)
+def test_crud_queries_prune_to_matching_partitions(
+    partitioned_db, issue, sources: set[str], table: str, month_offset: int
+):
+    from psycopg import sql
+
+    current = partitioned_db.execute("SELECT date_trunc('month', NOW())::date").fetchone()[0]
+    month = add_months(current, month_offset)
+    client = RecordingClient({"api_keys": [{"id": API_KEY_ID}]})
+
+    issue(client, month)
+
+    calls = [call for call in client.calls if call.source in sources]
+    assert {call.source for call in calls} == sources
+    for call in calls:
+        explain = sql.SQL("EXPLAIN (FORMAT JSON) ") + _render(sql, call)
+        plan = partitioned_db.execute(explain).fetchone()[0][0]["Plan"]
+        assert _scanned_relations(plan) == {f"{table}_p{month:%Y%m}"}
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.profiling import profiler
+from app.core.security import create_access_token
+from app.db.base import get_supabase
+from app.main import app
+from app.testing.supabase import InMemorySupabase
+
+ADMIN = {"id": "u-admin", "email": "admin@example.com", "role": "admin"}
+MEMBER = {"id": "u-member", "email": "member@example.com", "role": "user"}
+
+
+@pytest.fixture
+def client():
+    fake = InMemorySupabase({"users": [dict(ADMIN), dict(MEMBER)]}, latency=0.03)
+    app.dependency_overrides[get_supabase] = lambda: fake
+    profiler.reset()
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        app.dependency_overrides.pop(get_supabase, None)
+        profiler.reset()
+
+
+def _auth(user: dict) -> dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token({'sub': user['email']})}"}
+
+
+def test_capture_returns_folded_stacks_tagged_by_route(client):
+    captured = {}
+
+    def capture():
+        captured["response"] = client.post(
+            "/v1.0/admin/profile", params={"requests": 2}, headers=_auth(ADMIN)
+        )
+
+    thread = threading.Thread(target=capture)
+    thread.start()
+    while not profiler.capturing:
+        time.sleep(0.001)
+    assert client.post(
+        "/v1.0/admin/profile", params={"seconds": 1}, headers=_auth(ADMIN)
+    ).status_code == 409
+    for _ in range(2):
+        assert client.get("/v1.0/users/me", headers=_auth(MEMBER)).status_code == 200
+    thread.join(timeout=10)
+
+    response = captured["response"]
+    assert response.status_code == 200
+    assert response.headers["content-disposition"].endswith('.folded"')
+    lines = response.text.splitlines()
+    assert lines
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(
+        line.startswith("/v1.0/users/me;") and "app/crud/user.py:get_user_by_email" in line
+        for line in lines
+    )
+
+
+def test_sampled_requests_feed_the_continuous_profile(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "profiling_sample_rate", 1.0)
+    client.get("/v1.0/users/me", headers=_auth(MEMBER))
+
+    response = client.get("/v1.0/admin/profile/continuous", headers=_auth(ADMIN))
+    assert response.status_code == 200
+    assert "/v1.0/users/me;" in response.text
+
+
+def test_profile_endpoints_require_a_platform_admin(client):
+    assert client.get(
+        "/v1.0/admin/profile/continuous", headers=_auth(MEMBER)
+    ).status_code == 403
+    assert client.post(
+        "/v1.0/admin/profile", params={"seconds": 1}, headers=_auth(MEMBER)
+    ).status_code == 403
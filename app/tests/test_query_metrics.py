@@ -0,0 +1,215 @@
+import asyncio
+import logging
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.core import query_metrics
+from app.core.config import get_settings
+from app.core.query_metrics import RequestQueryStats
+from app.db import instrumentation
+from app.db.base import get_supabase
+from app.db.instrumentation import InstrumentedClient
+from app.main import app
+from app.services.mention_stream import MentionStreamHub
+from app.testing.seed import DatasetSize, build_dataset, seeded_client
+
+ACCOUNT_ID = "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
+TRACKERS_ROUTE = "/v1.0/accounts/{account_id}/trackers"
+
+
+class FakeResponse:
+    def __init__(self, data: list[dict[str, Any]]):
+        self.data = data
+        self.count = None
+
+
+class FakeTableQuery:
+    def __init__(self, table_name: str, storage: dict[str, list[dict[str, Any]]]):
+        self.table_name = table_name
+        self.storage = storage
+        self.filters: list = []
+        self.limit_value: int | None = None
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def eq(self, field: str, value: Any):
+        self.filters.append(lambda row: row.get(field) == value)
+        return self
+
+    def is_(self, field: str, _value: Any):
+        self.filters.append(lambda row: row.get(field) is None)
+        return self
+
+    def order(self, _field: str, **_kwargs):
+        return self
+
+    def limit(self, count: int):
+        self.limit_value = count
+        return self
+
+    def execute(self):
+        if self.table_name not in self.storage:
+            raise RuntimeError(f"relation {self.table_name} does not exist")
+        rows = [row for row in self.storage[self.table_name] if all(f(row) for f in self.filters)]
+        return FakeResponse(rows[: self.limit_value] if self.limit_value else rows)
+
+
+class FakeSupabaseClient:
+    def __init__(self, storage: dict[str, list[dict[str, Any]]]):
+        self.storage = storage
+
+    def table(self, table_name: str):
+        return FakeTableQuery(table_name, self.storage)
+
+
+def _seed_storage() -> dict[str, list[dict[str, Any]]]:
+    return {
+        "team_members": [
+            {
+                "account_id": ACCOUNT_ID,
+                "user_id": "user-1",
+                "role": "viewer",
+                "status": "accepted",
+                "deleted_at": None,
+            }
+        ],
+        "trackers": [
+            {
+                "id": f"tracker-{index}",
+                "account_id": ACCOUNT_ID,
+                "tracker_type": "keyword",
+                "tracker_value": f"keyword {index}",
+                "status": "active",
+                "mentions_count": index,
+                "notify_push": True,
+                "notify_telegram": False,
+                "notify_email": False,
+                "deleted_at": None,
+            }
+            for index in range(3)
+        ],
+    }
+
+
+@pytest.fixture
+def instrumented_client(monkeypatch):
+    monkeypatch.setattr(get_settings(), "metrics_enabled", True)
+    client = InstrumentedClient(FakeSupabaseClient(_seed_storage()))
+    app.dependency_overrides[get_supabase] = lambda: client
+    app.dependency_overrides[deps.get_current_user] = lambda: {
+        "id": "user-1",
+        "email": "user-1@example.com",
+    }
+    yield client
+    app.dependency_overrides = {}
+
+
+def test_request_reports_query_count_in_server_timing_and_metrics(instrumented_client):
+    with TestClient(app) as client:
+        response = client.get(
+            f"/v1.0/accounts/{ACCOUNT_ID}/trackers", headers={"X-Account-Id": ACCOUNT_ID}
+        )
+        metrics = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 3
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert response.headers["server-timing"].endswith('desc="2 queries"')
+
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = metrics.text
+    for table in ("team_members", "trackers"):
+        labels = f'route="{TRACKERS_ROUTE}",table="{table}",operation="select"'
+        assert f"db_queries_total{{{labels}}} 1" in body
+    rows_labels = f'route="{TRACKERS_ROUTE}",table="trackers",operation="select"'
+    assert f"db_rows_total{{{rows_labels}}} 3" in body
+    assert f'http_request_db_queries_bucket{{route="{TRACKERS_ROUTE}",le="2"}} 1' in body
+    assert f'http_request_db_queries_bucket{{route="{TRACKERS_ROUTE}",le="1"}} 0' in body
+
+
+def test_request_over_query_budget_is_logged(instrumented_client, monkeypatch, caplog):
+    monkeypatch.setattr(get_settings(), "query_budget_per_request", 1)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.query_metrics"):
+        with TestClient(app) as client:
+            client.get(
+                f"/v1.0/accounts/{ACCOUNT_ID}/trackers", headers={"X-Account-Id": ACCOUNT_ID}
+            )
+            metrics = client.get("/metrics")
+
+    assert any(
+        f"GET {TRACKERS_ROUTE} made 2 database queries (budget 1" in record.getMessage()
+        for record in caplog.records
+    )
+    assert (
+        f'http_request_query_budget_exceeded_total{{route="{TRACKERS_ROUTE}"}} 1' in metrics.text
+    )
+
+
+def test_metrics_endpoint_is_disabled_by_default():
+    with TestClient(app) as client:
+        assert client.get("/metrics").status_code == 404
+
+
+def test_instrumented_query_records_filter_columns_and_errors(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(instrumentation, "record_query", recorded.append)
+    monkeypatch.setattr(get_settings(), "query_response_bytes_sample_rate", 1.0)
+    client = InstrumentedClient(FakeSupabaseClient(_seed_storage()))
+
+    response = (
+        client.table("trackers")
+        .select("*")
+        .eq("account_id", ACCOUNT_ID)
+        .is_("deleted_at", "null")
+        .order("updated_at", desc=True)
+        .limit(2)
+        .execute()
+    )
+    with pytest.raises(RuntimeError):
+        client.table("missing").select("*").execute()
+
+    assert len(response.data) == 2
+    ok, failed = recorded
+    assert (ok.table, ok.operation, ok.rows, ok.error) == ("trackers", "select", 2, False)
+    assert ok.filters == ("eq:account_id", "is_:deleted_at", "order:updated_at", "limit")
+    assert ok.response_bytes > 0
+    assert (failed.table, failed.rows, failed.error) == ("missing", 0, True)
+
+    monkeypatch.setattr(get_settings(), "query_response_bytes_sample_rate", 0.0)
+    client.table("trackers").select("*").execute()
+    assert recorded[-1].response_bytes == 0
+
+
+def test_poller_started_by_a_request_does_not_record_into_it(monkeypatch):
+    routes = []
+    monkeypatch.setattr(
+        query_metrics.query_metrics, "observe_query", lambda route, _record: routes.append(route)
+    )
+    client = InstrumentedClient(seeded_client(build_dataset(DatasetSize.for_channels(30), seed=0)))
+    hub = MentionStreamHub(poll_seconds=0.001, batch_size=100, queue_size=10)
+    stats = RequestQueryStats({"type": "http"})
+
+    async def run() -> None:
+        token = query_metrics._current_stats.set(stats)
+        try:
+            subscription = await hub.subscribe(
+                client, account_id=ACCOUNT_ID, tracker_id=None, after_seq=None
+            )
+        finally:
+            query_metrics._current_stats.reset(token)
+        while len(routes) < 4:
+            await asyncio.sleep(0.005)
+        hub.unsubscribe(subscription)
+
+    asyncio.run(run())
+
+    # Only the request's own cursor lookup; every poll is counted outside it.
+    assert stats.count == 1
+    assert routes[0] == query_metrics.UNMATCHED_ROUTE
+    assert set(routes[1:]) == {query_metrics.NO_ROUTE}
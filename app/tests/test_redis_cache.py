@@ -0,0 +1,146 @@
+import asyncio
+import socket
+
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.core.config import get_settings
+from app.core.redis_cache import RedisCacheBackend
+from app.core.response_cache import (
+    CacheEntry,
+    InMemoryLRUBackend,
+    ResponseCache,
+    set_response_cache,
+)
+from app.db.base import get_supabase
+from app.main import app
+from app.testing.redis import FakeRedisServer
+from app.testing.seed import DatasetSize, build_dataset, seeded_client
+
+
+def _worker(url: str) -> ResponseCache:
+    backend = RedisCacheBackend(url, prefix="test", local_max_entries=16)
+    return ResponseCache(backend, ttl_seconds=60, stale_seconds=300)
+
+
+async def _eventually(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_workers_share_entries_and_invalidations_reach_every_worker():
+    calls = []
+
+    def compute(value):
+        async def run():
+            calls.append(value)
+            return {"value": value}
+
+        return run
+
+    async def scenario(server: FakeRedisServer):
+        first, second = _worker(server.url), _worker(server.url)
+        try:
+            assert await first.get_or_compute("rankings.countries:us", compute(1)) == {"value": 1}
+            assert await second.get_or_compute("rankings.countries:us", compute(2)) == {"value": 1}
+            await second.get_or_compute("home.countries:all", compute(3))
+            await _eventually(lambda: server.commands["SUBSCRIBE"] == 2)
+
+            await first.invalidate("rankings")
+            await _eventually(lambda: "rankings" not in second.backend._generations)
+            assert await second.get_or_compute("rankings.countries:us", compute(4)) == {"value": 4}
+            assert await first.get_or_compute("rankings.countries:us", compute(5)) == {"value": 4}
+            assert await first.get_or_compute("home.countries:all", compute(6)) == {"value": 3}
+        finally:
+            await first.backend.close()
+            await second.backend.close()
+
+    with FakeRedisServer(password="secret") as server:
+        asyncio.run(scenario(server))
+
+    assert calls == [1, 3, 4]
+
+
+def test_entries_are_stored_as_json_and_garbage_is_a_miss():
+    entry = CacheEntry(value={"items": [{"code": "US"}]}, fresh_until=2e9, stale_until=2e9)
+
+    async def scenario(server: FakeRedisServer):
+        backend = RedisCacheBackend(server.url, prefix="test", local_max_entries=0)
+        try:
+            await backend.set("home.countries:all", entry)
+            (key,) = [key for key in server.keys() if key.endswith("home.countries:all")]
+            raw = server._data[key.encode()][0]
+            assert raw.startswith(b"{")
+            assert await backend.get("home.countries:all") == entry
+
+            server._data[key.encode()] = (b"\x80\x05garbage", None)
+            assert await backend.get("home.countries:all") is None
+        finally:
+            await backend.close()
+
+    with FakeRedisServer() as server:
+        asyncio.run(scenario(server))
+
+
+def test_unreachable_redis_falls_back_to_computing():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    cache = _worker(f"redis://127.0.0.1:{port}/0")
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def scenario():
+        return [await cache.get_or_compute("rankings.countries:us", compute) for _ in range(2)]
+
+    # The local tier still serves the second lookup.
+    assert asyncio.run(scenario()) == [1, 1]
+    assert calls == 1
+
+
+def test_redis_backend_serves_another_workers_responses(monkeypatch):
+    fake = seeded_client(build_dataset(DatasetSize.for_channels(30), seed=0))
+    app.dependency_overrides[get_supabase] = lambda: fake
+    try:
+        with FakeRedisServer() as server:
+            settings = get_settings()
+            monkeypatch.setattr(settings, "response_cache_enabled", True)
+            monkeypatch.setattr(settings, "response_cache_backend", "redis")
+            monkeypatch.setattr(settings, "response_cache_redis_url", server.url)
+            with TestClient(app) as client:
+                first = client.get("/v1.0/home/countries")
+                executed = fake.executed
+                # A new process-wide cache stands in for another worker.
+                set_response_cache(None)
+                second = client.get("/v1.0/home/countries")
+
+        assert first.status_code == 200
+        assert second.json() == first.json()
+        assert fake.executed == executed
+    finally:
+        app.dependency_overrides.pop(get_supabase, None)
+
+
+def test_admin_invalidates_one_dataset():
+    backend = InMemoryLRUBackend(max_entries=8)
+    set_response_cache(ResponseCache(backend, ttl_seconds=60, stale_seconds=60))
+    entry = CacheEntry(value=1, fresh_until=2e9, stale_until=2e9)
+    for key in ("rankings.countries:a", "rankings.categories:b", "home.countries:c"):
+        asyncio.run(backend.set(key, entry))
+    app.dependency_overrides[deps.get_current_user] = lambda: {"id": "u-1", "role": "owner"}
+    try:
+        with TestClient(app) as client:
+            response = client.post(
+                "/v1.0/admin/cache/invalidate", params={"dataset": "rankings"}
+            )
+    finally:
+        app.dependency_overrides.pop(deps.get_current_user, None)
+
+    assert response.json() == {"invalidated": ["rankings"]}
+    assert list(backend._entries) == ["home.countries:c"]
@@ -0,0 +1,192 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.core.response_cache import (
+    CacheEntry,
+    InMemoryLRUBackend,
+    ResponseCache,
+    make_cache_key,
+)
+from app.db.base import get_supabase
+from app.main import app
+from app.schemas.channel import SortOrder
+
+
+def _build_cache(*, ttl_seconds: float = 60, stale_seconds: float = 300, max_entries: int = 16):
+    return ResponseCache(
+        InMemoryLRUBackend(max_entries),
+        ttl_seconds=ttl_seconds,
+        stale_seconds=stale_seconds,
+    )
+
+
+def test_make_cache_key_ignores_order_and_unset_params():
+    first = make_cache_key("channels.catalog", {"limit": 20, "q": None, "sort_order": SortOrder.DESC})
+    second = make_cache_key("channels.catalog", {"sort_order": "desc", "limit": 20})
+
+    assert first == second
+    assert first != make_cache_key("channels.catalog", {"limit": 21, "sort_order": "desc"})
+    assert first != make_cache_key("mini_apps.catalog", {"limit": 20, "sort_order": "desc"})
+
+
+def test_concurrent_misses_are_coalesced():
+    cache = _build_cache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"items": [calls]}
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert calls == 1
+    assert all(result == {"items": [1]} for result in results)
+
+
+def test_errors_are_shared_with_waiters_but_not_cached():
+    cache = _build_cache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("Invalid pagination cursor")
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_compute("key", compute) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+    with pytest.raises(ValueError):
+        asyncio.run(cache.get_or_compute("key", compute))
+    assert calls == 2
+
+
+def test_waiters_get_the_result_when_the_leader_is_cancelled():
+    cache = _build_cache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"items": [calls]}
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get_or_compute("key", compute)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(run())
+
+    assert calls == 1
+    assert results == [{"items": [1]}] * 3
+    assert asyncio.run(cache.get_or_compute("key", compute)) == {"items": [1]}
+
+
+def test_stale_entry_is_served_while_refreshing_in_background():
+    cache = _build_cache()
+    now = time.time()
+    asyncio.run(
+        cache.backend.set("key", CacheEntry(value="old", fresh_until=now - 1, stale_until=now + 60))
+    )
+
+    async def compute():
+        return "new"
+
+    async def run():
+        served = await cache.get_or_compute("key", compute)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        refreshed = await cache.get_or_compute("key", compute)
+        return served, refreshed
+
+    assert asyncio.run(run()) == ("old", "new")
+
+
+def test_expired_entry_is_recomputed_inline():
+    cache = _build_cache()
+    now = time.time()
+    asyncio.run(
+        cache.backend.set("key", CacheEntry(value="old", fresh_until=now - 2, stale_until=now - 1))
+    )
+
+    async def compute():
+        return "new"
+
+    assert asyncio.run(cache.get_or_compute("key", compute)) == "new"
+
+
+def test_lru_backend_evicts_least_recently_used():
+    backend = InMemoryLRUBackend(max_entries=2)
+    entry = CacheEntry(value=1, fresh_until=time.time() + 60, stale_until=time.time() + 60)
+
+    async def run():
+        await backend.set("a", entry)
+        await backend.set("b", entry)
+        await backend.get("a")
+        await backend.set("c", entry)
+        return [await backend.get(key) is not None for key in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [True, False, True]
+    assert len(backend) == 2
+
+
+class _CountingQuery:
+    def __init__(self, client, table_name: str):
+        self.client = client
+        self.table_name = table_name
+
+    def __getattr__(self, _name):
+        return lambda *_args, **_kwargs: self
+
+    def execute(self):
+        self.client.executed += 1
+        return type("Response", (), {"data": [], "count": 0})()
+
+
+class _CountingSupabaseClient:
+    def __init__(self):
+        self.executed = 0
+
+    def table(self, table_name: str):
+        return _CountingQuery(self, table_name)
+
+
+def test_repeated_catalog_requests_are_served_from_cache():
+    supabase_client = _CountingSupabaseClient()
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = lambda: {"id": "user-1"}
+
+    try:
+        with TestClient(app) as client:
+            first = client.get("/v1.0/channels?limit=5&sort_order=desc")
+            executed_after_first = supabase_client.executed
+            second = client.get("/v1.0/channels?sort_order=desc&limit=5")
+
+        assert first.status_code == 200
+        assert second.json() == first.json()
+        assert executed_after_first > 0
+        assert supabase_client.executed == executed_after_first
+    finally:
+        app.dependency_overrides = {}
@@ -0,0 +1,464 @@
+import logging
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.core.config import get_settings
+from app.crud import search as search_crud
+from app.db.base import get_supabase
+from app.main import app
+from app.services import suggest as suggest_service
+
+
+class FakeResponse:
+    def __init__(self, data, count: int | None = None):
+        self.data = data
+        self.count = count
+
+
+def _tokenize(value: str) -> list[str]:
+    return [token for token in value.lower().split() if token]
+
+
+class FakeTableQuery:
+    def __init__(
+        self,
+        table_name: str,
+        storage: dict[str, list[dict]],
+        calls: list[str],
+        delays: dict[str, float] | None = None,
+    ):
+        self.table_name = table_name
+        self.storage = storage
+        self.calls = calls
+        self.delays = delays or {}
+        self.filters: list = []
+        self.orders: list[tuple[str, bool]] = []
+        self.limit_value: int | None = None
+        self.range_start: int | None = None
+        self.range_end: int | None = None
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def eq(self, field: str, value):
+        self.filters.append(lambda row: row.get(field) == value)
+        return self
+
+    def in_(self, field: str, values):
+        allowed = set(values)
+        self.filters.append(lambda row: row.get(field) in allowed)
+        return self
+
+    def text_search(self, field: str, query: str, **_kwargs):
+        prefixes = [word[:-2] for word in _tokenize(query) if word.endswith(":*")]
+        self.filters.append(
+            lambda row: all(
+                any(word.startswith(prefix) for word in _tokenize(row.get(field, "")))
+                for prefix in prefixes
+            )
+        )
+        return self
+
+    def order(self, field: str, desc: bool = False, **_kwargs):
+        self.orders.append((field, desc))
+        return self
+
+    def limit(self, count: int):
+        self.limit_value = count
+        return self
+
+    def range(self, start: int, end: int):
+        self.range_start = start
+        self.range_end = end
+        return self
+
+    def execute(self):
+        self.calls.append(self.table_name)
+        if self.table_name in self.delays:
+            time.sleep(self.delays[self.table_name])
+        rows = [row.copy() for row in self.storage.get(self.table_name, [])]
+        rows = [row for row in rows if all(check(row) for check in self.filters)]
+
+        for field, desc in reversed(self.orders):
+            non_null_rows = [row for row in rows if row.get(field) is not None]
+            null_rows = [row for row in rows if row.get(field) is None]
+            non_null_rows.sort(key=lambda row: row.get(field), reverse=desc)
+            rows = non_null_rows + null_rows
+
+        if self.range_start is not None and self.range_end is not None:
+            rows = rows[self.range_start : self.range_end + 1]
+        elif self.limit_value is not None:
+            rows = rows[: self.limit_value]
+
+        return FakeResponse(rows)
+
+
+class FakeSupabaseClient:
+    def __init__(self, storage: dict[str, list[dict]], delays: dict[str, float] | None = None):
+        self.storage = storage
+        self.calls: list[str] = []
+        self.delays = delays or {}
+
+    def table(self, table_name: str):
+        return FakeTableQuery(table_name, self.storage, self.calls, self.delays)
+
+    def rpc(self, fn_name: str, params: dict, **_kwargs):
+        """Search functions match any row whose name starts a word with the query."""
+        query = FakeTableQuery(fn_name, self.storage, self.calls, self.delays)
+        prefix = params["search_query"].lower()
+        query.filters.append(lambda row: any(token.startswith(prefix) for token in _tokenize(row["name"])))
+        return query
+
+
+def _override_current_user():
+    return {"id": "user-1", "email": "user@example.com"}
+
+
+def _build_storage() -> dict[str, list[dict]]:
+    return {
+        "channel_rankings_daily": [{"snapshot_date": "2026-02-14"}],
+        "advertiser_metrics_daily": [{"metric_date": "2026-02-14"}],
+        "mini_app_metrics_daily": [{"metric_date": "2026-02-13"}],
+        "channels": [
+            {
+                "id": "ch-1",
+                "name": "Tech News Daily",
+                "username": "technewsdaily",
+                "subscribers_current": 1_300_000,
+            },
+            {
+                "id": "ch-2",
+                "name": "Crypto Growth Radar",
+                "username": "cryptoradar",
+                "subscribers_current": 640_000,
+            },
+            {
+                "id": "ch-3",
+                "name": "Crypto Alpha",
+                "username": "cryptoalpha",
+                "subscribers_current": 720_000,
+            },
+            {
+                "id": "ch-4",
+                "name": "Café Noticias",
+                "username": "cafenews",
+                "subscribers_current": 15_000,
+            },
+        ],
+        "advertisers": [
+            {"id": "adv-1", "name": "Binance", "slug": "binance", "estimated_spend_current": 2_500_000},
+            {"id": "adv-2", "name": "Bybit", "slug": "bybit", "estimated_spend_current": 900_000},
+        ],
+        "mini_apps": [
+            {"id": "ma-1", "name": "Wallet", "slug": "wallet", "daily_users_current": 1_000_000},
+            {"id": "ma-2", "name": "Crypto Wallet Pro", "slug": "cwp", "daily_users_current": 5_000},
+        ],
+        "search_catalog_channels": [
+            {
+                "channel_id": "ch-2",
+                "name": "Crypto Growth Radar",
+                "username": "cryptoradar",
+                "subscribers": 640_000,
+                "search_rank": 0.4,
+            },
+            {
+                "channel_id": "ch-3",
+                "name": "Crypto Alpha",
+                "username": "cryptoalpha",
+                "subscribers": 720_000,
+                "search_rank": 0.9,
+            },
+            {
+                "channel_id": "ch-1",
+                "name": "Tech News Daily",
+                "username": "technewsdaily",
+                "subscribers": 1_300_000,
+                "search_rank": 0.5,
+            },
+        ],
+        "search_advertisers": [
+            {"advertiser_id": "adv-1", "name": "Binance", "search_rank": 0.7},
+            {"advertiser_id": "adv-3", "name": "Crypto Exchange", "search_rank": 0.8},
+        ],
+        "search_mini_apps_latest": [
+            {
+                "mini_app_id": "ma-2",
+                "name": "Crypto Wallet Pro",
+                "slug": "cwp",
+                "daily_users": 5_000,
+                "search_rank": 0.6,
+            },
+        ],
+        "vw_ads_listing": [
+            {
+                "ad_id": "ad-1",
+                "advertiser_id": "adv-1",
+                "advertiser_name": "Binance",
+                "channel_id": "ch-3",
+                "channel_name": "Crypto Alpha",
+                "preview_text": "Trade crypto with zero fees",
+                "posted_at": "2026-02-10T10:00:00+00:00",
+                "search_tsv": "trade crypto with zero fees",
+            },
+            {
+                "ad_id": "ad-2",
+                "advertiser_id": "adv-2",
+                "advertiser_name": "Bybit",
+                "channel_id": "ch-1",
+                "channel_name": "Tech News Daily",
+                "preview_text": "New phone launch",
+                "posted_at": "2026-02-12T10:00:00+00:00",
+                "search_tsv": "new phone launch",
+            },
+        ],
+        "posts": [
+            {
+                "id": "post-1",
+                "channel_id": "ch-2",
+                "title": "Weekly crypto digest",
+                "content_text": "Crypto   markets\nrallied this week",
+                "published_at": "2026-02-13T08:00:00+00:00",
+                "external_post_url": "https://t.me/cryptoradar/1",
+                "is_deleted": False,
+                "search_tsv": "weekly crypto digest crypto markets rallied this week",
+            },
+            {
+                "id": "post-2",
+                "channel_id": "ch-3",
+                "title": "Deleted crypto post",
+                "content_text": "gone",
+                "published_at": "2026-02-14T08:00:00+00:00",
+                "external_post_url": None,
+                "is_deleted": True,
+                "search_tsv": "deleted crypto post gone",
+            },
+        ],
+    }
+
+
+@pytest.fixture(autouse=True)
+def _reset_suggest_indexes():
+    suggest_service.reset_suggest_indexes()
+    yield
+    suggest_service.reset_suggest_indexes()
+    app.dependency_overrides = {}
+
+
+def test_suggest_ranks_prefix_matches_by_popularity():
+    supabase_client = FakeSupabaseClient(_build_storage())
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    with TestClient(app) as client:
+        response = client.get("/v1.0/search/suggest?q=cry")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["name"] for item in body["data"]["channels"]] == [
+        "Crypto Alpha",
+        "Crypto Growth Radar",
+    ]
+    assert body["data"]["advertisers"] == []
+    assert [item["name"] for item in body["data"]["mini_apps"]] == ["Crypto Wallet Pro"]
+    assert body["meta"]["snapshot_date"] == "2026-02-14"
+
+
+def test_suggest_matches_word_starts_handles_and_accents():
+    supabase_client = FakeSupabaseClient(_build_storage())
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    with TestClient(app) as client:
+        word_response = client.get("/v1.0/search/suggest?q=wallet&types=mini_apps")
+        handle_response = client.get("/v1.0/search/suggest?q=@technews&types=channels")
+        accent_response = client.get("/v1.0/search/suggest?q=cafe&types=channels")
+
+    assert [item["name"] for item in word_response.json()["data"]["mini_apps"]] == [
+        "Wallet",
+        "Crypto Wallet Pro",
+    ]
+    assert word_response.json()["data"]["channels"] == []
+    assert [item["id"] for item in handle_response.json()["data"]["channels"]] == ["ch-1"]
+    assert [item["id"] for item in accent_response.json()["data"]["channels"]] == ["ch-4"]
+
+
+def test_suggest_serves_from_memory_after_first_build():
+    supabase_client = FakeSupabaseClient(_build_storage())
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    with TestClient(app) as client:
+        client.get("/v1.0/search/suggest?q=b")
+        calls_after_build = len(supabase_client.calls)
+        response = client.get("/v1.0/search/suggest?q=b&limit=1")
+
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()["data"]["advertisers"]] == ["Binance"]
+    assert len(supabase_client.calls) == calls_after_build
+
+
+def test_prefix_memo_keeps_only_recent_prefixes(monkeypatch):
+    monkeypatch.setattr(suggest_service, "_MEMO_MAX_ENTRIES", 3)
+    index = suggest_service.PrefixIndex(
+        [suggest_service.SuggestEntry(f"e-{name}", name, None, 1.0) for name in ("ab", "ac", "bd")]
+    )
+    assert sorted(index._memo) == ["a", "b"]
+
+    index.search("ab", limit=1)
+    index.search("a", limit=1)
+    index.search("ac", limit=1)
+
+    assert len(index._memo) == 3
+    assert "b" not in index._memo
+    assert [entry.name for entry in index.search("b", limit=1)] == ["bd"]
+
+
+def test_refresh_rebuilds_only_when_snapshot_changes():
+    storage = _build_storage()
+    supabase_client = FakeSupabaseClient(storage)
+
+    indexes = suggest_service.get_suggest_indexes(supabase_client)
+    indexes.checked_at = time.monotonic() - 10_000
+    suggest_service.refresh_suggest_indexes(supabase_client)
+    assert suggest_service.get_suggest_indexes(supabase_client) is indexes
+
+    storage["channel_rankings_daily"] = [{"snapshot_date": "2026-02-15"}]
+    storage["channels"].append(
+        {"id": "ch-5", "name": "Crypto Whales", "username": "whales", "subscribers_current": 9_000_000}
+    )
+    indexes.checked_at = time.monotonic() - 10_000
+    suggest_service.refresh_suggest_indexes(supabase_client)
+
+    rebuilt = suggest_service.get_suggest_indexes(supabase_client)
+    assert rebuilt is not indexes
+    assert rebuilt.channels.search("crypto", limit=1)[0].entity_id == "ch-5"
+
+
+def test_failed_refresh_keeps_indexes_and_waits_for_the_next_interval(monkeypatch, caplog):
+    supabase_client = FakeSupabaseClient(_build_storage())
+    indexes = suggest_service.get_suggest_indexes(supabase_client)
+    indexes.checked_at = time.monotonic() - 10_000
+
+    def unavailable(_client):
+        raise RuntimeError("PostgREST unavailable")
+
+    monkeypatch.setattr(suggest_service, "get_suggest_snapshot_key", unavailable)
+    with caplog.at_level(logging.ERROR, logger="app.services.suggest"):
+        suggest_service.refresh_suggest_indexes(supabase_client)
+
+    assert suggest_service.get_suggest_indexes(supabase_client) is indexes
+    assert not suggest_service.is_suggest_index_stale(indexes)
+    assert "Refreshing the suggest indexes failed" in caplog.text
+
+
+def test_suggest_requires_auth():
+    supabase_client = FakeSupabaseClient(_build_storage())
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+
+    with TestClient(app) as client:
+        response = client.get("/v1.0/search/suggest?q=cry")
+
+    assert response.status_code == 401
+
+
+def test_search_fans_out_across_sources():
+    supabase_client = FakeSupabaseClient(_build_storage())
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    with TestClient(app) as client:
+        response = client.get("/v1.0/search?q=crypto")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["channel_id"] for item in body["data"]["channels"]] == ["ch-3", "ch-2"]
+    assert body["data"]["channels"][0]["username"] == "@cryptoalpha"
+    # adv-3 has a search hit but no advertiser row, so it is dropped.
+    assert body["data"]["advertisers"] == []
+    assert [item["mini_app_id"] for item in body["data"]["mini_apps"]] == ["ma-2"]
+    assert [item["ad_id"] for item in body["data"]["ads"]] == ["ad-1"]
+    assert [item["post_id"] for item in body["data"]["posts"]] == ["post-1"]
+    assert body["data"]["posts"][0]["content_snippet"] == "Crypto markets rallied this week"
+    assert body["meta"]["partial"] is False
+    assert {source: meta["status"] for source, meta in body["meta"]["sources"].items()} == {
+        "channels": "ok",
+        "advertisers": "ok",
+        "mini_apps": "ok",
+        "ads": "ok",
+        "posts": "ok",
+    }
+
+
+def test_search_returns_partial_results_when_a_source_is_slow(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "search_source_timeout_seconds", 0.05)
+    supabase_client = FakeSupabaseClient(_build_storage(), delays={"posts": 0.5})
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        response = client.get("/v1.0/search?q=crypto&types=channels&types=posts")
+        elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    body = response.json()
+    assert elapsed < 0.5
+    assert [item["channel_id"] for item in body["data"]["channels"]] == ["ch-3", "ch-2"]
+    assert body["data"]["posts"] == []
+    assert body["meta"]["partial"] is True
+    assert body["meta"]["sources"]["posts"]["status"] == "timeout"
+    assert set(body["meta"]["sources"]) == {"channels", "posts"}
+
+
+def test_search_short_query_skips_full_text_only_sources():
+    supabase_client = FakeSupabaseClient(_build_storage())
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    with TestClient(app) as client:
+        response = client.get("/v1.0/search?q=bi")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["advertiser_id"] for item in body["data"]["advertisers"]] == ["adv-1"]
+    assert body["meta"]["sources"]["ads"]["status"] == "skipped"
+    assert body["meta"]["sources"]["posts"]["status"] == "skipped"
+    assert body["meta"]["partial"] is False
+    assert "posts" not in supabase_client.calls
+    assert "vw_ads_listing" not in supabase_client.calls
+
+
+def test_search_rejects_query_without_searchable_text():
+    supabase_client = FakeSupabaseClient(_build_storage())
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    with TestClient(app) as client:
+        response = client.get("/v1.0/search?q=(*)")
+
+    assert response.status_code == 400
+
+
+def test_search_matches_partial_words_as_prefixes():
+    supabase_client = FakeSupabaseClient(_build_storage())
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_current_user
+
+    with TestClient(app) as client:
+        response = client.get("/v1.0/search?q=cryp&types=ads&types=posts")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["ad_id"] for item in body["data"]["ads"]] == ["ad-1"]
+    assert [item["post_id"] for item in body["data"]["posts"]] == ["post-1"]
+
+
+def test_prefix_tsquery_turns_every_word_into_a_prefix():
+    assert search_crud.prefix_tsquery("Cryp tele-gram") == "cryp:* & tele:* & gram:*"
+    assert search_crud.prefix_tsquery("Café_news") == "cafe:* & news:*"
+    assert search_crud.prefix_tsquery("-:*&") is None
+    assert search_crud.is_prefix_search("-:*&")
@@ -0,0 +1,154 @@
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.startup import LazyRouterMiddleware, RouterLoader, lifespan
+from app.db.base import get_supabase
+from app.main import app
+from app.testing.seed import DatasetSize, build_dataset, seeded_client
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFERRED_MODULES = ("app.api.routes", "app.crud", "app.schemas", "supabase", "passlib", "jose")
+
+
+def _import_app_main() -> subprocess.CompletedProcess[str]:
+    script = (
+        "import sys, app.main; "
+        f"print(sorted(m for m in sys.modules if m.startswith({DEFERRED_MODULES!r})))"
+    )
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_app_main_defers_routers():
+    assert _import_app_main().stdout.strip() == "[]"
+
+
+def test_import_app_main_stays_within_budget():
+    # Wall-clock timing depends on the machine, so the budget is opt-in: set
+    # IMPORT_BUDGET_SECONDS (about 1.0 on a developer laptop, where eager
+    # router imports took ~1.3 s and deferred ones ~0.7 s).
+    budget = os.environ.get("IMPORT_BUDGET_SECONDS")
+    if not budget:
+        pytest.skip("IMPORT_BUDGET_SECONDS is not set")
+
+    stderr = _import_app_main().stderr
+    cumulative_us = int(re.search(r"\|\s*(\d+) \| app\.main$", stderr, re.M).group(1))
+    assert cumulative_us / 1e6 < float(budget)
+
+
+async def _no_clients(_app) -> None:
+    return None
+
+
+def test_ping_answers_while_routers_are_still_loading(monkeypatch):
+    test_app = FastAPI(lifespan=lifespan)
+    loader = RouterLoader(test_app, ["app.api.routes.public"])
+    test_app.state.router_loader = loader
+    test_app.add_middleware(LazyRouterMiddleware, loader=loader, ready_paths={"/ping"})
+
+    @test_app.get("/ping")
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    release = threading.Event()
+    load = loader.load
+
+    def slow_load() -> None:
+        release.wait(timeout=10)
+        load()
+
+    monkeypatch.setattr(loader, "load", slow_load)
+    monkeypatch.setattr("app.core.startup._create_clients", _no_clients)
+
+    with TestClient(test_app) as client:
+        assert client.get("/ping").status_code == 200
+        assert not loader.loaded
+
+        responses = []
+        waiting = threading.Thread(target=lambda: responses.append(client.get("/public/ping")))
+        waiting.start()
+        waiting.join(timeout=0.2)
+        assert not responses
+
+        release.set()
+        waiting.join(timeout=10)
+
+    assert loader.loaded
+    assert responses[0].status_code == 200
+
+
+def test_readyz_reports_ready_after_warmup_preloads_reference_data(monkeypatch):
+    dataset = build_dataset(DatasetSize.for_channels(60), seed=0)
+    fake = seeded_client(dataset)
+    monkeypatch.setattr(get_settings(), "warmup_reference_data", True)
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", True)
+    monkeypatch.setattr(get_settings(), "warmup_top_rankings", 3)
+    app.dependency_overrides[get_supabase] = lambda: fake
+    try:
+        assert TestClient(app).get("/readyz").status_code == 503
+
+        with TestClient(app) as client:
+            assert client.get("/livez").json() == {"status": "ok"}
+            deadline = time.monotonic() + 10
+            while (readyz := client.get("/readyz")).status_code != 200:
+                assert time.monotonic() < deadline, readyz.json()
+                time.sleep(0.01)
+            assert readyz.json() == {
+                "status": "ready",
+                "steps": {
+                    "routers": "ok",
+                    "clients": "ok",
+                    "security": "ok",
+                    "reference_data": "ok",
+                },
+            }
+
+            executed = fake.executed
+            response = client.get("/v1.0/home/countries")
+            assert response.status_code == 200
+            assert fake.executed == executed
+    finally:
+        app.dependency_overrides.pop(get_supabase, None)
+
+
+def test_livez_answers_while_reference_queries_are_in_flight(monkeypatch):
+    fake = seeded_client(build_dataset(DatasetSize.for_channels(30), seed=0))
+    release = threading.Event()
+    table = fake.table
+
+    def slow_table(name: str):
+        release.wait(timeout=10)
+        return table(name)
+
+    monkeypatch.setattr(fake, "table", slow_table)
+    monkeypatch.setattr(get_settings(), "warmup_reference_data", True)
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", True)
+    app.dependency_overrides[get_supabase] = lambda: fake
+    try:
+        with TestClient(app) as client:
+            deadline = time.monotonic() + 5
+            while client.get("/readyz").json()["steps"].get("reference_data") != "running":
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+
+            assert client.get("/livez").status_code == 200
+            assert client.get("/readyz").json()["steps"]["reference_data"] == "running"
+            release.set()
+    finally:
+        release.set()
+        app.dependency_overrides.pop(get_supabase, None)
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import time
 from datetime import UTC, datetime
 from typing import Any
 
+import pytest
 from fastapi.testclient import TestClient
 from postgrest.exceptions import APIError
 
 from app.api import deps
+from app.api.routes.trackers import stream_mentions
+from app.core.config import get_settings
+from app.crud.tracker import resolve_stats_window
 from app.db.base import get_supabase
 from app.main import app
+from app.schemas.tracker import TrackerStatsBucket
+from app.services import mention_stream
 
 
 class FakeResponse:
@@ -27,6 +36,7 @@ class FakeTableQuery:
         self.action = "select"
         self.insert_data: dict[str, Any] | None = None
         self.update_data: dict[str, Any] | None = None
+        self.upsert_kwargs: dict[str, Any] = {}
 
     def select(self, *_args, **_kwargs):
         self.action = "select"
@@ -37,6 +47,12 @@ class FakeTableQuery:
         self.insert_data = data
         return self
 
+    def upsert(self, data: list[dict[str, Any]], **kwargs):
+        self.action = "upsert"
+        self.insert_data = data
+        self.upsert_kwargs = kwargs
+        return self
+
     def update(self, data: dict[str, Any]):
         self.action = "update"
         self.update_data = data
@@ -66,6 +82,10 @@ class FakeTableQuery:
         self.filters.append(lambda row: _coerce_value(row.get(field)) <= _coerce_value(value))
         return self
 
+    def gt(self, field: str, value: Any):
+        self.filters.append(lambda row: _coerce_value(row.get(field)) > _coerce_value(value))
+        return self
+
     def lt(self, field: str, value: Any):
         self.filters.append(lambda row: _coerce_value(row.get(field)) < _coerce_value(value))
         return self
@@ -88,6 +108,9 @@ class FakeTableQuery:
         if self.action == "update":
             return self._execute_update()
 
+        if self.action == "upsert":
+            return self._execute_upsert()
+
         rows = [row.copy() for row in self.storage.get(self.table_name, []) if self._matches(row)]
 
         for field, desc in reversed(self.orders):
@@ -137,6 +160,19 @@ class FakeTableQuery:
         self.storage[self.table_name].append(new_row)
         return FakeResponse([new_row.copy()])
 
+    def _execute_upsert(self) -> FakeResponse:
+        assert self.upsert_kwargs.get("ignore_duplicates") is True
+        conflict_fields = self.upsert_kwargs["on_conflict"].split(",")
+        table = self.storage[self.table_name]
+        written: list[dict[str, Any]] = []
+        for new_row in self.insert_data:
+            key = tuple(new_row.get(field) for field in conflict_fields)
+            if any(tuple(row.get(field) for field in conflict_fields) == key for row in table):
+                continue
+            self.insert_data = new_row
+            written.extend(self._execute_insert().data)
+        return FakeResponse(written)
+
     def _execute_update(self) -> FakeResponse:
         assert self.update_data is not None
         updated: list[dict[str, Any]] = []
@@ -151,13 +187,54 @@ class FakeTableQuery:
         return FakeResponse(updated)
 
 
+class FakeRpc:
+    def __init__(self, fn_name: str, params: dict[str, Any], storage: dict[str, list[dict[str, Any]]]):
+        self.fn_name = fn_name
+        self.params = params
+        self.storage = storage
+
+    def execute(self) -> FakeResponse:
+        since = _coerce_value(self.params["p_since"])
+        until = _coerce_value(self.params["p_until"])
+        rows = [
+            row
+            for row in self.storage["tracker_mentions"]
+            if row["tracker_id"] == self.params["p_tracker_id"]
+            and since <= _coerce_value(row["mentioned_at"]) < until
+        ]
+        counts: dict[Any, int] = {}
+        if self.fn_name == "tracker_mention_histogram":
+            assert self.params["p_bucket"] == "hour"
+            for row in rows:
+                bucket_start = _coerce_value(row["mentioned_at"]).replace(minute=0, second=0)
+                counts[bucket_start] = counts.get(bucket_start, 0) + 1
+            return FakeResponse(
+                [{"bucket_start": key.isoformat(), "mentions": value} for key, value in sorted(counts.items())]
+            )
+
+        assert self.fn_name == "tracker_mention_top_channels"
+        for row in rows:
+            if row["channel_id"] is not None:
+                counts[row["channel_id"]] = counts.get(row["channel_id"], 0) + 1
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return FakeResponse(
+            [{"channel_id": key, "mentions": value} for key, value in ranked[: self.params["p_limit"]]]
+        )
+
+
 class FakeSupabaseClient:
     def __init__(self, storage: dict[str, list[dict[str, Any]]]):
         self.storage = storage
+        self.table_calls: list[str] = []
 
     def table(self, table_name: str):
+        self.table_calls.append(table_name)
         return FakeTableQuery(table_name, self.storage)
 
+    def rpc(self, fn_name: str, params: dict[str, Any], **_kwargs):
+        self.table_calls.append(f"rpc:{fn_name}")
+        return FakeRpc(fn_name, params, self.storage)
+
 
 def _coerce_value(value: Any) -> Any:
     if value is None:
@@ -299,6 +376,13 @@ def _seed_storage() -> dict[str, list[dict[str, Any]]]:
     }
 
 
+@pytest.fixture(autouse=True)
+def _reset_mention_stream_hub():
+    mention_stream.reset_mention_stream_hub()
+    yield
+    mention_stream.reset_mention_stream_hub()
+
+
 def _override_user(user_id: str):
     def _provider() -> dict[str, str]:
         return {"id": user_id, "email": f"{user_id}@example.com"}
@@ -424,6 +508,91 @@ def test_post_tracker_duplicate_returns_400():
         app.dependency_overrides = {}
 
 
+def test_tracker_batch_applies_operations_with_one_write_per_kind():
+    storage = _setup("user-editor")
+    supabase_client = app.dependency_overrides[get_supabase]()
+    try:
+        with TestClient(app) as client:
+            response = client.post(
+                "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/trackers:batch",
+                headers=_headers(),
+                json={
+                    "operations": [
+                        {"op": "create", "tracker_type": "keyword", "tracker_value": "Solana"},
+                        {"op": "create", "tracker_type": "keyword", "tracker_value": "bitcoin price"},
+                        {"op": "create", "tracker_type": "keyword", "tracker_value": " solana "},
+                        {"op": "create", "tracker_type": "keyword", "tracker_value": "toncoin"},
+                        {
+                            "op": "update",
+                            "tracker_id": "11111111-1111-1111-1111-111111111111",
+                            "status": "paused",
+                        },
+                        {"op": "delete", "tracker_id": "22222222-2222-2222-2222-222222222222"},
+                        {"op": "delete", "tracker_id": "33333333-3333-3333-3333-333333333333"},
+                    ]
+                },
+            )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [item["status"] for item in body["data"]] == [
+            "created",
+            "duplicate",
+            "duplicate",
+            "created",
+            "updated",
+            "deleted",
+            "not_found",
+        ]
+        assert body["data"][0]["tracker"]["tracker_value"] == "Solana"
+        assert body["data"][4]["tracker"]["status"] == "paused"
+        assert body["meta"]["counts"] == {"created": 2, "duplicate": 2, "updated": 1, "deleted": 1, "not_found": 1}
+
+        rows = {row["id"]: row for row in storage["trackers"]}
+        assert rows["11111111-1111-1111-1111-111111111111"]["paused_at"] is not None
+        assert rows["22222222-2222-2222-2222-222222222222"]["deleted_at"] is not None
+        assert rows["33333333-3333-3333-3333-333333333333"]["deleted_at"] is None
+        assert sum(row["normalized_value"] == "solana" for row in storage["trackers"]) == 1
+        # One membership check, then one upsert, one update and one soft delete.
+        assert supabase_client.table_calls == ["team_members", "trackers", "trackers", "trackers"]
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_tracker_batch_rejects_repeated_tracker_ids_and_viewers():
+    _setup("user-editor")
+    operations = [
+        {"op": "update", "tracker_id": "11111111-1111-1111-1111-111111111111", "notify_email": True},
+        {"op": "delete", "tracker_id": "11111111-1111-1111-1111-111111111111"},
+    ]
+    try:
+        with TestClient(app) as client:
+            response = client.post(
+                "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/trackers:batch",
+                headers=_headers(),
+                json={"operations": operations},
+            )
+            assert response.status_code == 200
+            assert [item["status"] for item in response.json()["data"]] == ["conflict", "conflict"]
+
+            app.dependency_overrides[deps.get_current_user] = _override_user("user-viewer")
+            forbidden = client.post(
+                "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/trackers:batch",
+                headers=_headers(),
+                json={"operations": operations},
+            )
+            assert forbidden.status_code == 403
+
+            too_many = client.post(
+                "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/trackers:batch",
+                headers=_headers(),
+                json={"operations": [operations[1]] * 501},
+            )
+            assert too_many.status_code == 422
+    finally:
+        app.dependency_overrides = {}
+
+
 def test_patch_tracker_success_updates_fields():
     _setup("user-editor")
     try:
@@ -504,6 +673,85 @@ def test_delete_tracker_not_found_returns_404():
         app.dependency_overrides = {}
 
 
+def test_get_tracker_stats_buckets_mentions_and_ranks_channels():
+    storage = _setup("user-editor")
+    storage["tracker_mentions"].append(
+        {
+            "id": "m-4",
+            "account_id": "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
+            "tracker_id": "11111111-1111-1111-1111-111111111111",
+            "mention_seq": 1004,
+            "channel_id": "ch-1",
+            "post_id": "p-4",
+            "mention_text": "bitcoin price",
+            "context_snippet": None,
+            "mentioned_at": "2026-02-14T21:45:00Z",
+        }
+    )
+    supabase_client = app.dependency_overrides[get_supabase]()
+    url = (
+        "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/trackers/11111111-1111-1111-1111-111111111111"
+        "/stats?bucket=hour&since=2026-02-14T19:30:00Z&until=2026-02-14T22:00:00Z"
+    )
+    try:
+        with TestClient(app) as client:
+            response = client.get(url, headers=_headers())
+            assert response.status_code == 200
+            data = response.json()["data"]
+            assert data["since"] == "2026-02-14T19:00:00Z"
+            assert data["until"] == "2026-02-14T22:00:00Z"
+            assert [point["mentions"] for point in data["series"]] == [0, 1, 2]
+            assert data["total_mentions"] == 3
+            assert [(row["channel_id"], row["mentions"]) for row in data["top_channels"]] == [
+                ("ch-1", 2),
+                ("ch-2", 1),
+            ]
+            assert data["top_channels"][0]["channel_name"] == "Tech News Daily"
+
+            supabase_client.table_calls.clear()
+            again = client.get(url, headers=_headers())
+
+        assert again.json() == response.json()
+        assert not any(call.startswith("rpc:") for call in supabase_client.table_calls)
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_get_tracker_stats_rejects_oversized_window_and_unknown_tracker():
+    _setup("user-editor")
+    base = "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/trackers"
+    try:
+        with TestClient(app) as client:
+            too_wide = client.get(
+                f"{base}/11111111-1111-1111-1111-111111111111/stats?bucket=hour&since=2020-01-01T00:00:00Z",
+                headers=_headers(),
+            )
+            foreign = client.get(
+                f"{base}/33333333-3333-3333-3333-333333333333/stats",
+                headers=_headers(),
+            )
+
+        assert too_wide.status_code == 400
+        assert foreign.status_code == 404
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_resolve_stats_window_reads_naive_until_as_utc(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        since, until = resolve_stats_window(
+            TrackerStatsBucket.DAY, since=None, until=datetime(2026, 2, 14)
+        )
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    assert until == datetime(2026, 2, 14, tzinfo=UTC)
+    assert since == datetime(2026, 1, 15, tzinfo=UTC)
+
+
 def test_get_tracker_mentions_base_polling():
     _setup("user-editor")
     try:
@@ -522,6 +770,30 @@ def test_get_tracker_mentions_base_polling():
         app.dependency_overrides = {}
 
 
+def test_get_tracker_mentions_reuses_cached_channel_names():
+    storage = _seed_storage()
+    supabase_client = FakeSupabaseClient(storage)
+    app.dependency_overrides[get_supabase] = lambda: supabase_client
+    app.dependency_overrides[deps.get_current_user] = _override_user("user-editor")
+    try:
+        with TestClient(app) as client:
+            first = client.get(
+                "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/tracker-mentions?limit=2",
+                headers=_headers(),
+            )
+            storage["channels"][0]["name"] = "Renamed Channel"
+            second = client.get(
+                "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/tracker-mentions?limit=2",
+                headers=_headers(),
+            )
+
+        assert first.status_code == 200
+        assert second.json()["data"][0]["channel_name"] == "Tech News Daily"
+        assert supabase_client.table_calls.count("channels") == 1
+    finally:
+        app.dependency_overrides = {}
+
+
 def test_get_tracker_mentions_cursor_next_page():
     _setup("user-editor")
     try:
@@ -544,6 +816,31 @@ def test_get_tracker_mentions_cursor_next_page():
         app.dependency_overrides = {}
 
 
+def test_get_tracker_mentions_streams_csv_in_pages(monkeypatch):
+    monkeypatch.setattr(get_settings(), "stream_page_size", 2)
+    _setup("user-editor")
+    try:
+        with TestClient(app) as client:
+            listing = client.get(
+                "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/tracker-mentions?limit=200",
+                headers=_headers(),
+            )
+            streamed = client.get(
+                "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/tracker-mentions?format=csv",
+                headers=_headers(),
+            )
+
+        assert streamed.status_code == 200
+        assert streamed.headers["content-type"] == "text/csv; charset=utf-8"
+        header, *lines = streamed.text.splitlines()
+        columns = header.split(",")
+        assert columns[:3] == ["mention_id", "tracker_id", "mention_seq"]
+        seqs = [int(line.split(",")[2]) for line in lines]
+        assert seqs == [row["mention_seq"] for row in listing.json()["data"]]
+    finally:
+        app.dependency_overrides = {}
+
+
 def test_get_tracker_mentions_filters_tracker_and_time_range():
     _setup("user-editor")
     try:
@@ -619,3 +916,139 @@ def test_unauthorized_returns_401():
         assert response.status_code == 401
     finally:
         app.dependency_overrides = {}
+
+
+def _parse_sse(text: str) -> list[dict[str, str]]:
+    events = []
+    for block in text.split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":")
+        )
+        if "data" in fields:
+            events.append(fields)
+    return events
+
+
+def _short_stream_settings(monkeypatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "tracker_stream_poll_seconds", 0.02)
+    monkeypatch.setattr(settings, "tracker_stream_heartbeat_seconds", 0.05)
+    monkeypatch.setattr(settings, "tracker_stream_max_seconds", 0.15)
+
+
+def test_stream_tracker_mentions_replays_after_seq_in_order(monkeypatch):
+    _short_stream_settings(monkeypatch)
+    _setup("user-viewer")
+    try:
+        with TestClient(app) as client:
+            response = client.get(
+                "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/tracker-mentions/stream?after_seq=1001",
+                headers=_headers(),
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse(response.text)
+        assert [event["id"] for event in events] == ["1002", "1003"]
+        assert all(event["event"] == "mention" for event in events)
+        assert json.loads(events[1]["data"])["channel_name"] == "Tech News Daily"
+        assert ": keepalive" in response.text
+        assert mention_stream.get_mention_stream_hub().subscriber_count == 0
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_stream_tracker_mentions_resumes_from_last_event_id_with_tracker_filter(monkeypatch):
+    _short_stream_settings(monkeypatch)
+    _setup("user-viewer")
+    try:
+        with TestClient(app) as client:
+            response = client.get(
+                "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/tracker-mentions/stream"
+                "?after_seq=0&tracker_id=22222222-2222-2222-2222-222222222222",
+                headers={**_headers(), "Last-Event-ID": "1000"},
+            )
+
+        assert response.status_code == 200
+        assert [event["id"] for event in _parse_sse(response.text)] == ["1001"]
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_stream_tracker_mentions_unsubscribes_when_closed_before_the_first_event():
+    supabase_client = FakeSupabaseClient(_seed_storage())
+    account_id = "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
+
+    async def run() -> int:
+        response = await stream_mentions(
+            account_id=account_id,
+            x_account_id=account_id,
+            last_event_id=None,
+            tracker_id=None,
+            after_seq=None,
+            current_user=_override_user("user-viewer")(),
+            client=supabase_client,
+        )
+        stream = response.body_iterator
+        assert (await anext(stream)).startswith("retry:")
+        subscribers = mention_stream.get_mention_stream_hub().subscriber_count
+        await stream.aclose()
+        return subscribers
+
+    assert asyncio.run(run()) == 1
+    assert mention_stream.get_mention_stream_hub().subscriber_count == 0
+
+
+def test_stream_tracker_mentions_forbidden_for_non_member():
+    _setup("user-non-member")
+    try:
+        with TestClient(app) as client:
+            response = client.get(
+                "/v1.0/accounts/aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa/tracker-mentions/stream",
+                headers=_headers(),
+            )
+
+        assert response.status_code == 403
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_mention_stream_hub_polls_once_for_all_subscribers():
+    storage = _seed_storage()
+    supabase_client = FakeSupabaseClient(storage)
+    hub = mention_stream.MentionStreamHub(poll_seconds=60, batch_size=100, queue_size=10)
+    account_a = "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
+    account_b = "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb"
+
+    async def run():
+        subscriptions = [
+            await hub.subscribe(supabase_client, account_id=account_a, tracker_id=None, after_seq=None),
+            await hub.subscribe(supabase_client, account_id=account_a, tracker_id=None, after_seq=None),
+            await hub.subscribe(supabase_client, account_id=account_b, tracker_id=None, after_seq=None),
+        ]
+        storage["tracker_mentions"].append(
+            {
+                "id": "m-4",
+                "account_id": account_a,
+                "tracker_id": "11111111-1111-1111-1111-111111111111",
+                "mention_seq": 1004,
+                "channel_id": "ch-2",
+                "post_id": None,
+                "mention_text": "bitcoin price",
+                "context_snippet": None,
+                "mentioned_at": "2026-02-14T22:00:00Z",
+            }
+        )
+        supabase_client.table_calls.clear()
+        fetched = await hub.poll_once()
+        queue_sizes = [subscription.queue.qsize() for subscription in subscriptions]
+        for subscription in subscriptions:
+            hub.unsubscribe(subscription)
+        return fetched, queue_sizes
+
+    fetched, queue_sizes = asyncio.run(run())
+
+    assert fetched == 1
+    assert queue_sizes == [1, 1, 0]
+    assert supabase_client.table_calls == ["tracker_mentions", "channels"]
+    assert hub.subscriber_count == 0
@@ -0,0 +1,321 @@
+"""Latency, throughput and query counts of the hot read endpoints.
+
+The app runs in-process against `app.testing.supabase.InMemorySupabase` seeded
+by `app.testing.seed` (10k channels by default, up to ~1M with a few GB of
+RAM), wrapped in `InstrumentedClient` so every request's PostgREST round trips
+are counted from its `Server-Timing` header. Each scenario cycles through a
+fixed, seeded list of requests so two runs issue the same requests in the
+same order, and reports latency percentiles, sequential requests per second,
+queries and simulated db time per request and response size.
+
+The response cache is off unless `--response-cache` is given, otherwise
+repeated requests would only measure the cache. `--latency-ms` makes every
+query sleep, which is what makes extra round trips visible; the reported db
+time also includes the fake's own filtering, so compare it between runs, not
+with production.
+
+    python -m bench.endpoints --channels 100000 --latency-ms 2 --json > after.json
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.security import create_access_token
+from app.db.base import get_supabase
+from app.db.instrumentation import InstrumentedClient
+from app.main import app
+from app.testing.seed import (
+    CATEGORIES,
+    COUNTRIES,
+    Dataset,
+    DatasetSize,
+    build_dataset,
+    seeded_client,
+)
+
+_SERVER_TIMING_RE = re.compile(r'db;dur=(?P<ms>[\d.]+);desc="(?P<queries>\d+) queries"')
+
+
+@dataclass(frozen=True)
+class Request:
+    path: str
+    params: dict[str, Any] = field(default_factory=dict)
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    requests: Callable[[Dataset, random.Random], Iterator[Request]]
+
+
+def _cycle(make: Callable[[random.Random], Request]):
+    def requests(_dataset: Dataset, rng: random.Random) -> Iterator[Request]:
+        while True:
+            yield make(rng)
+
+    return requests
+
+
+def _catalog(rng: random.Random) -> Request:
+    params: dict[str, Any] = {
+        "sort_by": rng.choice(["subscribers", "growth_7d", "engagement_rate"]),
+        "limit": 20,
+    }
+    if rng.random() < 0.5:
+        params["country_code"] = rng.choice(COUNTRIES)[0]
+    if rng.random() < 0.3:
+        params["category_slug"] = rng.choice(CATEGORIES)[0]
+    return Request("/v1.0/channels", params)
+
+
+def _catalog_search(rng: random.Random) -> Request:
+    term = rng.choice(["daily news", "crypto", "smart lab", "tech", "go", "urban market"])
+    return Request("/v1.0/channels", {"q": term, "sort_by": "relevance", "limit": 20})
+
+
+def _overview(dataset: Dataset, rng: random.Random) -> Iterator[Request]:
+    while True:
+        channel_id = rng.choice(dataset.detailed_channel_ids)
+        yield Request(f"/v1.0/channels/{channel_id}/overview")
+
+
+def _rankings(rng: random.Random) -> Request:
+    kind = rng.choice(["countries", "categories", "collections"])
+    if kind == "countries":
+        return Request("/v1.0/rankings/countries", {"country_code": rng.choice(COUNTRIES)[0]})
+    if kind == "categories":
+        return Request("/v1.0/rankings/categories", {"category_slug": rng.choice(CATEGORIES)[0]})
+    return Request("/v1.0/rankings/collections")
+
+
+def _advertisers(rng: random.Random) -> Request:
+    params: dict[str, Any] = {"limit": 20}
+    if rng.random() < 0.3:
+        params["q"] = rng.choice(["fintech", "gaming", "daily"])
+    return Request("/v1.0/advertisers", params)
+
+
+def _advertiser_detail(dataset: Dataset, rng: random.Random) -> Iterator[Request]:
+    while True:
+        yield Request(f"/v1.0/advertisers/{rng.choice(dataset.advertiser_ids)}")
+
+
+def _mini_apps(rng: random.Random) -> Request:
+    if rng.random() < 0.2:
+        return Request("/v1.0/mini-apps/summary")
+    return Request(
+        "/v1.0/mini-apps", {"sort_by": rng.choice(["daily_users", "rating"]), "limit": 20}
+    )
+
+
+def _mentions(dataset: Dataset, rng: random.Random) -> Iterator[Request]:
+    _user, account_id = dataset.users[0]
+    while True:
+        yield Request(
+            f"/v1.0/accounts/{account_id}/tracker-mentions",
+            {"limit": rng.choice([20, 50])},
+            {"X-Account-Id": account_id},
+        )
+
+
+SCENARIOS = (
+    Scenario("catalog", _cycle(_catalog)),
+    Scenario("catalog_search", _cycle(_catalog_search)),
+    Scenario("overview", _overview),
+    Scenario("rankings", _cycle(_rankings)),
+    Scenario("advertisers", _cycle(_advertisers)),
+    Scenario("advertiser_detail", _advertiser_detail),
+    Scenario("mini_apps", _cycle(_mini_apps)),
+    Scenario("mentions", _mentions),
+    Scenario("auth", _cycle(lambda _rng: Request("/v1.0/users/me"))),
+)
+
+
+@dataclass
+class Result:
+    scenario: str
+    requests: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    requests_per_second: float
+    queries_per_request: float
+    max_queries: int
+    db_ms_per_request: float
+    mean_response_bytes: int
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(percent / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def run_scenario(
+    client: TestClient,
+    scenario: Scenario,
+    dataset: Dataset,
+    *,
+    requests: int,
+    warmup: int,
+    seed: int,
+) -> Result:
+    source = scenario.requests(dataset, random.Random(seed))  # noqa: S311
+    for _ in range(warmup):
+        request = next(source)
+        client.get(request.path, params=request.params, headers=request.headers)
+
+    latencies: list[float] = []
+    queries: list[int] = []
+    db_ms: list[float] = []
+    sizes: list[int] = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        request = next(source)
+        sent = time.perf_counter()
+        response = client.get(request.path, params=request.params, headers=request.headers)
+        latencies.append((time.perf_counter() - sent) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+        sizes.append(len(response.content))
+        timing = _SERVER_TIMING_RE.search(response.headers.get("server-timing", ""))
+        if timing:
+            queries.append(int(timing["queries"]))
+            db_ms.append(float(timing["ms"]))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return Result(
+        scenario=scenario.name,
+        requests=requests,
+        errors=errors,
+        p50_ms=round(_percentile(latencies, 50), 3),
+        p95_ms=round(_percentile(latencies, 95), 3),
+        p99_ms=round(_percentile(latencies, 99), 3),
+        mean_ms=round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        requests_per_second=round(requests / elapsed, 1) if elapsed else 0.0,
+        queries_per_request=round(statistics.fmean(queries), 2) if queries else 0.0,
+        max_queries=max(queries, default=0),
+        db_ms_per_request=round(statistics.fmean(db_ms), 3) if db_ms else 0.0,
+        mean_response_bytes=int(statistics.fmean(sizes)) if sizes else 0,
+    )
+
+
+def run(
+    *,
+    channels: int,
+    requests: int,
+    warmup: int,
+    seed: int,
+    latency_ms: float,
+    response_cache: bool,
+    scenarios: list[str] | None = None,
+) -> dict[str, Any]:
+    seeding_started = time.perf_counter()
+    dataset = build_dataset(DatasetSize.for_channels(channels), seed=seed)
+    fake = seeded_client(dataset, latency=latency_ms / 1000)
+    seed_seconds = time.perf_counter() - seeding_started
+
+    user, _account_id = dataset.users[0]
+    token = create_access_token({"sub": user["email"]})
+    client_for_request = InstrumentedClient(fake)
+
+    settings = get_settings()
+    previous_cache = settings.response_cache_enabled
+    settings.response_cache_enabled = response_cache
+    app.dependency_overrides[get_supabase] = lambda: client_for_request
+    try:
+        with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as client:
+            results = [
+                run_scenario(
+                    client, scenario, dataset, requests=requests, warmup=warmup, seed=seed
+                )
+                for scenario in SCENARIOS
+                if not scenarios or scenario.name in scenarios
+            ]
+    finally:
+        app.dependency_overrides.pop(get_supabase, None)
+        settings.response_cache_enabled = previous_cache
+
+    return {
+        "config": {
+            "channels": channels,
+            "requests": requests,
+            "warmup": warmup,
+            "seed": seed,
+            "latency_ms": latency_ms,
+            "response_cache": response_cache,
+            "rows": sum(len(rows) for rows in dataset.tables.values()),
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        "results": [asdict(result) for result in results],
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark hot endpoints on seeded fake data.")
+    parser.add_argument("--channels", type=int, default=10_000, help="Channels to seed")
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per scenario")
+    parser.add_argument("--seed", type=int, default=0, help="Data and request mix seed")
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Simulated latency per database query"
+    )
+    parser.add_argument(
+        "--response-cache", action="store_true", help="Leave the response cache enabled"
+    )
+    parser.add_argument("--scenario", action="append", help="Only these scenarios")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(
+        channels=args.channels,
+        requests=args.requests,
+        warmup=args.warmup,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        response_cache=args.response_cache,
+        scenarios=args.scenario,
+    )
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+
+    config = report["config"]
+    print(
+        f"{config['channels']} channels, {config['rows']} rows seeded in "
+        f"{config['seed_seconds']}s, {config['latency_ms']} ms per query"
+    )
+    print(
+        f"{'scenario':<20}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}"
+        f"{'queries':>9}{'db ms':>9}{'errors':>8}"
+    )
+    for result in report["results"]:
+        print(
+            f"{result['scenario']:<20}{result['p50_ms']:>9}{result['p95_ms']:>9}"
+            f"{result['p99_ms']:>9}{result['requests_per_second']:>9}"
+            f"{result['queries_per_request']:>9}{result['db_ms_per_request']:>9}"
+            f"{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
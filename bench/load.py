@@ -0,0 +1,537 @@
+"""Concurrent load generator replaying a weighted traffic mix against the app.
+
+Virtual users run in one event loop, each picking the next operation from the
+mix by weight (catalog browsing, channel overviews, rankings, notification and
+mention polling, magic-link sign-in) until `--duration` or `--requests` is
+used up. The app is reached one of three ways:
+
+* ``--target inproc`` (default): `app.main:app` through httpx's ASGITransport;
+* ``--target uvicorn``: the same app served by uvicorn on a local port, so
+  the HTTP stack is included;
+* ``--base-url URL``: an already running server, e.g. ``uvicorn app.main:app``
+  with ``SUPABASE_URL`` pointing at a local PostgREST over Postgres.
+
+For the first two, ``--backend fake`` (default) seeds
+`app.testing.supabase.InMemorySupabase` with `app.testing.seed` and turns
+emails off; ``--backend supabase`` uses the configured Supabase/PostgREST.
+Requests authenticate with a JWT minted from ``JWT_SECRET`` for ``--email``
+(or the seeded users); ``--api-key`` additionally sends a key header for
+deployments behind a gateway that requires one. The app itself only accepts
+bearer tokens.
+
+The report has p50/p95/p99, throughput and error rate overall and per
+operation. ``--save-baseline`` stores it, ``--baseline`` compares against a
+stored one and exits 1 when p95 or throughput got worse than ``--tolerance``
+or the error rate went up.
+
+    python -m bench.load --concurrency 32 --duration 30 --save-baseline load.json
+    python -m bench.load --concurrency 32 --duration 30 --baseline load.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from dataclasses import dataclass, replace
+from typing import Any
+
+import httpx
+
+from app.core.config import get_settings
+from app.core.security import create_access_token
+from app.testing.seed import CATEGORIES, COUNTRIES, DatasetSize, build_dataset, seeded_client
+
+DEFAULT_MIX = {
+    "catalog": 30,
+    "overview": 20,
+    "rankings": 15,
+    "notifications_poll": 15,
+    "mentions_poll": 15,
+    "signin": 5,
+}
+# Ignore p95 regressions smaller than this; sub-millisecond noise is not a regression.
+_MIN_LATENCY_DELTA_MS = 1.0
+
+
+@dataclass
+class VirtualUser:
+    client: httpx.AsyncClient
+    email: str
+    headers: dict[str, str]
+    rng: random.Random
+    channel_ids: list[str]
+    account_id: str | None = None
+
+
+@dataclass(frozen=True)
+class Sample:
+    operation: str
+    seconds: float
+    status: int
+
+    @property
+    def ok(self) -> bool:
+        return 0 < self.status < 400
+
+
+async def _catalog(user: VirtualUser) -> int:
+    params: dict[str, Any] = {
+        "sort_by": user.rng.choice(["subscribers", "growth_7d", "engagement_rate"]),
+        "limit": 20,
+    }
+    if user.rng.random() < 0.5:
+        params["country_code"] = user.rng.choice(COUNTRIES)[0]
+    if user.rng.random() < 0.2:
+        params["q"] = user.rng.choice(["news", "crypto", "daily", "tech"])
+    response = await user.client.get("/v1.0/channels", params=params, headers=user.headers)
+    return response.status_code
+
+
+async def _overview(user: VirtualUser) -> int:
+    channel_id = user.rng.choice(user.channel_ids)
+    response = await user.client.get(f"/v1.0/channels/{channel_id}/overview", headers=user.headers)
+    return response.status_code
+
+
+async def _rankings(user: VirtualUser) -> int:
+    kind = user.rng.choice(["countries", "categories", "collections"])
+    params: dict[str, str] = {}
+    if kind == "countries":
+        params["country_code"] = user.rng.choice(COUNTRIES)[0]
+    elif kind == "categories":
+        params["category_slug"] = user.rng.choice(CATEGORIES)[0]
+    response = await user.client.get(
+        f"/v1.0/rankings/{kind}", params=params, headers=user.headers
+    )
+    return response.status_code
+
+
+async def _notifications_poll(user: VirtualUser) -> int:
+    response = await user.client.get(
+        "/v1.0/notifications",
+        params={"limit": 20, "include_unread_count": "true"},
+        headers=user.headers,
+    )
+    return response.status_code
+
+
+async def _mentions_poll(user: VirtualUser) -> int:
+    if user.account_id is None:
+        return 0
+    response = await user.client.get(
+        f"/v1.0/accounts/{user.account_id}/tracker-mentions",
+        params={"limit": 20},
+        headers={**user.headers, "X-Account-Id": user.account_id},
+    )
+    return response.status_code
+
+
+async def _signin(user: VirtualUser) -> int:
+    headers = {key: value for key, value in user.headers.items() if key != "Authorization"}
+    requested = await user.client.post(
+        "/v1.0/signin", json={"email": user.email}, headers=headers
+    )
+    if requested.status_code >= 400:
+        return requested.status_code
+    confirmed = await user.client.post(
+        "/v1.0/signin/confirm",
+        json={"email": user.email, "token": requested.json()["token"]},
+        headers=headers,
+    )
+    return confirmed.status_code
+
+
+OPERATIONS: dict[str, Callable[[VirtualUser], Awaitable[int]]] = {
+    "catalog": _catalog,
+    "overview": _overview,
+    "rankings": _rankings,
+    "notifications_poll": _notifications_poll,
+    "mentions_poll": _mentions_poll,
+    "signin": _signin,
+}
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """``catalog=30,overview=20`` -> weights; unknown operations are rejected."""
+    mix: dict[str, float] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(percent / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def _stats(samples: list[Sample], elapsed: float) -> dict[str, Any]:
+    latencies = sorted(sample.seconds * 1000 for sample in samples)
+    errors = sum(not sample.ok for sample in samples)
+    statuses: dict[str, int] = {}
+    for sample in samples:
+        if not sample.ok:
+            statuses[str(sample.status)] = statuses.get(str(sample.status), 0) + 1
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "error_statuses": statuses,
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict[str, Any]:
+    by_operation: dict[str, list[Sample]] = {}
+    for sample in samples:
+        by_operation.setdefault(sample.operation, []).append(sample)
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": _stats(samples, elapsed),
+        "operations": {
+            name: _stats(operation_samples, elapsed)
+            for name, operation_samples in sorted(by_operation.items())
+        },
+    }
+
+
+def compare(
+    report: dict[str, Any], baseline: dict[str, Any], *, tolerance: float
+) -> list[str]:
+    """Regressions of `report` against `baseline`, as human-readable lines."""
+    regressions: list[str] = []
+    sections = [("overall", report["overall"], baseline.get("overall"))]
+    sections += [
+        (name, stats, baseline.get("operations", {}).get(name))
+        for name, stats in report["operations"].items()
+    ]
+    for name, current, previous in sections:
+        if not previous:
+            continue
+        p95_limit = previous["p95_ms"] * (1 + tolerance)
+        if (
+            current["p95_ms"] > p95_limit
+            and current["p95_ms"] - previous["p95_ms"] > _MIN_LATENCY_DELTA_MS
+        ):
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']} ms > {previous['p95_ms']} ms baseline"
+            )
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']}/s < "
+                f"{previous['throughput_rps']}/s baseline"
+            )
+        if current["error_rate"] > previous["error_rate"] + 0.01:
+            regressions.append(
+                f"{name}: error rate {current['error_rate']} > {previous['error_rate']} baseline"
+            )
+    return regressions
+
+
+class _Budget:
+    def __init__(self, requests: int | None) -> None:
+        self._remaining = requests
+
+    def take(self) -> bool:
+        if self._remaining is None:
+            return True
+        if self._remaining <= 0:
+            return False
+        self._remaining -= 1
+        return True
+
+
+async def _drive(
+    user: VirtualUser,
+    mix: dict[str, float],
+    *,
+    deadline: float,
+    budget: _Budget,
+    think_seconds: float,
+    samples: list[Sample],
+) -> None:
+    names = list(mix)
+    weights = list(mix.values())
+    while time.perf_counter() < deadline and budget.take():
+        name = user.rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            status = await OPERATIONS[name](user)
+        except httpx.HTTPError:
+            status = 0
+        samples.append(Sample(name, time.perf_counter() - started, status))
+        if think_seconds:
+            await asyncio.sleep(think_seconds)
+
+
+@contextmanager
+def fake_backend(
+    *, channels: int, users: int, seed: int, latency_ms: float, response_cache: bool
+) -> Iterator[tuple[list[str], list[str]]]:
+    """Point `get_supabase` at a seeded fake; yields (user emails, overview channel ids)."""
+    from app.db.base import get_supabase
+    from app.db.instrumentation import InstrumentedClient
+    from app.main import app
+
+    size = DatasetSize.for_channels(channels)
+    # One seeded user per virtual user, so sign-ins do not revoke each other's tokens.
+    dataset = build_dataset(replace(size, users=max(size.users, users)), seed=seed)
+    client = InstrumentedClient(seeded_client(dataset, latency=latency_ms / 1000))
+    settings = get_settings()
+    previous = (settings.response_cache_enabled, settings.skip_emails)
+    settings.response_cache_enabled = response_cache
+    settings.skip_emails = True
+    app.dependency_overrides[get_supabase] = lambda: client
+    try:
+        yield [user["email"] for user, _account in dataset.users], dataset.detailed_channel_ids
+    finally:
+        app.dependency_overrides.pop(get_supabase, None)
+        settings.response_cache_enabled, settings.skip_emails = previous
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def _uvicorn_server(app: Any) -> Iterator[str]:
+    import uvicorn
+
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("uvicorn failed to start")
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+@asynccontextmanager
+async def _http_client(
+    *, target: str, base_url: str | None, concurrency: int
+) -> AsyncIterator[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if base_url is not None:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            yield client
+        return
+
+    from app.main import app
+
+    if target == "uvicorn":
+        with _uvicorn_server(app) as url:
+            async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+                yield client
+        return
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://inproc") as client:
+        yield client
+
+
+async def _discover_channel_ids(client: httpx.AsyncClient, headers: dict[str, str]) -> list[str]:
+    response = await client.get("/v1.0/channels", params={"limit": 100}, headers=headers)
+    response.raise_for_status()
+    return [row["channel_id"] for row in response.json()["data"]]
+
+
+async def run_load(
+    *,
+    client: httpx.AsyncClient,
+    emails: list[str],
+    channel_ids: list[str] | None,
+    mix: dict[str, float],
+    concurrency: int,
+    duration: float | None,
+    requests: int | None,
+    think_ms: float = 0.0,
+    api_key: str | None = None,
+    api_key_header: str = "X-API-Key",
+    seed: int = 0,
+) -> dict[str, Any]:
+    users: list[VirtualUser] = []
+    for index in range(concurrency):
+        email = emails[index % len(emails)]
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+        if api_key:
+            headers[api_key_header] = api_key
+        users.append(
+            VirtualUser(client, email, headers, random.Random(seed + index), channel_ids or [])  # noqa: S311
+        )
+
+    if not channel_ids:
+        discovered = await _discover_channel_ids(client, users[0].headers)
+        for user in users:
+            user.channel_ids = discovered
+    accounts: dict[str, str | None] = {}
+    for user in users:
+        if user.email not in accounts:
+            me = await client.get("/v1.0/users/me", headers=user.headers)
+            accounts[user.email] = me.json().get("default_account_id") if me.is_success else None
+        user.account_id = accounts[user.email]
+
+    samples: list[Sample] = []
+    budget = _Budget(requests)
+    started = time.perf_counter()
+    deadline = started + duration if duration else float("inf")
+    await asyncio.gather(
+        *(
+            _drive(
+                user,
+                mix,
+                deadline=deadline,
+                budget=budget,
+                think_seconds=think_ms / 1000,
+                samples=samples,
+            )
+            for user in users
+        )
+    )
+    return summarize(samples, time.perf_counter() - started)
+
+
+async def _main_async(args: argparse.Namespace) -> dict[str, Any]:
+    mix = parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX)
+    use_fake = args.base_url is None and args.backend == "fake"
+    emails = args.email or []
+    channel_ids: list[str] | None = None
+
+    with (
+        fake_backend(
+            channels=args.channels,
+            users=args.concurrency,
+            seed=args.seed,
+            latency_ms=args.latency_ms,
+            response_cache=args.response_cache,
+        )
+        if use_fake
+        else nullcontext()
+    ) as seeded:
+        if seeded is not None:
+            emails = emails or seeded[0]
+            channel_ids = seeded[1]
+        if not emails:
+            raise SystemExit("--email is required unless the fake backend is used")
+        async with _http_client(
+            target=args.target, base_url=args.base_url, concurrency=args.concurrency
+        ) as client:
+            report = await run_load(
+                client=client,
+                emails=emails,
+                channel_ids=channel_ids,
+                mix=mix,
+                concurrency=args.concurrency,
+                duration=args.duration if args.requests is None else None,
+                requests=args.requests,
+                think_ms=args.think_ms,
+                api_key=args.api_key,
+                api_key_header=args.api_key_header,
+                seed=args.seed,
+            )
+
+    report["config"] = {
+        "target": args.base_url or args.target,
+        "backend": "external" if args.base_url else args.backend,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "requests": args.requests,
+        "mix": mix,
+        "channels": args.channels if use_fake else None,
+        "latency_ms": args.latency_ms if use_fake else None,
+    }
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a weighted traffic mix against the app.")
+    parser.add_argument("--target", choices=["inproc", "uvicorn"], default="inproc")
+    parser.add_argument("--base-url", help="Drive an already running server instead")
+    parser.add_argument("--backend", choices=["fake", "supabase"], default="fake")
+    parser.add_argument("--concurrency", type=int, default=16, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--requests", type=int, help="Stop after this many operations instead")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between operations")
+    parser.add_argument(
+        "--mix", help=f"Weights, e.g. catalog=30,overview=20 (default {DEFAULT_MIX})"
+    )
+    parser.add_argument("--email", action="append", help="Users to authenticate as")
+    parser.add_argument("--api-key", help="Also send this key on every request")
+    parser.add_argument("--api-key-header", default="X-API-Key")
+    parser.add_argument("--channels", type=int, default=10_000, help="Channels to seed (fake)")
+    parser.add_argument(
+        "--latency-ms", type=float, default=1.0, help="Simulated latency per query (fake)"
+    )
+    parser.add_argument("--response-cache", action="store_true", help="Keep the response cache on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="Compare against this stored report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown")
+    parser.add_argument("--save-baseline", help="Write the report here")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(_main_async(args))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+
+    regressions: list[str] = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(report, json.load(handle), tolerance=args.tolerance)
+        report["regressions"] = regressions
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(
+            f"{report['overall']['requests']} operations in {report['elapsed_seconds']}s "
+            f"with {args.concurrency} users"
+        )
+        print(
+            f"{'operation':<20}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'p99 ms':>10}{'ops/s':>9}"
+        )
+        rows = [*report["operations"].items(), ("overall", report["overall"])]
+        for name, stats in rows:
+            print(
+                f"{name:<20}{stats['requests']:>7}{stats['errors']:>8}{stats['p50_ms']:>10}"
+                f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['throughput_rps']:>9}"
+            )
+        for line in regressions:
+            print(f"REGRESSION {line}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""Response serialization cost of the hot listing endpoints, before and after.
+
+For each endpoint a page of synthetic rows is turned into response bytes three
+ways:
+
+* ``legacy``: a model per row, then FastAPI's classic path (validate against
+  ``response_model``, ``jsonable_encoder``, ``json.dumps``), as on the oldest
+  FastAPI in requirements.txt;
+* ``fastapi``: a model per row, then the installed FastAPI's own path;
+* ``fast``: one ``model_validate`` over the envelope and ``ModelJSONResponse``.
+
+The three outputs are checked to decode to the same document before timing.
+
+    python -m bench.serialization --items 100 --json
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import statistics
+import sys
+import timeit
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from pydantic import BaseModel
+
+from app.api.routes import advertisers, channels, mini_apps, trackers
+from app.core.responses import ModelJSONResponse
+from app.schemas.advertiser import AdvertiserListEnvelope, AdvertiserListItem
+from app.schemas.channel import ChannelListEnvelope, ChannelListItem
+from app.schemas.mini_app import MiniAppListEnvelope, MiniAppListItem
+from app.schemas.tracker import (
+    Tracker,
+    TrackerListEnvelope,
+    TrackerMention,
+    TrackerMentionListEnvelope,
+)
+
+_NOW = datetime(2026, 1, 1, tzinfo=UTC)
+_PAGE = {"next_cursor": "eyJvZmZzZXQiOiAxMDB9", "has_more": True}
+_SUPPORTS_DUMP_JSON = "dump_json" in inspect.signature(serialize_response).parameters
+
+
+def _channel_rows(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "channel_id": f"00000000-0000-0000-0000-{index:012d}",
+            "name": f"Channel {index}",
+            "username": f"channel_{index}",
+            "subscribers": 1_000_000 - index,
+            "growth_24h": 0.1 * index,
+            "growth_7d": 0.7 * index,
+            "growth_30d": None,
+            "engagement_rate": 3.25,
+            "category_slug": "tech",
+            "category_name": "Technology",
+            "country_code": "US",
+            "status": "verified",
+            "verified": True,
+            "scam": False,
+        }
+        for index in range(count)
+    ]
+
+
+def _mini_app_rows(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "mini_app_id": f"00000000-0000-0000-0000-{index:012d}",
+            "name": f"Mini App {index}",
+            "slug": f"mini-app-{index}",
+            "category_slug": "games",
+            "daily_users": 50_000 - index,
+            "total_users": 900_000,
+            "sessions": 120_000,
+            "rating": 4.5,
+            "growth_weekly": 12.5,
+            "launched_at": "2025-06-01",
+        }
+        for index in range(count)
+    ]
+
+
+def _advertiser_rows(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "rank": index + 1,
+            "advertiser_id": f"00000000-0000-0000-0000-{index:012d}",
+            "name": f"Advertiser {index}",
+            "slug": f"advertiser-{index}",
+            "logo_url": f"https://cdn.example.com/logos/{index}.png",
+            "industry_slug": "fintech",
+            "industry_name": "Fintech",
+            "estimated_spend": 12_345.67,
+            "total_ads": 40,
+            "channels_used": 12,
+            "avg_engagement_rate": 2.5,
+            "trend": -3.5,
+            "active_creatives": 4,
+            "last_active_at": "2025-12-31T12:00:00+00:00",
+        }
+        for index in range(count)
+    ]
+
+
+def _tracker_rows(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "tracker_id": f"00000000-0000-0000-0000-{index:012d}",
+            "account_id": "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
+            "tracker_type": "keyword",
+            "tracker_value": f"keyword {index}",
+            "status": "active",
+            "mentions_count": index * 3,
+            "last_activity_at": _NOW - timedelta(minutes=index),
+            "notify_push": True,
+            "notify_telegram": False,
+            "notify_email": False,
+        }
+        for index in range(count)
+    ]
+
+
+def _mention_rows(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "mention_id": f"00000000-0000-0000-0000-{index:012d}",
+            "tracker_id": "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb",
+            "mention_seq": 10_000 - index,
+            "channel_id": "cccccccc-cccc-cccc-cccc-cccccccccccc",
+            "channel_name": "Tech News Daily",
+            "post_id": f"post-{index}",
+            "mention_text": "new release",
+            "context_snippet": "... the new release of the SDK ships with ...",
+            "mentioned_at": (_NOW - timedelta(seconds=index)).isoformat(),
+        }
+        for index in range(count)
+    ]
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    name: str
+    path: str
+    envelope: type[BaseModel]
+    item: type[BaseModel]
+    rows: Callable[[int], list[dict[str, Any]]]
+    page: dict[str, Any] | None
+    meta: dict[str, Any]
+
+    def payload(self, rows: list[dict[str, Any]]) -> dict[str, Any]:
+        payload: dict[str, Any] = {"data": rows, "meta": self.meta}
+        if self.page is not None:
+            payload["page"] = self.page
+        return payload
+
+
+ENDPOINTS = (
+    Endpoint(
+        name="channels",
+        path="/v1.0/channels",
+        envelope=ChannelListEnvelope,
+        item=ChannelListItem,
+        rows=_channel_rows,
+        page=_PAGE,
+        meta={"total_estimate": 5000},
+    ),
+    Endpoint(
+        name="mini_apps",
+        path="/v1.0/mini-apps",
+        envelope=MiniAppListEnvelope,
+        item=MiniAppListItem,
+        rows=_mini_app_rows,
+        page=_PAGE,
+        meta={"total_estimate": 5000},
+    ),
+    Endpoint(
+        name="advertisers",
+        path="/v1.0/advertisers",
+        envelope=AdvertiserListEnvelope,
+        item=AdvertiserListItem,
+        rows=_advertiser_rows,
+        page=_PAGE,
+        meta={
+            "total_estimate": 5000,
+            "time_period_days": 30,
+            "snapshot_date": "2025-12-31",
+            "baseline_date": "2025-12-01",
+        },
+    ),
+    Endpoint(
+        name="trackers",
+        path="/v1.0/accounts/{account_id}/trackers",
+        envelope=TrackerListEnvelope,
+        item=Tracker,
+        rows=_tracker_rows,
+        page=None,
+        meta={},
+    ),
+    Endpoint(
+        name="tracker_mentions",
+        path="/v1.0/accounts/{account_id}/tracker-mentions",
+        envelope=TrackerMentionListEnvelope,
+        item=TrackerMention,
+        rows=_mention_rows,
+        page=_PAGE,
+        meta={},
+    ),
+)
+
+
+def _response_field(path: str) -> Any:
+    routes = (
+        route
+        for module in (channels, mini_apps, advertisers, trackers)
+        for route in module.router.routes
+    )
+    for route in routes:
+        if isinstance(route, APIRoute) and route.path == path and "GET" in route.methods:
+            return route.response_field
+    raise LookupError(path)
+
+
+def _per_row_envelope(endpoint: Endpoint, rows: list[dict[str, Any]]) -> BaseModel:
+    payload = endpoint.payload([endpoint.item(**row) for row in rows])
+    return endpoint.envelope(**payload)
+
+
+def _fastapi_body(field: Any, content: BaseModel, *, dump_json: bool) -> bytes:
+    kwargs = {"dump_json": True} if dump_json else {}
+    serialized = asyncio.run(serialize_response(field=field, response_content=content, **kwargs))
+    return serialized if dump_json else JSONResponse(serialized).body
+
+
+@dataclass
+class Result:
+    endpoint: str
+    items: int
+    legacy_us: float
+    fastapi_us: float
+    fast_us: float
+    speedup_vs_legacy: float
+    speedup_vs_fastapi: float
+
+
+def _time_us(func: Callable[[], Any], *, number: int, repeat: int) -> float:
+    runs = timeit.repeat(func, number=number, repeat=repeat)
+    return statistics.median(runs) / number * 1_000_000
+
+
+def bench_endpoint(endpoint: Endpoint, *, items: int, number: int, repeat: int) -> Result:
+    field = _response_field(endpoint.path)
+    rows = endpoint.rows(items)
+
+    def legacy() -> bytes:
+        return _fastapi_body(field, _per_row_envelope(endpoint, rows), dump_json=False)
+
+    def fastapi_default() -> bytes:
+        envelope = _per_row_envelope(endpoint, rows)
+        return _fastapi_body(field, envelope, dump_json=_SUPPORTS_DUMP_JSON)
+
+    def fast() -> bytes:
+        return ModelJSONResponse(endpoint.envelope.model_validate(endpoint.payload(rows))).body
+
+    expected = json.loads(legacy())
+    for candidate in (fastapi_default, fast):
+        if json.loads(candidate()) != expected:
+            raise AssertionError(f"{endpoint.name}: {candidate.__name__} output differs")
+
+    # asyncio.run() costs the same in the first two paths; time it once and
+    # take it out so only serialization is compared.
+    loop_overhead = _time_us(lambda: asyncio.run(asyncio.sleep(0)), number=number, repeat=repeat)
+    legacy_us = _time_us(legacy, number=number, repeat=repeat) - loop_overhead
+    fastapi_us = _time_us(fastapi_default, number=number, repeat=repeat) - loop_overhead
+    fast_us = _time_us(fast, number=number, repeat=repeat)
+    return Result(
+        endpoint=endpoint.name,
+        items=items,
+        legacy_us=round(legacy_us, 1),
+        fastapi_us=round(fastapi_us, 1),
+        fast_us=round(fast_us, 1),
+        speedup_vs_legacy=round(legacy_us / fast_us, 2),
+        speedup_vs_fastapi=round(fastapi_us / fast_us, 2),
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark listing response serialization.")
+    parser.add_argument("--items", type=int, default=100, help="Rows per page")
+    parser.add_argument("--number", type=int, default=200, help="Calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs (median is kept)")
+    parser.add_argument("--endpoint", action="append", help="Only these endpoints")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    selected = [
+        endpoint for endpoint in ENDPOINTS if not args.endpoint or endpoint.name in args.endpoint
+    ]
+    results = [
+        bench_endpoint(endpoint, items=args.items, number=args.number, repeat=args.repeat)
+        for endpoint in selected
+    ]
+
+    if args.json:
+        json.dump([asdict(result) for result in results], sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+
+    print(f"{'endpoint':<18}{'items':>6}{'legacy us':>12}{'fastapi us':>12}{'fast us':>10}")
+    for result in results:
+        print(
+            f"{result.endpoint:<18}{result.items:>6}{result.legacy_us:>12}"
+            f"{result.fastapi_us:>12}{result.fast_us:>10}"
+            f"   x{result.speedup_vs_legacy} / x{result.speedup_vs_fastapi}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@ TRUNCATE TABLE
   magic_tokens,
   team_members,
   notifications,
+  notification_counters,
+  notifications_archive,
+  notification_fanout_jobs,
   users,
   accounts
 RESTART IDENTITY;
@@ -196,7 +196,11 @@ AS $$
 BEGIN
   NEW.search_tsv := to_tsvector(
     'simple',
-    unaccent(COALESCE(NEW.name::text, '') || ' ' || COALESCE(NEW.description, ''))
+    unaccent(
+      COALESCE(NEW.name::text, '') || ' ' ||
+      COALESCE(NEW.slug::text, '') || ' ' ||
+      COALESCE(NEW.description, '')
+    )
   );
   RETURN NEW;
 END;
@@ -219,6 +223,73 @@ BEGIN
 END;
 $$;
 
+CREATE OR REPLACE FUNCTION notifications_unread_insert_trigger()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  PERFORM apply_notification_unread_deltas(
+    (
+      SELECT COALESCE(jsonb_agg(jsonb_build_object('user_id', user_id, 'delta', delta)), '[]')
+      FROM (
+        SELECT n.user_id, COUNT(*)::int AS delta
+        FROM new_rows n
+        WHERE NOT n.is_read AND n.deleted_at IS NULL
+        GROUP BY n.user_id
+      ) AS deltas
+    )
+  );
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION notifications_unread_update_trigger()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  PERFORM apply_notification_unread_deltas(
+    (
+      SELECT COALESCE(jsonb_agg(jsonb_build_object('user_id', user_id, 'delta', delta)), '[]')
+      FROM (
+        SELECT user_id, SUM(delta)::int AS delta
+        FROM (
+          SELECT n.user_id, 1 AS delta
+          FROM new_rows n
+          WHERE NOT n.is_read AND n.deleted_at IS NULL
+          UNION ALL
+          SELECT o.user_id, -1
+          FROM old_rows o
+          WHERE NOT o.is_read AND o.deleted_at IS NULL
+        ) AS changes
+        GROUP BY user_id
+      ) AS deltas
+    )
+  );
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION notifications_unread_delete_trigger()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  PERFORM apply_notification_unread_deltas(
+    (
+      SELECT COALESCE(jsonb_agg(jsonb_build_object('user_id', user_id, 'delta', delta)), '[]')
+      FROM (
+        SELECT o.user_id, -COUNT(*)::int AS delta
+        FROM old_rows o
+        WHERE NOT o.is_read AND o.deleted_at IS NULL
+        GROUP BY o.user_id
+      ) AS deltas
+    )
+  );
+  RETURN NULL;
+END;
+$$;
+
 -- ============================================================
 -- Bootstrap auth + account core (existing model)
 -- ============================================================
@@ -289,6 +360,48 @@ CREATE TABLE IF NOT EXISTS notifications (
   deleted_by UUID REFERENCES users(id) ON DELETE SET NULL
 );
 
+-- Unread (is_read = false, not deleted) notifications per user, maintained by
+-- the notifications_unread_* triggers so the bell badge is a key lookup.
+CREATE TABLE IF NOT EXISTS notification_counters (
+  user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+  unread_count INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Notifications removed by the retention job when archiving is enabled.
+CREATE TABLE IF NOT EXISTS notifications_archive (
+  LIKE notifications INCLUDING DEFAULTS,
+  archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Bulk notification deliveries; run_notification_fanout_batch advances
+-- last_user_id and delivered_count in the same transaction as each insert.
+CREATE TABLE IF NOT EXISTS notification_fanout_jobs (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  target_type TEXT NOT NULL,
+  target_account_id UUID REFERENCES accounts(id) ON DELETE CASCADE,
+  target_user_ids UUID[],
+  subject TEXT NOT NULL,
+  body TEXT NOT NULL,
+  type notification_type NOT NULL DEFAULT 'system',
+  details TEXT,
+  cta TEXT,
+  status TEXT NOT NULL DEFAULT 'queued',
+  total_recipients INTEGER,
+  delivered_count INTEGER NOT NULL DEFAULT 0,
+  last_user_id UUID,
+  error_message TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  created_by UUID REFERENCES users(id) ON DELETE SET NULL,
+  started_at TIMESTAMPTZ,
+  completed_at TIMESTAMPTZ,
+  CHECK (target_type IN ('users', 'account', 'all')),
+  CHECK (target_type <> 'users' OR target_user_ids IS NOT NULL),
+  CHECK (target_type <> 'account' OR target_account_id IS NOT NULL),
+  CHECK (status IN ('queued', 'processing', 'completed', 'failed')),
+  CHECK (delivered_count >= 0)
+);
+
 CREATE TABLE IF NOT EXISTS magic_tokens (
   id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
   user_id UUID REFERENCES users(id) ON DELETE CASCADE,
@@ -401,7 +514,10 @@ CREATE TABLE IF NOT EXISTS api_key_usage_daily (
   CHECK (request_count >= 0),
   CHECK (error_count >= 0),
   CHECK (average_latency_ms IS NULL OR average_latency_ms >= 0)
-);
+) PARTITION BY RANGE (usage_date);
+
+CREATE TABLE IF NOT EXISTS api_key_usage_daily_default
+  PARTITION OF api_key_usage_daily DEFAULT;
 
 CREATE TABLE IF NOT EXISTS audit_events (
   id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -657,7 +773,10 @@ CREATE TABLE IF NOT EXISTS channel_metrics_daily (
   CHECK (avg_views IS NULL OR avg_views >= 0),
   CHECK (engagement_rate IS NULL OR (engagement_rate BETWEEN 0 AND 100)),
   CHECK (posts_per_day IS NULL OR posts_per_day >= 0)
-);
+) PARTITION BY RANGE (metric_date);
+
+CREATE TABLE IF NOT EXISTS channel_metrics_daily_default
+  PARTITION OF channel_metrics_daily DEFAULT;
 
 CREATE TABLE IF NOT EXISTS channel_inout_daily (
   channel_id UUID NOT NULL REFERENCES channels(id) ON DELETE CASCADE,
@@ -800,7 +919,10 @@ CREATE TABLE IF NOT EXISTS post_metrics_daily (
   CHECK (comments_count IS NULL OR comments_count >= 0),
   CHECK (forwards_count IS NULL OR forwards_count >= 0),
   CHECK (engagement_rate IS NULL OR (engagement_rate BETWEEN 0 AND 100))
-);
+) PARTITION BY RANGE (metric_date);
+
+CREATE TABLE IF NOT EXISTS post_metrics_daily_default
+  PARTITION OF post_metrics_daily DEFAULT;
 
 CREATE TABLE IF NOT EXISTS post_reaction_breakdown (
   post_id UUID NOT NULL REFERENCES posts(id) ON DELETE CASCADE,
@@ -854,7 +976,10 @@ CREATE TABLE IF NOT EXISTS advertiser_metrics_daily (
   CHECK (active_creatives IS NULL OR active_creatives >= 0),
   CHECK (channels_used IS NULL OR channels_used >= 0),
   CHECK (avg_engagement_rate IS NULL OR (avg_engagement_rate BETWEEN 0 AND 100))
-);
+) PARTITION BY RANGE (metric_date);
+
+CREATE TABLE IF NOT EXISTS advertiser_metrics_daily_default
+  PARTITION OF advertiser_metrics_daily DEFAULT;
 
 CREATE TABLE IF NOT EXISTS ad_campaigns (
   id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -1107,8 +1232,10 @@ CREATE TABLE IF NOT EXISTS trackers (
   CHECK (mentions_count >= 0)
 );
 
+-- Unique constraints on a partitioned table must include the partition key,
+-- hence (id, mentioned_at) and a non-unique mention_seq fed by its sequence.
 CREATE TABLE IF NOT EXISTS tracker_mentions (
-  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  id UUID NOT NULL DEFAULT gen_random_uuid(),
   account_id UUID NOT NULL,
   tracker_id UUID NOT NULL,
   channel_id UUID REFERENCES channels(id) ON DELETE SET NULL,
@@ -1116,25 +1243,42 @@ CREATE TABLE IF NOT EXISTS tracker_mentions (
   mention_text TEXT NOT NULL,
   context_snippet TEXT,
   mentioned_at TIMESTAMPTZ NOT NULL,
-  mention_seq BIGSERIAL NOT NULL UNIQUE,
+  mention_seq BIGSERIAL NOT NULL,
   created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (id, mentioned_at),
   FOREIGN KEY (tracker_id, account_id)
     REFERENCES trackers(id, account_id)
     ON DELETE CASCADE
+) PARTITION BY RANGE (mentioned_at);
+
+CREATE TABLE IF NOT EXISTS tracker_mentions_default
+  PARTITION OF tracker_mentions DEFAULT;
+
+-- Keyset position of the mention matching pipeline over posts(created_at, id)
+CREATE TABLE IF NOT EXISTS tracker_match_cursors (
+  name TEXT PRIMARY KEY,
+  last_created_at TIMESTAMPTZ NOT NULL,
+  last_post_id UUID NOT NULL,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
 CREATE TABLE IF NOT EXISTS export_jobs (
   id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
   account_id UUID NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
   export_type TEXT NOT NULL,
+  format TEXT NOT NULL DEFAULT 'csv',
   filters JSONB NOT NULL DEFAULT '{}'::jsonb,
   status export_status NOT NULL DEFAULT 'queued',
+  rows_exported BIGINT NOT NULL DEFAULT 0,
   file_url TEXT,
   file_size_bytes BIGINT,
   error_message TEXT,
   created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
   created_by UUID REFERENCES users(id) ON DELETE SET NULL,
   started_at TIMESTAMPTZ,
+  -- Refreshed by the worker after every page; claim_export_job reclaims
+  -- processing jobs whose heartbeat went quiet.
+  heartbeat_at TIMESTAMPTZ,
   completed_at TIMESTAMPTZ,
   expires_at TIMESTAMPTZ,
   CHECK (export_type IN (
@@ -1146,6 +1290,8 @@ CREATE TABLE IF NOT EXISTS export_jobs (
     'mini_apps_csv',
     'custom'
   )),
+  CHECK (format IN ('csv', 'ndjson', 'parquet')),
+  CHECK (rows_exported >= 0),
   CHECK (file_size_bytes IS NULL OR file_size_bytes >= 0),
   CHECK (completed_at IS NULL OR started_at IS NULL OR completed_at >= started_at)
 );
@@ -1231,6 +1377,18 @@ CREATE INDEX IF NOT EXISTS notifications_user_idx
   ON notifications(user_id, created_at DESC)
   WHERE deleted_at IS NULL;
 
+CREATE INDEX IF NOT EXISTS notifications_user_unread_idx
+  ON notifications(user_id)
+  WHERE is_read = FALSE AND deleted_at IS NULL;
+
+-- Retention scans: expired by age, and soft-deleted rows by deletion time.
+CREATE INDEX IF NOT EXISTS notifications_created_idx
+  ON notifications(created_at);
+
+CREATE INDEX IF NOT EXISTS notifications_deleted_idx
+  ON notifications(deleted_at)
+  WHERE deleted_at IS NOT NULL;
+
 CREATE INDEX IF NOT EXISTS magic_tokens_lookup_idx
   ON magic_tokens(email, token, expires_at DESC)
   WHERE used_at IS NULL;
@@ -1325,12 +1483,45 @@ CREATE INDEX IF NOT EXISTS trackers_account_status_idx
 CREATE INDEX IF NOT EXISTS tracker_mentions_account_cursor_idx
   ON tracker_mentions(account_id, mention_seq DESC);
 
+-- get_latest_mention_seq reads the newest mention across all accounts; with
+-- mention_seq no longer unique, nothing else serves that ORDER BY ... LIMIT 1.
+CREATE INDEX IF NOT EXISTS tracker_mentions_seq_idx
+  ON tracker_mentions(mention_seq DESC);
+
 CREATE INDEX IF NOT EXISTS tracker_mentions_tracker_time_idx
   ON tracker_mentions(tracker_id, mentioned_at DESC);
 
+-- One mention per tracker and post; lets the matching pipeline re-run safely.
+-- mentioned_at is the post's published_at, so including the partition key
+-- does not weaken the guarantee.
+CREATE UNIQUE INDEX IF NOT EXISTS tracker_mentions_tracker_post_uidx
+  ON tracker_mentions(tracker_id, post_id, mentioned_at);
+
+CREATE INDEX IF NOT EXISTS trackers_updated_at_idx
+  ON trackers(updated_at, id);
+
+CREATE INDEX IF NOT EXISTS posts_created_id_idx
+  ON posts(created_at, id);
+
 CREATE INDEX IF NOT EXISTS export_jobs_account_status_idx
   ON export_jobs(account_id, status, created_at DESC);
 
+CREATE INDEX IF NOT EXISTS export_jobs_account_created_idx
+  ON export_jobs(account_id, created_at DESC, id DESC);
+
+-- Worker claims (oldest queued first) and expiry sweeps.
+CREATE INDEX IF NOT EXISTS export_jobs_queued_idx
+  ON export_jobs(created_at)
+  WHERE status IN ('queued', 'processing');
+
+CREATE INDEX IF NOT EXISTS export_jobs_expires_idx
+  ON export_jobs(expires_at)
+  WHERE status = 'completed';
+
+CREATE INDEX IF NOT EXISTS notification_fanout_jobs_pending_idx
+  ON notification_fanout_jobs(created_at)
+  WHERE status IN ('queued', 'processing');
+
 -- ============================================================
 -- Triggers
 -- ============================================================
@@ -1478,9 +1669,14 @@ BEFORE UPDATE ON mini_apps
 FOR EACH ROW
 EXECUTE FUNCTION set_updated_at();
 
+-- Counter updates from the mention pipeline (mentions_count, last_activity_at)
+-- leave updated_at alone, so the matcher's incremental sync skips them.
 DROP TRIGGER IF EXISTS trackers_set_updated_at ON trackers;
 CREATE TRIGGER trackers_set_updated_at
-BEFORE UPDATE ON trackers
+BEFORE UPDATE OF
+  tracker_type, tracker_value, normalized_value, status, notify_push, notify_telegram,
+  notify_email, paused_at, updated_by, deleted_at, deleted_by
+ON trackers
 FOR EACH ROW
 EXECUTE FUNCTION set_updated_at();
 
@@ -1505,7 +1701,7 @@ EXECUTE FUNCTION ad_creatives_search_tsv_trigger();
 
 DROP TRIGGER IF EXISTS advertisers_search_tsv_biu ON advertisers;
 CREATE TRIGGER advertisers_search_tsv_biu
-BEFORE INSERT OR UPDATE OF name, description ON advertisers
+BEFORE INSERT OR UPDATE OF name, slug, description ON advertisers
 FOR EACH ROW
 EXECUTE FUNCTION advertisers_search_tsv_trigger();
 
@@ -1515,6 +1711,38 @@ BEFORE INSERT OR UPDATE OF name, slug, description ON mini_apps
 FOR EACH ROW
 EXECUTE FUNCTION mini_apps_search_tsv_trigger();
 
+-- Notification unread counters
+DROP TRIGGER IF EXISTS notifications_unread_ai ON notifications;
+CREATE TRIGGER notifications_unread_ai
+AFTER INSERT ON notifications
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notifications_unread_insert_trigger();
+
+DROP TRIGGER IF EXISTS notifications_unread_au ON notifications;
+CREATE TRIGGER notifications_unread_au
+AFTER UPDATE ON notifications
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notifications_unread_update_trigger();
+
+DROP TRIGGER IF EXISTS notifications_unread_ad ON notifications;
+CREATE TRIGGER notifications_unread_ad
+AFTER DELETE ON notifications
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notifications_unread_delete_trigger();
+
+-- Resynchronise counters with the notifications already stored
+INSERT INTO notification_counters (user_id, unread_count)
+SELECT u.id, COUNT(n.id)
+FROM users u
+LEFT JOIN notifications n
+  ON n.user_id = u.id AND NOT n.is_read AND n.deleted_at IS NULL
+GROUP BY u.id
+ON CONFLICT (user_id) DO UPDATE
+SET unread_count = EXCLUDED.unread_count, updated_at = NOW();
+
 -- ============================================================
 -- Helper functions for API service-level authorization checks
 -- ============================================================
@@ -1577,7 +1805,11 @@ SELECT
     WHEN COALESCE(m.subscribers, c.subscribers_current) < 1000000 THEN 'large'
     ELSE 'huge'
   END AS size_bucket,
-  c.updated_at
+  c.updated_at,
+  c.search_tsv,
+  -- Same expressions as channels_name_trgm_idx / channels_username_trgm_idx.
+  lower(c.name::text) AS search_name,
+  lower(COALESCE(c.username::text, '')) AS search_username
 FROM channels c
 LEFT JOIN LATERAL (
   SELECT
@@ -1664,7 +1896,8 @@ SELECT
   m.clicks,
   m.ctr,
   m.engagement_rate,
-  m.spend
+  m.spend,
+  ac.search_tsv
 FROM ad_creatives ac
 JOIN advertisers a ON a.id = ac.advertiser_id
 LEFT JOIN channels ch ON ch.id = ac.source_channel_id
@@ -1719,7 +1952,10 @@ SELECT
   COALESCE(mm.total_users, ma.total_users_current) AS total_users,
   COALESCE(mm.sessions, ma.total_sessions_current) AS sessions,
   COALESCE(mm.avg_session_seconds, ma.avg_session_seconds) AS avg_session_seconds,
-  COALESCE(mm.growth_weekly, ma.growth_weekly) AS growth_weekly
+  COALESCE(mm.growth_weekly, ma.growth_weekly) AS growth_weekly,
+  ma.search_tsv,
+  -- Same expression as mini_apps_name_trgm_idx.
+  lower(ma.name::text) AS search_name
 FROM mini_apps ma
 LEFT JOIN mini_app_categories mac ON mac.id = ma.category_id
 LEFT JOIN LATERAL (
@@ -1783,4 +2019,541 @@ SELECT
   growth_30d
 FROM vw_account_channel_insights;
 
+-- ============================================================
+-- Catalog search functions
+-- ============================================================
+-- Terms of 3+ characters match every word as a lexeme prefix against the
+-- search_tsv GIN indexes and are ranked with ts_rank. Shorter terms (and terms
+-- without words) are matched as name prefixes through the trigram indexes and
+-- ranked by similarity. The 3 character threshold must match
+-- FULL_TEXT_MIN_LENGTH in app/crud/search.py.
+
+-- 'cryp tele' -> 'cryp':* & 'tele':*, NULL without words. Must match
+-- prefix_tsquery in app/crud/search.py.
+CREATE OR REPLACE FUNCTION search_prefix_tsquery(search_query TEXT)
+RETURNS tsquery
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT to_tsquery('simple', string_agg(word || ':*', ' & '))
+  FROM regexp_split_to_table(lower(unaccent(search_query)), '[^[:alnum:]]+') AS word
+  WHERE word <> '';
+$$;
+
+CREATE OR REPLACE FUNCTION search_catalog_channels(search_query TEXT)
+RETURNS TABLE (
+  channel_id UUID,
+  telegram_channel_id BIGINT,
+  name CITEXT,
+  username CITEXT,
+  country_code CHAR(2),
+  country_name TEXT,
+  status channel_status,
+  verified BOOLEAN,
+  scam BOOLEAN,
+  category_id UUID,
+  category_slug CITEXT,
+  category_name TEXT,
+  subscribers BIGINT,
+  avg_views BIGINT,
+  engagement_rate NUMERIC,
+  growth_24h NUMERIC,
+  growth_7d NUMERIC,
+  growth_30d NUMERIC,
+  posts_per_day NUMERIC,
+  size_bucket TEXT,
+  updated_at TIMESTAMPTZ,
+  search_rank REAL
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    v.channel_id, v.telegram_channel_id, v.name, v.username, v.country_code,
+    v.country_name, v.status, v.verified, v.scam, v.category_id, v.category_slug,
+    v.category_name, v.subscribers, v.avg_views, v.engagement_rate, v.growth_24h,
+    v.growth_7d, v.growth_30d, v.posts_per_day, v.size_bucket, v.updated_at,
+    ts_rank(v.search_tsv, search_prefix_tsquery(search_query))
+  FROM vw_catalog_channels v
+  WHERE char_length(btrim(search_query)) >= 3
+    AND v.search_tsv @@ search_prefix_tsquery(search_query)
+  UNION ALL
+  SELECT
+    v.channel_id, v.telegram_channel_id, v.name, v.username, v.country_code,
+    v.country_name, v.status, v.verified, v.scam, v.category_id, v.category_slug,
+    v.category_name, v.subscribers, v.avg_views, v.engagement_rate, v.growth_24h,
+    v.growth_7d, v.growth_30d, v.posts_per_day, v.size_bucket, v.updated_at,
+    GREATEST(
+      similarity(v.search_name, lower(btrim(search_query))),
+      similarity(v.search_username, lower(btrim(search_query)))
+    )
+  FROM vw_catalog_channels v
+  WHERE (char_length(btrim(search_query)) < 3 OR search_prefix_tsquery(search_query) IS NULL)
+    AND (
+      v.search_name LIKE lower(btrim(search_query)) || '%'
+      OR v.search_username LIKE lower(btrim(search_query)) || '%'
+    );
+$$;
+
+CREATE OR REPLACE FUNCTION search_mini_apps_latest(search_query TEXT)
+RETURNS TABLE (
+  mini_app_id UUID,
+  telegram_app_id TEXT,
+  name CITEXT,
+  slug CITEXT,
+  icon_url TEXT,
+  description TEXT,
+  rating NUMERIC,
+  launched_at DATE,
+  category_id UUID,
+  category_slug CITEXT,
+  category_name TEXT,
+  daily_users BIGINT,
+  total_users BIGINT,
+  sessions BIGINT,
+  avg_session_seconds INTEGER,
+  growth_weekly NUMERIC,
+  search_rank REAL
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    v.mini_app_id, v.telegram_app_id, v.name, v.slug, v.icon_url, v.description,
+    v.rating, v.launched_at, v.category_id, v.category_slug, v.category_name,
+    v.daily_users, v.total_users, v.sessions, v.avg_session_seconds, v.growth_weekly,
+    ts_rank(v.search_tsv, search_prefix_tsquery(search_query))
+  FROM vw_mini_apps_latest v
+  WHERE char_length(btrim(search_query)) >= 3
+    AND v.search_tsv @@ search_prefix_tsquery(search_query)
+  UNION ALL
+  SELECT
+    v.mini_app_id, v.telegram_app_id, v.name, v.slug, v.icon_url, v.description,
+    v.rating, v.launched_at, v.category_id, v.category_slug, v.category_name,
+    v.daily_users, v.total_users, v.sessions, v.avg_session_seconds, v.growth_weekly,
+    similarity(v.search_name, lower(btrim(search_query)))
+  FROM vw_mini_apps_latest v
+  WHERE (char_length(btrim(search_query)) < 3 OR search_prefix_tsquery(search_query) IS NULL)
+    AND v.search_name LIKE lower(btrim(search_query)) || '%';
+$$;
+
+CREATE OR REPLACE FUNCTION search_advertisers(search_query TEXT)
+RETURNS TABLE (advertiser_id UUID, search_rank REAL)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    a.id,
+    ts_rank(a.search_tsv, search_prefix_tsquery(search_query))
+  FROM advertisers a
+  WHERE char_length(btrim(search_query)) >= 3
+    AND a.search_tsv @@ search_prefix_tsquery(search_query)
+  UNION ALL
+  SELECT
+    a.id,
+    similarity(lower(a.name::text), lower(btrim(search_query)))
+  FROM advertisers a
+  WHERE (char_length(btrim(search_query)) < 3 OR search_prefix_tsquery(search_query) IS NULL)
+    AND lower(a.name::text) LIKE lower(btrim(search_query)) || '%';
+$$;
+
+-- ============================================================
+-- Tracker mention matching
+-- ============================================================
+-- Applies per-tracker mention counts produced by one pipeline batch in a
+-- single statement. counts: [{"tracker_id": uuid, "mentions": int, "last_activity_at": timestamptz}]
+CREATE OR REPLACE FUNCTION apply_tracker_mention_counts(counts JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+  UPDATE trackers t
+  SET
+    mentions_count = t.mentions_count + c.mentions,
+    last_activity_at = GREATEST(t.last_activity_at, c.last_activity_at)
+  FROM jsonb_to_recordset(counts) AS c(tracker_id UUID, mentions BIGINT, last_activity_at TIMESTAMPTZ)
+  WHERE t.id = c.tracker_id;
+$$;
+
+-- ============================================================
+-- Tracker mention statistics
+-- ============================================================
+-- Both aggregates range-scan tracker_mentions_tracker_time_idx for a single
+-- tracker; callers check the tracker belongs to the account beforehand.
+CREATE OR REPLACE FUNCTION tracker_mention_histogram(
+  p_tracker_id UUID,
+  p_bucket TEXT,
+  p_since TIMESTAMPTZ,
+  p_until TIMESTAMPTZ
+)
+RETURNS TABLE (bucket_start TIMESTAMPTZ, mentions BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT date_trunc(p_bucket, m.mentioned_at, 'UTC'), COUNT(*)
+  FROM tracker_mentions m
+  WHERE m.tracker_id = p_tracker_id
+    AND m.mentioned_at >= p_since
+    AND m.mentioned_at < p_until
+  GROUP BY 1
+  ORDER BY 1;
+$$;
+
+CREATE OR REPLACE FUNCTION tracker_mention_top_channels(
+  p_tracker_id UUID,
+  p_since TIMESTAMPTZ,
+  p_until TIMESTAMPTZ,
+  p_limit INTEGER
+)
+RETURNS TABLE (channel_id UUID, mentions BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT m.channel_id, COUNT(*)
+  FROM tracker_mentions m
+  WHERE m.tracker_id = p_tracker_id
+    AND m.mentioned_at >= p_since
+    AND m.mentioned_at < p_until
+    AND m.channel_id IS NOT NULL
+  GROUP BY m.channel_id
+  ORDER BY COUNT(*) DESC, m.channel_id
+  LIMIT p_limit;
+$$;
+
+-- ============================================================
+-- Notification counters
+-- ============================================================
+-- Applies per-user unread deltas: [{"user_id": uuid, "delta": int}]. The
+-- notifications_unread_* triggers are statement-level, so bulk inserts and
+-- mark-all-read touch each counter row once.
+CREATE OR REPLACE FUNCTION apply_notification_unread_deltas(deltas JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+  INSERT INTO notification_counters AS c (user_id, unread_count)
+  SELECT d.user_id, d.delta
+  FROM jsonb_to_recordset(deltas) AS d(user_id UUID, delta INTEGER)
+  WHERE d.delta <> 0
+  ON CONFLICT (user_id) DO UPDATE
+  SET unread_count = c.unread_count + EXCLUDED.unread_count, updated_at = NOW();
+$$;
+
+-- ============================================================
+-- Exports
+-- ============================================================
+-- Atomically hands one export job to a worker: the given job, or else the
+-- oldest queued one. Jobs left in processing by a worker that died are
+-- reclaimed once their last heartbeat_at (started_at before the first one) is
+-- older than p_stale_after. Returns no row when there is nothing to do, or the
+-- job is already being worked on.
+CREATE OR REPLACE FUNCTION claim_export_job(
+  p_job_id UUID DEFAULT NULL,
+  p_stale_after INTERVAL DEFAULT INTERVAL '1 hour'
+)
+RETURNS SETOF export_jobs
+LANGUAGE sql
+AS $$
+  UPDATE export_jobs j
+  SET
+    status = 'processing',
+    started_at = NOW(),
+    heartbeat_at = NOW(),
+    rows_exported = 0,
+    error_message = NULL
+  WHERE j.id = (
+    SELECT c.id
+    FROM export_jobs c
+    WHERE (p_job_id IS NULL OR c.id = p_job_id)
+      AND (
+        c.status = 'queued'
+        OR (
+          c.status = 'processing'
+          AND COALESCE(c.heartbeat_at, c.started_at) < NOW() - p_stale_after
+        )
+      )
+    ORDER BY c.created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING j.*;
+$$;
+
+-- Counts a requested export against today's account usage.
+CREATE OR REPLACE FUNCTION increment_account_exports(p_account_id UUID)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+  INSERT INTO account_usage_daily AS u (account_id, usage_date, exports_count)
+  VALUES (p_account_id, CURRENT_DATE, 1)
+  ON CONFLICT (account_id, usage_date) DO UPDATE
+  SET exports_count = u.exports_count + 1;
+$$;
+
+-- ============================================================
+-- Notification retention
+-- ============================================================
+-- Hard-deletes (or moves to notifications_archive) at most p_batch_size
+-- notifications created before p_created_before or soft-deleted before
+-- p_deleted_before, returning how many were removed. Callers loop until a
+-- batch comes back short, so no single statement holds locks for long;
+-- SKIP LOCKED keeps concurrent runs and user writes from blocking each other.
+CREATE OR REPLACE FUNCTION purge_notifications(
+  p_created_before TIMESTAMPTZ,
+  p_deleted_before TIMESTAMPTZ,
+  p_batch_size INTEGER,
+  p_archive BOOLEAN DEFAULT FALSE
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  IF p_archive THEN
+    WITH doomed AS (
+      SELECT n.id
+      FROM notifications n
+      WHERE n.created_at < p_created_before OR n.deleted_at < p_deleted_before
+      LIMIT p_batch_size
+      FOR UPDATE SKIP LOCKED
+    ),
+    purged AS (
+      DELETE FROM notifications n
+      USING doomed d
+      WHERE n.id = d.id
+      RETURNING n.*
+    )
+    INSERT INTO notifications_archive
+    SELECT purged.*, NOW() FROM purged;
+  ELSE
+    WITH doomed AS (
+      SELECT n.id
+      FROM notifications n
+      WHERE n.created_at < p_created_before OR n.deleted_at < p_deleted_before
+      LIMIT p_batch_size
+      FOR UPDATE SKIP LOCKED
+    )
+    DELETE FROM notifications n
+    USING doomed d
+    WHERE n.id = d.id;
+  END IF;
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$;
+
+-- ============================================================
+-- Notification fan-out
+-- ============================================================
+-- Recipients of a fan-out job in user id order, after p_after_user_id. Each
+-- target type gets its own query so explicit users and accounts are driven
+-- from their own rows instead of a scan of every user.
+CREATE OR REPLACE FUNCTION notification_fanout_recipients(
+  p_job_id UUID,
+  p_after_user_id UUID,
+  p_limit INTEGER
+)
+RETURNS TABLE (user_id UUID)
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+  v_job notification_fanout_jobs%ROWTYPE;
+BEGIN
+  SELECT * INTO v_job FROM notification_fanout_jobs j WHERE j.id = p_job_id;
+  IF NOT FOUND THEN
+    RETURN;
+  END IF;
+
+  IF v_job.target_type = 'users' THEN
+    RETURN QUERY
+    SELECT u.id
+    FROM (SELECT DISTINCT t.id FROM unnest(v_job.target_user_ids) AS t(id)) t
+    JOIN users u ON u.id = t.id AND u.deleted_at IS NULL
+    WHERE p_after_user_id IS NULL OR u.id > p_after_user_id
+    ORDER BY u.id
+    LIMIT p_limit;
+  ELSIF v_job.target_type = 'account' THEN
+    RETURN QUERY
+    SELECT u.id
+    FROM team_members tm
+    JOIN users u ON u.id = tm.user_id AND u.deleted_at IS NULL
+    WHERE tm.account_id = v_job.target_account_id
+      AND tm.status = 'accepted'
+      AND tm.deleted_at IS NULL
+      AND (p_after_user_id IS NULL OR u.id > p_after_user_id)
+    ORDER BY u.id
+    LIMIT p_limit;
+  ELSIF v_job.target_type = 'all' THEN
+    RETURN QUERY
+    SELECT u.id
+    FROM users u
+    WHERE u.deleted_at IS NULL
+      AND (p_after_user_id IS NULL OR u.id > p_after_user_id)
+    ORDER BY u.id
+    LIMIT p_limit;
+  END IF;
+END;
+$$;
+
+-- Inserts the next batch of a fan-out job with one INSERT ... SELECT and
+-- records progress atomically, so a crashed run resumes without duplicates.
+CREATE OR REPLACE FUNCTION run_notification_fanout_batch(p_job_id UUID, p_batch_size INTEGER)
+RETURNS TABLE (inserted INTEGER, delivered_count INTEGER, total_recipients INTEGER, done BOOLEAN)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_job notification_fanout_jobs%ROWTYPE;
+  v_inserted INTEGER;
+  v_last_user_id UUID;
+BEGIN
+  SELECT * INTO v_job FROM notification_fanout_jobs j WHERE j.id = p_job_id FOR UPDATE;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Notification fan-out job % not found', p_job_id;
+  END IF;
+  IF v_job.status = 'completed' THEN
+    RETURN QUERY SELECT 0, v_job.delivered_count, v_job.total_recipients, TRUE;
+    RETURN;
+  END IF;
+
+  IF v_job.total_recipients IS NULL THEN
+    SELECT COUNT(*) INTO v_job.total_recipients
+    FROM notification_fanout_recipients(p_job_id, NULL, NULL);
+  END IF;
+
+  WITH recipients AS (
+    SELECT r.user_id
+    FROM notification_fanout_recipients(p_job_id, v_job.last_user_id, p_batch_size) r
+  ),
+  written AS (
+    INSERT INTO notifications (user_id, account_id, subject, body, type, details, cta)
+    SELECT r.user_id, v_job.target_account_id, v_job.subject, v_job.body, v_job.type, v_job.details, v_job.cta
+    FROM recipients r
+    RETURNING 1
+  )
+  SELECT
+    (SELECT COUNT(*) FROM written),
+    (SELECT r.user_id FROM recipients r ORDER BY r.user_id DESC LIMIT 1)
+  INTO v_inserted, v_last_user_id;
+
+  UPDATE notification_fanout_jobs j
+  SET
+    status = CASE WHEN v_inserted < p_batch_size THEN 'completed' ELSE 'processing' END,
+    total_recipients = v_job.total_recipients,
+    delivered_count = j.delivered_count + v_inserted,
+    last_user_id = COALESCE(v_last_user_id, j.last_user_id),
+    started_at = COALESCE(j.started_at, NOW()),
+    completed_at = CASE WHEN v_inserted < p_batch_size THEN NOW() END
+  WHERE j.id = p_job_id
+  RETURNING j.delivered_count INTO v_job.delivered_count;
+
+  RETURN QUERY SELECT v_inserted, v_job.delivered_count, v_job.total_recipients, v_inserted < p_batch_size;
+END;
+$$;
+
+-- ============================================================
+-- Monthly partitions
+-- ============================================================
+-- tracker_mentions and the *_daily metric tables are range partitioned by
+-- month into <table>_pYYYYMM. app/services/partition_maintenance.py keeps
+-- future partitions pre-created and detaches (or drops) expired ones; rows
+-- outside every monthly range land in <table>_default.
+CREATE OR REPLACE FUNCTION _assert_monthly_partitioned(p_table TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF p_table NOT IN (
+    'tracker_mentions',
+    'channel_metrics_daily',
+    'post_metrics_daily',
+    'advertiser_metrics_daily',
+    'api_key_usage_daily'
+  ) THEN
+    RAISE EXCEPTION 'Table % is not monthly partitioned', p_table;
+  END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION list_monthly_partitions(p_table TEXT)
+RETURNS TABLE (partition_name TEXT, month_start DATE)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+  PERFORM _assert_monthly_partitioned(p_table);
+  RETURN QUERY
+    SELECT c.relname::text, to_date(right(c.relname::text, 6), 'YYYYMM')
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = p_table::regclass
+      AND c.relname ~ '_p[0-9]{6}$'
+    ORDER BY 2;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION create_monthly_partition(p_table TEXT, p_month DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_start DATE := date_trunc('month', p_month)::date;
+  v_name TEXT := format('%s_p%s', p_table, to_char(date_trunc('month', p_month), 'YYYYMM'));
+BEGIN
+  PERFORM _assert_monthly_partitioned(p_table);
+  -- Bounds are written as UTC midnights: exact for TIMESTAMPTZ keys, and DATE
+  -- keys drop the time part.
+  EXECUTE format(
+    'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+    v_name,
+    p_table,
+    v_start::text || ' 00:00:00+00',
+    (v_start + INTERVAL '1 month')::date::text || ' 00:00:00+00'
+  );
+  RETURN v_name;
+END;
+$$;
+
+-- Detached partitions stay behind as plain tables for archiving unless
+-- p_drop is set. Returns NULL when the month is not attached.
+CREATE OR REPLACE FUNCTION detach_monthly_partition(p_table TEXT, p_month DATE, p_drop BOOLEAN DEFAULT FALSE)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_name TEXT := format('%s_p%s', p_table, to_char(date_trunc('month', p_month), 'YYYYMM'));
+BEGIN
+  PERFORM _assert_monthly_partitioned(p_table);
+  IF NOT EXISTS (
+    SELECT 1
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = p_table::regclass AND c.relname = v_name
+  ) THEN
+    RETURN NULL;
+  END IF;
+
+  EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', p_table, v_name);
+  IF p_drop THEN
+    EXECUTE format('DROP TABLE %I', v_name);
+  END IF;
+  RETURN v_name;
+END;
+$$;
+
+-- Bootstrap the last 12 months and the next 3.
+SELECT create_monthly_partition(t.name, m.month::date)
+FROM unnest(ARRAY[
+  'tracker_mentions',
+  'channel_metrics_daily',
+  'post_metrics_daily',
+  'advertiser_metrics_daily',
+  'api_key_usage_daily'
+]) AS t(name)
+CROSS JOIN generate_series(
+  date_trunc('month', NOW() AT TIME ZONE 'UTC') - INTERVAL '12 months',
+  date_trunc('month', NOW() AT TIME ZONE 'UTC') + INTERVAL '3 months',
+  INTERVAL '1 month'
+) AS m(month);
+
 COMMIT;